@@ -1,9 +1,14 @@
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from dbgpt.component import SystemApp
-from dbgpt.configs.model_config import MODEL_DISK_CACHE_DIR, resolve_root_path
+from dbgpt.configs.model_config import (
+    EMBEDDING_CACHE_DIR,
+    MODEL_DISK_CACHE_DIR,
+    resolve_root_path,
+)
 from dbgpt.util.executor_utils import DefaultExecutorFactory
+from dbgpt.util.http_client_pool import HttpClientPool
 from dbgpt_app.config import ApplicationConfig, ServiceWebParameters
 from dbgpt_serve.rag.storage_manager import StorageManager
 
@@ -32,6 +37,8 @@ def initialize_components(
     system_app.register(
         DefaultExecutorFactory, max_workers=web_config.default_thread_pool_size
     )
+    # Keep-alive connections shared by the embedding, rerank and proxy LLM clients
+    system_app.register(HttpClientPool)
     system_app.register(DefaultScheduler)
     system_app.register_instance(controller)
     system_app.register(ConnectorManager)
@@ -45,7 +52,9 @@ def initialize_components(
 
     system_app.register_instance(multi_agents)
 
-    _initialize_embedding_model(system_app, default_embedding_name)
+    _initialize_embedding_model(
+        system_app, default_embedding_name, **_embedding_cache_kwargs(param)
+    )
     _initialize_rerank_model(system_app, default_rerank_name)
     _initialize_model_cache(system_app, web_config)
     _initialize_awel(system_app, web_config.awel_dirs)
@@ -61,6 +70,24 @@ def initialize_components(
     _initialize_prompt_templates()
 
 
+def _embedding_cache_kwargs(param: ApplicationConfig) -> Dict[str, Any]:
+    rag_config = param.rag
+    query_cache_dir = rag_config.query_embedding_cache_dir
+    if query_cache_dir:
+        query_cache_dir = resolve_root_path(query_cache_dir)
+    document_cache_dir = None
+    if rag_config.enable_document_embedding_cache:
+        document_cache_dir = resolve_root_path(
+            rag_config.document_embedding_cache_dir
+            or f"{EMBEDDING_CACHE_DIR}_{param.service.web.port}"
+        )
+    return {
+        "query_cache_size": rag_config.query_embedding_cache_size or 0,
+        "query_cache_dir": query_cache_dir,
+        "document_cache_dir": document_cache_dir,
+    }
+
+
 def _initialize_model_cache(system_app: SystemApp, web_config: ServiceWebParameters):
     from dbgpt.storage.cache import initialize_cache
 
@@ -75,7 +102,17 @@ def _initialize_model_cache(system_app: SystemApp, web_config: ServiceWebParamet
     else:
         persist_dir = f"{MODEL_DISK_CACHE_DIR}_{web_config.port}"
     persist_dir = resolve_root_path(persist_dir)
-    initialize_cache(system_app, storage_type, max_memory_mb, persist_dir)
+    initialize_cache(
+        system_app,
+        storage_type,
+        max_memory_mb,
+        persist_dir,
+        cache_policy=web_config.model_cache.cache_policy or "lru",
+        ttl_seconds=web_config.model_cache.ttl_seconds,
+        retrieval_policy=web_config.model_cache.retrieval_policy or "exact_match",
+        similarity_threshold=web_config.model_cache.similarity_threshold,
+        max_disk_mb=web_config.model_cache.max_disk_mb,
+    )
 
 
 def _initialize_awel(system_app: SystemApp, awel_dirs: Optional[str] = None):
@@ -116,6 +116,62 @@ class RagParameters(BaseParameters):
         default=3,
         metadata={"help": _("knowledge rerank top k")},
     )
+    query_embedding_cache_size: Optional[int] = field(
+        default=1024,
+        metadata={
+            "help": _(
+                "The max query embeddings cached in memory, 0 to disable the query "
+                "embedding cache"
+            )
+        },
+    )
+    query_embedding_cache_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to persist the query embedding cache(RocksDB), if None, "
+                "only cache in memory"
+            )
+        },
+    )
+    enable_document_embedding_cache: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to cache the document embeddings on disk, the unchanged "
+                "chunks are not embedded again when re-indexing. The cache is not "
+                "evicted, remove its directory to reclaim the space"
+            )
+        },
+    )
+    document_embedding_cache_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory of the document embedding cache, if None, use the "
+                "default directory"
+            )
+        },
+    )
+    enable_pdf_parse_cache: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to cache the parsed pages of the pdf files on disk, a file "
+                "parsed again is read from the cache. The cache keeps the text of the "
+                "files after their documents are deleted, up to 512MB"
+            )
+        },
+    )
+    pdf_parse_cache_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory of the pdf parse cache, if None, use the default "
+                "directory"
+            )
+        },
+    )
     storage: StorageConfig = field(
         default_factory=lambda: StorageConfig(),
         metadata={"help": _("Storage configuration")},
@@ -164,6 +220,10 @@ class RagParameters(BaseParameters):
         default=3,
         metadata={"help": _("kg_extraction_batch_size")},
     )
+    kg_extraction_texts_per_prompt: Optional[int] = field(
+        default=1,
+        metadata={"help": _("kg_extraction_texts_per_prompt")},
+    )
     kg_community_summary_batch_size: Optional[int] = field(
         default=20,
         metadata={"help": _("kg_community_summary_batch_size")},
@@ -5,10 +5,12 @@ from typing import Any, Optional, Type
 
 from dbgpt.component import ComponentType, SystemApp
 from dbgpt.core import Embeddings, RerankEmbeddings
+from dbgpt.rag.embedding.cached import CachedEmbeddings, QueryEmbeddingCache
 from dbgpt.rag.embedding.embedding_factory import (
     EmbeddingFactory,
     RerankEmbeddingFactory,
 )
+from dbgpt.storage.cache.embedding_cache import CacheBackedEmbeddings, EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +18,19 @@ logger = logging.getLogger(__name__)
 def _initialize_embedding_model(
     system_app: SystemApp,
     default_embedding_name: Optional[str] = None,
+    query_cache_size: int = 0,
+    query_cache_dir: Optional[str] = None,
+    document_cache_dir: Optional[str] = None,
 ):
     if default_embedding_name:
         logger.info("Register remote RemoteEmbeddingFactory")
-        system_app.register(RemoteEmbeddingFactory, model_name=default_embedding_name)
+        system_app.register(
+            RemoteEmbeddingFactory,
+            model_name=default_embedding_name,
+            query_cache_size=query_cache_size,
+            query_cache_dir=query_cache_dir,
+            document_cache_dir=document_cache_dir,
+        )
 
 
 def _initialize_rerank_model(
@@ -34,11 +45,31 @@ def _initialize_rerank_model(
 
 
 class RemoteEmbeddingFactory(EmbeddingFactory):
-    def __init__(self, system_app, model_name: str = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        system_app,
+        model_name: str = None,
+        query_cache_size: int = 0,
+        query_cache_dir: Optional[str] = None,
+        document_cache_dir: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(system_app=system_app)
         self._default_model_name = model_name
         self.kwargs = kwargs
         self.system_app = system_app
+        # Shared by all created embeddings
+        self._query_cache = (
+            QueryEmbeddingCache(query_cache_size, query_cache_dir)
+            if query_cache_size > 0
+            else None
+        )
+        self._document_cache = None
+        if document_cache_dir:
+            try:
+                self._document_cache = EmbeddingCache(document_cache_dir)
+            except Exception as e:
+                logger.warning(f"Failed to open the document embedding cache: {e}")
 
     def init_app(self, system_app):
         self.system_app = system_app
@@ -55,7 +86,12 @@ class RemoteEmbeddingFactory(EmbeddingFactory):
             ComponentType.WORKER_MANAGER_FACTORY, WorkerManagerFactory
         ).create()
         # Ignore model_name args
-        return RemoteEmbeddings(self._default_model_name, worker_manager)
+        embeddings = RemoteEmbeddings(self._default_model_name, worker_manager)
+        if self._document_cache is not None:
+            embeddings = CacheBackedEmbeddings(embeddings, self._document_cache)
+        if self._query_cache is not None:
+            return CachedEmbeddings(embeddings, self._query_cache)
+        return embeddings
 
 
 class RemoteRerankEmbeddingFactory(RerankEmbeddingFactory):
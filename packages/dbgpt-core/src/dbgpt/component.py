@@ -101,6 +101,7 @@ class ComponentType(str, Enum):
     RESOURCE_MANAGER = "dbgpt_resource_manager"
     VARIABLES_PROVIDER = "dbgpt_variables_provider"
     FILE_STORAGE_CLIENT = "dbgpt_file_storage_client"
+    HTTP_CLIENT_POOL = "dbgpt_http_client_pool"
 
 
 _EMPTY_DEFAULT_COMPONENT = "_EMPTY_DEFAULT_COMPONENT"
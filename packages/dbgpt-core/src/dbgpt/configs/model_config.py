@@ -21,6 +21,9 @@ DATASETS_DIR = os.path.join(PILOT_PATH, "datasets")
 DATA_DIR = os.path.join(PILOT_PATH, "data")
 PLUGINS_DIR = os.path.join(ROOT_PATH, "plugins")
 MODEL_DISK_CACHE_DIR = os.path.join(DATA_DIR, "model_cache")
+EMBEDDING_CACHE_DIR = os.path.join(DATA_DIR, "embedding_cache")
+PDF_PARSE_CACHE_DIR = os.path.join(DATA_DIR, "pdf_parse_cache")
+GRAPH_EXTRACTION_CHECKPOINT_DIR = os.path.join(DATA_DIR, "graph_extraction")
 FILE_SERVER_LOCAL_STORAGE_PATH = os.path.join(DATA_DIR, "file_server")
 _DAG_DEFINITION_DIR = os.path.join(ROOT_PATH, "examples/awel")
 # Global language setting
@@ -28,6 +28,8 @@ class CachePolicy(str, Enum):
 
     LRU = "lru"
     FIFO = "fifo"
+    # LRU eviction guarded by a TinyLFU admission filter
+    LFU = "lfu"
 
 
 @dataclass
@@ -36,6 +38,8 @@ class CacheConfig:
 
     retrieval_policy: Optional[RetrievalPolicy] = RetrievalPolicy.EXACT_MATCH
     cache_policy: Optional[CachePolicy] = CachePolicy.LRU
+    # Time to live of the entry in seconds, None means using the storage default
+    ttl: Optional[float] = None
 
 
 class CacheKey(Serializable, ABC, Generic[K]):
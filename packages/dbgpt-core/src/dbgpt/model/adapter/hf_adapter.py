@@ -96,6 +96,17 @@ class HFLLMDeployModelParameters(LLMDeployModelParameters):
             "valid_values": ["flash_attention_2"],
         },
     )
+    max_batch_size: Optional[int] = field(
+        default=1,
+        metadata={
+            "help": _(
+                "The max requests generated in one batch by continuous batching, a "
+                "new request joins the batch between two decode steps. 1 to generate "
+                "the requests one by one. The concurrency of the model should not be "
+                "less than it."
+            )
+        },
+    )
 
     @property
     def real_model_path(self) -> Optional[str]:
@@ -261,6 +272,13 @@ class NewHFChatModelAdapter(LLMModelAdapter, ABC):
         self, model, deploy_model_params: LLMDeployModelParameters
     ):
         """Get the generate stream function of the model"""
+        max_batch_size = getattr(deploy_model_params, "max_batch_size", None) or 1
+        if max_batch_size > 1:
+            from dbgpt.model.llm.llm_out.hf_batch_llm import (
+                batch_generate_stream_function,
+            )
+
+            return batch_generate_stream_function(max_batch_size)
         from dbgpt.model.llm.llm_out.hf_chat_llm import huggingface_chat_generate_stream
 
         return huggingface_chat_generate_stream
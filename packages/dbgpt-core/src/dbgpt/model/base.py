@@ -36,6 +36,10 @@ class ModelInstance:
     last_heartbeat: Optional[datetime] = None
     # Remove from the registry
     remove_from_registry: Optional[bool] = False
+    # The load of the instance reported by the heartbeat
+    in_flight: Optional[int] = None
+    queue_depth: Optional[int] = None
+    latency_ms: Optional[float] = None
 
     def to_dict(self) -> Dict:
         """Convert to dict"""
@@ -8,7 +8,7 @@ import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
 import shortuuid
 from fastapi import APIRouter, Depends, HTTPException
@@ -111,6 +111,19 @@ async def check_api_key(
         return None
 
 
+def _stream_delta(text: str, incremental: bool, sent_len: int) -> Tuple[str, int]:
+    """Return the text to send of a stream output and the length sent after it.
+
+    A delta output is sent as it is. A full output, a checkpoint of the delta stream
+    or an output of a worker not supporting deltas, only sends the text after the
+    length already sent.
+    """
+    text = text.replace("\ufffd", "")
+    if incremental:
+        return text, sent_len + len(text)
+    return text[sent_len:], max(sent_len, len(text))
+
+
 def create_error_response(code: int, message: str) -> JSONResponse:
     """Copy from fastchat.serve.openai_api_server.check_requests
 
@@ -324,11 +337,9 @@ class APIServer(BaseComponent):
             )
             yield transform_to_sse(chunk)
 
-            delta_text = ""
-            previous_text = ""
-            thinking_text = ""
-            previous_thinking_text = ""
-            full_text = ""
+            sent_text_len = 0
+            sent_thinking_len = 0
+            text_parts = []
 
             span = root_tracer.start_span(
                 "API.chat_completion_stream_generator",
@@ -338,28 +349,27 @@ class APIServer(BaseComponent):
                 },
             )
 
-            async for model_output in worker_manager.generate_stream(params):
+            # Consume the text deltas, the cumulative text is not rebuilt
+            stream_params = {**params, "incremental": True}
+            async for model_output in worker_manager.generate_stream(stream_params):
                 model_output: ModelOutput = model_output
                 if model_output.error_code != 0:
                     yield transform_to_sse(model_output.to_dict())
                     yield transform_to_sse("[DONE]")
                     return
+                # A delta output only carries the parts changed since the last one
+                delta_text = ""
+                thinking_text = ""
                 if model_output.has_text:
-                    full_text = model_output.text
-                    decoded_unicode = model_output.text.replace("\ufffd", "")
-                    delta_text = decoded_unicode[len(previous_text) :]
-                    previous_text = (
-                        decoded_unicode
-                        if len(decoded_unicode) > len(previous_text)
-                        else previous_text
+                    delta_text, sent_text_len = _stream_delta(
+                        model_output.text, model_output.incremental, sent_text_len
                     )
+                    text_parts.append(delta_text)
                 if model_output.has_thinking:
-                    decoded_unicode = model_output.thinking_text.replace("\ufffd", "")
-                    thinking_text = decoded_unicode[len(previous_thinking_text) :]
-                    previous_thinking_text = (
-                        decoded_unicode
-                        if len(decoded_unicode) > len(previous_thinking_text)
-                        else previous_thinking_text
+                    thinking_text, sent_thinking_len = _stream_delta(
+                        model_output.thinking_text,
+                        model_output.incremental,
+                        sent_thinking_len,
                     )
 
                 if not delta_text:
@@ -399,7 +409,7 @@ class APIServer(BaseComponent):
                 yield transform_to_sse(chunk)
             span.end(
                 metadata={
-                    "full_text": full_text,
+                    "full_text": "".join(text_parts),
                 }
             )
 
@@ -464,23 +474,20 @@ class APIServer(BaseComponent):
         for text in request.prompt:
             for i in range(request.n):
                 params["prompt"] = text
-                previous_text = ""
+                sent_text_len = 0
                 last_usage.prompt_tokens += curr_usage.prompt_tokens
                 last_usage.completion_tokens += curr_usage.completion_tokens
                 last_usage.total_tokens += curr_usage.total_tokens
 
-                async for model_output in worker_manager.generate_stream(params):
+                stream_params = {**params, "incremental": True}
+                async for model_output in worker_manager.generate_stream(stream_params):
                     model_output: ModelOutput = model_output
                     if model_output.error_code != 0:
                         yield transform_to_sse(model_output.to_dict())
                         yield transform_to_sse("[DONE]")
                         return
-                    decoded_unicode = model_output.text.replace("\ufffd", "")
-                    delta_text = decoded_unicode[len(previous_text) :]
-                    previous_text = (
-                        decoded_unicode
-                        if len(decoded_unicode) > len(previous_text)
-                        else previous_text
+                    delta_text, sent_text_len = _stream_delta(
+                        model_output.text, model_output.incremental, sent_text_len
                     )
 
                     if len(delta_text) == 0:
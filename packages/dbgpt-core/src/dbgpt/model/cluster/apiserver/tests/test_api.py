@@ -1,9 +1,12 @@
+import json
+
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 from dbgpt.component import SystemApp
 from dbgpt.model.cluster.apiserver.api import (
+    APIServer,
     ModelList,
     api_settings,
     initialize_apiserver,
@@ -96,3 +99,54 @@ async def test_chat_completions(client: AsyncClient, expected_messages):
         await chat_completion("/api/v1/chat/completions", chat_data, client)
         == expected_messages
     )
+
+
+class _MockWorkerManagerFactory:
+    def __init__(self, outputs):
+        self._outputs = outputs
+
+    def create(self):
+        return self
+
+    async def generate_stream(self, params):
+        assert params["incremental"]
+        for output in self._outputs:
+            yield output
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_thinking_deltas():
+    from dbgpt.core import ModelOutput
+    from dbgpt.model.utils.stream_utils import DeltaEncoder
+
+    encoder = DeltaEncoder()
+    outputs = [
+        encoder.encode(ModelOutput.build(text, thinking, is_reasoning_model=True))
+        for text, thinking in [
+            ("", "I think"),
+            ("", "I think hard"),
+            ("Hel", "I think hard"),
+            ("Hello", "I think hard"),
+            ("Hello world", "I think hard"),
+        ]
+    ]
+    api_server = APIServer()
+    api_server.get_worker_manager = _MockWorkerManagerFactory(outputs).create
+    deltas = []
+    async for event in api_server.chat_completion_stream_generator(
+        "test-model", {"messages": []}, 1
+    ):
+        data = event[len("data: ") :].strip()
+        if data == "[DONE]":
+            break
+        delta = json.loads(data)["choices"][0]["delta"]
+        if delta.get("role"):
+            continue
+        deltas.append((delta.get("content"), delta.get("reasoning_content")))
+    assert deltas == [
+        (None, "I think"),
+        (None, " hard"),
+        ("Hel", None),
+        ("lo", None),
+        (" world", None),
+    ]
@@ -34,6 +34,8 @@ class PromptRequest(BaseModel):
     frequency_penalty: Optional[float] = None
     chat_model: Optional[bool] = True
     """Whether to use chat model"""
+    incremental: bool = False
+    """Whether to stream the text deltas instead of the cumulative text"""
 
 
 class EmbeddingsRequest(BaseModel):
@@ -8,12 +8,17 @@ from fastapi import APIRouter
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.configs.model_config import resolve_root_path
 from dbgpt.model.base import ModelInstance
-from dbgpt.model.cluster.registry import EmbeddedModelRegistry, ModelRegistry
+from dbgpt.model.cluster.registry import (
+    EmbeddedModelRegistry,
+    ModelRegistry,
+    RegistrySnapshot,
+)
 from dbgpt.model.parameter import DBModelRegistryParameters, ModelControllerParameters
 from dbgpt.util.api_utils import APIMixin
 from dbgpt.util.api_utils import _api_remote as api_remote
 from dbgpt.util.api_utils import _sync_api_remote as sync_api_remote
 from dbgpt.util.fastapi import create_app
+from dbgpt.util.http_client_pool import get_http_client_pool
 from dbgpt.util.tracer.tracer_impl import (
     TracerParameters,
     initialize_tracer,
@@ -27,6 +32,9 @@ from dbgpt.util.utils import (
 
 logger = logging.getLogger(__name__)
 
+# The max seconds a watch request waits for the changes of the instances
+_MAX_WATCH_TIMEOUT_SECS = 60
+
 
 class BaseModelController(BaseComponent, ABC):
     name = ComponentType.MODEL_CONTROLLER
@@ -56,6 +64,15 @@ class BaseModelController(BaseComponent, ABC):
         """Send a heartbeat for a given model instance. This can be used to verify if
         the instance is still alive and functioning."""
 
+    async def watch_instances(
+        self, version: int = 0, timeout: float = 30
+    ) -> RegistrySnapshot:
+        """Wait for the changes of the instances since a version.
+
+        See :meth:`ModelRegistry.watch_instances`.
+        """
+        raise NotImplementedError
+
     async def model_apply(self) -> bool:
         raise NotImplementedError
 
@@ -87,6 +104,11 @@ class LocalModelController(BaseModelController):
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
         return await self.registry.send_heartbeat(instance)
 
+    async def watch_instances(
+        self, version: int = 0, timeout: float = 30
+    ) -> RegistrySnapshot:
+        return await self.registry.watch_instances(version, timeout)
+
 
 class _RemoteModelController(APIMixin, BaseModelController):
     def __init__(
@@ -126,6 +148,24 @@ class _RemoteModelController(APIMixin, BaseModelController):
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
         pass
 
+    async def watch_instances(
+        self, version: int = 0, timeout: float = 30
+    ) -> RegistrySnapshot:
+        # Not by api_remote, the request waits longer than its default timeout
+        base_url = await self.select_url()
+        client = get_http_client_pool().client()
+        response = await client.get(
+            f"{base_url}/api/controller/models/watch",
+            params={"version": version, "timeout": timeout},
+            timeout=timeout + 10,
+        )
+        if response.status_code != 200:
+            raise Exception(
+                f"Remote request error, error code: {response.status_code}, "
+                f"error msg: {response.text}"
+            )
+        return RegistrySnapshot.from_dict(response.json())
+
 
 class ModelRegistryClient(_RemoteModelController, ModelRegistry):
     async def get_all_model_instances(
@@ -158,6 +198,11 @@ class ModelControllerAdapter(BaseModelController):
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
         return await self.backend.send_heartbeat(instance)
 
+    async def watch_instances(
+        self, version: int = 0, timeout: float = 30
+    ) -> RegistrySnapshot:
+        return await self.backend.watch_instances(version, timeout)
+
     async def model_apply(self) -> bool:
         return await self.backend.model_apply()
 
@@ -251,6 +296,14 @@ async def api_get_all_instances(model_name: str = None, healthy_only: bool = Fal
     return await controller.get_all_instances(model_name, healthy_only=healthy_only)
 
 
+@router.get("/controller/models/watch")
+async def api_watch_instances(version: int = 0, timeout: float = 30):
+    """Wait for the changes of the instances since the version (long polling)."""
+    timeout = min(max(timeout, 0), _MAX_WATCH_TIMEOUT_SECS)
+    snapshot = await controller.watch_instances(version, timeout)
+    return snapshot.to_dict()
+
+
 @router.post("/controller/heartbeat")
 async def api_model_heartbeat(request: ModelInstance):
     return await controller.send_heartbeat(request)
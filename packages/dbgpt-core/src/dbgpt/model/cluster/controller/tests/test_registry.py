@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 import pytest
 
 from dbgpt.model.base import ModelInstance
-from dbgpt.model.cluster.registry import EmbeddedModelRegistry
+from dbgpt.model.cluster.registry import EmbeddedModelRegistry, RegistrySnapshot
 
 
 @pytest.fixture
@@ -142,3 +142,75 @@ async def test_same_model_name_different_ip_port(model_registry):
     assert len(instances) == 2
     assert instances[0].host != instances[1].host
     assert instances[0].port != instances[1].port
+
+
+@pytest.mark.asyncio
+async def test_select_by_reported_load(model_registry):
+    """
+    Test if the load reported by the heartbeat is kept and used to select instances
+    """
+    for port, in_flight in [(5000, 0), (5001, 8)]:
+        await model_registry.send_heartbeat(
+            ModelInstance(
+                model_name="test_model",
+                host="192.168.1.1",
+                port=port,
+                in_flight=in_flight,
+            )
+        )
+    instances = await model_registry.get_all_instances("test_model")
+    assert {ins.port: ins.in_flight for ins in instances} == {5000: 0, 5001: 8}
+    for _ in range(10):
+        selected = await model_registry.select_one_health_instance("test_model")
+        assert selected.port == 5000
+
+
+@pytest.mark.asyncio
+async def test_watch_instances(model_registry, model_instance):
+    """
+    Test if the watchers get a full snapshot first, then the changes only
+    """
+    await model_registry.register_instance(model_instance)
+    snapshot = await model_registry.watch_instances(0, timeout=1)
+    assert snapshot.full
+    assert [ins.port for ins in snapshot.instances] == [5000]
+
+    # No change, return at the timeout
+    unchanged = await model_registry.watch_instances(snapshot.version, timeout=0.1)
+    assert unchanged.version == snapshot.version
+    assert not unchanged.full and not unchanged.instances and not unchanged.removed
+
+    # The heartbeat only updates the last heartbeat, it is not a change
+    await model_registry.send_heartbeat(model_instance)
+    unchanged = await model_registry.watch_instances(snapshot.version, timeout=0.1)
+    assert unchanged.version == snapshot.version
+
+    # Woken up by the registration
+    watcher = asyncio.create_task(
+        model_registry.watch_instances(snapshot.version, timeout=10)
+    )
+    await asyncio.sleep(0.05)
+    assert not watcher.done()
+    await model_registry.register_instance(
+        ModelInstance(model_name="test_model", host="192.168.1.1", port=5001)
+    )
+    changes = await asyncio.wait_for(watcher, 1)
+    assert changes.version > snapshot.version
+    assert not changes.full
+    assert [ins.port for ins in changes.instances] == [5001]
+
+    model_instance.remove_from_registry = True
+    await model_registry.deregister_instance(model_instance)
+    removed = await model_registry.watch_instances(changes.version, timeout=1)
+    assert removed.removed == ["test_model@192.168.1.1:5000"]
+    assert not removed.instances
+
+
+def test_registry_snapshot_dict():
+    snapshot = RegistrySnapshot(
+        version=3,
+        instances=[ModelInstance(model_name="test_model", host="h", port=1)],
+        removed=["test_model@h:2"],
+        full=False,
+    )
+    assert RegistrySnapshot.from_dict(snapshot.to_dict()) == snapshot
@@ -3,13 +3,14 @@ from abc import ABC, abstractmethod
 from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
-from typing import AsyncIterator, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.core import ModelMetadata, ModelOutput
 from dbgpt.core.interface.parameter import BaseDeployModelParameters
 from dbgpt.model.base import WorkerApplyOutput, WorkerSupportedModel
 from dbgpt.model.cluster.base import WorkerApplyRequest, WorkerStartupRequest
+from dbgpt.model.cluster.routing import InstanceLoad
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.model.parameter import ModelWorkerParameters
 from dbgpt.util.parameter_utils import ParameterDescription
@@ -31,6 +32,8 @@ class WorkerRunData:
     _last_heartbeat: Optional[datetime] = None
     # Remove from the registry, Just for stop worker
     remove_from_registry: bool = False
+    # The load reported by the heartbeat of a remote instance
+    reported_load: Optional[InstanceLoad] = None
 
     def _to_print_key(self):
         model_name = self.model_params.name
@@ -44,6 +47,11 @@ class WorkerRunData:
         """Check if the worker is stopped""" ""
         return self.stop_event.is_set()
 
+    @property
+    def instance_key(self) -> str:
+        """The key of the instance in the routing and load metrics"""
+        return f"{self.worker_key}@{self.host}:{self.port}"
+
 
 class WorkerManager(ABC):
     @abstractmethod
@@ -155,6 +163,15 @@ class WorkerManager(ABC):
             params (Dict): parameters, eg. {"model": "vicuna-13b-v1.5"}
         """
 
+    def routing_metrics(self) -> Dict[str, Any]:
+        """Get the routing metrics
+
+        Returns:
+            Dict[str, Any]: The routing strategy, the routing decisions and the load
+                of every instance.
+        """
+        return {}
+
     @abstractmethod
     async def worker_apply(self, apply_req: WorkerApplyRequest) -> WorkerApplyOutput:
         """Worker apply"""
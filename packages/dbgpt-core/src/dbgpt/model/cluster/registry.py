@@ -1,18 +1,111 @@
+import asyncio
 import itertools
 import logging
-import random
 import threading
 import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.model.base import ModelInstance
+from dbgpt.model.cluster.routing import (
+    InstanceLoad,
+    RouteCandidate,
+    Router,
+    RoutingStrategy,
+    create_router,
+)
 
 logger = logging.getLogger(__name__)
 
+# The fields changed by every heartbeat, not a change of the instance for watchers
+_VOLATILE_FIELDS = ("last_heartbeat",)
+
+
+@dataclass
+class RegistrySnapshot:
+    """The instances of the registry at a version.
+
+    A full snapshot has all the instances. Otherwise, it has the instances changed
+    and the keys (see :func:`instance_key`) of the instances removed since the
+    version of the watcher.
+    """
+
+    version: int
+    instances: List[ModelInstance] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    full: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "instances": [ins.to_dict() for ins in self.instances],
+            "removed": self.removed,
+            "full": self.full,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RegistrySnapshot":
+        return cls(
+            version=data["version"],
+            instances=[ModelInstance(**ins) for ins in data.get("instances", [])],
+            removed=data.get("removed", []),
+            full=data.get("full", True),
+        )
+
+
+class _RegistryChangeLog:
+    """Version the instances of a registry and keep the recent changes."""
+
+    def __init__(self, max_history: int = 256):
+        # Start from the current time, so the versions of a restarted registry are
+        # still newer than the versions its watchers have seen
+        self.version = time.time_ns() // 1_000_000
+        self._instances: Dict[str, ModelInstance] = {}
+        self._states: Dict[str, Tuple] = {}
+        # (version, keys of the instances changed in the version)
+        self._history: Deque[Tuple[int, Set[str]]] = deque(maxlen=max_history)
+
+    def update(self, instances: List[ModelInstance]) -> bool:
+        """Update the instances, return whether any instance is changed."""
+        instances_by_key = {instance_key(ins): ins for ins in instances}
+        states = {
+            key: tuple(v for k, v in asdict(ins).items() if k not in _VOLATILE_FIELDS)
+            for key, ins in instances_by_key.items()
+        }
+        changed = {key for key, st in states.items() if self._states.get(key) != st}
+        changed |= self._states.keys() - states.keys()
+        self._instances = instances_by_key
+        self._states = states
+        if not changed:
+            return False
+        self.version += 1
+        self._history.append((self.version, changed))
+        return True
+
+    def since(self, version: int) -> RegistrySnapshot:
+        """Return the changes since the version, or a full snapshot if the changes
+        are not kept."""
+        if version == self.version:
+            return RegistrySnapshot(version=self.version, full=False)
+        if not self._history or not (self._history[0][0] - 1 <= version < self.version):
+            return RegistrySnapshot(
+                version=self.version, instances=list(self._instances.values())
+            )
+        changed: Set[str] = set()
+        for v, keys in self._history:
+            if v > version:
+                changed |= keys
+        return RegistrySnapshot(
+            version=self.version,
+            instances=[self._instances[k] for k in changed if k in self._instances],
+            removed=[k for k in changed if k not in self._instances],
+            full=False,
+        )
+
 
 class ModelRegistry(BaseComponent, ABC):
     """
@@ -22,9 +115,17 @@ class ModelRegistry(BaseComponent, ABC):
     """
 
     name = ComponentType.MODEL_REGISTRY
+    # The strategy of select_one_health_instance
+    routing_strategy: str = RoutingStrategy.POWER_OF_TWO.value
+    _router: Optional[Router] = None
 
     def __init__(self, system_app: SystemApp | None = None):
         self.system_app = system_app
+        # (model name, host, port) -> the load reported by the heartbeat
+        self._reported_loads: Dict[Tuple[str, str, int], InstanceLoad] = {}
+        self._change_log = _RegistryChangeLog()
+        self._watch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watch_event: Optional[asyncio.Event] = None
         super().__init__(system_app)
 
     def init_app(self, system_app: SystemApp):
@@ -101,14 +202,96 @@ class ModelRegistry(BaseComponent, ABC):
         - model_name (str): Name of the model.
 
         Returns:
-        - ModelInstance: One randomly selected healthy and enabled instance, or None
-            if no such instance exists.
+        - ModelInstance: One healthy and enabled instance selected by the load
+            reported by the instances, or None if no such instance exists.
         """
         instances = await self.get_all_instances(model_name, healthy_only=True)
         instances = [i for i in instances if i.enabled]
         if not instances:
             return None
-        return random.choice(instances)
+        if self._router is None:
+            self._router = create_router(self.routing_strategy)
+        candidates = [
+            RouteCandidate(
+                key=instance_key(i),
+                load=instance_load(i) or InstanceLoad(),
+                item=i,
+            )
+            for i in instances
+        ]
+        return self._router.select(candidates).item
+
+    async def watch_instances(
+        self, version: int = 0, timeout: float = 30
+    ) -> RegistrySnapshot:
+        """
+        Wait for the changes of the instances since a version (long polling).
+
+        Args:
+        - version (int): The version of the snapshot the watcher has, 0 for none.
+        - timeout (float): The max seconds to wait for a change.
+
+        Returns:
+        - RegistrySnapshot: The changes as soon as the instances are changed, a
+            snapshot without changes at the timeout, or a full snapshot if the
+            changes since the version are not kept.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            # Get the event before reading the instances, not to miss a change
+            event = self._get_watch_event()
+            instances = await self.get_all_model_instances(healthy_only=False)
+            self._change_log.update(instances)
+            remaining = deadline - loop.time()
+            if self._change_log.version != version or remaining <= 0:
+                return self._change_log.since(version)
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def _notify_changed(self) -> None:
+        """Wake up the watchers, the instances may be changed.
+
+        It can be called from any thread.
+        """
+        loop = self._watch_loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake_watchers)
+        except RuntimeError:
+            # The event loop is closed
+            self._watch_loop = None
+
+    def _wake_watchers(self) -> None:
+        event, self._watch_event = self._watch_event, None
+        if event:
+            event.set()
+
+    def _get_watch_event(self) -> asyncio.Event:
+        self._watch_loop = asyncio.get_running_loop()
+        if self._watch_event is None:
+            self._watch_event = asyncio.Event()
+        return self._watch_event
+
+    def _record_load(self, instance: ModelInstance) -> None:
+        """Keep the load reported by the heartbeat of the instance."""
+        load = instance_load(instance)
+        if load is not None:
+            key = (instance.model_name.strip(), instance.host.strip(), instance.port)
+            self._reported_loads[key] = load
+
+    def _with_load(self, instances: List[ModelInstance]) -> List[ModelInstance]:
+        """Fill the last reported load into the instances."""
+        for ins in instances:
+            load = self._reported_loads.get((ins.model_name, ins.host, ins.port))
+            if load is not None:
+                ins.in_flight = load.in_flight
+                ins.queue_depth = load.queue_depth
+                ins.latency_ms = load.latency_ms
+        return instances
 
     @abstractmethod
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
@@ -157,6 +340,7 @@ class EmbeddedModelRegistry(ModelRegistry):
             ins.healthy = False
             if ins.remove_from_registry:
                 self.registry[model_name].remove(ins)
+            self._notify_changed()
 
     def _heartbeat_checker(self):
         while True:
@@ -167,6 +351,8 @@ class EmbeddedModelRegistry(ModelRegistry):
                         and datetime.now() - instance.last_heartbeat
                         > timedelta(seconds=self.heartbeat_timeout_secs)
                     ):
+                        if instance.healthy:
+                            self._notify_changed()
                         instance.healthy = False
             time.sleep(self.heartbeat_interval_secs)
 
@@ -174,6 +360,7 @@ class EmbeddedModelRegistry(ModelRegistry):
         model_name = instance.model_name.strip()
         host = instance.host.strip()
         port = instance.port
+        self._record_load(instance)
 
         instances, exist_ins = self._get_instances(
             model_name, host, port, healthy_only=False
@@ -190,6 +377,7 @@ class EmbeddedModelRegistry(ModelRegistry):
             instance.healthy = True
             instance.last_heartbeat = datetime.now()
             instances.append(instance)
+        self._notify_changed()
         return True
 
     async def deregister_instance(self, instance: ModelInstance) -> bool:
@@ -202,6 +390,7 @@ class EmbeddedModelRegistry(ModelRegistry):
             ins.healthy = False
             if instance.remove_from_registry:
                 self.registry[model_name].remove(ins)
+            self._notify_changed()
         return True
 
     async def get_all_instances(
@@ -215,7 +404,7 @@ class EmbeddedModelRegistry(ModelRegistry):
         instances = self.registry[model_name]
         if healthy_only:
             instances = [ins for ins in instances if ins.healthy is True]
-        return instances
+        return self._with_load(instances)
 
     async def get_all_model_instances(
         self, healthy_only: bool = False
@@ -224,9 +413,10 @@ class EmbeddedModelRegistry(ModelRegistry):
         instances = list(itertools.chain(*self.registry.values()))
         if healthy_only:
             instances = [ins for ins in instances if ins.healthy is True]
-        return instances
+        return self._with_load(instances)
 
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
+        self._record_load(instance)
         _, exist_ins = self._get_instances(
             instance.model_name, instance.host, instance.port, healthy_only=False
         )
@@ -238,4 +428,22 @@ class EmbeddedModelRegistry(ModelRegistry):
         ins = exist_ins[0]
         ins.last_heartbeat = datetime.now()
         ins.healthy = True
+        # Wake up the watchers of the health or the load changes
+        self._notify_changed()
         return True
+
+
+def instance_key(instance: ModelInstance) -> str:
+    """Return the key of the instance in the registry snapshots."""
+    return f"{instance.model_name}@{instance.host}:{instance.port}"
+
+
+def instance_load(instance: ModelInstance) -> Optional[InstanceLoad]:
+    """Return the load reported by the instance, None if it is not reported."""
+    if instance.in_flight is None:
+        return None
+    return InstanceLoad(
+        in_flight=instance.in_flight,
+        queue_depth=instance.queue_depth or 0,
+        latency_ms=instance.latency_ms,
+    )
@@ -243,12 +243,14 @@ class StorageModelRegistry(ModelRegistry):
                 ):
                     instance.healthy = False
                     self._storage.update(instance)
+                    self._notify_changed()
             time.sleep(self.heartbeat_interval_secs)
 
     async def register_instance(self, instance: ModelInstance) -> bool:
         model_name = instance.model_name.strip()
         host = instance.host.strip()
         port = instance.port
+        self._record_load(instance)
         _, exist_ins = await self._get_instances_by_model(
             model_name, host, port, healthy_only=False
         )
@@ -268,6 +270,7 @@ class StorageModelRegistry(ModelRegistry):
             new_inst.healthy = True
             new_inst.last_heartbeat = datetime.now()
             await blocking_func_to_async(self._executor, self._storage.save, new_inst)
+        self._notify_changed()
         return True
 
     async def deregister_instance(self, instance: ModelInstance) -> bool:
@@ -298,6 +301,7 @@ class StorageModelRegistry(ModelRegistry):
             else:
                 logger.info(f"Set instance {model_name}@{host}:{port} as unhealthy.")
                 await blocking_func_to_async(self._executor, self._storage.update, ins)
+            self._notify_changed()
         return True
 
     async def get_all_instances(
@@ -330,7 +334,9 @@ class StorageModelRegistry(ModelRegistry):
         )
         if healthy_only:
             instances = [ins for ins in instances if ins.healthy is True]
-        return [ModelInstanceStorageItem.to_model_instance(ins) for ins in instances]
+        return self._with_load(
+            [ModelInstanceStorageItem.to_model_instance(ins) for ins in instances]
+        )
 
     async def get_all_model_instances(
         self, healthy_only: bool = False
@@ -351,9 +357,9 @@ class StorageModelRegistry(ModelRegistry):
         )
         if healthy_only:
             all_instances = [ins for ins in all_instances if ins.healthy is True]
-        return [
-            ModelInstanceStorageItem.to_model_instance(ins) for ins in all_instances
-        ]
+        return self._with_load(
+            [ModelInstanceStorageItem.to_model_instance(ins) for ins in all_instances]
+        )
 
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
         """Receive heartbeat from model instance.
@@ -370,6 +376,7 @@ class StorageModelRegistry(ModelRegistry):
         model_name = instance.model_name.strip()
         host = instance.host.strip()
         port = instance.port
+        self._record_load(instance)
         _, exist_ins = await self._get_instances_by_model(
             model_name, host, port, healthy_only=False
         )
@@ -382,4 +389,6 @@ class StorageModelRegistry(ModelRegistry):
             ins.last_heartbeat = datetime.now()
             ins.healthy = True
             await blocking_func_to_async(self._executor, self._storage.update, ins)
+            # Wake up the watchers of the health or the load changes
+            self._notify_changed()
             return True
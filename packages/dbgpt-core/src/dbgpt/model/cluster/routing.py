@@ -0,0 +1,359 @@
+"""Routing strategies to select a model instance by the load of the instances.
+
+A random choice gives a slow or busy replica the same share of the traffic as an
+idle one. The strategies here select by the in-flight requests tracked by the
+worker manager, the load reported by the workers through the heartbeat, and the
+latency observed.
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+# The chars of the prompt prefix to route the requests of the same prefix together
+_AFFINITY_PREFIX_CHARS = 512
+
+
+class RoutingStrategy(str, Enum):
+    RANDOM = "random"
+    LEAST_OUTSTANDING = "least_outstanding"
+    POWER_OF_TWO = "power_of_two"
+    EWMA_LATENCY = "ewma_latency"
+    AFFINITY = "affinity"
+
+    @staticmethod
+    def values():
+        return [item.value for item in RoutingStrategy]
+
+
+@dataclass
+class InstanceLoad:
+    """The load of a model instance."""
+
+    # The requests accepted and not finished, including the queued ones
+    in_flight: int = 0
+    # The requests waiting for a concurrency slot of the instance
+    queue_depth: int = 0
+    # The exponentially weighted moving average of the latency, None if unknown
+    latency_ms: Optional[float] = None
+
+    def merge(self, other: Optional["InstanceLoad"]) -> "InstanceLoad":
+        """Merge the load seen by this process with the load reported by the worker.
+
+        The worker counts the requests of all the clients, but its report is as old
+        as the last heartbeat, so the larger counts are taken.
+        """
+        if other is None:
+            return self
+        return InstanceLoad(
+            in_flight=max(self.in_flight, other.in_flight),
+            queue_depth=max(self.queue_depth, other.queue_depth),
+            latency_ms=(
+                self.latency_ms if self.latency_ms is not None else other.latency_ms
+            ),
+        )
+
+
+@dataclass
+class RouteCandidate(Generic[T]):
+    """An instance to route a request to."""
+
+    key: str
+    load: InstanceLoad
+    item: T
+
+
+class LoadTracker:
+    """Track the in-flight requests and the latency of the instances.
+
+    Example:
+        .. code-block:: python
+
+            with tracker.track(key) as request:
+                async with semaphore:
+                    request.running()
+                    ...
+    """
+
+    def __init__(self, latency_alpha: float = 0.3):
+        """Create a LoadTracker.
+
+        Args:
+            latency_alpha (float): The weight of the newest latency in the moving
+                average.
+        """
+        self._latency_alpha = latency_alpha
+        self._loads: Dict[str, InstanceLoad] = defaultdict(InstanceLoad)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> InstanceLoad:
+        """Return a copy of the load of the instance."""
+        with self._lock:
+            load = self._loads.get(key)
+            return InstanceLoad(**asdict(load)) if load else InstanceLoad()
+
+    def all(self) -> Dict[str, InstanceLoad]:
+        """Return a copy of the loads of all the instances."""
+        with self._lock:
+            return {k: InstanceLoad(**asdict(v)) for k, v in self._loads.items()}
+
+    def track(self, key: str) -> "TrackedRequest":
+        """Track a request sent to the instance."""
+        return TrackedRequest(self, key)
+
+    def _update(self, key: str, in_flight: int = 0, queue_depth: int = 0) -> None:
+        with self._lock:
+            load = self._loads[key]
+            load.in_flight += in_flight
+            load.queue_depth += queue_depth
+
+    def _observe_latency(self, key: str, latency_ms: float) -> None:
+        with self._lock:
+            load = self._loads[key]
+            if load.latency_ms is None:
+                load.latency_ms = latency_ms
+            else:
+                load.latency_ms += self._latency_alpha * (latency_ms - load.latency_ms)
+
+
+class TrackedRequest:
+    """A request counted in the load of an instance until it exits."""
+
+    def __init__(self, tracker: LoadTracker, key: str):
+        self._tracker = tracker
+        self._key = key
+        self._start = time.perf_counter()
+        self._running = False
+        self._latency_observed = False
+
+    def __enter__(self) -> "TrackedRequest":
+        self._tracker._update(self._key, in_flight=1, queue_depth=1)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self._running:
+            self._tracker._update(self._key, queue_depth=-1)
+        self._tracker._update(self._key, in_flight=-1)
+        if exc_type is None:
+            self.observe_latency()
+
+    def running(self) -> None:
+        """The request got a concurrency slot of the instance."""
+        if not self._running:
+            self._running = True
+            self._tracker._update(self._key, queue_depth=-1)
+
+    def observe_latency(self) -> None:
+        """Record the latency since the request was sent, only the first call counts.
+
+        A stream calls it at its first output, so the latency is the time to the
+        first token which does not depend on the length of the answer.
+        """
+        if self._latency_observed:
+            return
+        self._latency_observed = True
+        latency_ms = (time.perf_counter() - self._start) * 1000
+        self._tracker._observe_latency(self._key, latency_ms)
+
+
+class Router(ABC):
+    """Select one of the candidate instances of a request."""
+
+    strategy: str
+
+    def __init__(self):
+        """Create a Router."""
+        self._decisions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def select(
+        self, candidates: List[RouteCandidate[T]], affinity_key: Optional[str] = None
+    ) -> RouteCandidate[T]:
+        """Select one candidate and count the decision.
+
+        Args:
+            candidates (List[RouteCandidate[T]]): The candidates, not empty.
+            affinity_key (Optional[str]): The session or prompt prefix key of the
+                request, the requests of the same key prefer the same instance.
+
+        Returns:
+            RouteCandidate[T]: The selected candidate.
+        """
+        if len(candidates) == 1:
+            selected = candidates[0]
+        else:
+            selected = self._select(candidates, affinity_key)
+        with self._lock:
+            self._decisions[selected.key] += 1
+        return selected
+
+    @abstractmethod
+    def _select(
+        self, candidates: List[RouteCandidate[T]], affinity_key: Optional[str]
+    ) -> RouteCandidate[T]:
+        """Select one of two or more candidates."""
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the routing metrics, the decisions count of every instance."""
+        with self._lock:
+            return {"strategy": self.strategy, "decisions": dict(self._decisions)}
+
+
+class RandomRouter(Router):
+    """Select an instance randomly."""
+
+    strategy = RoutingStrategy.RANDOM.value
+
+    def _select(self, candidates, affinity_key):
+        return random.choice(candidates)
+
+
+class LeastOutstandingRouter(Router):
+    """Select the instance of the least in-flight requests, ties broken randomly."""
+
+    strategy = RoutingStrategy.LEAST_OUTSTANDING.value
+
+    def _select(self, candidates, affinity_key):
+        return _least_outstanding(candidates)
+
+
+class PowerOfTwoRouter(Router):
+    """Select the less loaded of two random instances.
+
+    It is nearly as balanced as the least outstanding requests, and does not send
+    all the requests to the same instance when the loads are stale.
+    """
+
+    strategy = RoutingStrategy.POWER_OF_TWO.value
+
+    def _select(self, candidates, affinity_key):
+        first, second = random.sample(candidates, 2)
+        return second if second.load.in_flight < first.load.in_flight else first
+
+
+class EWMALatencyRouter(Router):
+    """Select the instance of the least expected latency.
+
+    The latency moving average is scaled by the in-flight requests, an instance
+    without observed latency is tried first.
+    """
+
+    strategy = RoutingStrategy.EWMA_LATENCY.value
+
+    def _select(self, candidates, affinity_key):
+        unknown = [c for c in candidates if c.load.latency_ms is None]
+        if unknown:
+            return _least_outstanding(unknown)
+        return min(candidates, key=lambda c: c.load.latency_ms * (c.load.in_flight + 1))
+
+
+class AffinityRouter(Router):
+    """Send the requests of the same key to the same instance, for KV cache reuse.
+
+    The instances are ordered by the rendezvous hash of the key and the instance, so
+    adding or removing an instance only moves the keys of that instance. An instance
+    loaded more than ``load_factor`` times the average is skipped (consistent
+    hashing with bounded loads). A request without key falls back to the power of
+    two choices.
+    """
+
+    strategy = RoutingStrategy.AFFINITY.value
+
+    def __init__(self, load_factor: float = 1.25):
+        """Create an AffinityRouter.
+
+        Args:
+            load_factor (float): The max load of an instance relative to the
+                average load.
+        """
+        super().__init__()
+        self._load_factor = load_factor
+        self._fallback = PowerOfTwoRouter()
+
+    def _select(self, candidates, affinity_key):
+        if not affinity_key:
+            return self._fallback._select(candidates, affinity_key)
+        total = sum(c.load.in_flight for c in candidates) + 1
+        max_load = math.ceil(self._load_factor * total / len(candidates))
+        ordered = sorted(
+            candidates, key=lambda c: _rendezvous_hash(affinity_key, c.key)
+        )
+        for candidate in ordered:
+            if candidate.load.in_flight < max_load:
+                return candidate
+        return ordered[0]
+
+
+def affinity_key_of(params: Dict[str, Any]) -> Optional[str]:
+    """Return the affinity key of a model request.
+
+    It is the conversation of the request, or the prefix of its first message (the
+    system prompt usually), the requests of the same key reuse the KV cache of the
+    same instance.
+    """
+    context = params.get("context")
+    if isinstance(context, dict) and context.get("conv_uid"):
+        return context["conv_uid"]
+    messages = params.get("messages")
+    if messages:
+        first = messages[0]
+        if isinstance(first, dict):
+            content = first.get("content")
+        else:
+            content = getattr(first, "content", None)
+        if isinstance(content, str) and content:
+            return content[:_AFFINITY_PREFIX_CHARS]
+    prompt = params.get("prompt")
+    if isinstance(prompt, str) and prompt:
+        return prompt[:_AFFINITY_PREFIX_CHARS]
+    return None
+
+
+def _least_outstanding(candidates: List[RouteCandidate[T]]) -> RouteCandidate[T]:
+    least = min(c.load.in_flight for c in candidates)
+    return random.choice([c for c in candidates if c.load.in_flight == least])
+
+
+def _rendezvous_hash(key: str, instance_key: str) -> bytes:
+    return hashlib.md5(f"{key}\0{instance_key}".encode()).digest()
+
+
+_ROUTERS: Dict[str, Type[Router]] = {
+    router_cls.strategy: router_cls
+    for router_cls in (
+        RandomRouter,
+        LeastOutstandingRouter,
+        PowerOfTwoRouter,
+        EWMALatencyRouter,
+        AffinityRouter,
+    )
+}
+
+
+def register_router(router_cls: Type[Router]) -> None:
+    """Register a router class of a custom strategy."""
+    _ROUTERS[router_cls.strategy] = router_cls
+
+
+def create_router(strategy: str) -> Router:
+    """Create the router of the strategy.
+
+    Raises:
+        ValueError: If the strategy is unknown.
+    """
+    router_cls = _ROUTERS.get(strategy)
+    if router_cls is None:
+        raise ValueError(
+            f"Unknown routing strategy {strategy}, the valid strategies are "
+            f"{list(_ROUTERS.keys())}"
+        )
+    return router_cls()
@@ -0,0 +1,97 @@
+import pytest
+
+from ..routing import (
+    InstanceLoad,
+    LoadTracker,
+    RouteCandidate,
+    RoutingStrategy,
+    affinity_key_of,
+    create_router,
+)
+
+
+def _candidates(*in_flights, latencies=None):
+    latencies = latencies or [None] * len(in_flights)
+    return [
+        RouteCandidate(
+            key=f"worker-{i}",
+            load=InstanceLoad(in_flight=n, latency_ms=latency),
+            item=i,
+        )
+        for i, (n, latency) in enumerate(zip(in_flights, latencies))
+    ]
+
+
+def test_create_router():
+    for strategy in RoutingStrategy.values():
+        assert create_router(strategy).strategy == strategy
+    with pytest.raises(ValueError):
+        create_router("unknown")
+
+
+def test_least_outstanding():
+    router = create_router("least_outstanding")
+    for _ in range(20):
+        assert router.select(_candidates(3, 0, 5)).item == 1
+    assert router.metrics() == {
+        "strategy": "least_outstanding",
+        "decisions": {"worker-1": 20},
+    }
+
+
+def test_power_of_two_avoids_the_busiest():
+    router = create_router("power_of_two")
+    selected = {router.select(_candidates(1, 2, 100)).item for _ in range(100)}
+    assert 2 not in selected
+
+
+def test_ewma_latency():
+    router = create_router("ewma_latency")
+    # The instance without latency is tried first
+    assert router.select(_candidates(0, 0, latencies=[10.0, None])).item == 1
+    # 100ms * (1 + 1) > 30ms * (3 + 1)
+    candidates = _candidates(1, 3, latencies=[100.0, 30.0])
+    assert router.select(candidates).item == 1
+
+
+def test_affinity():
+    router = create_router("affinity")
+    candidates = _candidates(0, 0, 0, 0)
+    selected = {router.select(candidates, "conv-1").item for _ in range(10)}
+    assert len(selected) == 1
+    # An overloaded instance is skipped
+    busy = selected.pop()
+    candidates[busy].load.in_flight = 10
+    assert router.select(candidates, "conv-1").item != busy
+
+
+def test_load_tracker():
+    tracker = LoadTracker(latency_alpha=0.5)
+    with tracker.track("a") as request:
+        assert tracker.get("a") == InstanceLoad(in_flight=1, queue_depth=1)
+        request.running()
+        assert tracker.get("a").queue_depth == 0
+    load = tracker.get("a")
+    assert load.in_flight == 0 and load.queue_depth == 0
+    assert load.latency_ms is not None
+
+    with pytest.raises(RuntimeError):
+        with tracker.track("a"):
+            raise RuntimeError("error")
+    assert tracker.get("a").in_flight == 0
+    assert tracker.get("a").queue_depth == 0
+
+
+def test_merge_reported_load():
+    local = InstanceLoad(in_flight=1)
+    reported = InstanceLoad(in_flight=4, queue_depth=2, latency_ms=12.0)
+    assert local.merge(reported) == reported
+    assert local.merge(None) is local
+
+
+def test_affinity_key_of():
+    assert affinity_key_of({"context": {"conv_uid": "c1"}, "messages": []}) == "c1"
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    assert affinity_key_of({"messages": messages}) == messages[0]["content"]
+    assert affinity_key_of({"prompt": "x" * 1000}) == "x" * 512
+    assert affinity_key_of({}) is None
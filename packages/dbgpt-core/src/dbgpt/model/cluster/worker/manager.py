@@ -3,7 +3,6 @@ import itertools
 import json
 import logging
 import os
-import random
 import sys
 import time
 import traceback
@@ -41,6 +40,14 @@ from dbgpt.model.cluster.manager_base import (
     WorkerRunData,
 )
 from dbgpt.model.cluster.registry import ModelRegistry
+from dbgpt.model.cluster.routing import (
+    InstanceLoad,
+    LoadTracker,
+    RouteCandidate,
+    RoutingStrategy,
+    affinity_key_of,
+    create_router,
+)
 from dbgpt.model.cluster.storage import ModelStorage, ModelStorageItem
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.model.parameter import (
@@ -49,6 +56,7 @@ from dbgpt.model.parameter import (
     WorkerType,
 )
 from dbgpt.model.utils.llm_utils import list_supported_models
+from dbgpt.model.utils.stream_utils import encode_delta_stream
 from dbgpt.util.fastapi import create_app, register_event_handler
 from dbgpt.util.parameter_utils import (
     ParameterDescription,
@@ -95,6 +103,7 @@ class LocalWorkerManager(WorkerManager):
         host: str = None,
         port: int = None,
         model_storage: Optional[ModelStorage] = None,
+        routing_strategy: str = RoutingStrategy.POWER_OF_TWO.value,
     ) -> None:
         """Create a LocalWorkerManager instance.
 
@@ -109,6 +118,8 @@ class LocalWorkerManager(WorkerManager):
             port (int, optional): Port. Defaults to None.
             model_storage (Optional[ModelStorage], optional): Model storage. Defaults
                 to None. It is used to store model metadata.
+            routing_strategy (str, optional): The strategy to select one of the
+                instances of a model. Defaults to "power_of_two".
         """
         self.workers: Dict[str, List[WorkerRunData]] = dict()
         self.executor = ThreadPoolExecutor(max_workers=os.cpu_count() * 5)
@@ -120,6 +131,10 @@ class LocalWorkerManager(WorkerManager):
         self.port = port
         self.model_storage = model_storage
         self.start_listeners = []
+        self._router = create_router(
+            routing_strategy or RoutingStrategy.POWER_OF_TWO.value
+        )
+        self._load_tracker = LoadTracker()
 
         self.run_data = WorkerRunData(
             host=self.host,
@@ -403,43 +418,81 @@ class LocalWorkerManager(WorkerManager):
         return self.workers.get(worker_key, [])
 
     def _simple_select(
-        self, worker_type: str, model_name: str, worker_instances: List[WorkerRunData]
+        self,
+        worker_type: str,
+        model_name: str,
+        worker_instances: List[WorkerRunData],
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         if not worker_instances:
             raise Exception(
                 f"Cound not found worker instances for model name {model_name} and "
                 f"worker type {worker_type}"
             )
-        worker_run_data = random.choice(worker_instances)
-        return worker_run_data
+        candidates = [
+            RouteCandidate(
+                key=wr.instance_key,
+                load=self._load_tracker.get(wr.instance_key).merge(wr.reported_load),
+                item=wr,
+            )
+            for wr in worker_instances
+        ]
+        return self._router.select(candidates, affinity_key).item
 
     async def select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         worker_instances = await self.get_model_instances(
             worker_type, model_name, healthy_only
         )
-        return self._simple_select(worker_type, model_name, worker_instances)
+        return self._simple_select(
+            worker_type, model_name, worker_instances, affinity_key
+        )
 
     def sync_select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         worker_instances = self.sync_get_model_instances(
             worker_type, model_name, healthy_only
         )
-        return self._simple_select(worker_type, model_name, worker_instances)
+        return self._simple_select(
+            worker_type, model_name, worker_instances, affinity_key
+        )
 
     async def _get_model(self, params: Dict, worker_type: str = "llm") -> WorkerRunData:
         model = params.get("model")
         if not model:
             raise Exception("Model name count not be empty")
-        return await self.select_one_instance(worker_type, model, healthy_only=True)
+        return await self.select_one_instance(
+            worker_type, model, healthy_only=True, affinity_key=affinity_key_of(params)
+        )
 
     def _sync_get_model(self, params: Dict, worker_type: str = "llm") -> WorkerRunData:
         model = params.get("model")
         if not model:
             raise Exception("Model name count not be empty")
-        return self.sync_select_one_instance(worker_type, model, healthy_only=True)
+        return self.sync_select_one_instance(
+            worker_type, model, healthy_only=True, affinity_key=affinity_key_of(params)
+        )
+
+    def instance_load(self, worker_run_data: WorkerRunData) -> InstanceLoad:
+        """Get the load of the instance tracked by this worker manager"""
+        return self._load_tracker.get(worker_run_data.instance_key)
+
+    def routing_metrics(self) -> Dict[str, Any]:
+        metrics = self._router.metrics()
+        metrics["instances"] = {
+            key: asdict(load) for key, load in self._load_tracker.all().items()
+        }
+        return metrics
 
     async def generate_stream(
         self, params: Dict, async_wrapper=None, **kwargs
@@ -457,20 +510,30 @@ class LocalWorkerManager(WorkerManager):
                     error_code=1,
                 )
                 return
-            async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    async for outout in worker_run_data.worker.async_generate_stream(
-                        params
-                    ):
-                        yield outout
-                else:
-                    if not async_wrapper:
-                        from starlette.concurrency import iterate_in_threadpool
-
-                        async_wrapper = iterate_in_threadpool
-                    async for output in async_wrapper(
-                        worker_run_data.worker.generate_stream(params)
-                    ):
+            # The caller consumes the text deltas instead of the cumulative text
+            incremental = params.get("incremental", False)
+            if "incremental" in params:
+                params = {k: v for k, v in params.items() if k != "incremental"}
+            worker = worker_run_data.worker
+            with self._load_tracker.track(worker_run_data.instance_key) as request:
+                async with worker_run_data.semaphore:
+                    request.running()
+                    if worker.support_async():
+                        if incremental:
+                            stream = worker.async_generate_delta_stream(params)
+                        else:
+                            stream = worker.async_generate_stream(params)
+                    else:
+                        if not async_wrapper:
+                            from starlette.concurrency import iterate_in_threadpool
+
+                            async_wrapper = iterate_in_threadpool
+                        stream = async_wrapper(worker.generate_stream(params))
+                        if incremental:
+                            stream = encode_delta_stream(stream)
+                    async for output in stream:
+                        # The latency of a stream is the time to the first output
+                        request.observe_latency()
                         yield output
 
     async def generate(self, params: Dict) -> ModelOutput:
@@ -486,13 +549,15 @@ class LocalWorkerManager(WorkerManager):
                     text=f"**LLMServer Generate Error, Please CheckErrorInfo.**: {e}",
                     error_code=1,
                 )
-            async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    return await worker_run_data.worker.async_generate(params)
-                else:
-                    return await self.run_blocking_func(
-                        worker_run_data.worker.generate, params
-                    )
+            with self._load_tracker.track(worker_run_data.instance_key) as request:
+                async with worker_run_data.semaphore:
+                    request.running()
+                    if worker_run_data.worker.support_async():
+                        return await worker_run_data.worker.async_generate(params)
+                    else:
+                        return await self.run_blocking_func(
+                            worker_run_data.worker.generate, params
+                        )
 
     async def embeddings(self, params: Dict) -> List[List[float]]:
         """Embed input"""
@@ -505,13 +570,15 @@ class LocalWorkerManager(WorkerManager):
                 worker_run_data = await self._get_model(params, worker_type=worker_type)
             except Exception as e:
                 raise e
-            async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    return await worker_run_data.worker.async_embeddings(params)
-                else:
-                    return await self.run_blocking_func(
-                        worker_run_data.worker.embeddings, params
-                    )
+            with self._load_tracker.track(worker_run_data.instance_key) as request:
+                async with worker_run_data.semaphore:
+                    request.running()
+                    if worker_run_data.worker.support_async():
+                        return await worker_run_data.worker.async_embeddings(params)
+                    else:
+                        return await self.run_blocking_func(
+                            worker_run_data.worker.embeddings, params
+                        )
 
     def sync_embeddings(self, params: Dict) -> List[List[float]]:
         worker_type = params.get("worker_type", WorkerType.TEXT2VEC.value)
@@ -809,17 +876,17 @@ class WorkerManagerAdapter(WorkerManager):
         )
 
     async def select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self, worker_type: str, model_name: str, healthy_only: bool = True, **kwargs
     ) -> WorkerRunData:
         return await self.worker_manager.select_one_instance(
-            worker_type, model_name, healthy_only
+            worker_type, model_name, healthy_only, **kwargs
         )
 
     def sync_select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self, worker_type: str, model_name: str, healthy_only: bool = True, **kwargs
     ) -> WorkerRunData:
         return self.worker_manager.sync_select_one_instance(
-            worker_type, model_name, healthy_only
+            worker_type, model_name, healthy_only, **kwargs
         )
 
     async def generate_stream(
@@ -846,6 +913,9 @@ class WorkerManagerAdapter(WorkerManager):
     async def worker_apply(self, apply_req: WorkerApplyRequest) -> WorkerApplyOutput:
         return await self.worker_manager.worker_apply(apply_req)
 
+    def routing_metrics(self) -> Dict[str, Any]:
+        return self.worker_manager.routing_metrics()
+
     async def parameter_descriptions(
         self, worker_type: str, model_name: str
     ) -> List[ParameterDescription]:
@@ -927,6 +997,12 @@ async def api_worker_apply(request: WorkerApplyRequest):
     return await worker_manager.worker_apply(request)
 
 
+@router.get("/worker/routing/metrics")
+async def api_routing_metrics():
+    """Get the routing decisions and the load of the instances."""
+    return worker_manager.routing_metrics()
+
+
 @router.get("/worker/parameter/descriptions")
 async def api_worker_parameter_descs(
     model: str, worker_type: str = WorkerType.LLM.value
@@ -1066,7 +1142,10 @@ def _create_local_model_manager(
             f"controller_addr: {worker_params.controller_addr}"
         )
         return LocalWorkerManager(
-            host=register_host, port=port, model_storage=model_storage
+            host=register_host,
+            port=port,
+            model_storage=model_storage,
+            routing_strategy=worker_params.routing_strategy,
         )
     else:
         from dbgpt.model.cluster.controller.controller import ModelRegistryClient
@@ -1089,19 +1168,28 @@ def _create_local_model_manager(
             return await client.deregister_instance(instance)
 
         async def send_heartbeat_func(worker_run_data: WorkerRunData):
+            # Report the load for the load-aware routing of the clients
+            load = local_manager.instance_load(worker_run_data)
             instance = ModelInstance(
-                model_name=worker_run_data.worker_key, host=register_host, port=port
+                model_name=worker_run_data.worker_key,
+                host=register_host,
+                port=port,
+                in_flight=load.in_flight,
+                queue_depth=load.queue_depth,
+                latency_ms=load.latency_ms,
             )
             return await client.send_heartbeat(instance)
 
-        return LocalWorkerManager(
+        local_manager = LocalWorkerManager(
             register_func=register_func,
             deregister_func=deregister_func,
             send_heartbeat_func=send_heartbeat_func,
             host=register_host,
             port=port,
             model_storage=model_storage,
+            routing_strategy=worker_params.routing_strategy,
         )
+        return local_manager
 
 
 def _build_worker(
@@ -1275,7 +1363,9 @@ def initialize_worker_manager_in_client(
             raise ValueError("Controller can`t be None")
         logger.info(f"Worker params: {worker_params}")
         client = ModelRegistryClient(worker_params.controller_addr)
-        worker_manager.worker_manager = RemoteWorkerManager(client)
+        worker_manager.worker_manager = RemoteWorkerManager(
+            client, routing_strategy=worker_params.routing_strategy
+        )
         worker_manager.after_start(start_listener)
         initialize_controller(
             app=app,
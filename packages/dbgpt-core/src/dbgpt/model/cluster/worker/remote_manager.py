@@ -1,5 +1,6 @@
 import asyncio
-from typing import Any, Callable, List
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dbgpt.model.base import ModelInstance, WorkerApplyOutput, WorkerSupportedModel
 from dbgpt.model.cluster.base import (
@@ -8,15 +9,46 @@ from dbgpt.model.cluster.base import (
     WorkerApplyRequest,
     WorkerStartupRequest,
 )
-from dbgpt.model.cluster.registry import ModelRegistry
+from dbgpt.model.cluster.registry import (
+    ModelRegistry,
+    RegistrySnapshot,
+    instance_key,
+    instance_load,
+)
+from dbgpt.model.cluster.routing import RoutingStrategy
 from dbgpt.model.cluster.worker.manager import LocalWorkerManager, WorkerRunData, logger
 from dbgpt.model.cluster.worker.remote_worker import RemoteModelWorker
 from dbgpt.model.parameter import WorkerType
 
 
 class RemoteWorkerManager(LocalWorkerManager):
-    def __init__(self, model_registry: ModelRegistry = None) -> None:
-        super().__init__(model_registry=model_registry)
+    """The worker manager of the remote workers registered in the registry.
+
+    The instances are selected from a local view of the registry, which is updated
+    by watching the changes of the registry (long polling), so selecting an instance
+    does not send a request to the registry. If the watch is broken, the view is
+    refreshed from the registry when it is older than ``cache_ttl_secs``.
+    """
+
+    def __init__(
+        self,
+        model_registry: ModelRegistry = None,
+        routing_strategy: str = RoutingStrategy.POWER_OF_TWO.value,
+        watch_timeout_secs: float = 30,
+        cache_ttl_secs: float = 5,
+    ) -> None:
+        super().__init__(
+            model_registry=model_registry, routing_strategy=routing_strategy
+        )
+        self._watch_timeout_secs = watch_timeout_secs
+        self._cache_ttl_secs = cache_ttl_secs
+        # instance key -> (instance, worker run data of the instance)
+        self._instances: Dict[str, Tuple[ModelInstance, WorkerRunData]] = {}
+        self._version = 0
+        self._synced_at: Optional[float] = None
+        self._watching = False
+        self._watch_supported = True
+        self._watch_task: Optional[asyncio.Task] = None
 
     async def start(self):
         for listener in self.start_listeners:
@@ -26,7 +58,10 @@ class RemoteWorkerManager(LocalWorkerManager):
                 listener(self)
 
     async def stop(self, ignore_exception: bool = False):
-        pass
+        if self._watch_task and not self._watch_task.done():
+            self._watch_task.cancel()
+        self._watch_task = None
+        self._watching = False
 
     async def _fetch_from_worker(
         self,
@@ -158,6 +193,7 @@ class RemoteWorkerManager(LocalWorkerManager):
             model_params=None,
             stop_event=asyncio.Event(),
             semaphore=asyncio.Semaphore(100),  # Not limit in client
+            reported_load=instance_load(instance),
         )
         return wr
 
@@ -165,33 +201,136 @@ class RemoteWorkerManager(LocalWorkerManager):
         self, worker_type: str, model_name: str, healthy_only: bool = True
     ) -> List[WorkerRunData]:
         worker_key = self._worker_key(worker_type, model_name)
-        instances: List[ModelInstance] = await self.model_registry.get_all_instances(
-            worker_key, healthy_only
+        await self._ensure_synced()
+        return self._cached_instances(
+            lambda ins: ins.model_name == worker_key, healthy_only
         )
-        return self._build_worker_instances(model_name, instances)
 
     async def get_all_model_instances(
         self, worker_type: str, healthy_only: bool = True
     ) -> List[WorkerRunData]:
-        instances: List[
-            ModelInstance
-        ] = await self.model_registry.get_all_model_instances(healthy_only=healthy_only)
-        result = []
-        for instance in instances:
-            name, wt = WorkerType.parse_worker_key(instance.model_name)
-            if wt != worker_type:
-                continue
-            result.append(self._build_single_worker_instance(name, instance))
-        return result
+        await self._ensure_synced()
+        return self._cached_instances(
+            lambda ins: WorkerType.parse_worker_key(ins.model_name)[1] == worker_type,
+            healthy_only,
+        )
 
     def sync_get_model_instances(
         self, worker_type: str, model_name: str, healthy_only: bool = True
     ) -> List[WorkerRunData]:
         worker_key = self._worker_key(worker_type, model_name)
+        if self._is_fresh():
+            return self._cached_instances(
+                lambda ins: ins.model_name == worker_key, healthy_only
+            )
+        # The watch can not be started without an event loop, ask the registry
         instances: List[ModelInstance] = self.model_registry.sync_get_all_instances(
             worker_key, healthy_only
         )
-        return self._build_worker_instances(model_name, instances)
+        result = []
+        for instance in instances:
+            cached = self._instances.get(instance_key(instance))
+            if cached:
+                wr = cached[1]
+                wr.reported_load = instance_load(instance)
+                result.append(wr)
+            else:
+                result.append(self._build_single_worker_instance(model_name, instance))
+        return result
+
+    def _cached_instances(
+        self, predicate: Callable[[ModelInstance], bool], healthy_only: bool
+    ) -> List[WorkerRunData]:
+        return [
+            wr
+            for ins, wr in self._instances.values()
+            if predicate(ins) and (ins.healthy or not healthy_only)
+        ]
+
+    def _is_fresh(self) -> bool:
+        if self._synced_at is None:
+            return False
+        age = time.monotonic() - self._synced_at
+        if self._watching:
+            # A watch request returns at least every watch timeout
+            return age < self._watch_timeout_secs + self._cache_ttl_secs
+        return age < self._cache_ttl_secs
+
+    async def _ensure_synced(self) -> None:
+        """Start watching the registry, refresh the view if it is stale."""
+        self._ensure_watching()
+        if self._is_fresh():
+            return
+        instances = await self.model_registry.get_all_model_instances(
+            healthy_only=False
+        )
+        # Version 0, the next watch request gets a full snapshot
+        self._apply_snapshot(RegistrySnapshot(version=0, instances=instances))
+
+    def _ensure_watching(self) -> None:
+        if not self._watch_supported:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._watch_task
+        if task and not task.done() and task.get_loop() is loop:
+            return
+        self._watch_task = loop.create_task(self._watch_registry())
+
+    async def _watch_registry(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                snapshot = await self.model_registry.watch_instances(
+                    self._version, self._watch_timeout_secs
+                )
+            except asyncio.CancelledError:
+                raise
+            except NotImplementedError:
+                logger.info(
+                    "The model registry does not support watching, refresh the "
+                    f"instances every {self._cache_ttl_secs} seconds"
+                )
+                self._watch_supported = False
+                self._watching = False
+                return
+            except Exception as e:
+                self._watching = False
+                logger.warning(
+                    f"Watch the model registry failed: {e}, retry in {backoff} seconds"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            backoff = 1.0
+            self._apply_snapshot(snapshot)
+            self._watching = True
+
+    def _apply_snapshot(self, snapshot: RegistrySnapshot) -> None:
+        """Apply a snapshot or the changes of the registry to the local view.
+
+        The worker run data of an instance is reused, so its worker keeps its
+        connections.
+        """
+        if snapshot.full:
+            old, instances = self._instances, {}
+        else:
+            old, instances = self._instances, dict(self._instances)
+            for key in snapshot.removed:
+                instances.pop(key, None)
+        for instance in snapshot.instances:
+            key = instance_key(instance)
+            cached = old.get(key)
+            if cached:
+                wr = cached[1]
+                wr.reported_load = instance_load(instance)
+            else:
+                name, _ = WorkerType.parse_worker_key(instance.model_name)
+                wr = self._build_single_worker_instance(name, instance)
+            instances[key] = (instance, wr)
+        # Replace the view at once, it is read by other threads
+        self._instances = instances
+        self._version = snapshot.version
+        self._synced_at = time.monotonic()
 
     async def worker_apply(self, apply_req: WorkerApplyRequest) -> WorkerApplyOutput:
         async def _remote_apply_func(worker_run_data: WorkerRunData):
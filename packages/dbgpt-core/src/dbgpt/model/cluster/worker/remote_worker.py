@@ -1,13 +1,23 @@
 import json
 import logging
-from typing import Dict, Iterator, List
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional
 
 from dbgpt.core import ModelMetadata, ModelOutput
 from dbgpt.model.cluster.worker_base import ModelWorker
+from dbgpt.model.utils.stream_utils import decode_delta_stream
+from dbgpt.util.http_client_pool import get_http_client_pool
 from dbgpt.util.tracer import DBGPT_TRACER_SPAN_ID, root_tracer
 
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
 logger = logging.getLogger(__name__)
 
+# The outputs of a stream are JSON objects separated by NUL, a NUL in a JSON text
+# is always escaped.
+_FRAME_DELIMITER = b"\0"
+
 
 class RemoteModelWorker(ModelWorker):
     def __init__(self) -> None:
@@ -16,6 +26,8 @@ class RemoteModelWorker(ModelWorker):
         self.timeout = 3600
         self.host = None
         self.port = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._session: Optional["requests.Session"] = None
 
     @property
     def worker_addr(self) -> str:
@@ -44,29 +56,32 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate_stream(self, params: Dict) -> Iterator[ModelOutput]:
         """Asynchronous generate stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            delimiter = b"\0"
-            buffer = b""
-            url = self.worker_addr + "/generate_stream"
-            logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
-            async with client.stream(
-                "POST",
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            ) as response:
-                async for raw_chunk in response.aiter_raw():
-                    buffer += raw_chunk
-                    while delimiter in buffer:
-                        chunk, buffer = buffer.split(delimiter, 1)
-                        if not chunk:
-                            continue
-                        chunk = chunk.decode()
-                        data = json.loads(chunk)
-                        yield ModelOutput(**data)
+        async for output in decode_delta_stream(
+            self.async_generate_delta_stream(params)
+        ):
+            yield output
+
+    async def async_generate_delta_stream(
+        self, params: Dict
+    ) -> AsyncIterator[ModelOutput]:
+        """Asynchronous generate stream of the text deltas.
+
+        The remote worker is asked to send the deltas, which are yielded without
+        rebuilding the cumulative text. A worker of an old version ignores it and
+        sends the full outputs, they are checkpoints of the delta stream.
+        """
+        url = self.worker_addr + "/generate_stream"
+        logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
+        async with self._get_client().stream(
+            "POST",
+            url,
+            headers=self._get_trace_headers(),
+            json={**params, "incremental": True},
+            timeout=self.timeout,
+        ) as response:
+            # The body is read only when the consumer asks for the next output
+            async for frame in _iter_frames(response.aiter_raw()):
+                yield ModelOutput(**json.loads(frame))
 
     def generate(self, params: Dict) -> ModelOutput:
         """Generate non stream"""
@@ -74,58 +89,26 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate(self, params: Dict) -> ModelOutput:
         """Asynchronous generate non stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/generate"
-            logger.debug(f"Send async_generate to url {url}, params: {params}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelOutput(**response.json())
+        url = self.worker_addr + "/generate"
+        logger.debug(f"Send async_generate to url {url}, params: {params}")
+        response = await self._post(url, params)
+        return ModelOutput(**response.json())
 
     def count_token(self, prompt: str) -> int:
         raise NotImplementedError
 
     async def async_count_token(self, prompt: str) -> int:
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/count_token"
-            logger.debug(f"Send async_count_token to url {url}, params: {prompt}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json={"prompt": prompt},
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        url = self.worker_addr + "/count_token"
+        logger.debug(f"Send async_count_token to url {url}, params: {prompt}")
+        response = await self._post(url, {"prompt": prompt})
+        return response.json()
 
     async def async_get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Asynchronously get model metadata"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/model_metadata"
-            logger.debug(
-                f"Send async_get_model_metadata to url {url}, params: {params}"
-            )
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelMetadata.from_dict(response.json())
+        url = self.worker_addr + "/model_metadata"
+        logger.debug(f"Send async_get_model_metadata to url {url}, params: {params}")
+        response = await self._post(url, params)
+        return ModelMetadata.from_dict(response.json())
 
     def get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Get model metadata"""
@@ -133,11 +116,9 @@ class RemoteModelWorker(ModelWorker):
 
     def embeddings(self, params: Dict) -> List[List[float]]:
         """Get embeddings for input"""
-        import requests
-
         url = self.worker_addr + "/embeddings"
         logger.debug(f"Send embeddings to url {url}, params: {params}")
-        response = requests.post(
+        response = self._get_session().post(
             url,
             headers=self._get_trace_headers(),
             json=params,
@@ -149,20 +130,41 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_embeddings(self, params: Dict) -> List[List[float]]:
         """Asynchronous get embeddings for input"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/embeddings"
-            logger.debug(f"Send async_embeddings to url {url}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        url = self.worker_addr + "/embeddings"
+        logger.debug(f"Send async_embeddings to url {url}")
+        response = await self._post(url, params)
+        return response.json()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        """Return the client of the worker.
+
+        The connections are kept alive in the shared HTTP client pool, a request
+        does not pay the connection setup. The concurrency of a worker is bounded
+        by its own limit, the client is not limited by the per-host cap of the
+        pool, a long stream must not queue the requests behind it.
+        """
+        if self._client is None:
+            self._client = get_http_client_pool().client(limit_per_host=False)
+        return self._client
+
+    def _get_session(self) -> "requests.Session":
+        """Return the keep-alive session of the synchronous requests."""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    async def _post(self, url: str, data: Dict) -> "httpx.Response":
+        response = await self._get_client().post(
+            url,
+            headers=self._get_trace_headers(),
+            json=data,
+            timeout=self.timeout,
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return response
 
     def _get_trace_headers(self):
         span_id = root_tracer.get_current_span_id()
@@ -170,3 +172,28 @@ class RemoteModelWorker(ModelWorker):
         if span_id:
             headers.update({DBGPT_TRACER_SPAN_ID: span_id})
         return headers
+
+
+async def _iter_frames(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split the raw chunks of a stream into the frames.
+
+    Every byte is scanned once and the consumed frames are dropped from the front
+    of the buffer, a long stream is parsed in linear time.
+    """
+    buffer = bytearray()
+    for_scan = 0
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(_FRAME_DELIMITER, for_scan)
+            if end < 0:
+                break
+            if end > start:
+                yield bytes(buffer[start:end])
+            start = for_scan = end + 1
+        if start:
+            del buffer[:start]
+        for_scan = len(buffer)
+    if buffer.strip():
+        yield bytes(buffer)
@@ -413,6 +413,56 @@ async def test_generate_stream(
         assert text == expected_messages
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "manager_with_2_workers, expected_messages",
+    [
+        ({"stream_messages": ["Hello", " world."]}, ["Hello", " world."]),
+        ({"stream_messages": ["你好，我是", "张三。"]}, ["你好，我是", "张三。"]),
+    ],
+    indirect=["manager_with_2_workers"],
+)
+async def test_generate_incremental_stream(
+    manager_with_2_workers: Tuple[  # noqa: F811
+        LocalWorkerManager, List[Tuple[ModelWorker, ModelWorkerParameters]]
+    ],
+    expected_messages: List[str],
+):
+    manager, workers = manager_with_2_workers
+    for _, worker_params, _ in workers:
+        params = {"model": worker_params.name, "incremental": True}
+        outputs = [out async for out in manager.generate_stream(params)]
+        assert [out.text for out in outputs] == expected_messages
+        assert all(out.incremental for out in outputs)
+        assert params["incremental"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "manager_with_2_workers",
+    [{"stream_messages": ["Hello", " world."]}],
+    indirect=["manager_with_2_workers"],
+)
+async def test_routing_metrics(
+    manager_with_2_workers: Tuple[  # noqa: F811
+        LocalWorkerManager, List[Tuple[ModelWorker, ModelWorkerParameters]]
+    ],
+):
+    manager, workers = manager_with_2_workers
+    for _, worker_params, _ in workers:
+        params = {"model": worker_params.name}
+        async for _ in manager.generate_stream(params):
+            # Counted as in-flight until the stream ends
+            metrics = manager.routing_metrics()
+            assert sum(i["in_flight"] for i in metrics["instances"].values()) == 1
+    metrics = manager.routing_metrics()
+    assert metrics["strategy"] == "power_of_two"
+    assert sum(metrics["decisions"].values()) == len(workers)
+    for load in metrics["instances"].values():
+        assert load["in_flight"] == 0 and load["queue_depth"] == 0
+        assert load["latency_ms"] is not None
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "manager_with_2_workers, expected_messages",
@@ -0,0 +1,104 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from dbgpt.model.base import ModelInstance
+from dbgpt.model.cluster.registry import EmbeddedModelRegistry, instance_key
+from dbgpt.model.parameter import WorkerType
+
+from ..remote_manager import RemoteWorkerManager
+
+_in_watch = contextvars.ContextVar("in_watch", default=False)
+
+
+class _CountingRegistry(EmbeddedModelRegistry):
+    """Count the queries of the instances, except the ones of the watch."""
+
+    def __init__(self):
+        super().__init__()
+        self.get_calls = 0
+
+    async def get_all_instances(self, model_name, healthy_only=False):
+        self.get_calls += 1
+        return await super().get_all_instances(model_name, healthy_only)
+
+    async def get_all_model_instances(self, healthy_only=False):
+        if not _in_watch.get():
+            self.get_calls += 1
+        return await super().get_all_model_instances(healthy_only)
+
+    async def watch_instances(self, version=0, timeout=30):
+        _in_watch.set(True)
+        return await super().watch_instances(version, timeout)
+
+
+def _instance(port: int, model_name: str = "mock") -> ModelInstance:
+    return ModelInstance(
+        model_name=WorkerType.to_worker_key(model_name, WorkerType.LLM),
+        host="127.0.0.1",
+        port=port,
+    )
+
+
+async def _wait_for(predicate, timeout: float = 2):
+    async def _poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_select_from_watched_view():
+    registry = _CountingRegistry()
+    await registry.register_instance(_instance(8001))
+    await registry.register_instance(_instance(8100, "other"))
+    manager = RemoteWorkerManager(model_registry=registry, watch_timeout_secs=10)
+    try:
+        instances = await manager.get_model_instances(WorkerType.LLM.value, "mock")
+        assert [wr.port for wr in instances] == [8001]
+        first = instances[0]
+        # The view is stale only before the first sync
+        assert registry.get_calls == 1
+
+        # Updated by the watch, without asking the registry
+        await registry.register_instance(_instance(8002))
+        await _wait_for(lambda: len(manager._instances) == 3)
+        for _ in range(10):
+            instances = await manager.get_model_instances(WorkerType.LLM.value, "mock")
+            assert sorted(wr.port for wr in instances) == [8001, 8002]
+        assert registry.get_calls == 1
+        # The worker of an instance is reused
+        assert first in instances
+
+        all_llms = await manager.get_all_model_instances(WorkerType.LLM.value)
+        assert sorted(wr.port for wr in all_llms) == [8001, 8002, 8100]
+
+        instance = _instance(8001)
+        await registry.deregister_instance(instance)
+        await _wait_for(
+            lambda: not manager._instances[instance_key(instance)][0].healthy
+        )
+        instances = await manager.get_model_instances(WorkerType.LLM.value, "mock")
+        assert [wr.port for wr in instances] == [8002]
+        instances = manager.sync_get_model_instances(
+            WorkerType.LLM.value, "mock", healthy_only=False
+        )
+        assert sorted(wr.port for wr in instances) == [8001, 8002]
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_refresh_stale_view_without_watch():
+    registry = EmbeddedModelRegistry()
+    await registry.register_instance(_instance(8001))
+    manager = RemoteWorkerManager(model_registry=registry, cache_ttl_secs=0)
+    # The watch is not supported by the registry
+    manager._watch_supported = False
+    instances = await manager.get_model_instances(WorkerType.LLM.value, "mock")
+    assert [wr.port for wr in instances] == [8001]
+    await registry.register_instance(_instance(8002))
+    instances = await manager.get_model_instances(WorkerType.LLM.value, "mock")
+    assert sorted(wr.port for wr in instances) == [8001, 8002]
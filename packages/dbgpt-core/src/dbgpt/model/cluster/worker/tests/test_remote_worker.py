@@ -0,0 +1,78 @@
+import json
+
+import httpx
+import pytest
+
+from dbgpt.core import ModelOutput
+
+from ..remote_worker import RemoteModelWorker, _iter_frames
+
+
+async def _chunks_of(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _frames_of(*outputs: ModelOutput) -> bytes:
+    return b"".join(
+        json.dumps(output.to_dict(), ensure_ascii=False).encode() + b"\0"
+        for output in outputs
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+async def test_iter_frames(chunk_size):
+    data = b'{"a": 1}\0\0{"b": "\xe4\xbd\xa0"}\0{"c": 3}'
+    frames = [f async for f in _iter_frames(_chunks_of(data, chunk_size))]
+    assert frames == [b'{"a": 1}', b'{"b": "\xe4\xbd\xa0"}', b'{"c": 3}']
+
+
+@pytest.fixture
+def worker():
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = json.loads(request.content)
+        if request.url.path.endswith("/generate_stream"):
+            assert params["incremental"]
+            first = ModelOutput.build("Hello")
+            first.incremental = True
+            second = ModelOutput.build(" world")
+            second.incremental = True
+            data = _frames_of(first, second)
+            return httpx.Response(200, content=_chunks_of(data, 5))
+        return httpx.Response(200, json=[[0.1, 0.2]])
+
+    worker = RemoteModelWorker()
+    worker.load_worker("mock", host="127.0.0.1", port=8000)
+    worker._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    worker.requests = requests
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_generate_stream(worker):
+    params = {"model": "mock"}
+    deltas = [o.text async for o in worker.async_generate_delta_stream(params)]
+    assert deltas == ["Hello", " world"]
+    texts = [o.text async for o in worker.async_generate_stream(params)]
+    assert texts == ["Hello", "Hello world"]
+    assert "incremental" not in params
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused(worker):
+    client = worker._get_client()
+    assert await worker.async_embeddings({"input": ["a"]}) == [[0.1, 0.2]]
+    assert await worker.async_embeddings({"input": ["b"]}) == [[0.1, 0.2]]
+    assert worker._get_client() is client
+    assert len(worker.requests) == 2
+
+
+def test_client_not_limited_per_host():
+    worker = RemoteModelWorker()
+    worker.load_worker("mock", host="127.0.0.1", port=8000)
+    # A long stream must not take a slot of the per-host cap of the pool
+    assert worker._get_client()._transport._limit_per_host is False
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Iterator, List, Type
+from typing import AsyncIterator, Dict, Iterator, List, Type
 
 from dbgpt.core import ModelMetadata, ModelOutput
 from dbgpt.core.interface.parameter import BaseDeployModelParameters
 from dbgpt.model.parameter import WorkerType
+from dbgpt.model.utils.stream_utils import encode_delta_stream
 from dbgpt.util.parameter_utils import ParameterDescription, _get_parameter_descriptions
 
 
@@ -93,6 +94,19 @@ class ModelWorker(ABC):
         """Asynchronously generate a stream based on provided parameters."""
         raise NotImplementedError
 
+    async def async_generate_delta_stream(
+        self, params: Dict
+    ) -> AsyncIterator[ModelOutput]:
+        """Asynchronously generate a stream of the text deltas.
+
+        Every output only carries the text appended since the previous one
+        (``incremental=True``), a full output (``incremental=False``) is a checkpoint
+        which replaces the text received before. By default, the deltas are encoded
+        from :meth:`async_generate_stream`.
+        """
+        async for output in encode_delta_stream(self.async_generate_stream(params)):
+            yield output
+
     @abstractmethod
     def generate(self, params: Dict) -> ModelOutput:
         """Generate output (non-stream) based on provided parameters."""
@@ -0,0 +1,238 @@
+"""Continuous batching of the generation requests of a local model.
+
+A local model generates one request at a time, the concurrent requests wait for the
+whole generation of the previous ones. The engine here runs the requests of a model
+in one batch: a new request is admitted between two decode steps (its prompt is
+prefilled and its rows are added to the batch), every decode step generates one
+token of all the running requests in one forward pass, and a finished request leaves
+the batch at once. The tokens of every request are streamed to its own queue.
+
+The engine only schedules the requests, the forward passes and the KV cache are
+owned by a :class:`BatchRunner`, e.g. the huggingface runner in
+``dbgpt.model.llm.llm_out.hf_batch_llm``.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_seq_ids = itertools.count()
+
+
+@dataclass
+class SamplingParams:
+    """The sampling parameters of a request."""
+
+    temperature: float = 0.7
+    top_p: float = 1.0
+    top_k: int = -1
+    repetition_penalty: float = 1.0
+    do_sample: bool = True
+
+    @property
+    def greedy(self) -> bool:
+        return not self.do_sample or self.temperature < 1e-5 or self.top_p < 1e-8
+
+
+@dataclass
+class Sequence:
+    """A generation request in the engine."""
+
+    prompt_ids: List[int]
+    max_new_tokens: int
+    stop_token_ids: Set[int] = field(default_factory=set)
+    sampling: SamplingParams = field(default_factory=SamplingParams)
+    # The max tokens of the prompt and the output, 0 for no limit
+    context_len: int = 0
+    seq_id: int = field(default_factory=lambda: next(_seq_ids))
+    # The generated tokens, without the stop token
+    output_ids: List[int] = field(default_factory=list)
+    # The last sampled token, the input of the next decode step
+    last_token: Optional[int] = None
+    finish_reason: Optional[str] = None
+    cancelled: bool = False
+    _events: "queue.Queue" = field(default_factory=queue.Queue, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.finish_reason is not None
+
+    def append_token(self, token: int) -> None:
+        """Append a sampled token and check whether the sequence is finished."""
+        self.last_token = token
+        if token in self.stop_token_ids:
+            self.finish_reason = "stop"
+        else:
+            self.output_ids.append(token)
+            if len(self.output_ids) >= self.max_new_tokens or (
+                self.context_len > 0
+                and len(self.prompt_ids) + len(self.output_ids) >= self.context_len
+            ):
+                self.finish_reason = "length"
+        self._events.put(len(self.output_ids))
+
+    def fail(self, error: Exception) -> None:
+        self.finish_reason = "error"
+        self._events.put(error)
+
+    def cancel(self) -> None:
+        """Cancel the sequence, it leaves the batch before the next step."""
+        self.cancelled = True
+
+    def stream(self) -> Iterator[List[int]]:
+        """Wait for the new tokens, yield all the output tokens generated so far.
+
+        The tokens generated while the consumer is busy are yielded together.
+
+        Raises:
+            Exception: The error of the forward pass.
+        """
+        while True:
+            event = self._events.get()
+            # Drain the queue, the consumer only needs the latest output
+            try:
+                while True:
+                    event = self._events.get_nowait()
+                    if isinstance(event, Exception):
+                        break
+            except queue.Empty:
+                pass
+            if isinstance(event, Exception):
+                raise event
+            yield self.output_ids[:event]
+            if self.finished and event == len(self.output_ids):
+                return
+
+
+class BatchRunner(ABC):
+    """Run the forward passes of the batch and keep its KV cache.
+
+    It is only called by the thread of the engine.
+    """
+
+    @abstractmethod
+    def prefill(self, seqs: List[Sequence]) -> List[int]:
+        """Prefill the prompts of the new sequences and add them to the batch.
+
+        Returns:
+            List[int]: The first token sampled for every sequence.
+        """
+
+    @abstractmethod
+    def decode(self, seqs: List[Sequence]) -> List[int]:
+        """Run one decode step of all the sequences in the batch.
+
+        The input of a sequence is its ``last_token``.
+
+        Returns:
+            List[int]: The next token sampled for every sequence.
+        """
+
+    @abstractmethod
+    def release(self, seqs: List[Sequence]) -> None:
+        """Remove the sequences from the batch."""
+
+    def reset(self) -> None:
+        """Remove all the sequences, after an error of the forward pass."""
+
+
+class ContinuousBatchingEngine:
+    """Schedule the sequences of a model in a continuous batch.
+
+    The engine thread starts with the first sequence and exits when there are no
+    sequences left, so an idle engine does not hold a thread.
+    """
+
+    def __init__(self, runner: BatchRunner, max_batch_size: int = 8):
+        """Create a ContinuousBatchingEngine.
+
+        Args:
+            runner (BatchRunner): The runner of the forward passes.
+            max_batch_size (int): The max sequences running in a batch, the others
+                wait to be admitted.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self._runner = runner
+        self._max_batch_size = max_batch_size
+        self._waiting: List[Sequence] = []
+        self._running: List[Sequence] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def num_waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def num_running(self) -> int:
+        return len(self._running)
+
+    def submit(self, seq: Sequence) -> Sequence:
+        """Submit a sequence, it is admitted to the batch at the next step."""
+        with self._lock:
+            self._waiting.append(seq)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="continuous-batching", daemon=True
+                )
+                self._thread.start()
+        return seq
+
+    def generate(self, seq: Sequence) -> Iterator[List[int]]:
+        """Submit a sequence and stream its output tokens.
+
+        The sequence is cancelled if the consumer stops the iteration.
+        """
+        self.submit(seq)
+        try:
+            yield from seq.stream()
+        finally:
+            if not seq.finished:
+                seq.cancel()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._waiting = [s for s in self._waiting if not s.cancelled]
+                if not self._waiting and not self._running:
+                    self._thread = None
+                    return
+                admitted = self._waiting[: self._max_batch_size - len(self._running)]
+                del self._waiting[: len(admitted)]
+            try:
+                self._step(admitted)
+            except Exception as e:
+                logger.exception(f"Continuous batching step failed: {e}")
+                for seq in self._running + admitted:
+                    if not seq.finished:
+                        seq.fail(e)
+                self._running = []
+                self._runner.reset()
+
+    def _step(self, admitted: List[Sequence]) -> None:
+        # The sequences cancelled by their consumers since the last step
+        self._release_finished()
+        if admitted:
+            self._running += admitted
+            for seq, token in zip(admitted, self._runner.prefill(admitted)):
+                seq.append_token(token)
+            self._release_finished()
+        if self._running:
+            for seq, token in zip(self._running, self._runner.decode(self._running)):
+                seq.append_token(token)
+            self._release_finished()
+
+    def _release_finished(self) -> None:
+        done = [s for s in self._running if s.finished or s.cancelled]
+        if done:
+            self._running = [
+                s for s in self._running if not (s.finished or s.cancelled)
+            ]
+            self._runner.release(done)
@@ -0,0 +1,333 @@
+"""Generate with the continuous batching engine of a huggingface model.
+
+The KV cache of the batch is kept in the legacy format, a (key, value) pair of
+``[batch, heads, length, head_dim]`` tensors per layer. The sequences of different
+lengths are padded on the left and masked by the attention mask. The new sequences
+are prefilled together and their cache is concatenated to the batch, a finished
+sequence is removed from the batch and the padding columns left are dropped.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from dbgpt.core import ModelOutput
+
+from ...utils.parse_utils import (
+    _DEFAULT_THINK_END_TOKEN,
+    _DEFAULT_THINK_START_TOKEN,
+    parse_chat_message,
+)
+from ..continuous_batching import (
+    BatchRunner,
+    ContinuousBatchingEngine,
+    SamplingParams,
+    Sequence,
+)
+from ..inference import prepare_logits_processor
+from .hf_chat_llm import huggingface_chat_generate_stream
+
+logger = logging.getLogger(__name__)
+
+_engine_lock = threading.Lock()
+
+
+class HFBatchRunner(BatchRunner):
+    """Run the batch of a huggingface decoder-only model."""
+
+    def __init__(self, model: AutoModelForCausalLM, device: str):
+        self._model = model
+        self._device = device
+        self._rows: List[int] = []
+        self._cache: Optional[List[List[torch.Tensor]]] = None
+        self._mask: Optional[torch.Tensor] = None
+        self._processors: Dict[int, object] = {}
+
+    @torch.inference_mode()
+    def prefill(self, seqs: List[Sequence]) -> List[int]:
+        max_len = max(len(s.prompt_ids) for s in seqs)
+        input_ids = torch.zeros((len(seqs), max_len), dtype=torch.long)
+        mask = torch.zeros((len(seqs), max_len), dtype=torch.long)
+        for i, seq in enumerate(seqs):
+            input_ids[i, max_len - len(seq.prompt_ids) :] = torch.tensor(seq.prompt_ids)
+            mask[i, max_len - len(seq.prompt_ids) :] = 1
+        input_ids, mask = input_ids.to(self._device), mask.to(self._device)
+        position_ids = (mask.cumsum(-1) - 1).clamp(min=0)
+        out = self._model(
+            input_ids=input_ids,
+            attention_mask=mask,
+            position_ids=position_ids,
+            use_cache=True,
+        )
+        self._merge(seqs, _to_legacy(out.past_key_values), mask)
+        return self._sample(seqs, out.logits[:, -1, :])
+
+    @torch.inference_mode()
+    def decode(self, seqs: List[Sequence]) -> List[int]:
+        rows = {seq_id: i for i, seq_id in enumerate(self._rows)}
+        order = [rows[s.seq_id] for s in seqs]
+        last_tokens = [0] * len(self._rows)
+        for row, seq in zip(order, seqs):
+            last_tokens[row] = seq.last_token
+        input_ids = torch.tensor(last_tokens, device=self._device).unsqueeze(-1)
+        # The position of the new token is the count of the real tokens before it
+        position_ids = self._mask.sum(-1, keepdim=True)
+        self._mask = F.pad(self._mask, (0, 1), value=1)
+        out = self._model(
+            input_ids=input_ids,
+            attention_mask=self._mask,
+            position_ids=position_ids,
+            past_key_values=_from_legacy(self._cache),
+            use_cache=True,
+        )
+        self._cache = _to_legacy(out.past_key_values)
+        return self._sample(seqs, out.logits[order, -1, :])
+
+    @torch.inference_mode()
+    def release(self, seqs: List[Sequence]) -> None:
+        released = {s.seq_id for s in seqs}
+        for seq_id in released:
+            self._processors.pop(seq_id, None)
+        keep = [i for i, seq_id in enumerate(self._rows) if seq_id not in released]
+        if len(keep) == len(self._rows):
+            return
+        if not keep:
+            self.reset()
+            return
+        self._rows = [self._rows[i] for i in keep]
+        index = torch.tensor(keep, device=self._mask.device)
+        mask = self._mask.index_select(0, index)
+        # Drop the padding columns of all the sequences left
+        start = int((mask.sum(0) > 0).nonzero()[0])
+        self._mask = mask[:, start:]
+        self._cache = [
+            [t.index_select(0, index.to(t.device))[:, :, start:] for t in layer]
+            for layer in self._cache
+        ]
+
+    def reset(self) -> None:
+        self._rows = []
+        self._cache = None
+        self._mask = None
+        self._processors.clear()
+
+    def _merge(self, seqs: List[Sequence], cache, mask: torch.Tensor) -> None:
+        self._rows += [s.seq_id for s in seqs]
+        if self._cache is None:
+            self._cache, self._mask = cache, mask
+            return
+        cur_len, new_len = self._mask.shape[1], mask.shape[1]
+        length = max(cur_len, new_len)
+        self._mask = torch.cat(
+            [
+                F.pad(self._mask, (length - cur_len, 0)),
+                F.pad(mask, (length - new_len, 0)),
+            ]
+        )
+        self._cache = [
+            [
+                torch.cat(
+                    [
+                        F.pad(old, (0, 0, length - cur_len, 0)),
+                        F.pad(new, (0, 0, length - new_len, 0)),
+                    ]
+                )
+                for old, new in zip(old_layer, new_layer)
+            ]
+            for old_layer, new_layer in zip(self._cache, cache)
+        ]
+
+    def _sample(self, seqs: List[Sequence], logits: torch.Tensor) -> List[int]:
+        tokens = []
+        for i, seq in enumerate(seqs):
+            sampling = seq.sampling
+            processor = self._processors.get(seq.seq_id)
+            if processor is None:
+                processor = prepare_logits_processor(
+                    sampling.temperature if not sampling.greedy else 1.0,
+                    sampling.repetition_penalty,
+                    sampling.top_p if not sampling.greedy else 1.0,
+                    sampling.top_k if not sampling.greedy else -1,
+                )
+                self._processors[seq.seq_id] = processor
+            last_logits = logits[i : i + 1].float()
+            if processor:
+                ids = torch.tensor(
+                    [seq.prompt_ids + seq.output_ids], device=last_logits.device
+                )
+                last_logits = processor(ids, last_logits)
+            if sampling.greedy:
+                tokens.append(int(last_logits.argmax(-1)))
+            else:
+                probs = torch.softmax(last_logits, dim=-1)
+                tokens.append(int(torch.multinomial(probs, num_samples=1)))
+        return tokens
+
+
+def _to_legacy(past_key_values) -> List[List[torch.Tensor]]:
+    if hasattr(past_key_values, "to_legacy_cache"):
+        past_key_values = past_key_values.to_legacy_cache()
+    elif hasattr(past_key_values, "layers"):
+        past_key_values = [
+            (layer.keys, layer.values) for layer in past_key_values.layers
+        ]
+    return [list(layer) for layer in past_key_values]
+
+
+def _from_legacy(cache: List[List[torch.Tensor]]):
+    legacy = tuple(tuple(layer) for layer in cache)
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return legacy
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(legacy)
+    return DynamicCache(legacy)
+
+
+def _eos_token_ids(model: AutoModelForCausalLM, tokenizer: AutoTokenizer) -> Set[int]:
+    """Return the end tokens of the tokenizer and the generation config.
+
+    A chat model usually ends its answer with the end of turn token of its
+    generation config, not the eos token of its tokenizer.
+    """
+    eos_token_ids = set()
+    generation_config = getattr(model, "generation_config", None)
+    for token_id in (
+        getattr(generation_config, "eos_token_id", None),
+        tokenizer.eos_token_id,
+    ):
+        if isinstance(token_id, int):
+            eos_token_ids.add(token_id)
+        elif token_id:
+            eos_token_ids.update(token_id)
+    return eos_token_ids
+
+
+def get_batch_engine(
+    model: AutoModelForCausalLM, device: str, max_batch_size: int
+) -> ContinuousBatchingEngine:
+    """Return the engine of the model, create it at the first call."""
+    with _engine_lock:
+        engine = getattr(model, "_dbgpt_batch_engine", None)
+        if engine is None:
+            engine = ContinuousBatchingEngine(
+                HFBatchRunner(model, device), max_batch_size=max_batch_size
+            )
+            # Released with the model
+            model._dbgpt_batch_engine = engine
+        return engine
+
+
+def batch_generate_stream_function(max_batch_size: int):
+    """Return the generate stream function of the continuous batching engine."""
+
+    def huggingface_batch_generate_stream(
+        model: AutoModelForCausalLM,
+        tokenizer: AutoTokenizer,
+        params,
+        device,
+        context_len=4096,
+    ):
+        if (
+            model.config.is_encoder_decoder
+            or params.get("audios")
+            or params.get("images")
+            or params.get("videos")
+        ):
+            # Not supported by the batch runner
+            yield from huggingface_chat_generate_stream(
+                model, tokenizer, params, device, context_len
+            )
+            return
+        if hasattr(model, "device"):
+            device = model.device
+        engine = get_batch_engine(model, device, max_batch_size)
+        yield from _generate_stream(
+            engine, tokenizer, params, context_len, _eos_token_ids(model, tokenizer)
+        )
+
+    return huggingface_batch_generate_stream
+
+
+def _generate_stream(
+    engine: ContinuousBatchingEngine,
+    tokenizer: AutoTokenizer,
+    params,
+    context_len: int,
+    eos_token_ids: Set[int],
+):
+    prompt = params["prompt"]
+    max_new_tokens = int(params.get("max_new_tokens", 4096))
+    stop_token_ids = set(params.get("stop_token_ids") or []) | eos_token_ids
+    custom_stop_words = params.get("custom_stop_words", [])
+    think_start_token = params.get("think_start_token", _DEFAULT_THINK_START_TOKEN)
+    think_end_token = params.get("think_end_token", _DEFAULT_THINK_END_TOKEN)
+    is_reasoning_model = params.get("is_reasoning_model", False)
+    reasoning_patterns = [
+        {"start": think_start_token, "end": think_end_token},
+    ]
+    do_sample = params.get("do_sample", True)
+
+    input_ids = tokenizer(prompt).input_ids
+    max_src_len = context_len - max_new_tokens - 1
+    if max_src_len > 0:
+        input_ids = input_ids[-max_src_len:]
+    seq = Sequence(
+        prompt_ids=input_ids,
+        max_new_tokens=max_new_tokens,
+        stop_token_ids=stop_token_ids,
+        sampling=SamplingParams(
+            temperature=float(params.get("temperature", 0.7)),
+            top_p=float(params.get("top_p", 1.0)),
+            top_k=int(params.get("top_k", -1)),
+            repetition_penalty=float(params.get("repetition_penalty", 1.0)),
+            do_sample=True if do_sample is None else bool(do_sample),
+        ),
+        context_len=context_len,
+    )
+    text_prefix = ""
+    if prompt.rstrip().endswith(think_start_token) and is_reasoning_model:
+        text_prefix = think_start_token + "\n"
+
+    for output_ids in engine.generate(seq):
+        text = tokenizer.decode(
+            output_ids,
+            skip_special_tokens=True,
+            spaces_between_special_tokens=False,
+        )
+        finish_reason = None
+        if seq.finished and len(output_ids) == len(seq.output_ids):
+            finish_reason = seq.finish_reason
+        for stop_word in custom_stop_words:
+            pos = text.find(stop_word)
+            if pos != -1:
+                text = text[:pos]
+                finish_reason = "stop"
+                break
+        msg = parse_chat_message(
+            text_prefix + text,
+            extract_reasoning=is_reasoning_model,
+            reasoning_patterns=reasoning_patterns,
+        )
+        usage = {
+            "prompt_tokens": len(input_ids),
+            "completion_tokens": len(output_ids),
+            "total_tokens": len(input_ids) + len(output_ids),
+        }
+        yield ModelOutput.build(
+            msg.content,
+            msg.reasoning_content,
+            error_code=0,
+            usage=usage,
+            finish_reason=finish_reason,
+            is_reasoning_model=is_reasoning_model,
+        )
+        if finish_reason:
+            # Leave the batch on a custom stop word
+            seq.cancel()
+            return
@@ -0,0 +1,139 @@
+import threading
+from typing import List
+
+import pytest
+
+from ..continuous_batching import BatchRunner, ContinuousBatchingEngine, Sequence
+
+EOS = 0
+
+
+class _MockRunner(BatchRunner):
+    """Generate the tokens 1, 2, 3... of every sequence, EOS after `prompt_ids[0]`."""
+
+    def __init__(self, step_event: threading.Event = None):
+        self.rows: List[int] = []
+        self.prefill_sizes: List[int] = []
+        self.decode_sizes: List[int] = []
+        self.released: List[int] = []
+        # The rows of the batch when a sequence is prefilled
+        self.rows_at_prefill = {}
+        self._step_event = step_event
+
+    def prefill(self, seqs):
+        self.prefill_sizes.append(len(seqs))
+        for s in seqs:
+            self.rows_at_prefill[s.seq_id] = list(self.rows)
+        self.rows += [s.seq_id for s in seqs]
+        return [self._next(s) for s in seqs]
+
+    def decode(self, seqs):
+        if self._step_event:
+            self._step_event.wait()
+        assert sorted(s.seq_id for s in seqs) == sorted(self.rows)
+        self.decode_sizes.append(len(seqs))
+        return [self._next(s) for s in seqs]
+
+    def release(self, seqs):
+        for s in seqs:
+            self.rows.remove(s.seq_id)
+            self.released.append(s.seq_id)
+
+    def reset(self):
+        self.rows = []
+
+    @staticmethod
+    def _next(seq: Sequence) -> int:
+        token = len(seq.output_ids) + 1
+        return EOS if token > seq.prompt_ids[0] else token
+
+
+def _seq(num_tokens: int, max_new_tokens: int = 100) -> Sequence:
+    return Sequence(
+        prompt_ids=[num_tokens], max_new_tokens=max_new_tokens, stop_token_ids={EOS}
+    )
+
+
+def test_generate():
+    engine = ContinuousBatchingEngine(_MockRunner())
+    seq = _seq(3)
+    outputs = list(engine.generate(seq))
+    assert outputs[-1] == [1, 2, 3]
+    assert seq.finish_reason == "stop"
+
+    seq = _seq(10, max_new_tokens=4)
+    assert list(engine.generate(seq))[-1] == [1, 2, 3, 4]
+    assert seq.finish_reason == "length"
+
+
+def _wait_idle(engine: ContinuousBatchingEngine):
+    thread = engine._thread
+    if thread:
+        thread.join(5)
+    assert engine.num_running == 0 and engine.num_waiting == 0
+
+
+def test_share_decode_steps():
+    step_event = threading.Event()
+    runner = _MockRunner(step_event)
+    engine = ContinuousBatchingEngine(runner, max_batch_size=4)
+    lengths = [5, 8, 3, 6, 7, 2]
+    seqs = [engine.submit(_seq(n)) for n in lengths]
+    step_event.set()
+    results = [list(seq.stream())[-1] for seq in seqs]
+    assert results == [list(range(1, n + 1)) for n in lengths]
+    assert max(runner.decode_sizes) == 4
+    # The forward passes are shared by the sequences, one pass per token of each
+    # sequence without batching
+    assert sum(runner.decode_sizes) == sum(lengths)
+    assert len(runner.decode_sizes) < sum(lengths) / 2
+    _wait_idle(engine)
+    assert len(runner.released) == len(lengths)
+    assert not runner.rows
+
+
+def test_admit_between_steps():
+    step_event = threading.Event()
+    runner = _MockRunner(step_event)
+    engine = ContinuousBatchingEngine(runner, max_batch_size=2)
+    first = engine.submit(_seq(3))
+    second = engine.submit(_seq(20))
+    third = engine.submit(_seq(2))
+    step_event.set()
+    assert list(third.stream())[-1] == [1, 2]
+    assert list(second.stream())[-1] == list(range(1, 21))
+    assert list(first.stream())[-1] == [1, 2, 3]
+    # The third sequence waits for the row of the first one, and joins the batch
+    # while the second one is running
+    assert runner.released == [first.seq_id, third.seq_id, second.seq_id]
+    assert runner.rows_at_prefill[third.seq_id] == [second.seq_id]
+    assert max(runner.decode_sizes) == 2
+
+
+def test_cancel():
+    step_event = threading.Event()
+    runner = _MockRunner(step_event)
+    engine = ContinuousBatchingEngine(runner)
+    seq = _seq(1000, max_new_tokens=1000)
+    stream = engine.generate(seq)
+    next(stream)
+    stream.close()
+    assert seq.cancelled
+    step_event.set()
+    other = _seq(3)
+    assert list(engine.generate(other))[-1] == [1, 2, 3]
+    assert seq.seq_id in runner.released
+
+
+class _FailedRunner(_MockRunner):
+    def decode(self, seqs):
+        raise RuntimeError("forward failed")
+
+
+def test_error():
+    engine = ContinuousBatchingEngine(_FailedRunner())
+    with pytest.raises(RuntimeError, match="forward failed"):
+        list(engine.generate(_seq(3)))
+    # The engine is still usable
+    engine._runner = _MockRunner()
+    assert list(engine.generate(_seq(2)))[-1] == [1, 2]
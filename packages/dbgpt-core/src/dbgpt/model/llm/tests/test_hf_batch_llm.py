@@ -0,0 +1,73 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from ..continuous_batching import (  # noqa: E402
+    ContinuousBatchingEngine,
+    SamplingParams,
+    Sequence,
+)
+from ..llm_out.hf_batch_llm import HFBatchRunner  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=128,
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=256,
+        # Large weights, the tokens depend on the whole context
+        initializer_range=0.5,
+    )
+    # Double precision, the padded batch and a single prompt pick the same tokens
+    model = transformers.LlamaForCausalLM(config).double().eval()
+    model.generation_config.eos_token_id = None
+    model.generation_config.pad_token_id = 0
+    return model
+
+
+def _seq(prompt_ids, max_new_tokens) -> Sequence:
+    return Sequence(
+        prompt_ids=prompt_ids,
+        max_new_tokens=max_new_tokens,
+        sampling=SamplingParams(do_sample=False),
+    )
+
+
+def _generate(model, seq: Sequence):
+    input_ids = torch.tensor([seq.prompt_ids])
+    output = model.generate(
+        input_ids,
+        attention_mask=torch.ones_like(input_ids),
+        max_new_tokens=seq.max_new_tokens,
+        do_sample=False,
+    )
+    return output[0, input_ids.shape[1] :].tolist()
+
+
+def test_greedy_batch_equals_generate(model):
+    engine = ContinuousBatchingEngine(HFBatchRunner(model, "cpu"), max_batch_size=4)
+    first = _seq([5, 17, 42, 9], 10)
+    # The longest prompt, leaves the batch early and its padding is dropped
+    short = _seq([3, 8, 99, 21, 64, 7], 2)
+    # Admitted in the middle of the batch, longer than the running sequences
+    late = _seq([11, 12, 13, 14, 15, 16, 17, 18, 19], 3)
+
+    # Run the steps of the engine thread in order
+    engine._step([first, short])
+    engine._step([])
+    assert short.finished and engine.num_running == 1
+    engine._step([late])
+    assert engine.num_running == 2
+    while engine.num_running:
+        engine._step([])
+
+    for seq in (first, short, late):
+        assert seq.finish_reason == "length"
+        assert seq.output_ids == _generate(model, seq)
@@ -188,6 +188,23 @@ class ModelWorkerParameters(BaseServerParameters):
         default=20,
         metadata={"help": _("The interval for sending heartbeats (seconds)")},
     )
+    routing_strategy: Optional[str] = field(
+        default="power_of_two",
+        metadata={
+            "valid_values": [
+                "random",
+                "least_outstanding",
+                "power_of_two",
+                "ewma_latency",
+                "affinity",
+            ],
+            "help": _(
+                "The strategy to select one of the instances of a model, "
+                "'affinity' sends the requests of the same conversation or prompt "
+                "prefix to the same instance for the KV cache reuse"
+            ),
+        },
+    )
 
 
 @dataclass
@@ -99,9 +99,13 @@ def _initialize_openai_v1(init_params: OpenAIParameters):
 def _build_openai_client(init_params: OpenAIParameters) -> Tuple[str, ClientType]:
     import httpx
 
+    from dbgpt.util.http_client_pool import get_http_client_pool
+
     openai_params, api_type, api_version, api_azure_deployment = _initialize_openai_v1(
         init_params
     )
+    # The connections are kept alive and shared by all the clients in the pool
+    pool = get_http_client_pool()
     if api_type == "azure":
         from openai import AsyncAzureOpenAI
 
@@ -110,6 +114,7 @@ def _build_openai_client(init_params: OpenAIParameters) -> Tuple[str, ClientType
             api_version=api_version,
             azure_deployment=api_azure_deployment,
             azure_endpoint=openai_params["base_url"],
+            http_client=pool.client(),
         )
     else:
         from openai import AsyncOpenAI
@@ -117,14 +122,11 @@ def _build_openai_client(init_params: OpenAIParameters) -> Tuple[str, ClientType
         # Remove proxies for httpx AsyncClient when httpx version >= 0.28.0
         httpx_version = metadata.version("httpx")
         if httpx_version >= "0.28.0":
-            if init_params.proxy:
-                http_client = httpx.AsyncClient(proxy=init_params.proxy)
-            else:
-                http_client = httpx.AsyncClient()
+            http_client = pool.client(proxy=init_params.proxy)
         elif init_params.proxies:
             http_client = httpx.AsyncClient(proxies=init_params.proxies)
         else:
-            http_client = httpx.AsyncClient()
+            http_client = pool.client()
         async_client = AsyncOpenAI(**openai_params, http_client=http_client)
     return api_type, async_client
 
@@ -0,0 +1,153 @@
+"""Delta encoding of the model output streams.
+
+The model workers stream cumulative outputs, every output carries the full text
+generated so far, so a long answer moves O(n^2) bytes through every hop. A delta
+stream only carries the text appended since the previous output
+(``incremental=True``). Every ``checkpoint_interval`` outputs, and whenever the text
+is not an extension of the previous one, a full output (``incremental=False``) is
+sent as a checkpoint which replaces everything received before.
+"""
+
+from typing import AsyncIterator, Optional
+
+from dbgpt.core import ModelOutput
+from dbgpt.core.interface.media import MediaContentType
+
+DEFAULT_CHECKPOINT_INTERVAL = 64
+
+# A multi-byte character split by the tokens is decoded to the replacement
+# character, it is held back until the next output completes it.
+_REPLACEMENT_CHAR = "�"
+
+
+def _is_text_only(output: ModelOutput) -> bool:
+    contents = output.content if isinstance(output.content, list) else [output.content]
+    return all(
+        c.type in (MediaContentType.TEXT, MediaContentType.THINKING) for c in contents
+    )
+
+
+def _rebuild(
+    output: ModelOutput, text: str, thinking: str, incremental: bool
+) -> ModelOutput:
+    new_output = ModelOutput.build(
+        text,
+        thinking,
+        error_code=output.error_code,
+        usage=output.usage,
+        finish_reason=output.finish_reason,
+        metrics=output.metrics,
+    )
+    new_output.model_context = output.model_context
+    new_output.incremental = incremental
+    return new_output
+
+
+class DeltaEncoder:
+    """Encode the cumulative outputs of a stream to deltas and checkpoints."""
+
+    def __init__(self, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        """Create a DeltaEncoder.
+
+        Args:
+            checkpoint_interval (int): Send a full output every these outputs, 0 to
+                send checkpoints only when the text is rewritten.
+        """
+        self._checkpoint_interval = checkpoint_interval
+        self._text = ""
+        self._thinking = ""
+        self._count = 0
+
+    def encode(self, output: ModelOutput) -> ModelOutput:
+        """Encode a cumulative output."""
+        if output.incremental:
+            # Already a delta, just track the full text
+            if output.has_text:
+                self._text += output.text
+            if output.has_thinking:
+                self._thinking += output.thinking_text or ""
+            self._count += 1
+            return output
+        if output.error_code != 0 or not _is_text_only(output):
+            self._count = 0
+            return output
+
+        text = output.text.rstrip(_REPLACEMENT_CHAR) if output.has_text else ""
+        thinking = (output.thinking_text or "") if output.has_thinking else ""
+        thinking = thinking.rstrip(_REPLACEMENT_CHAR)
+        is_checkpoint = (
+            not text.startswith(self._text)
+            or not thinking.startswith(self._thinking)
+            or (
+                self._checkpoint_interval > 0
+                and self._count > 0
+                and self._count % self._checkpoint_interval == 0
+            )
+        )
+        if is_checkpoint:
+            new_output = _rebuild(output, text, thinking, incremental=False)
+        else:
+            new_output = _rebuild(
+                output,
+                text[len(self._text) :],
+                thinking[len(self._thinking) :],
+                incremental=True,
+            )
+        self._text, self._thinking = text, thinking
+        self._count += 1
+        return new_output
+
+
+class DeltaDecoder:
+    """Decode a delta stream to cumulative outputs.
+
+    It is the adapter of the consumers expecting the full text in every output.
+    """
+
+    def __init__(self):
+        """Create a DeltaDecoder."""
+        self._text = ""
+        self._thinking = ""
+
+    @property
+    def text(self) -> str:
+        """Return the full text decoded so far."""
+        return self._text
+
+    def decode(self, output: ModelOutput) -> ModelOutput:
+        """Decode a delta or a checkpoint to a cumulative output."""
+        if not output.incremental:
+            if output.error_code == 0 and _is_text_only(output):
+                self._text = output.text if output.has_text else ""
+                self._thinking = (
+                    (output.thinking_text or "") if output.has_thinking else ""
+                )
+            return output
+        if output.has_text:
+            self._text += output.text
+        if output.has_thinking:
+            self._thinking += output.thinking_text or ""
+        return _rebuild(output, self._text, self._thinking, incremental=False)
+
+
+async def encode_delta_stream(
+    stream: AsyncIterator[ModelOutput],
+    checkpoint_interval: Optional[int] = None,
+) -> AsyncIterator[ModelOutput]:
+    """Encode a cumulative output stream to a delta stream."""
+    encoder = DeltaEncoder(
+        DEFAULT_CHECKPOINT_INTERVAL
+        if checkpoint_interval is None
+        else checkpoint_interval
+    )
+    async for output in stream:
+        yield encoder.encode(output)
+
+
+async def decode_delta_stream(
+    stream: AsyncIterator[ModelOutput],
+) -> AsyncIterator[ModelOutput]:
+    """Decode a delta stream to a cumulative output stream."""
+    decoder = DeltaDecoder()
+    async for output in stream:
+        yield decoder.decode(output)
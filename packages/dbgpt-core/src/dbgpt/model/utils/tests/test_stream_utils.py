@@ -0,0 +1,82 @@
+import pytest
+
+from dbgpt.core import ModelOutput
+
+from ..stream_utils import (
+    DeltaDecoder,
+    DeltaEncoder,
+    decode_delta_stream,
+    encode_delta_stream,
+)
+
+
+def _cumulative(*texts: str):
+    return [ModelOutput.build(text) for text in texts]
+
+
+def test_encode_deltas_and_checkpoints():
+    encoder = DeltaEncoder(checkpoint_interval=3)
+    outputs = [
+        encoder.encode(o) for o in _cumulative("a", "ab", "abc", "abcd", "abcde")
+    ]
+    assert [o.text for o in outputs] == ["a", "b", "c", "abcd", "e"]
+    assert [o.incremental for o in outputs] == [True, True, True, False, True]
+
+
+def test_encode_rewritten_text():
+    encoder = DeltaEncoder(checkpoint_interval=0)
+    outputs = [encoder.encode(o) for o in _cumulative("hello", "hello w", "hi")]
+    assert [(o.text, o.incremental) for o in outputs] == [
+        ("hello", True),
+        (" w", True),
+        ("hi", False),
+    ]
+
+
+def test_encode_hold_back_partial_character():
+    encoder = DeltaEncoder()
+    outputs = [encoder.encode(o) for o in _cumulative("你�", "你好")]
+    assert [o.text for o in outputs] == ["你", "好"]
+
+
+def test_encode_thinking_and_metadata():
+    encoder = DeltaEncoder()
+    first = ModelOutput.build(thinking="think")
+    second = ModelOutput.build("ans", "think more", finish_reason="stop")
+    second.usage = {"total_tokens": 3}
+    outputs = [encoder.encode(first), encoder.encode(second)]
+    assert outputs[0].thinking_text == "think"
+    assert outputs[1].thinking_text == " more"
+    assert outputs[1].text == "ans"
+    assert outputs[1].finish_reason == "stop"
+    assert outputs[1].usage == {"total_tokens": 3}
+
+
+def test_error_output_is_passed_through():
+    encoder = DeltaEncoder()
+    encoder.encode(ModelOutput.build("abc"))
+    error = ModelOutput(error_code=1, text="error")
+    assert encoder.encode(error) is error
+
+
+def test_decode_roundtrip():
+    texts = ["", "x", "xy", "xyz", "xz", "xz!", "xz!?"]
+    encoder = DeltaEncoder(checkpoint_interval=2)
+    decoder = DeltaDecoder()
+    decoded = [decoder.decode(encoder.encode(o)).text for o in _cumulative(*texts)]
+    assert decoded == texts
+    assert decoder.text == texts[-1]
+
+
+@pytest.mark.asyncio
+async def test_delta_stream_roundtrip():
+    texts = [f"token-{i} " * i for i in range(1, 10)]
+
+    async def stream():
+        for output in _cumulative(*texts):
+            yield output
+
+    decoded = [
+        o.text async for o in decode_delta_stream(encode_delta_stream(stream(), 4))
+    ]
+    assert decoded == texts
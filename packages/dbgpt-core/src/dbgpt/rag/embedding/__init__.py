@@ -1,5 +1,12 @@
 """Module for embedding related classes and functions."""
 
+from .batcher import EmbeddingBatcher  # noqa: F401
+from .cached import (  # noqa: F401
+    CachedEmbeddings,
+    QueryEmbeddingCache,
+    embeddings_fingerprint,
+    model_name_of,
+)
 from .embedding_factory import (  # noqa: F401
     DefaultEmbeddingFactory,
     EmbeddingFactory,
@@ -21,8 +28,10 @@ from .rerank import (  # noqa: F401
 )
 
 __ALL__ = [
+    "CachedEmbeddings",
     "CrossEncoderRerankEmbeddings",
     "DefaultEmbeddingFactory",
+    "EmbeddingBatcher",
     "EmbeddingFactory",
     "Embeddings",
     "HuggingFaceBgeEmbeddings",
@@ -31,7 +40,10 @@ __ALL__ = [
     "HuggingFaceInstructEmbeddings",
     "OpenAPIEmbeddings",
     "OpenAPIRerankEmbeddings",
+    "QueryEmbeddingCache",
     "SiliconFlowRerankEmbeddings",
     "InfiniAIRerankEmbeddings",
     "WrappedEmbeddingFactory",
+    "embeddings_fingerprint",
+    "model_name_of",
 ]
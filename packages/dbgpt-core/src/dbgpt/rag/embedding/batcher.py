@@ -0,0 +1,266 @@
+"""Batch the requests of a remote embedding model.
+
+Large lists of texts are split into sub-batches by item count and estimated tokens,
+the sub-batches are sent concurrently. Small requests arriving within a short window
+(e.g. the queries of many chat sessions) are coalesced into one upstream batch.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EmbedFunc = Callable[[List[str]], List[List[float]]]
+AsyncEmbedFunc = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text without a tokenizer.
+
+    A token is about 4 bytes of English text and 3 bytes (one character) of CJK
+    text, 3 bytes per token over-estimates the English texts, a batch is never
+    larger than its token limit.
+    """
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+class _AsyncPending:
+    """The coalescing requests of an event loop."""
+
+    def __init__(self):
+        self.items: List[Tuple[str, asyncio.Future]] = []
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+
+
+class EmbeddingBatcher:
+    """Split, run concurrently and coalesce embedding requests.
+
+    The results are always returned in the order of the input texts.
+
+    Example:
+        .. code-block:: python
+
+            batcher = EmbeddingBatcher(embed_func, aembed_func, max_batch_size=64)
+            vectors = batcher.embed(texts)
+            vector = (await batcher.aembed_coalesced([query]))[0]
+    """
+
+    def __init__(
+        self,
+        embed_func: EmbedFunc,
+        aembed_func: Optional[AsyncEmbedFunc] = None,
+        max_batch_size: int = 128,
+        max_batch_tokens: Optional[int] = None,
+        max_concurrency: int = 4,
+        batch_window: float = 0.005,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        """Create a new EmbeddingBatcher.
+
+        Args:
+            embed_func (EmbedFunc): Embed one upstream batch.
+            aembed_func (Optional[AsyncEmbedFunc]): Embed one upstream batch
+                asynchronously, default to run embed_func in a thread.
+            max_batch_size (int): The max texts of an upstream batch.
+            max_batch_tokens (Optional[int]): The max estimated tokens of an
+                upstream batch, None for no limit. A text exceeding the limit is
+                sent alone.
+            max_concurrency (int): The max upstream batches running concurrently
+                for one call.
+            batch_window (float): The seconds to wait for other requests to
+                coalesce with, 0 to disable coalescing.
+            token_counter (Optional[Callable[[str], int]]): Count the tokens of a
+                text, default is :func:`estimate_tokens`.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self._embed_func = embed_func
+        self._aembed_func = aembed_func
+        self._max_batch_size = max_batch_size
+        self._max_batch_tokens = max_batch_tokens
+        self._max_concurrency = max_concurrency
+        self._batch_window = batch_window
+        self._token_counter = token_counter or estimate_tokens
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Coalescing state of the synchronous requests
+        self._pending: List[Tuple[str, Future]] = []
+        self._collecting = False
+        self._full = threading.Event()
+        # Coalescing state of the asynchronous requests, per event loop
+        self._async_pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def split(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """Split the texts into the (start, end) ranges of the upstream batches."""
+        ranges = []
+        start, tokens = 0, 0
+        for i, text in enumerate(texts):
+            text_tokens = self._token_counter(text) if self._max_batch_tokens else 0
+            if i > start and (
+                i - start >= self._max_batch_size
+                or (
+                    self._max_batch_tokens
+                    and tokens + text_tokens > self._max_batch_tokens
+                )
+            ):
+                ranges.append((start, i))
+                start, tokens = i, 0
+            tokens += text_tokens
+        if start < len(texts):
+            ranges.append((start, len(texts)))
+        return ranges
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed the texts, the upstream batches are sent concurrently."""
+        ranges = self.split(texts)
+        if len(ranges) <= 1:
+            return self._embed_func(texts) if texts else []
+        executor = self._get_executor()
+        # Every batch runs in a copy of the current context, e.g. the trace id
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run, self._embed_func, texts[start:end]
+            )
+            for start, end in ranges
+        ]
+        results: List[List[float]] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Embed the texts asynchronously."""
+        ranges = self.split(texts)
+        if not ranges:
+            return []
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _run(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        batches = await asyncio.gather(
+            *[_run(texts[start:end]) for start, end in ranges]
+        )
+        return [vector for batch in batches for vector in batch]
+
+    def embed_coalesced(self, texts: List[str]) -> List[List[float]]:
+        """Embed the texts together with the requests of other threads.
+
+        The first request waits the batch window (or until a full batch is
+        collected) and sends all the collected texts upstream.
+        """
+        if self._batch_window <= 0 or not texts:
+            return self.embed(texts)
+        futures: List[Future] = [Future() for _ in texts]
+        with self._lock:
+            self._pending.extend(zip(texts, futures))
+            leader = not self._collecting
+            if leader:
+                self._collecting = True
+                self._full.clear()
+            if len(self._pending) >= self._max_batch_size:
+                self._full.set()
+        if leader:
+            self._full.wait(self._batch_window)
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._collecting = False
+            self._run_pending(pending)
+        return [future.result() for future in futures]
+
+    async def aembed_coalesced(self, texts: List[str]) -> List[List[float]]:
+        """Embed the texts together with the other requests of the event loop."""
+        if self._batch_window <= 0 or not texts:
+            return await self.aembed(texts)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pending = self._async_pending.get(loop)
+            if pending is None:
+                pending = _AsyncPending()
+                self._async_pending[loop] = pending
+        futures = [loop.create_future() for _ in texts]
+        pending.items.extend(zip(texts, futures))
+        if len(pending.items) >= self._max_batch_size:
+            if pending.handle:
+                pending.handle.cancel()
+            self._aflush(pending)
+        elif pending.handle is None:
+            pending.handle = loop.call_later(self._batch_window, self._aflush, pending)
+        return list(await asyncio.gather(*futures))
+
+    def close(self) -> None:
+        """Shutdown the thread pool of the concurrent batches."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_concurrency,
+                    thread_name_prefix="embedding_batcher",
+                )
+            return self._executor
+
+    async def _aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        if self._aembed_func:
+            return await self._aembed_func(texts)
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._get_executor(), ctx.run, self._embed_func, texts
+        )
+
+    def _run_pending(self, pending: List[Tuple[str, Future]]) -> None:
+        texts, positions = _dedupe(pending)
+        logger.debug(f"Coalesced {len(pending)} embedding requests")
+        try:
+            vectors = self.embed(texts)
+        except BaseException as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        for (_, future), pos in zip(pending, positions):
+            future.set_result(vectors[pos])
+
+    def _aflush(self, pending: _AsyncPending) -> None:
+        pending.handle = None
+        items, pending.items = pending.items, []
+        if not items:
+            return
+        task = asyncio.ensure_future(self._arun_pending(items))
+        # Keep a reference until the task is done
+        pending.tasks.add(task)
+        task.add_done_callback(pending.tasks.discard)
+
+    async def _arun_pending(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        texts, positions = _dedupe(items)
+        logger.debug(f"Coalesced {len(items)} embedding requests")
+        try:
+            vectors = await self.aembed(texts)
+        except BaseException as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), pos in zip(items, positions):
+            if not future.done():
+                future.set_result(vectors[pos])
+
+
+def _dedupe(items: List[Tuple[str, object]]) -> Tuple[List[str], List[int]]:
+    """Return the unique texts and the position of every item in them."""
+    unique: Dict[str, int] = {}
+    positions = [unique.setdefault(text, len(unique)) for text, _ in items]
+    return list(unique.keys()), positions
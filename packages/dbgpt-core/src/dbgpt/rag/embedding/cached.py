@@ -0,0 +1,238 @@
+"""Cache the embeddings of queries.
+
+The same question is often searched in several knowledge spaces, or retried by an
+agent loop, the query embeddings are memoized to avoid embedding it again.
+"""
+
+import hashlib
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from dbgpt.core import Embeddings
+
+
+def model_name_of(embeddings: Embeddings) -> str:
+    """Return the model name of the embeddings, the class name if it has none."""
+    model_name = getattr(embeddings, "model_name", None)
+    if isinstance(model_name, str) and model_name:
+        return model_name
+    return type(embeddings).__name__
+
+
+def embeddings_fingerprint(embeddings: Embeddings) -> str:
+    """Return the fingerprint of the backend of the embeddings.
+
+    The vectors of a model name can differ by backend or by encode options (e.g.
+    normalized or not), the fingerprint is the class, the model name and the
+    encode options of the embeddings. A wrapper is fingerprinted by the embeddings
+    it wraps.
+    """
+    while isinstance(getattr(embeddings, "embeddings", None), Embeddings):
+        embeddings = embeddings.embeddings  # type: ignore
+    parts = [type(embeddings).__qualname__, model_name_of(embeddings)]
+    for name in ("encode_kwargs", "dimensions"):
+        value = getattr(embeddings, name, None)
+        if value:
+            parts.append(f"{name}={json.dumps(value, sort_keys=True, default=str)}")
+    return "|".join(parts)
+
+
+class QueryEmbeddingCache:
+    """A bounded LRU cache of query embeddings.
+
+    The key of a cache entry is the namespace of the embeddings backend and the sha256
+    of the query text, the vector is saved as a compact array of doubles. When
+    persist_dir is provided, the entries are also written to a RocksDB database, a
+    miss of the memory cache falls back to it.
+
+    The cache is thread safe and can be shared by many embeddings instances.
+    """
+
+    def __init__(self, max_entries: int = 1024, persist_dir: Optional[str] = None):
+        """Create a new QueryEmbeddingCache.
+
+        Args:
+            max_entries (int): The max entries kept in memory.
+            persist_dir (Optional[str]): The directory of the RocksDB persistence
+                tier, None to keep the cache in memory only.
+        """
+        self._max_entries = max_entries
+        self._cache: OrderedDict[bytes, array] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Any = None
+        if persist_dir:
+            try:
+                from rocksdict import Rdict
+            except ImportError:
+                raise ImportError(
+                    "Could not import rocksdict python package. "
+                    "Please install it with `pip install rocksdict`."
+                )
+            self._db = Rdict(persist_dir)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(namespace: str, text: str) -> bytes:
+        """Build the cache key of a query embedded by a backend."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{namespace}:{digest}".encode("utf-8")
+
+    def get(self, key: bytes) -> Optional[List[float]]:
+        """Get the embedding of a key, None if not cached."""
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+        if self._db is not None:
+            data = self._db.get(key)
+            if data is not None:
+                vector = array("d")
+                vector.frombytes(data)
+                with self._lock:
+                    self.hits += 1
+                    self._put(key, vector)
+                return vector.tolist()
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: bytes, embedding: List[float]) -> None:
+        """Cache the embedding of a key."""
+        vector = array("d", embedding)
+        with self._lock:
+            self._put(key, vector)
+        if self._db is not None:
+            self._db[key] = vector.tobytes()
+
+    def clear(self) -> None:
+        """Clear the memory cache."""
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Close the persistence tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        """Return the number of entries in memory."""
+        return len(self._cache)
+
+    def _put(self, key: bytes, vector: array) -> None:
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings which memoize the query embeddings of another embeddings.
+
+    Only the queries are cached, the documents are embedded by the wrapped embeddings
+    directly.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: Optional[QueryEmbeddingCache] = None,
+        namespace: Optional[str] = None,
+    ) -> None:
+        """Create a new CachedEmbeddings.
+
+        Args:
+            embeddings (Embeddings): The embeddings to wrap.
+            cache (Optional[QueryEmbeddingCache]): The cache, can be shared by many
+                embeddings, a new memory cache is created if not provided.
+            namespace (Optional[str]): The namespace in the cache key, default is
+                the fingerprint of the wrapped embeddings.
+        """
+        self._embeddings = embeddings
+        self._cache = cache if cache is not None else QueryEmbeddingCache()
+        self._model_name = model_name_of(embeddings)
+        self._namespace = namespace or embeddings_fingerprint(embeddings)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the wrapped embeddings."""
+        return self._embeddings
+
+    @property
+    def model_name(self) -> str:
+        """Return the model name."""
+        return self._model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed search docs."""
+        return self._embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed query text."""
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple query texts, only the uncached ones are embedded."""
+        results, missing = self._lookup(texts)
+        if missing:
+            miss_texts = list(missing.keys())
+            if len(miss_texts) == 1:
+                embeddings = [self._embeddings.embed_query(miss_texts[0])]
+            else:
+                embeddings = self._embeddings.embed_queries(miss_texts)
+            self._fill(results, missing, embeddings)
+        return results  # type: ignore
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed search docs."""
+        return await self._embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronous Embed query text."""
+        return (await self.aembed_queries([text]))[0]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed multiple query texts."""
+        results, missing = self._lookup(texts)
+        if missing:
+            miss_texts = list(missing.keys())
+            if len(miss_texts) == 1:
+                embeddings = [await self._embeddings.aembed_query(miss_texts[0])]
+            else:
+                embeddings = await self._embeddings.aembed_queries(miss_texts)
+            self._fill(results, missing, embeddings)
+        return results  # type: ignore
+
+    def _lookup(
+        self, texts: List[str]
+    ) -> Tuple[List[Optional[List[float]]], Dict[str, List[int]]]:
+        results: List[Optional[List[float]]] = []
+        # Uncached text -> positions, the duplicated texts are embedded once
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text in missing:
+                missing[text].append(i)
+                results.append(None)
+                continue
+            embedding = self._cache.get(self._cache.build_key(self._namespace, text))
+            if embedding is None:
+                missing[text] = [i]
+            results.append(embedding)
+        return results, missing
+
+    def _fill(
+        self,
+        results: List[Optional[List[float]]],
+        missing: Dict[str, List[int]],
+        embeddings: List[List[float]],
+    ) -> None:
+        for (text, positions), embedding in zip(missing.items(), embeddings):
+            self._cache.set(self._cache.build_key(self._namespace, text), embedding)
+            for i in positions:
+                results[i] = embedding
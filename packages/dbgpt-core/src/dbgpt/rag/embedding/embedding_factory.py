@@ -11,9 +11,32 @@ from dbgpt.core.awel import DAGVar
 from dbgpt.core.awel.flow import ResourceCategory, register_resource
 from dbgpt.core.interface.parameter import EmbeddingDeployModelParameters
 
+from .cached import CachedEmbeddings, QueryEmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
+def _with_cache(
+    embeddings: Embeddings,
+    query_cache_size: int = 0,
+    query_cache_dir: Optional[str] = None,
+    document_cache_dir: Optional[str] = None,
+) -> Embeddings:
+    if document_cache_dir:
+        from dbgpt.storage.cache.embedding_cache import (
+            CacheBackedEmbeddings,
+            EmbeddingCache,
+        )
+
+        embeddings = CacheBackedEmbeddings(
+            embeddings, EmbeddingCache(document_cache_dir)
+        )
+    if query_cache_size > 0:
+        cache = QueryEmbeddingCache(query_cache_size, query_cache_dir)
+        embeddings = CachedEmbeddings(embeddings, cache)
+    return embeddings
+
+
 class EmbeddingFactory(BaseComponent, ABC):
     """Abstract base class for EmbeddingFactory."""
 
@@ -62,9 +85,21 @@ class DefaultEmbeddingFactory(EmbeddingFactory):
         system_app: Optional[SystemApp] = None,
         default_model_name: Optional[str] = None,
         default_model_path: Optional[str] = None,
+        query_cache_size: int = 0,
+        query_cache_dir: Optional[str] = None,
+        document_cache_dir: Optional[str] = None,
         **kwargs: Any,
     ) -> None:
-        """Create a new DefaultEmbeddingFactory."""
+        """Create a new DefaultEmbeddingFactory.
+
+        Args:
+            query_cache_size (int): The max query embeddings cached in memory, 0 to
+                disable the query embedding cache.
+            query_cache_dir (Optional[str]): The directory to persist the query
+                embedding cache, None to cache in memory only.
+            document_cache_dir (Optional[str]): The directory of the persistent
+                document embedding cache, None to disable it.
+        """
         super().__init__(system_app=system_app)
         if not default_model_path:
             default_model_path = default_model_name
@@ -73,7 +108,9 @@ class DefaultEmbeddingFactory(EmbeddingFactory):
         self._default_model_name = default_model_name
         self._default_model_path = default_model_path
         self._kwargs = kwargs
-        self._model = self._load_model()
+        self._model = _with_cache(
+            self._load_model(), query_cache_size, query_cache_dir, document_cache_dir
+        )
 
     def init_app(self, system_app):
         """Init the app."""
@@ -214,13 +251,18 @@ class WrappedEmbeddingFactory(EmbeddingFactory):
         self,
         system_app: Optional[SystemApp] = None,
         embeddings: Optional[Embeddings] = None,
+        query_cache_size: int = 0,
+        query_cache_dir: Optional[str] = None,
+        document_cache_dir: Optional[str] = None,
         **kwargs: Any,
     ) -> None:
         """Create a new DefaultEmbeddingFactory."""
         super().__init__(system_app=system_app)
         if not embeddings:
             raise ValueError("embeddings must be provided.")
-        self._model = embeddings
+        self._model = _with_cache(
+            embeddings, query_cache_size, query_cache_dir, document_cache_dir
+        )
 
     def init_app(self, system_app):
         """Init the app."""
@@ -273,6 +315,10 @@ class DefaultEmbeddings(Embeddings):
         """Embed query text."""
         return self.embeddings.embed_query(text)
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple query texts."""
+        return self.embeddings.embed_queries(texts)
+
     async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
         """Asynchronous Embed search docs."""
         return await self.embeddings.aembed_documents(texts)
@@ -280,3 +326,7 @@ class DefaultEmbeddings(Embeddings):
     async def aembed_query(self, text: str) -> List[float]:
         """Asynchronous Embed query text."""
         return await self.embeddings.aembed_query(text)
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed multiple query texts."""
+        return await self.embeddings.aembed_queries(texts)
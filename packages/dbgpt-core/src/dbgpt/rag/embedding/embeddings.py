@@ -6,7 +6,13 @@ from typing import Any, Dict, List, Optional, Type
 import aiohttp
 import requests
 
-from dbgpt._private.pydantic import EXTRA_FORBID, BaseModel, ConfigDict, Field
+from dbgpt._private.pydantic import (
+    EXTRA_FORBID,
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+)
 from dbgpt.core import EmbeddingModelMetadata, Embeddings
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
 from dbgpt.core.interface.parameter import EmbeddingDeployModelParameters
@@ -16,8 +22,11 @@ from dbgpt.model.adapter.embed_metadata import (
     EMBED_COMMON_HF_JINA_MODELS,
     EMBED_COMMON_HF_QWEN_MODELS,
 )
+from dbgpt.util.http_client_pool import get_http_client_pool
 from dbgpt.util.tracer import DBGPT_TRACER_SPAN_ID, root_tracer
 
+from .batcher import EmbeddingBatcher
+
 DEFAULT_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
 DEFAULT_INSTRUCT_MODEL = "hkunlp/instructor-large"
 DEFAULT_BGE_MODEL = "BAAI/bge-large-en"
@@ -274,6 +283,10 @@ class HuggingFaceEmbeddings(BaseModel, Embeddings):
         """
         return self.embed_documents([text])[0]
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Compute embeddings of multiple queries in one batch."""
+        return self.embed_documents(texts)
+
 
 @register_resource(
     _("HuggingFace Instructor Embeddings"),
@@ -414,6 +427,12 @@ class HuggingFaceInstructEmbeddings(BaseModel, Embeddings):
         embedding = self.client.encode([instruction_pair], **self.encode_kwargs)[0]
         return embedding.tolist()
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Compute embeddings of multiple queries in one batch."""
+        instruction_pairs = [[self.query_instruction, text] for text in texts]
+        embeddings = self.client.encode(instruction_pairs, **self.encode_kwargs)
+        return embeddings.tolist()
+
 
 # TODO: Support AWEL flow
 class HuggingFaceBgeEmbeddings(BaseModel, Embeddings):
@@ -531,6 +550,12 @@ class HuggingFaceBgeEmbeddings(BaseModel, Embeddings):
         )
         return embedding.tolist()
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Compute embeddings of multiple queries in one batch."""
+        texts = [self.query_instruction + t.replace("\n", " ") for t in texts]
+        embeddings = self.client.encode(texts, **self.encode_kwargs)
+        return embeddings.tolist()
+
 
 @register_resource(
     _("HuggingFace Inference API Embeddings"),
@@ -623,6 +648,10 @@ class HuggingFaceInferenceAPIEmbeddings(BaseModel, Embeddings):
         """
         return self.embed_documents([text])[0]
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Compute embeddings of multiple queries in one batch."""
+        return self.embed_documents(texts)
+
 
 def _handle_request_result(res: requests.Response) -> List[List[float]]:
     """Parse the result from a request.
@@ -681,6 +710,36 @@ class OpenAPIEmbeddingDeployModelParameters(EmbeddingDeployModelParameters):
             "help": _("The timeout for the request in seconds."),
         },
     )
+    max_batch_size: int = field(
+        default=128,
+        metadata={
+            "help": _("The max texts of a request to the embeddings API."),
+        },
+    )
+    max_batch_tokens: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The max estimated tokens of a request to the embeddings API, "
+                "None for no limit."
+            ),
+        },
+    )
+    max_concurrency: int = field(
+        default=4,
+        metadata={
+            "help": _("The max concurrent requests of one embedding call."),
+        },
+    )
+    batch_window: float = field(
+        default=0.005,
+        metadata={
+            "help": _(
+                "The seconds to wait for the concurrent queries to embed them in "
+                "one request, 0 to disable it."
+            ),
+        },
+    )
 
     @property
     def real_provider_model_name(self) -> str:
@@ -806,8 +865,25 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
     pass_trace_id: bool = Field(
         default=True, description="Whether to pass the trace ID to the API."
     )
+    max_batch_size: int = Field(
+        default=128, description="The max texts of a request to the API."
+    )
+    max_batch_tokens: Optional[int] = Field(
+        default=None,
+        description="The max estimated tokens of a request to the API, None for no "
+        "limit.",
+    )
+    max_concurrency: int = Field(
+        default=4, description="The max concurrent requests of one embedding call."
+    )
+    batch_window: float = Field(
+        default=0.005,
+        description="The seconds to wait for the concurrent queries to embed them "
+        "in one request, 0 to disable it.",
+    )
 
     session: Optional[requests.Session] = None
+    _batcher: EmbeddingBatcher = PrivateAttr()
 
     def __init__(self, **kwargs):
         """Initialize the OpenAPIEmbeddings."""
@@ -827,6 +903,14 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
             session.headers.update({"Authorization": f"Bearer {api_key}"})
         kwargs["session"] = session
         super().__init__(**kwargs)
+        self._batcher = EmbeddingBatcher(
+            self._embed_batch,
+            self._aembed_batch,
+            max_batch_size=self.max_batch_size,
+            max_batch_tokens=self.max_batch_tokens,
+            max_concurrency=self.max_concurrency,
+            batch_window=self.batch_window,
+        )
 
     @classmethod
     def param_class(cls) -> Type[OpenAPIEmbeddingDeployModelParameters]:
@@ -842,11 +926,18 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
             api_key=parameters.api_key,
             model_name=parameters.real_provider_model_name,
             timeout=parameters.timeout,
+            max_batch_size=parameters.max_batch_size,
+            max_batch_tokens=parameters.max_batch_tokens,
+            max_concurrency=parameters.max_concurrency,
+            batch_window=parameters.batch_window,
         )
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Get the embeddings for a list of texts.
 
+        The texts are split into requests by max_batch_size and max_batch_tokens,
+        the requests are sent concurrently.
+
         Args:
             texts (Documents): A list of texts to get embeddings for.
 
@@ -854,6 +945,9 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
             Embedded texts as List[List[float]], where each inner List[float]
                 corresponds to a single input text.
         """
+        return self._batcher.embed(texts)
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
         # Call OpenAI Embedding API
         headers = {}
         current_span_id = root_tracer.get_current_span_id()
@@ -877,7 +971,12 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
         Returns:
             Embeddings for the text.
         """
-        return self.embed_documents([text])[0]
+        # The concurrent queries are embedded in one request
+        return self._batcher.embed_coalesced([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Compute embeddings of multiple queries in one request."""
+        return self.embed_documents(texts)
 
     async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
         """Asynchronous Embed search docs.
@@ -889,30 +988,38 @@ class OpenAPIEmbeddings(BaseModel, Embeddings):
             List[List[float]]: Embedded texts as List[List[float]], where each inner
                 List[float] corresponds to a single input text.
         """
+        return await self._batcher.aembed(texts)
+
+    async def _aembed_batch(self, texts: List[str]) -> List[List[float]]:
         headers = {"Authorization": f"Bearer {self.api_key}"}
         current_span_id = root_tracer.get_current_span_id()
         if self.pass_trace_id and current_span_id:
             # Set the trace ID if available
             headers[DBGPT_TRACER_SPAN_ID] = current_span_id
-        async with aiohttp.ClientSession(
-            headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)
-        ) as session:
-            async with session.post(
-                self.api_url, json={"input": texts, "model": self.model_name}
-            ) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                if "data" not in data:
-                    raise RuntimeError(data["detail"])
-                embeddings = data["data"]
-                sorted_embeddings = sorted(embeddings, key=lambda e: e["index"])
-                return [result["embedding"] for result in sorted_embeddings]
+        session = get_http_client_pool().session()
+        async with session.post(
+            self.api_url,
+            json={"input": texts, "model": self.model_name},
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            if "data" not in data:
+                raise RuntimeError(data["detail"])
+            embeddings = data["data"]
+            sorted_embeddings = sorted(embeddings, key=lambda e: e["index"])
+            return [result["embedding"] for result in sorted_embeddings]
 
     async def aembed_query(self, text: str) -> List[float]:
         """Asynchronous Embed query text."""
-        embeddings = await self.aembed_documents([text])
+        embeddings = await self._batcher.aembed_coalesced([text])
         return embeddings[0]
 
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed multiple query texts in one request."""
+        return await self.aembed_documents(texts)
+
 
 register_embedding_adapter(
     HuggingFaceEmbeddings,
@@ -8,7 +8,13 @@ import aiohttp
 import numpy as np
 import requests
 
-from dbgpt._private.pydantic import EXTRA_FORBID, BaseModel, ConfigDict, Field
+from dbgpt._private.pydantic import (
+    EXTRA_FORBID,
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+)
 from dbgpt.configs.model_config import get_device
 from dbgpt.core import RerankEmbeddings
 from dbgpt.core.interface.parameter import RerankerDeployModelParameters
@@ -17,8 +23,11 @@ from dbgpt.model.adapter.embed_metadata import (
     RERANKER_COMMON_HF_MODELS,
     RERANKER_COMMON_HF_QWEN_MODELS,
 )
+from dbgpt.util.http_client_pool import get_http_client_pool
 from dbgpt.util.tracer import DBGPT_TRACER_SPAN_ID, root_tracer
 
+from .rerank_batcher import RerankBatchEngine
+
 
 @dataclass
 class CrossEncoderRerankEmbeddingsParameters(RerankerDeployModelParameters):
@@ -49,6 +58,15 @@ class CrossEncoderRerankEmbeddingsParameters(RerankerDeployModelParameters):
             )
         },
     )
+    micro_batch_size: int = field(
+        default=16,
+        metadata={
+            "help": _(
+                "The candidates of a micro-batch, the candidates are sorted by "
+                "length before batching. 0 to score all the candidates in one batch."
+            )
+        },
+    )
 
     model_kwargs: Dict[str, Any] = field(
         default_factory=dict,
@@ -97,6 +115,11 @@ class CrossEncoderRerankEmbeddings(BaseModel, RerankEmbeddings):
     """Model name to use."""
     model_kwargs: Dict[str, Any] = Field(default_factory=dict)
     """Keyword arguments to pass to the model."""
+    micro_batch_size: int = 16
+    """The candidates of a micro-batch, 0 to score all the candidates in one batch."""
+    token_cache_size: int = 4096
+    """The max tokenized candidates to cache."""
+    _engine: RerankBatchEngine = PrivateAttr()
 
     def __init__(self, **kwargs: Any):
         """Initialize the sentence_transformer."""
@@ -113,6 +136,9 @@ class CrossEncoderRerankEmbeddings(BaseModel, RerankEmbeddings):
             **(kwargs.get("model_kwargs") or {}),
         )
         super().__init__(**kwargs)
+        self._engine = RerankBatchEngine(
+            self._encode, self.micro_batch_size, self.token_cache_size
+        )
 
     @classmethod
     def param_class(cls) -> Type[CrossEncoderRerankEmbeddingsParameters]:
@@ -128,6 +154,7 @@ class CrossEncoderRerankEmbeddings(BaseModel, RerankEmbeddings):
             model_name=parameters.real_model_path,
             max_length=parameters.max_length,
             model_kwargs=parameters.real_model_kwargs,
+            micro_batch_size=parameters.micro_batch_size,
         )
 
     @classmethod
@@ -156,12 +183,30 @@ class CrossEncoderRerankEmbeddings(BaseModel, RerankEmbeddings):
         """
         from sentence_transformers import CrossEncoder
 
-        query_content_pairs = [[query, candidate] for candidate in candidates]
         _model = cast(CrossEncoder, self.client)
-        rank_scores = _model.predict(sentences=query_content_pairs)
-        if isinstance(rank_scores, np.ndarray):
-            rank_scores = rank_scores.tolist()
-        return rank_scores  # type: ignore
+
+        def _score_batch(indices: List[int]) -> List[float]:
+            # The batch is sorted by length, CrossEncoder pads it to its longest pair
+            query_content_pairs = [[query, candidates[i]] for i in indices]
+            rank_scores = _model.predict(
+                sentences=query_content_pairs,
+                batch_size=len(indices),
+                show_progress_bar=False,
+            )
+            if isinstance(rank_scores, np.ndarray):
+                rank_scores = rank_scores.tolist()
+            return rank_scores  # type: ignore
+
+        return self._engine.predict(candidates, _score_batch)
+
+    def _encode(self, text: str) -> List[int]:
+        max_length = getattr(self.client, "max_length", None)
+        return self.client.tokenizer(
+            text,
+            add_special_tokens=False,
+            truncation=bool(max_length),
+            max_length=max_length,
+        )["input_ids"]
 
 
 @dataclass
@@ -188,6 +233,15 @@ class QwenRerankEmbeddingsParameters(RerankerDeployModelParameters):
             ),
         },
     )
+    micro_batch_size: int = field(
+        default=16,
+        metadata={
+            "help": _(
+                "The candidates of a micro-batch, the candidates are sorted by "
+                "length before batching. 0 to score all the candidates in one batch."
+            )
+        },
+    )
 
     @property
     def real_provider_model_name(self) -> str:
@@ -244,6 +298,11 @@ class QwenRerankEmbeddings(BaseModel, RerankEmbeddings):
         "query"
     )  #: :meta private:
     device: Optional[str] = None  #: :meta private:
+    micro_batch_size: int = 16
+    """The candidates of a micro-batch, 0 to score all the candidates in one batch."""
+    token_cache_size: int = 4096
+    """The max tokenized candidates to cache."""
+    _engine: RerankBatchEngine = PrivateAttr()
 
     def __init__(self, **kwargs: Any):
         try:
@@ -287,6 +346,9 @@ class QwenRerankEmbeddings(BaseModel, RerankEmbeddings):
         kwargs["prefix_tokens"] = prefix_tokens
         kwargs["suffix_tokens"] = suffix_tokens
         super().__init__(**kwargs)
+        self._engine = RerankBatchEngine(
+            self._encode, self.micro_batch_size, self.token_cache_size
+        )
 
     @classmethod
     def param_class(cls) -> Type[QwenRerankEmbeddingsParameters]:
@@ -301,6 +363,7 @@ class QwenRerankEmbeddings(BaseModel, RerankEmbeddings):
         return cls(
             model_name=parameters.real_model_path,
             device=parameters.real_device,
+            micro_batch_size=parameters.micro_batch_size,
         )
 
     def format_instruction(self, instruction, query, doc):
@@ -348,15 +411,47 @@ class QwenRerankEmbeddings(BaseModel, RerankEmbeddings):
             return scores
 
     def predict(self, query: str, candidates: List[str]) -> List[float]:
-        queries = [query] * len(candidates)
-        pairs = [
-            self.format_instruction(self.task, query, doc)
-            for query, doc in zip(queries, candidates)
-        ]
-        # Tokenize the input texts
-        inputs = self.process_inputs(pairs)
-        scores = self.compute_logits(inputs)
-        return scores
+        """Predict the rank scores of the candidates.
+
+        The instruction and query are tokenized once, the document tokens are
+        cached. The candidates are scored in length sorted micro-batches.
+
+        Args:
+            query: The query text.
+            candidates: The list of candidate texts.
+
+        Returns:
+            List[float]: The rank scores of the candidates.
+        """
+        if not candidates:
+            return []
+        # Split the formatted instruction at "<Document>:" and " {doc}", a boundary
+        # of the pre-tokenizer, the token ids are the same as tokenizing it whole.
+        query_part = self.format_instruction(self.task, query, "")[:-1]
+        query_tokens = self._encode(query_part)
+        docs = [" " + doc for doc in candidates]
+        max_pair_length = (
+            self.max_length - len(self.prefix_tokens) - len(self.suffix_tokens)
+        )
+
+        def _score_batch(indices: List[int]) -> List[float]:
+            input_ids = [
+                self.prefix_tokens
+                + (query_tokens + self._engine.encode(docs[i]))[:max_pair_length]
+                + self.suffix_tokens
+                for i in indices
+            ]
+            inputs = self.tokenizer.pad(
+                {"input_ids": input_ids}, padding=True, return_tensors="pt"
+            )
+            for key in inputs:
+                inputs[key] = inputs[key].to(self.model.device)
+            return self.compute_logits(inputs)
+
+        return self._engine.predict(docs, _score_batch)
+
+    def _encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False)
 
 
 @dataclass
@@ -509,14 +604,17 @@ class OpenAPIRerankEmbeddings(BaseModel, RerankEmbeddings):
         if self.pass_trace_id and current_span_id:
             # Set the trace ID if available
             headers[DBGPT_TRACER_SPAN_ID] = current_span_id
-        async with aiohttp.ClientSession(
-            headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)
-        ) as session:
-            data = {"model": self.model_name, "query": query, "documents": candidates}
-            async with session.post(self.api_url, json=data) as resp:
-                resp.raise_for_status()
-                response_data = await resp.json()
-                return self._parse_results(response_data)
+        data = {"model": self.model_name, "query": query, "documents": candidates}
+        session = get_http_client_pool().session()
+        async with session.post(
+            self.api_url,
+            json=data,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as resp:
+            resp.raise_for_status()
+            response_data = await resp.json()
+            return self._parse_results(response_data)
 
 
 @dataclass
@@ -681,14 +779,17 @@ class TeiRerankEmbeddings(OpenAPIRerankEmbeddings):
         if self.pass_trace_id and current_span_id:
             # Set the trace ID if available
             headers[DBGPT_TRACER_SPAN_ID] = current_span_id
-        async with aiohttp.ClientSession(
-            headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)
-        ) as session:
-            data = {"query": query, "texts": candidates}
-            async with session.post(self.api_url, json=data) as resp:
-                resp.raise_for_status()
-                response_data = await resp.json()
-                return self._parse_results(response_data)
+        data = {"query": query, "texts": candidates}
+        session = get_http_client_pool().session()
+        async with session.post(
+            self.api_url,
+            json=data,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as resp:
+            resp.raise_for_status()
+            response_data = await resp.json()
+            return self._parse_results(response_data)
 
 
 @dataclass
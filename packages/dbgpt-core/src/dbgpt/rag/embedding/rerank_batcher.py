@@ -0,0 +1,101 @@
+"""Length sorted micro-batching of local rerank models.
+
+Padding every candidate of a rerank call to the longest one wastes most of the
+compute when the candidate lengths differ, and a single batch of hundreds of
+candidates can run out of memory. The engine sorts the candidates by their token
+length, scores them in fixed size micro-batches of similar lengths and restores the
+original order. The token ids of the candidates are cached, the same chunks are
+reranked again and again by different queries.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional
+
+EncodeFunc = Callable[[str], List[int]]
+ScoreBatchFunc = Callable[[List[int]], List[float]]
+
+
+class RerankBatchEngine:
+    """Score the candidates of a query in length sorted micro-batches.
+
+    Example:
+        .. code-block:: python
+
+            engine = RerankBatchEngine(tokenizer.encode, micro_batch_size=16)
+            scores = engine.predict(
+                candidates,
+                lambda indices: model_scores([candidates[i] for i in indices]),
+            )
+    """
+
+    def __init__(
+        self,
+        encode: EncodeFunc,
+        micro_batch_size: Optional[int] = 16,
+        cache_size: int = 4096,
+    ):
+        """Create a new RerankBatchEngine.
+
+        Args:
+            encode (EncodeFunc): Tokenize a candidate to its token ids.
+            micro_batch_size (Optional[int]): The candidates of a micro-batch, None
+                or 0 to score all the candidates in one batch.
+            cache_size (int): The max tokenized candidates to cache, 0 to disable
+                the cache.
+        """
+        self._encode = encode
+        self._micro_batch_size = micro_batch_size
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, List[int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> List[int]:
+        """Return the token ids of a text, cached."""
+        if self._cache_size <= 0:
+            return self._encode(text)
+        with self._lock:
+            token_ids = self._cache.get(text)
+            if token_ids is not None:
+                self._cache.move_to_end(text)
+                return token_ids
+        token_ids = self._encode(text)
+        with self._lock:
+            self._cache[text] = token_ids
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return token_ids
+
+    def micro_batches(self, texts: List[str]) -> Iterator[List[int]]:
+        """Yield the indices of the micro-batches, from the longest texts."""
+        if not texts:
+            return
+        order = sorted(
+            range(len(texts)), key=lambda i: len(self.encode(texts[i])), reverse=True
+        )
+        batch_size = self._micro_batch_size or len(order)
+        for start in range(0, len(order), batch_size):
+            yield order[start : start + batch_size]
+
+    def predict(self, texts: List[str], score_batch: ScoreBatchFunc) -> List[float]:
+        """Score the texts in micro-batches, in the original order.
+
+        The longest micro-batch runs first, so an out of memory error happens as
+        early as possible.
+
+        Args:
+            texts (List[str]): The texts to sort by token length.
+            score_batch (ScoreBatchFunc): Score the texts of the given indices.
+
+        Returns:
+            List[float]: The scores of the texts.
+        """
+        scores = [0.0] * len(texts)
+        for indices in self.micro_batches(texts):
+            for i, score in zip(indices, score_batch(indices)):
+                scores[i] = float(score)
+        return scores
+
+    def __len__(self) -> int:
+        """Return the number of cached tokenized texts."""
+        return len(self._cache)
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from dbgpt.rag.embedding.batcher import EmbeddingBatcher, estimate_tokens
+
+
+class MockUpstream:
+    def __init__(self, delay: float = 0.0):
+        self.batches: List[List[str]] = []
+        self.running = 0
+        self.max_running = 0
+        self._delay = delay
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.batches.append(texts)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        threading.Event().wait(self._delay)
+        with self._lock:
+            self.running -= 1
+        return [[float(len(t))] for t in texts]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(texts)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self._delay)
+        self.running -= 1
+        return [[float(len(t))] for t in texts]
+
+
+def _texts(n: int) -> List[str]:
+    return ["x" * (i + 1) for i in range(n)]
+
+
+def test_split_by_size_and_tokens():
+    batcher = EmbeddingBatcher(lambda t: [], max_batch_size=3)
+    assert batcher.split(_texts(7)) == [(0, 3), (3, 6), (6, 7)]
+    assert batcher.split([]) == []
+
+    batcher = EmbeddingBatcher(
+        lambda t: [], max_batch_size=10, max_batch_tokens=5, token_counter=len
+    )
+    # A text exceeding the limit is sent alone
+    assert batcher.split(["aa", "bbb", "c", "dddddddd", "e"]) == [
+        (0, 2),
+        (2, 3),
+        (3, 4),
+        (4, 5),
+    ]
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("你好") == 3
+
+
+def test_embed_concurrently_in_order():
+    upstream = MockUpstream(delay=0.05)
+    batcher = EmbeddingBatcher(upstream.embed, max_batch_size=2, max_concurrency=3)
+    texts = _texts(11)
+    assert batcher.embed(texts) == [[float(len(t))] for t in texts]
+    assert len(upstream.batches) == 6
+    assert 1 < upstream.max_running <= 3
+    batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_aembed_concurrently_in_order():
+    upstream = MockUpstream(delay=0.01)
+    batcher = EmbeddingBatcher(
+        upstream.embed, upstream.aembed, max_batch_size=2, max_concurrency=2
+    )
+    texts = _texts(9)
+    assert await batcher.aembed(texts) == [[float(len(t))] for t in texts]
+    assert len(upstream.batches) == 5
+    assert upstream.max_running == 2
+
+
+def test_embed_coalesced_threads():
+    upstream = MockUpstream()
+    batcher = EmbeddingBatcher(upstream.embed, batch_window=0.2)
+    texts = ["a", "bb", "ccc", "bb"]
+    results = [None] * len(texts)
+
+    def _run(i):
+        results[i] = batcher.embed_coalesced([texts[i]])[0]
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [[1.0], [2.0], [3.0], [2.0]]
+    # The concurrent queries are sent in one batch, the duplicated text once
+    assert len(upstream.batches) == 1
+    assert sorted(upstream.batches[0]) == ["a", "bb", "ccc"]
+
+
+@pytest.mark.asyncio
+async def test_aembed_coalesced():
+    upstream = MockUpstream()
+    batcher = EmbeddingBatcher(
+        upstream.embed, upstream.aembed, max_batch_size=3, batch_window=10
+    )
+    # The window is long, a full batch is flushed immediately
+    results = await asyncio.wait_for(
+        asyncio.gather(*[batcher.aembed_coalesced([t]) for t in ["a", "bb", "ccc"]]),
+        timeout=5,
+    )
+    assert results == [[[1.0]], [[2.0]], [[3.0]]]
+    assert upstream.batches == [["a", "bb", "ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_aembed_coalesced_error():
+    async def _fail(texts):
+        raise RuntimeError("upstream error")
+
+    batcher = EmbeddingBatcher(lambda t: [], _fail, batch_window=0.01)
+    with pytest.raises(RuntimeError, match="upstream error"):
+        await batcher.aembed_coalesced(["a"])
@@ -0,0 +1,116 @@
+from typing import List
+
+import pytest
+
+from dbgpt.core import Embeddings
+
+from ..cached import CachedEmbeddings, QueryEmbeddingCache
+from ..embedding_factory import WrappedEmbeddingFactory
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self, model_name: str = "mock"):
+        self.model_name = model_name
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_embed_query_cached():
+    embeddings = MockEmbeddings()
+    cached = CachedEmbeddings(embeddings)
+
+    assert cached.embed_query("hello") == [5.0, 1.0]
+    assert cached.embed_query("hello") == [5.0, 1.0]
+    assert embeddings.embedded == ["hello"]
+
+
+def test_embed_queries_only_missing():
+    embeddings = MockEmbeddings()
+    cached = CachedEmbeddings(embeddings)
+    cached.embed_query("a")
+
+    results = cached.embed_queries(["a", "bb", "bb", "ccc"])
+    assert results == [[1.0, 1.0], [2.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert embeddings.embedded == ["a", "bb", "ccc"]
+
+
+def test_embed_documents_not_cached():
+    embeddings = MockEmbeddings()
+    cached = CachedEmbeddings(embeddings)
+    cached.embed_documents(["a"])
+    cached.embed_documents(["a"])
+    assert embeddings.embedded == ["a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_aembed_query_cached():
+    embeddings = MockEmbeddings()
+    cached = CachedEmbeddings(embeddings)
+
+    assert await cached.aembed_query("hello") == [5.0, 1.0]
+    assert await cached.aembed_queries(["hello", "hi"]) == [[5.0, 1.0], [2.0, 1.0]]
+    assert embeddings.embedded == ["hello", "hi"]
+
+
+def test_shared_cache_scoped_by_model():
+    cache = QueryEmbeddingCache(max_entries=10)
+    embeddings1 = MockEmbeddings("model1")
+    embeddings2 = MockEmbeddings("model2")
+
+    CachedEmbeddings(embeddings1, cache).embed_query("hello")
+    CachedEmbeddings(embeddings1, cache).embed_query("hello")
+    CachedEmbeddings(embeddings2, cache).embed_query("hello")
+    assert embeddings1.embedded == ["hello"]
+    assert embeddings2.embedded == ["hello"]
+
+    # The same model with other encode options does not share the vectors
+    embeddings3 = MockEmbeddings("model1")
+    embeddings3.encode_kwargs = {"normalize_embeddings": True}
+    CachedEmbeddings(embeddings3, cache).embed_query("hello")
+    assert embeddings3.embedded == ["hello"]
+
+
+def test_lru_eviction():
+    cache = QueryEmbeddingCache(max_entries=2)
+    embeddings = MockEmbeddings()
+    cached = CachedEmbeddings(embeddings, cache)
+
+    cached.embed_query("a")
+    cached.embed_query("b")
+    cached.embed_query("a")
+    cached.embed_query("c")
+    assert len(cache) == 2
+    cached.embed_query("a")
+    cached.embed_query("b")
+    assert embeddings.embedded == ["a", "b", "c", "b"]
+
+
+def test_persistent_cache(tmp_path):
+    pytest.importorskip("rocksdict")
+    persist_dir = str(tmp_path / "query_cache")
+    cache = QueryEmbeddingCache(max_entries=10, persist_dir=persist_dir)
+    CachedEmbeddings(MockEmbeddings(), cache).embed_query("hello")
+    cache.close()
+
+    embeddings = MockEmbeddings()
+    cache = QueryEmbeddingCache(max_entries=10, persist_dir=persist_dir)
+    assert CachedEmbeddings(embeddings, cache).embed_query("hello") == [5.0, 1.0]
+    assert embeddings.embedded == []
+    cache.close()
+
+
+def test_factory_query_cache():
+    embeddings = MockEmbeddings()
+    factory = WrappedEmbeddingFactory(embeddings=embeddings, query_cache_size=10)
+    factory.create().embed_query("hello")
+    factory.create().embed_query("hello")
+    assert embeddings.embedded == ["hello"]
+
+    factory = WrappedEmbeddingFactory(embeddings=embeddings)
+    assert factory.create() is embeddings
@@ -0,0 +1,59 @@
+from typing import List
+
+from dbgpt.rag.embedding.rerank_batcher import RerankBatchEngine
+
+
+class MockTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text: str) -> List[int]:
+        self.calls += 1
+        return [len(word) for word in text.split()]
+
+
+def _candidates() -> List[str]:
+    return ["a b c", "a", "a b c d e", "a b", "a b c d"]
+
+
+def test_micro_batches_sorted_by_length():
+    engine = RerankBatchEngine(MockTokenizer().encode, micro_batch_size=2)
+    batches = list(engine.micro_batches(_candidates()))
+    assert batches == [[2, 4], [0, 3], [1]]
+    assert list(engine.micro_batches([])) == []
+
+    engine = RerankBatchEngine(MockTokenizer().encode, micro_batch_size=0)
+    assert list(engine.micro_batches(_candidates())) == [[2, 4, 0, 3, 1]]
+
+
+def test_predict_restores_order():
+    candidates = _candidates()
+    engine = RerankBatchEngine(MockTokenizer().encode, micro_batch_size=2)
+    batch_sizes = []
+
+    def score_batch(indices: List[int]) -> List[float]:
+        batch_sizes.append(len(indices))
+        return [len(candidates[i]) for i in indices]
+
+    scores = engine.predict(candidates, score_batch)
+    assert scores == [float(len(c)) for c in candidates]
+    assert batch_sizes == [2, 2, 1]
+
+
+def test_tokenization_cache():
+    tokenizer = MockTokenizer()
+    engine = RerankBatchEngine(tokenizer.encode, micro_batch_size=2, cache_size=4)
+    candidates = _candidates()
+    engine.predict(candidates, lambda indices: [0.0] * len(indices))
+    assert tokenizer.calls == 5
+    assert len(engine) == 4
+
+    engine.predict(candidates[1:], lambda indices: [0.0] * len(indices))
+    assert tokenizer.calls == 5
+    assert engine.encode("a b") == [1, 1]
+
+    engine = RerankBatchEngine(tokenizer.encode, cache_size=0)
+    engine.encode("a")
+    engine.encode("a")
+    assert tokenizer.calls == 7
+    assert len(engine) == 0
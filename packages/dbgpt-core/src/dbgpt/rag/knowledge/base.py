@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
 from dbgpt.core import Document
 from dbgpt.rag.text_splitter.text_splitter import (
@@ -164,6 +164,22 @@ class Knowledge(ABC):
         documents = self._load()
         return self._postprocess(documents)
 
+    def iter_load(self) -> Iterator[Document]:
+        """Load knowledge from data loader lazily, document by document.
+
+        The knowledge of large files can override `_iter_load` to yield documents
+        while parsing, so the whole knowledge is never held in memory at once.
+        """
+        for document in self._iter_load():
+            yield from self._postprocess([document])
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Set the chunk size of the splitter of the documents.
+
+        The knowledge can load documents close to the chunk size, e.g. pack the
+        small rows of a table together. Default does nothing.
+        """
+
     def extract(
         self,
         documents: List[Document],
@@ -195,6 +211,13 @@ class Knowledge(ABC):
     def _load(self) -> List[Document]:
         """Preprocess knowledge from data loader."""
 
+    def _iter_load(self) -> Iterator[Document]:
+        """Preprocess knowledge from data loader lazily.
+
+        Default loads all documents at once.
+        """
+        yield from self._load()
+
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
         """Return supported chunk strategy."""
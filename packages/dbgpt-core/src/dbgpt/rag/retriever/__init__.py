@@ -2,7 +2,7 @@
 
 from .base import BaseRetriever, RetrieverStrategy  # noqa: F401
 from .embedding import EmbeddingRetriever  # noqa: F401
-from .rerank import DefaultRanker, Ranker, RRFRanker  # noqa: F401
+from .rerank import DefaultRanker, Ranker, RankFusion, RRFRanker  # noqa: F401
 from .rewrite import QueryRewrite  # noqa: F401
 
 __all__ = [
@@ -12,5 +12,6 @@ __all__ = [
     "Ranker",
     "DefaultRanker",
     "RRFRanker",
+    "RankFusion",
     "QueryRewrite",
 ]
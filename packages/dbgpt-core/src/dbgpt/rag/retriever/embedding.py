@@ -157,8 +157,8 @@ class EmbeddingRetriever(BaseRetriever):
             self._similarity_search(query, filters, root_tracer.get_current_span_id())
             for query in queries
         ]
-        new_candidates = await run_async_tasks(tasks=candidates, concurrency_limit=1)
-        return new_candidates
+        new_candidates = await run_async_tasks(tasks=candidates)
+        return _dedupe_chunks(new_candidates)
 
     async def _aretrieve_with_score(
         self,
@@ -202,18 +202,10 @@ class EmbeddingRetriever(BaseRetriever):
             "dbgpt.rag.retriever.embeddings.similarity_search_with_score",
             metadata={"query": query, "score_threshold": score_threshold},
         ):
-            candidates_with_score = [
-                self._similarity_search_with_score(
-                    query, score_threshold, filters, root_tracer.get_current_span_id()
-                )
-                for query in queries
-            ]
-            res_candidates_with_score = await run_async_tasks(
-                tasks=candidates_with_score, concurrency_limit=1
-            )
-            new_candidates_with_score = cast(
-                List[Chunk], reduce(lambda x, y: x + y, res_candidates_with_score)
+            res_candidates_with_score = await self._similarity_search_with_score(
+                queries, score_threshold, filters, root_tracer.get_current_span_id()
             )
+            new_candidates_with_score = _dedupe_chunks(res_candidates_with_score)
 
         with root_tracer.start_span(
             "dbgpt.rag.retriever.embeddings.rerank",
@@ -252,25 +244,35 @@ class EmbeddingRetriever(BaseRetriever):
 
     async def _similarity_search_with_score(
         self,
-        query,
+        queries: List[str],
         score_threshold,
         filters: Optional[MetadataFilters] = None,
         parent_span_id: Optional[str] = None,
-    ) -> List[Chunk]:
-        """Similar search with score."""
+    ) -> List[List[Chunk]]:
+        """Similar search with score of all queries in one batch."""
         with root_tracer.start_span(
             "dbgpt.rag.retriever.embeddings._do_similarity_search_with_score",
             parent_span_id,
             metadata={
-                "query": query,
+                "queries": queries,
                 "score_threshold": score_threshold,
             },
         ):
-            return await self._index_store.asimilar_search_with_scores(
-                query, self._top_k, score_threshold, filters
+            return await self._index_store.asimilar_search_with_scores_batch(
+                queries, self._top_k, score_threshold, filters
             )
 
     @classmethod
     def name(cls):
         """Return retriever name."""
         return "embedding_retriever"
+
+
+def _dedupe_chunks(candidates: List[List[Chunk]]) -> List[Chunk]:
+    """Merge the candidates of multiple queries, keep the best score of each chunk."""
+    chunks: Dict[str, Chunk] = {}
+    for chunk in (chunk for query_chunks in candidates for chunk in query_chunks):
+        exist = chunks.get(chunk.chunk_id)
+        if exist is None or chunk.score > exist.score:
+            chunks[chunk.chunk_id] = chunk
+    return list(chunks.values())
@@ -1,13 +1,194 @@
 """Rerank module for RAG retriever."""
 
+import asyncio
+import heapq
 from abc import ABC, abstractmethod
-from typing import Callable, List, Optional
+from typing import (
+    AsyncIterable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from dbgpt.core import Chunk, RerankEmbeddings
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
 from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
 
 RANK_FUNC = Callable[[List[Chunk]], List[Chunk]]
+# The candidates of each retriever, keyed by the retriever name, or a list of them
+# named by the retriever of their chunks
+CANDIDATE_LISTS = Union[
+    Mapping[Optional[str], Sequence[Chunk]], Sequence[Sequence[Chunk]]
+]
+
+
+class RankFusion:
+    """Fuse the ranked candidates of many retrievers into one ranking.
+
+    Candidates are identified by chunk_id, the fused scores are computed with numpy
+    in one pass over all candidates and the top k are selected with a heap.
+
+    Two fusion methods are supported:
+    - "rrf": Reciprocal Rank Fusion, score = sum(weight / (rrf_k + rank)), the
+      rank starts from 1.
+    - "weighted": score = sum(weight * normalized score), the scores of each
+      retriever are min-max normalized to [0, 1].
+
+    The weights are keyed by the retriever name, a retriever without weight is
+    weighted 1.0, and a retriever without candidates is skipped.
+    """
+
+    def __init__(
+        self,
+        method: str = "rrf",
+        weights: Optional[Mapping[str, float]] = None,
+        rrf_k: int = 60,
+    ):
+        """Create a RankFusion.
+
+        Args:
+            method(str): The fusion method, "rrf" or "weighted".
+            weights(Optional[Mapping[str, float]]): The weight of each retriever
+                name, default is 1.0.
+            rrf_k(int): The rank constant of RRF.
+        """
+        if method not in ("rrf", "weighted"):
+            raise ValueError(f"Unsupported fusion method: {method}")
+        self._method = method
+        self._weights: Dict[str, float] = dict(weights or {})
+        self._rrf_k = rrf_k
+
+    def weight_of(self, retriever: Optional[str]) -> float:
+        """Return the weight of the retriever."""
+        if retriever is None:
+            return 1.0
+        return self._weights.get(retriever, 1.0)
+
+    def fuse(
+        self, candidate_lists: CANDIDATE_LISTS, topk: Optional[int] = None
+    ) -> List[Chunk]:
+        """Fuse the candidates of many retrievers.
+
+        Args:
+            candidate_lists(CANDIDATE_LISTS): The candidates of each retriever,
+                sorted by relevance in descending order. A mapping is keyed by the
+                retriever name, the name of a list is the retriever of its chunks.
+            topk(Optional[int]): The max number of chunks, None for no limit.
+
+        Return:
+            List[Chunk]: The fused chunks, whose score is the fused score.
+        """
+        import numpy as np
+
+        positions: Dict[str, int] = {}
+        chunks: List[Chunk] = []
+        doc_indexes: List[int] = []
+        contributions = []
+        for retriever, candidates in _named_lists(candidate_lists):
+            if not candidates:
+                continue
+            weight = self.weight_of(retriever)
+            for chunk in candidates:
+                pos = positions.get(chunk.chunk_id)
+                if pos is None:
+                    pos = len(chunks)
+                    positions[chunk.chunk_id] = pos
+                    chunks.append(chunk)
+                doc_indexes.append(pos)
+            if self._method == "rrf":
+                ranks = np.arange(1, len(candidates) + 1, dtype=np.float64)
+                contributions.append(weight / (self._rrf_k + ranks))
+            else:
+                scores = np.fromiter(
+                    (c.score for c in candidates),
+                    dtype=np.float64,
+                    count=len(candidates),
+                )
+                low, high = scores.min(), scores.max()
+                if high > low:
+                    scores = (scores - low) / (high - low)
+                else:
+                    scores = np.ones_like(scores)
+                contributions.append(weight * scores)
+        if not chunks:
+            return []
+        fused = np.bincount(
+            np.asarray(doc_indexes),
+            weights=np.concatenate(contributions),
+            minlength=len(chunks),
+        ).tolist()
+        limit = len(chunks) if topk is None else topk
+        selected = heapq.nlargest(limit, range(len(chunks)), key=fused.__getitem__)
+        return [_with_score(chunks[i], fused[i]) for i in selected]
+
+    async def afuse(
+        self,
+        candidate_streams: Union[
+            Mapping[Optional[str], AsyncIterable[Chunk]],
+            Sequence[AsyncIterable[Chunk]],
+        ],
+        topk: Optional[int] = None,
+    ) -> List[Chunk]:
+        """Fuse the candidates streamed by many retrievers.
+
+        The streams are consumed concurrently, each stream yields its candidates
+        sorted by relevance in descending order.
+
+        Args:
+            candidate_streams: The candidate streams of each retriever, keyed by the
+                retriever name like the candidate lists of :meth:`fuse`.
+            topk(Optional[int]): The max number of chunks, None for no limit.
+
+        Return:
+            List[Chunk]: The fused chunks, whose score is the fused score.
+        """
+
+        async def _collect(stream: AsyncIterable[Chunk]) -> List[Chunk]:
+            return [chunk async for chunk in stream]
+
+        if isinstance(candidate_streams, Mapping):
+            names = list(candidate_streams.keys())
+            streams = list(candidate_streams.values())
+        else:
+            names, streams = None, list(candidate_streams)
+        candidate_lists = await asyncio.gather(*[_collect(s) for s in streams])
+        if names is not None:
+            return self.fuse(dict(zip(names, candidate_lists)), topk)
+        return self.fuse(candidate_lists, topk)
+
+
+def _named_lists(
+    candidate_lists: CANDIDATE_LISTS,
+) -> List[Tuple[Optional[str], Sequence[Chunk]]]:
+    if isinstance(candidate_lists, Mapping):
+        return list(candidate_lists.items())
+    return [
+        (candidates[0].retriever if candidates else None, candidates)
+        for candidates in candidate_lists
+    ]
+
+
+def _with_score(chunk: Chunk, score: float) -> Chunk:
+    """Return a shallow copy of the chunk with a new score."""
+    if hasattr(chunk, "model_copy"):
+        return chunk.model_copy(update={"score": score})
+    return chunk.copy(update={"score": score})
+
+
+def _group_by_retriever(candidates: List[Chunk]) -> Dict[Optional[str], List[Chunk]]:
+    """Group the candidates by retriever name, each group is sorted by score."""
+    groups: Dict[Optional[str], List[Chunk]] = {}
+    for chunk in candidates:
+        groups.setdefault(chunk.retriever, []).append(chunk)
+    return {
+        name: sorted(group, key=lambda x: x.score, reverse=True)
+        for name, group in groups.items()
+    }
 
 
 class Ranker(ABC):
@@ -129,14 +310,17 @@ class DefaultRanker(Ranker):
         Return:
             List[Chunk]: List of top k documents
         """
-        candidates_with_scores = self._filter(candidates_with_scores)
         if self.rank_fn is not None:
-            candidates_with_scores = self.rank_fn(candidates_with_scores)
-        else:
-            candidates_with_scores = sorted(
-                candidates_with_scores, key=lambda x: x.score, reverse=True
-            )
-        return candidates_with_scores[: self.topk]
+            candidates_with_scores = self._filter(candidates_with_scores)
+            return self.rank_fn(candidates_with_scores)[: self.topk]
+        # Keep the highest scored chunk of each content, ties keep the earliest one
+        best: Dict[str, Tuple[float, int, Chunk]] = {}
+        for i, candidate in enumerate(candidates_with_scores):
+            current = best.get(candidate.content)
+            if current is None or candidate.score > current[0]:
+                best[candidate.content] = (candidate.score, -i, candidate)
+        top = heapq.nlargest(self.topk, best.values(), key=lambda x: (x[0], x[1]))
+        return [item[2] for item in top]
 
 
 class RRFRanker(Ranker):
@@ -146,9 +330,20 @@ class RRFRanker(Ranker):
         self,
         topk: int = 4,
         rank_fn: Optional[RANK_FUNC] = None,
+        rrf_k: int = 60,
+        weights: Optional[Mapping[str, float]] = None,
     ):
-        """RRF rank algorithm implementation."""
+        """RRF rank algorithm implementation.
+
+        Args:
+            topk(int): The number of top k documents.
+            rank_fn(Optional[RANK_FUNC]): The rank function.
+            rrf_k(int): The rank constant of RRF.
+            weights(Optional[Mapping[str, float]]): The weight of each retriever
+                name, default is 1.0.
+        """
         super().__init__(topk, rank_fn)
+        self._fusion = RankFusion("rrf", weights=weights, rrf_k=rrf_k)
 
     def rank(
         self, candidates_with_scores: List[Chunk], query: Optional[str] = None
@@ -168,9 +363,49 @@ class RRFRanker(Ranker):
                 score += 1.0 / ( k + rank( result(q), d ) )
         return score
         reference:https://www.elastic.co/guide/en/elasticsearch/reference/current/rrf.html
+
+        The candidates are grouped into result sets by their retriever name.
         """
-        # it will be implemented soon when multi recall is implemented
-        return candidates_with_scores
+        if not candidates_with_scores:
+            return candidates_with_scores
+        return self.rank_lists(_group_by_retriever(candidates_with_scores))
+
+    def rank_lists(self, candidate_lists: CANDIDATE_LISTS) -> List[Chunk]:
+        """Fuse the result sets of many retrievers with RRF.
+
+        Args:
+            candidate_lists(CANDIDATE_LISTS): The result set of each retriever,
+                sorted by relevance in descending order, see
+                :meth:`RankFusion.fuse`.
+
+        Return:
+            List[Chunk]: The top k chunks.
+        """
+        candidates = self._fusion.fuse(candidate_lists, self.topk)
+        if self.rank_fn is not None:
+            candidates = self.rank_fn(candidates)
+        return candidates
+
+    async def arank_streams(
+        self,
+        candidate_streams: Union[
+            Mapping[Optional[str], AsyncIterable[Chunk]],
+            Sequence[AsyncIterable[Chunk]],
+        ],
+    ) -> List[Chunk]:
+        """Fuse the streamed result sets of many retrievers with RRF.
+
+        Args:
+            candidate_streams: The result set streams of each retriever, consumed
+                concurrently, see :meth:`RankFusion.afuse`.
+
+        Return:
+            List[Chunk]: The top k chunks.
+        """
+        candidates = await self._fusion.afuse(candidate_streams, self.topk)
+        if self.rank_fn is not None:
+            candidates = self.rank_fn(candidates)
+        return candidates
 
 
 @register_resource(
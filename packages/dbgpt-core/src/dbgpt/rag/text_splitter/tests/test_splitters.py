@@ -1,7 +1,8 @@
-from dbgpt.core import Chunk
+from dbgpt.core import Chunk, Document
 from dbgpt.rag.text_splitter.text_splitter import (
     CharacterTextSplitter,
     MarkdownHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
 )
 
 
@@ -63,3 +64,41 @@ def test_character_text_splitter_empty_doc() -> None:
     output = splitter.split_text(text)
     expected_output = ["db", "gpt"]
     assert output == expected_output
+
+
+def test_recursive_character_text_splitter() -> None:
+    """Test splitting the long pieces by the next separators."""
+    text = "foo bar###" + "x" * 12 + "\nbaz qux"
+    splitter = RecursiveCharacterTextSplitter(chunk_size=10, chunk_overlap=0)
+    output = splitter.split_text(text)
+    assert output == ["foo bar", "x" * 10, "xx", "baz qux"]
+
+
+def test_merge_splits_overlap_window() -> None:
+    """Test the overlap window of merging many small splits."""
+    splitter = CharacterTextSplitter(separator="", chunk_size=4, chunk_overlap=2)
+    output = splitter._merge_splits(list("abcdefg"), separator="")
+    assert output == ["abcd", "cdef", "efg"]
+
+
+def test_split_documents_in_processes() -> None:
+    """Test splitting the documents in a process pool keeps the order."""
+    documents = [
+        Document(content=f"doc{i} " + "word " * (i * 5), metadata={"i": i})
+        for i in range(8)
+    ]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=5)
+    expected = splitter.split_documents(documents)
+    output = splitter.split_documents(documents, max_workers=2)
+    assert [(c.content, c.metadata) for c in output] == [
+        (c.content, c.metadata) for c in expected
+    ]
+
+    # A splitter with a lambda can't be pickled, split in the current process
+    splitter = CharacterTextSplitter(
+        separator=" ", chunk_size=20, chunk_overlap=5, length_function=lambda t: len(t)
+    )
+    output = splitter.split_documents(documents, max_workers=2)
+    assert [c.content for c in output] == [
+        c.content for c in splitter.split_documents(documents)
+    ]
@@ -2,8 +2,25 @@
 
 import copy
 import logging
+import multiprocessing
+import pickle
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Iterable, List, Optional, TypedDict, Union, cast
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
 
 from dbgpt.core import Chunk, Document
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
@@ -11,6 +28,16 @@ from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
 logger = logging.getLogger(__name__)
 
 
+def _create_documents(
+    splitter: "TextSplitter",
+    texts: List[str],
+    metadatas: List[dict],
+    kwargs: Dict[str, Any],
+) -> List[Chunk]:
+    """Split the texts in a worker process."""
+    return splitter.create_documents(texts, metadatas, **kwargs)
+
+
 class TextSplitter(ABC):
     """Interface for splitting text into chunks.
 
@@ -68,16 +95,80 @@ class TextSplitter(ABC):
                     chunks.append(new_doc)
         return chunks
 
-    def split_documents(self, documents: Iterable[Document], **kwargs) -> List[Chunk]:
-        """Split documents."""
+    def split_documents(
+        self, documents: Iterable[Document], max_workers: int = 1, **kwargs
+    ) -> List[Chunk]:
+        """Split documents.
+
+        Args:
+            documents (Iterable[Document]): The documents to split.
+            max_workers (int): The processes to split a large batch of documents,
+                1 to split in the current process. The splitter must be picklable,
+                otherwise the documents are split in the current process.
+        """
         texts = []
         metadatas = []
         for doc in documents:
             # Iterable just supports one iteration
             texts.append(doc.content)
             metadatas.append(doc.metadata)
+        if max_workers > 1 and len(texts) > 1:
+            chunks = self._create_documents_in_processes(
+                texts, metadatas, max_workers, **kwargs
+            )
+            if chunks is not None:
+                return chunks
         return self.create_documents(texts, metadatas, **kwargs)
 
+    def _create_documents_in_processes(
+        self, texts: List[str], metadatas: List[dict], max_workers: int, **kwargs
+    ) -> Optional[List[Chunk]]:
+        """Split the texts in a process pool, in groups of similar total length.
+
+        Returns None if the splitter can't be sent to the processes.
+        """
+        try:
+            pickle.dumps(self)
+        except Exception as e:
+            logger.warning(
+                f"{self.__class__.__name__} is not picklable, split the documents in "
+                f"the current process: {e}"
+            )
+            return None
+        # Several groups per process to balance the documents of different sizes
+        num_groups = min(len(texts), max_workers * 4)
+        group_size = sum(len(t) for t in texts) / num_groups
+        groups: List[Tuple[int, int]] = []
+        start, size = 0, 0
+        for i, text in enumerate(texts):
+            size += len(text)
+            if size >= group_size or i == len(texts) - 1:
+                groups.append((start, i + 1))
+                start, size = i + 1, 0
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(groups)), mp_context=mp_context
+        ) as pool:
+            results = pool.map(
+                _create_documents,
+                [self] * len(groups),
+                [texts[a:b] for a, b in groups],
+                [metadatas[a:b] for a, b in groups],
+                [kwargs] * len(groups),
+            )
+            return [chunk for chunks in results for chunk in chunks]
+
+    def iter_split_documents(
+        self, documents: Iterable[Document], **kwargs
+    ) -> Iterator[Chunk]:
+        """Split documents lazily.
+
+        The chunks of a document are yielded once it is split, so the documents can
+        be streamed from a loader.
+        """
+        for doc in documents:
+            yield from self.split_documents([doc], **kwargs)
+
     def _join_docs(self, docs: List[str], separator: str, **kwargs) -> Optional[str]:
         text = separator.join(docs)
         text = text.strip()
@@ -101,42 +192,67 @@ class TextSplitter(ABC):
             chunk_overlap = self._chunk_overlap
         if separator is None:
             separator = self._separator
-        separator_len = self._length_function(separator)
+        return self._merge_pieces(
+            (cast(str, s) for s in splits), separator, chunk_size, chunk_overlap
+        )
+
+    def _merge_pieces(
+        self,
+        pieces: Iterable[str],
+        separator: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        lengths: Optional[Iterable[int]] = None,
+    ) -> List[str]:
+        """Merge the pieces into chunks with a sliding window.
+
+        The window keeps the length of every piece and a running total, a piece is
+        measured once and dropping a piece from the window is O(1), so merging is
+        linear in the number of pieces.
 
+        Args:
+            pieces (Iterable[str]): The pieces to merge.
+            separator (str): The separator to join the pieces.
+            chunk_size (int): The max length of a chunk.
+            chunk_overlap (int): The max overlap length of two adjacent chunks.
+            lengths (Optional[Iterable[int]]): The precomputed lengths of the pieces.
+        """
+        separator_len = self._length_function(separator)
+        if lengths is None:
+            measured = ((d, self._length_function(d)) for d in pieces)
+        else:
+            measured = zip(pieces, lengths)
         docs = []
-        current_doc: List[str] = []
+        current_doc: Deque[str] = deque()
+        current_lens: Deque[int] = deque()
         total = 0
-        for s in splits:
-            d = cast(str, s)
-            _len = self._length_function(d)
-            if (
-                total + _len + (separator_len if len(current_doc) > 0 else 0)
-                > chunk_size
-            ):
+        for d, _len in measured:
+            if total + _len + (separator_len if current_doc else 0) > chunk_size:
                 if total > chunk_size:
                     logger.warning(
                         f"Created a chunk of size {total}, "
                         f"which is longer than the specified {chunk_size}"
                     )
-                if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                if current_doc:
+                    doc = self._join_docs(list(current_doc), separator)
                     if doc is not None:
                         docs.append(doc)
                     # Keep on popping if:
                     # - we have a larger chunk than in the chunk overlap
                     # - or if we still have any chunks and the length is long
                     while total > chunk_overlap or (
-                        total + _len + (separator_len if len(current_doc) > 0 else 0)
+                        total + _len + (separator_len if current_doc else 0)
                         > chunk_size
                         and total > 0
                     ):
-                        total -= self._length_function(current_doc[0]) + (
+                        total -= current_lens.popleft() + (
                             separator_len if len(current_doc) > 1 else 0
                         )
-                        current_doc = current_doc[1:]
+                        current_doc.popleft()
             current_doc.append(d)
+            current_lens.append(_len)
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs(list(current_doc), separator)
         if doc is not None:
             docs.append(doc)
         return docs
@@ -288,44 +404,54 @@ class RecursiveCharacterTextSplitter(TextSplitter):
         self, text: str, separator: Optional[str] = None, **kwargs
     ) -> List[str]:
         """Split incoming text and return chunks."""
+        return self._split_text(text, 0, **kwargs)
+
+    def _split_text(self, text: str, start: int, **kwargs) -> List[str]:
+        """Split the text by the first separator in it from `separators[start]`.
+
+        A piece split by a separator never contains it or the separators before it,
+        so the longer pieces are split recursively from the next separator.
+        """
         final_chunks = []
+        chunk_size = kwargs.get("chunk_size", None)
+        chunk_overlap = kwargs.get("chunk_overlap", None)
+        if chunk_size is None:
+            chunk_size = self._chunk_size
+        if chunk_overlap is None:
+            chunk_overlap = self._chunk_overlap
         # Get appropriate separator to use
-        separator = self._separators[-1]
-        for _s in self._separators:
-            if _s == "":
-                separator = _s
-                break
-            if _s in text:
-                separator = _s
+        index = len(self._separators) - 1
+        for i in range(start, len(self._separators)):
+            _s = self._separators[i]
+            if _s == "" or _s in text:
+                index = i
                 break
+        separator = self._separators[index]
         # Now that we have the separator, split the text
         if separator:
             splits = text.split(separator)
         else:
             splits = list(text)
         # Now go merging things, recursively splitting longer texts.
-        _good_splits = []
+        _good_splits: List[str] = []
+        _good_lens: List[int] = []
         for s in splits:
-            if self._length_function(s) < self._chunk_size:
+            _len = self._length_function(s)
+            if _len < self._chunk_size:
                 _good_splits.append(s)
+                _good_lens.append(_len)
             else:
                 if _good_splits:
-                    merged_text = self._merge_splits(
-                        _good_splits,
-                        separator,
-                        chunk_size=kwargs.get("chunk_size", None),
-                        chunk_overlap=kwargs.get("chunk_overlap", None),
+                    merged_text = self._merge_pieces(
+                        _good_splits, separator, chunk_size, chunk_overlap, _good_lens
                     )
                     final_chunks.extend(merged_text)
-                    _good_splits = []
-                other_info = self.split_text(s)
+                    _good_splits, _good_lens = [], []
+                other_info = self._split_text(s, index + 1)
                 final_chunks.extend(other_info)
         if _good_splits:
-            merged_text = self._merge_splits(
-                _good_splits,
-                separator,
-                chunk_size=kwargs.get("chunk_size", None),
-                chunk_overlap=kwargs.get("chunk_overlap", None),
+            merged_text = self._merge_pieces(
+                _good_splits, separator, chunk_size, chunk_overlap, _good_lens
             )
             final_chunks.extend(merged_text)
         return final_chunks
@@ -695,52 +821,22 @@ class MarkdownHeaderTextSplitter(TextSplitter):
             chunk_overlap = self._chunk_overlap
         if separator is None:
             separator = self._separator
-        separator_len = self._length_function(separator)
 
-        docs = []
-        current_doc: List[str] = []
-        total = 0
-        for _doc in documents:
+        def _to_text(_doc: str | dict) -> str:
             dict_doc = cast(dict, _doc)
             if dict_doc["metadata"] != {}:
                 head = sorted(
                     dict_doc["metadata"].items(), key=lambda x: x[0], reverse=True
                 )[0][1]
-                d = head + separator + dict_doc["page_content"]
-            else:
-                d = dict_doc["page_content"]
-            _len = self._length_function(d)
-            if (
-                total + _len + (separator_len if len(current_doc) > 0 else 0)
-                > chunk_size
-            ):
-                if total > chunk_size:
-                    logger.warning(
-                        f"Created a chunk of size {total}, "
-                        f"which is longer than the specified {chunk_size}"
-                    )
-                if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
-                    if doc is not None:
-                        docs.append(doc)
-                    # Keep on popping if:
-                    # - we have a larger chunk than in the chunk overlap
-                    # - or if we still have any chunks and the length is long
-                    while total > chunk_overlap or (
-                        total + _len + (separator_len if len(current_doc) > 0 else 0)
-                        > chunk_size
-                        and total > 0
-                    ):
-                        total -= self._length_function(current_doc[0]) + (
-                            separator_len if len(current_doc) > 1 else 0
-                        )
-                        current_doc = current_doc[1:]
-            current_doc.append(d)
-            total += _len + (separator_len if len(current_doc) > 1 else 0)
-        doc = self._join_docs(current_doc, separator)
-        if doc is not None:
-            docs.append(doc)
-        return docs
+                return head + separator + dict_doc["page_content"]
+            return dict_doc["page_content"]
+
+        return self._merge_pieces(
+            (_to_text(_doc) for _doc in documents),
+            separator,
+            chunk_size,
+            chunk_overlap,
+        )
 
     def run(
         self,
@@ -1,12 +1,12 @@
 """TripletExtractor class."""
 
-import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
 from dbgpt.core import HumanPromptTemplate, LLMClient, ModelMessage, ModelRequest
 from dbgpt.rag.transformer.base import ExtractorBase
+from dbgpt.util.chat_util import run_async_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -30,25 +30,18 @@ class LLMExtractor(ExtractorBase, ABC):
         batch_size: int = 1,
         limit: Optional[int] = None,
     ) -> List:
-        """Batch extract by LLM."""
+        """Batch extract by LLM.
+
+        At most batch_size requests are running at the same time, a new request
+        starts as soon as one finishes.
+        """
         if batch_size < 1:
             raise ValueError("batch_size >= 1")
 
-        results = []
-
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i : i + batch_size]
-
-            # Create tasks for current batch
-            extraction_tasks = [
-                self._extract(text, None, limit) for text in batch_texts
-            ]
-
-            # Execute batch concurrently and wait for all to complete
-            batch_results = await asyncio.gather(*extraction_tasks)
-            results.extend(batch_results)
-
-        return results
+        return await run_async_tasks(
+            tasks=[self._extract(text, None, limit) for text in texts],
+            concurrency_limit=batch_size,
+        )
 
     async def _extract(
         self, text: str, history: str = None, limit: Optional[int] = None
@@ -58,6 +51,18 @@ class LLMExtractor(ExtractorBase, ABC):
         if limit and limit < 1:
             raise ValueError("optional argument limit >= 1")
 
+        response_text = await self._generate(text, history)
+        if response_text:
+            return self._parse_response(response_text, limit)
+        else:
+            return []
+
+    async def _generate(self, text: str, history: str = None) -> Optional[str]:
+        """Request the LLM with the prompt, return the text of the response.
+
+        Returns:
+            Optional[str]: The response text, None if the request failed.
+        """
         template = HumanPromptTemplate.from_template(self._prompt_template)
 
         messages = (
@@ -82,12 +87,9 @@ class LLMExtractor(ExtractorBase, ABC):
             code = str(response.error_code)
             reason = response.text
             logger.error(f"request llm failed ({code}) {reason}")
-            return []
+            return None
 
-        if response.has_text:
-            return self._parse_response(response.text, limit)
-        else:
-            return []
+        return response.text if response.has_text else None
 
     def truncate(self):
         """Do nothing by default."""
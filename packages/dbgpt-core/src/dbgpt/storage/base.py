@@ -4,9 +4,30 @@ import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
-from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from dataclasses import dataclass
-from typing import List, Optional
+from itertools import islice
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Sized,
+    Union,
+)
 
 from dbgpt.core import Chunk
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -25,6 +46,116 @@ class IndexStoreConfig(BaseParameters):
         raise NotImplementedError("Current index store does not support create_store")
 
 
+@dataclass
+class LoadProgress:
+    """The progress of loading chunks into an index store.
+
+    Parameters:
+        group_index (int): The index of the loaded chunk group.
+        group_size (int): The number of chunks in the group.
+        group_latency (float): The seconds spent to load the group, retries included.
+        retries (int): The retries of the group.
+        loaded_chunks (int): The number of chunks loaded so far.
+        total_chunks (Optional[int]): The total number of chunks, None if the chunks
+            are streamed.
+    """
+
+    group_index: int
+    group_size: int
+    group_latency: float
+    retries: int
+    loaded_chunks: int
+    total_chunks: Optional[int] = None
+
+
+LoadProgressCallback = Callable[[LoadProgress], None]
+
+
+@dataclass
+class _GroupLoadResult:
+    ids: List[str]
+    latency: float
+    retries: int
+
+
+class _LoadTracker:
+    """Collect the results of loaded chunk groups in order and report progress."""
+
+    def __init__(
+        self,
+        total: Optional[int],
+        progress_callback: Optional[LoadProgressCallback] = None,
+    ):
+        self._total = total
+        self._progress_callback = progress_callback
+        self._results: Dict[int, List[str]] = {}
+        self._latencies: List[float] = []
+        self._loaded_cnt = 0
+        self._start_time = time.time()
+
+    def on_done(self, idx: int, result: _GroupLoadResult) -> None:
+        self._results[idx] = result.ids
+        self._latencies.append(result.latency)
+        self._loaded_cnt += len(result.ids)
+        logger.info(
+            f"Loaded chunk group {idx + 1} in {result.latency:.3f} seconds, "
+            f"{self._loaded_cnt} chunks loaded, total {self._total or 'unknown'}."
+        )
+        if self._progress_callback:
+            self._progress_callback(
+                LoadProgress(
+                    group_index=idx,
+                    group_size=len(result.ids),
+                    group_latency=result.latency,
+                    retries=result.retries,
+                    loaded_chunks=self._loaded_cnt,
+                    total_chunks=self._total,
+                )
+            )
+
+    def finish(self) -> List[str]:
+        ids = [i for idx in sorted(self._results) for i in self._results[idx]]
+        if self._latencies:
+            latencies = sorted(self._latencies)
+            logger.info(
+                f"Loaded {len(ids)} chunks in {len(latencies)} groups in "
+                f"{time.time() - self._start_time:.3f} seconds, group latency p50: "
+                f"{latencies[len(latencies) // 2]:.3f}s, max: {latencies[-1]:.3f}s"
+            )
+        return ids
+
+
+def _iter_chunk_groups(chunks: Iterable[Chunk], size: int) -> Iterator[List[Chunk]]:
+    iterator = iter(chunks)
+    while group := list(islice(iterator, size)):
+        yield group
+
+
+async def _aiter_chunk_groups(
+    chunks: Union[Iterable[Chunk], AsyncIterable[Chunk]], size: int
+) -> AsyncIterator[List[Chunk]]:
+    if not isinstance(chunks, AsyncIterable):
+        for group in _iter_chunk_groups(chunks, size):
+            yield group
+        return
+    try:
+        group: List[Chunk] = []
+        async for chunk in chunks:
+            group.append(chunk)
+            if len(group) >= size:
+                yield group
+                group = []
+        if group:
+            yield group
+    finally:
+        if isinstance(chunks, AsyncGenerator):
+            await chunks.aclose()
+
+
+def _retry_backoff(retries: int) -> float:
+    return min(0.5 * 2 ** (retries - 1), 10.0)
+
+
 class IndexStoreBase(ABC):
     """Index store base class."""
 
@@ -33,11 +164,13 @@ class IndexStoreBase(ABC):
         executor: Optional[Executor] = None,
         max_chunks_once_load: Optional[int] = None,
         max_threads: Optional[int] = None,
+        max_retries: Optional[int] = None,
     ):
         """Init index store."""
         self._executor = executor or ThreadPoolExecutor()
         self._max_chunks_once_load = max_chunks_once_load or 10
         self._max_threads = max_threads or 1
+        self._max_retries = max_retries or 0
 
     @abstractmethod
     def get_config(self) -> IndexStoreConfig:
@@ -111,100 +244,182 @@ class IndexStoreBase(ABC):
 
     def load_document_with_limit(
         self,
-        chunks: List[Chunk],
+        chunks: Iterable[Chunk],
         max_chunks_once_load: Optional[int] = None,
         max_threads: Optional[int] = None,
+        progress_callback: Optional[LoadProgressCallback] = None,
+        max_retries: Optional[int] = None,
     ) -> List[str]:
         """Load document in index database with specified limit.
 
+        The chunks are consumed lazily in groups of max_chunks_once_load, and at most
+        max_threads groups are loading at the same time, a new group is submitted as
+        soon as any running group finishes.
+
         Args:
-            chunks(List[Chunk]): Document chunks.
+            chunks(Iterable[Chunk]): Document chunks, can be a generator.
             max_chunks_once_load(int): Max number of chunks to load at once.
             max_threads(int): Max number of threads to use.
+            progress_callback(LoadProgressCallback): Called after each group loaded.
+            max_retries(int): Max retries of a failed group.
 
         Return:
-            List[str]: Chunk ids.
+            List[str]: Chunk ids, in the order of the chunks.
+
+        Raises:
+            Exception: The error of load_document if the group is not retried,
+                otherwise a RuntimeError from the error of the last retry.
         """
         max_chunks_once_load = max_chunks_once_load or self._max_chunks_once_load
         max_threads = max_threads or self._max_threads
-        # Group the chunks into chunks of size max_chunks
-        chunk_groups = [
-            chunks[i : i + max_chunks_once_load]
-            for i in range(0, len(chunks), max_chunks_once_load)
-        ]
+        if max_retries is None:
+            max_retries = self._max_retries
+        total = len(chunks) if isinstance(chunks, Sized) else None
         logger.info(
-            f"Loading {len(chunks)} chunks in {len(chunk_groups)} groups with "
-            f"{max_threads} threads."
+            f"Loading {total or 'streamed'} chunks in groups of "
+            f"{max_chunks_once_load} with {max_threads} threads."
         )
-        ids = []
-        loaded_cnt = 0
-        start_time = time.time()
+        tracker = _LoadTracker(total, progress_callback)
         with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            tasks = []
-            for chunk_group in chunk_groups:
-                tasks.append(executor.submit(self.load_document, chunk_group))
-            for future in tasks:
-                success_ids = future.result()
-                ids.extend(success_ids)
-                loaded_cnt += len(success_ids)
-                logger.info(f"Loaded {loaded_cnt} chunks, total {len(chunks)} chunks.")
-        logger.info(
-            f"Loaded {len(chunks)} chunks in {time.time() - start_time} seconds"
-        )
-        return ids
+            pending: Dict[Future, int] = {}
+            try:
+                for idx, group in enumerate(
+                    _iter_chunk_groups(chunks, max_chunks_once_load)
+                ):
+                    if len(pending) >= max_threads:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            tracker.on_done(pending.pop(future), future.result())
+                    future = executor.submit(
+                        self._load_group_with_retry, idx, group, max_retries
+                    )
+                    pending[future] = idx
+                for future in as_completed(pending):
+                    tracker.on_done(pending[future], future.result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return tracker.finish()
 
     async def aload_document_with_limit(
         self,
-        chunks: List[Chunk],
+        chunks: Union[Iterable[Chunk], AsyncIterable[Chunk]],
         max_chunks_once_load: Optional[int] = None,
         max_threads: Optional[int] = None,
+        progress_callback: Optional[LoadProgressCallback] = None,
+        max_retries: Optional[int] = None,
     ) -> List[str]:
         """Load document in index database with specified limit.
 
+        The chunks are consumed lazily in groups of max_chunks_once_load, and at most
+        max_threads groups are loading at the same time, a new group is started as
+        soon as any running group finishes.
+
         Args:
-            chunks(List[Chunk]): Document chunks.
+            chunks(Union[Iterable[Chunk], AsyncIterable[Chunk]]): Document chunks,
+                can be a generator or an async generator.
             max_chunks_once_load(int): Max number of chunks to load at once.
-            max_threads(int): Max number of threads to use.
+            max_threads(int): Max number of concurrent groups.
+            progress_callback(LoadProgressCallback): Called after each group loaded.
+            max_retries(int): Max retries of a failed group.
 
         Return:
-            List[str]: Chunk ids.
+            List[str]: Chunk ids, in the order of the chunks.
+
+        Raises:
+            RuntimeError: A group failed, from the error of aload_document.
         """
         max_chunks_once_load = max_chunks_once_load or self._max_chunks_once_load
         max_threads = max_threads or self._max_threads
-        chunk_groups = [
-            chunks[i : i + max_chunks_once_load]
-            for i in range(0, len(chunks), max_chunks_once_load)
-        ]
+        if max_retries is None:
+            max_retries = self._max_retries
+        total = len(chunks) if isinstance(chunks, Sized) else None
         logger.info(
-            f"Loading {len(chunks)} chunks in {len(chunk_groups)} groups with "
-            f"{max_threads} threads."
+            f"Loading {total or 'streamed'} chunks in groups of "
+            f"{max_chunks_once_load} with {max_threads} concurrency."
         )
-        tasks = []
-        for chunk_group in chunk_groups:
-            tasks.append(self.aload_document(chunk_group))
-
-        results = await self._run_tasks_with_concurrency(tasks, max_threads)
-
-        ids = []
-        loaded_cnt = 0
-        for idx, success_ids in enumerate(results):
-            if isinstance(success_ids, Exception):
-                raise RuntimeError(
-                    f"Failed to load chunk group {idx + 1}: {str(success_ids)}"
-                ) from success_ids
-            ids.extend(success_ids)
-            loaded_cnt += len(success_ids)
-            logger.info(f"Loaded {loaded_cnt} chunks, total {len(chunks)} chunks.")
-
-        return ids
-
-    async def _run_tasks_with_concurrency(self, tasks, max_concurrent):
-        results = []
-        for i in range(0, len(tasks), max_concurrent):
-            batch = tasks[i : i + max_concurrent]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            results.extend(batch_results)
-        return results
+        tracker = _LoadTracker(total, progress_callback)
+        semaphore = asyncio.Semaphore(max_threads)
+        errors: List[BaseException] = []
+        tasks: Set[asyncio.Task] = set()
+
+        async def _load_group(idx: int, group: List[Chunk]):
+            try:
+                result = await self._aload_group_with_retry(idx, group, max_retries)
+                tracker.on_done(idx, result)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                semaphore.release()
+
+        groups = _aiter_chunk_groups(chunks, max_chunks_once_load)
+        try:
+            idx = 0
+            async for group in groups:
+                await semaphore.acquire()
+                if errors:
+                    semaphore.release()
+                    break
+                task = asyncio.create_task(_load_group(idx, group))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                idx += 1
+            if tasks:
+                await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await groups.aclose()
+        if errors:
+            raise errors[0]
+        return tracker.finish()
+
+    def _load_group_with_retry(
+        self, idx: int, group: List[Chunk], max_retries: int
+    ) -> "_GroupLoadResult":
+        start_time = time.time()
+        retries = 0
+        while True:
+            try:
+                ids = self.load_document(group)
+                return _GroupLoadResult(ids, time.time() - start_time, retries)
+            except Exception as e:
+                if retries >= max_retries:
+                    if not retries:
+                        raise
+                    raise RuntimeError(
+                        f"Failed to load chunk group {idx + 1}: {str(e)}"
+                    ) from e
+                retries += 1
+                logger.warning(
+                    f"Failed to load chunk group {idx + 1}, retry {retries}/"
+                    f"{max_retries}: {str(e)}"
+                )
+                time.sleep(_retry_backoff(retries))
+
+    async def _aload_group_with_retry(
+        self, idx: int, group: List[Chunk], max_retries: int
+    ) -> "_GroupLoadResult":
+        start_time = time.time()
+        retries = 0
+        while True:
+            try:
+                ids = await self.aload_document(group)
+                return _GroupLoadResult(ids, time.time() - start_time, retries)
+            except Exception as e:
+                if retries >= max_retries:
+                    raise RuntimeError(
+                        f"Failed to load chunk group {idx + 1}: {str(e)}"
+                    ) from e
+                retries += 1
+                logger.warning(
+                    f"Failed to load chunk group {idx + 1}, retry {retries}/"
+                    f"{max_retries}: {str(e)}"
+                )
+                await asyncio.sleep(_retry_backoff(retries))
 
     def similar_search(
         self, text: str, topk: int, filters: Optional[MetadataFilters] = None
@@ -243,6 +458,33 @@ class IndexStoreBase(ABC):
             self.similar_search_with_scores, query, topk, score_threshold, filters
         )
 
+    async def asimilar_search_with_scores_batch(
+        self,
+        queries: List[str],
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Async similar_search_with_score of multiple queries.
+
+        The searches of all queries are issued concurrently.
+
+        Args:
+            queries(List[str]): The query texts.
+            topk(int): The number of similar documents to return of each query.
+            score_threshold(float): score_threshold: Optional, a floating point value
+                between 0 to 1
+            filters(Optional[MetadataFilters]): metadata filters.
+        Return:
+            List[List[Chunk]]: The similar documents of each query.
+        """
+        return await asyncio.gather(
+            *[
+                self.asimilar_search_with_scores(query, topk, score_threshold, filters)
+                for query in queries
+            ]
+        )
+
     def full_text_search(
         self, text: str, topk: int, filters: Optional[MetadataFilters] = None
     ) -> List[Chunk]:
@@ -1 +1,208 @@
-"""Embeddings cache."""
+"""Embeddings cache.
+
+A content addressed cache of document embeddings, the key is the sha256 of the
+fingerprint of the embeddings backend and the text, the value is the float32 vector.
+Re-indexing a mostly unchanged document set only embeds the changed texts.
+"""
+
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dbgpt.core import Embeddings
+from dbgpt.rag.embedding.cached import embeddings_fingerprint, model_name_of
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """A content addressed embedding cache.
+
+    Vectors are saved as raw float32 bytes, in a RocksDB database when persist_dir is
+    provided, otherwise in a bounded in-memory LRU.
+    """
+
+    def __init__(
+        self,
+        persist_dir: Optional[str] = None,
+        max_memory_entries: int = 100000,
+    ):
+        """Create a new EmbeddingCache.
+
+        Args:
+            persist_dir (Optional[str]): The directory of the RocksDB database, None
+                to cache in memory.
+            max_memory_entries (int): The max entries of the in-memory cache, only
+                used when persist_dir is None.
+        """
+        self._db: Any = None
+        self._memory: OrderedDict[bytes, bytes] = OrderedDict()
+        self._max_memory_entries = max_memory_entries
+        self._lock = threading.Lock()
+        if persist_dir:
+            try:
+                from rocksdict import Rdict
+            except ImportError:
+                raise ImportError(
+                    "Could not import rocksdict python package. "
+                    "Please install it with `pip install rocksdict`."
+                )
+            self._db = Rdict(persist_dir)
+
+    @staticmethod
+    def build_key(namespace: str, text: str) -> bytes:
+        """Build the content address of a text embedded by a backend."""
+        hasher = hashlib.sha256(namespace.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(text.encode("utf-8"))
+        return hasher.digest()
+
+    def mget(self, keys: Sequence[bytes]) -> List[Optional[List[float]]]:
+        """Get the vectors of many keys, None for the missing ones."""
+        if not keys:
+            return []
+        if self._db is not None:
+            values = self._db[list(keys)]
+        else:
+            with self._lock:
+                values = [self._memory.get(key) for key in keys]
+                for key, value in zip(keys, values):
+                    if value is not None:
+                        self._memory.move_to_end(key)
+        return [_decode(value) if value is not None else None for value in values]
+
+    def mset(self, items: Sequence[Tuple[bytes, List[float]]]) -> None:
+        """Save the vectors of many keys."""
+        if not items:
+            return
+        if self._db is not None:
+            from rocksdict import WriteBatch
+
+            batch = WriteBatch()
+            for key, vector in items:
+                batch.put(key, _encode(vector))
+            self._db.write(batch)
+            return
+        with self._lock:
+            for key, vector in items:
+                self._memory[key] = _encode(vector)
+                self._memory.move_to_end(key)
+            while len(self._memory) > self._max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _encode(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(data: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class CacheBackedEmbeddings(Embeddings):
+    """Embeddings which cache the document embeddings of another embeddings.
+
+    Only the texts missing in the cache are sent to the model, duplicated texts in a
+    call are embedded once. The queries are embedded by the wrapped embeddings
+    directly.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        namespace: Optional[str] = None,
+    ) -> None:
+        """Create a new CacheBackedEmbeddings.
+
+        Args:
+            embeddings (Embeddings): The embeddings to wrap.
+            cache (EmbeddingCache): The embedding cache.
+            namespace (Optional[str]): The namespace in the cache key, default is
+                the fingerprint of the wrapped embeddings.
+        """
+        self._embeddings = embeddings
+        self._cache = cache
+        self._model_name = model_name_of(embeddings)
+        self._namespace = namespace or embeddings_fingerprint(embeddings)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the wrapped embeddings."""
+        return self._embeddings
+
+    @property
+    def model_name(self) -> str:
+        """Return the model name."""
+        return self._model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed search docs, only the uncached ones are sent to the model."""
+        results, missing = self._lookup(texts)
+        if missing:
+            embeddings = self._embeddings.embed_documents(list(missing.keys()))
+            self._fill(results, missing, embeddings)
+        return results  # type: ignore
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed query text."""
+        return self._embeddings.embed_query(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple query texts."""
+        return self._embeddings.embed_queries(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed search docs."""
+        results, missing = self._lookup(texts)
+        if missing:
+            embeddings = await self._embeddings.aembed_documents(list(missing.keys()))
+            self._fill(results, missing, embeddings)
+        return results  # type: ignore
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronous Embed query text."""
+        return await self._embeddings.aembed_query(text)
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed multiple query texts."""
+        return await self._embeddings.aembed_queries(texts)
+
+    def _lookup(
+        self, texts: List[str]
+    ) -> Tuple[List[Optional[List[float]]], Dict[str, List[int]]]:
+        keys = [self._cache.build_key(self._namespace, text) for text in texts]
+        results = self._cache.mget(keys)
+        # Uncached text -> positions
+        missing: Dict[str, List[int]] = {}
+        for i, (text, vector) in enumerate(zip(texts, results)):
+            if vector is None:
+                missing.setdefault(text, []).append(i)
+        if texts:
+            hits = sum(1 for vector in results if vector is not None)
+            logger.debug(f"Embedding cache hit {hits}/{len(texts)} texts")
+        return results, missing
+
+    def _fill(
+        self,
+        results: List[Optional[List[float]]],
+        missing: Dict[str, List[int]],
+        embeddings: List[List[float]],
+    ) -> None:
+        items = []
+        for (text, positions), vector in zip(missing.items(), embeddings):
+            items.append((self._cache.build_key(self._namespace, text), vector))
+            for i in positions:
+                results[i] = vector
+        self._cache.mset(items)
@@ -1,10 +1,11 @@
 """Cache manager."""
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import Optional, Type, cast
+from typing import Optional, Set, Type, cast
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.core import CacheConfig, CacheKey, CacheValue, Serializable, Serializer
@@ -12,7 +13,7 @@ from dbgpt.core.interface.cache import K, V
 from dbgpt.util.executor_utils import ExecutorFactory, blocking_func_to_async
 from dbgpt.util.parameter_utils import BaseParameters
 
-from .storage.base import CacheStorage
+from .storage.base import CacheStorage, MemoryCacheStorage
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,11 @@ class ModelCacheParameters(BaseParameters):
     storage_type: str = field(
         default="memory",
         metadata={
-            "help": _("The storage type, default is memory"),
+            "help": _(
+                "The storage type, tiered means an in-memory cache over the disk "
+                "cache, default is memory"
+            ),
+            "valid_values": ["memory", "disk", "tiered"],
         },
     )
     max_memory_mb: int = field(
@@ -47,6 +52,53 @@ class ModelCacheParameters(BaseParameters):
             "help": _("The persist directory, default is model_cache"),
         },
     )
+    max_disk_mb: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The max disk usage of disk cache in MB, the earliest written entries "
+                "are evicted when exceeded, default is None, which means unbounded"
+            ),
+        },
+    )
+    cache_policy: str = field(
+        default="lru",
+        metadata={
+            "help": _(
+                "The eviction policy of memory cache, one of lru, fifo and lfu, "
+                "default is lru"
+            ),
+            "valid_values": ["lru", "fifo", "lfu"],
+        },
+    )
+    ttl_seconds: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The time to live of cache entries in seconds, default is None, "
+                "which means entries never expire"
+            ),
+        },
+    )
+    retrieval_policy: str = field(
+        default="exact_match",
+        metadata={
+            "help": _(
+                "The retrieval policy, similarity_match also serves near-duplicate "
+                "prompts with the default embedding model, default is exact_match"
+            ),
+            "valid_values": ["exact_match", "similarity_match"],
+        },
+    )
+    similarity_threshold: float = field(
+        default=0.95,
+        metadata={
+            "help": _(
+                "The min cosine similarity of the last user message to serve a "
+                "similarity match, default is 0.95"
+            ),
+        },
+    )
 
 
 class CacheManager(BaseComponent, ABC):
@@ -143,8 +195,87 @@ class LocalCacheManager(CacheManager):
         return self._serializer
 
 
+class TieredCacheManager(LocalCacheManager):
+    """Two-tier cache manager.
+
+    Hot keys are served from an in-memory L1 storage in the event loop without a
+    thread hop, a miss falls through to the L2 storage (usually the disk storage)
+    and promotes the item to L1. Writes go to L1 immediately and are written back
+    to L2 in the background.
+    """
+
+    def __init__(
+        self,
+        system_app: SystemApp,
+        serializer: Serializer,
+        storage: CacheStorage,
+        l1_storage: MemoryCacheStorage,
+    ) -> None:
+        """Create a tiered cache manager.
+
+        Args:
+            system_app (SystemApp): The system app.
+            serializer (Serializer): The serializer of cache values.
+            storage (CacheStorage): The L2 storage.
+            l1_storage (MemoryCacheStorage): The in-memory L1 storage.
+        """
+        super().__init__(system_app, serializer, storage)
+        self._l1_storage = l1_storage
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    async def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ):
+        """Set cache with key, the L2 storage is written asynchronously."""
+        self._l1_storage.set(key, value, cache_config)
+        task = asyncio.create_task(super().set(key, value, cache_config))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._on_write_back_done)
+
+    async def get(
+        self,
+        key: CacheKey[K],
+        cls: Type[Serializable],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> Optional[CacheValue[V]]:
+        """Retrieve cache with key, L2 hits are promoted to L1."""
+        item = self._l1_storage.get(key, cache_config)
+        if not item:
+            if self._storage.support_async():
+                item = await self._storage.aget(key, cache_config)
+            else:
+                item = await blocking_func_to_async(
+                    self.executor, self._storage.get, key, cache_config
+                )
+            if not item:
+                return None
+            self._l1_storage.set_item(key, item, cache_config)
+        return cast(CacheValue[V], self._serializer.deserialize(item.value_data, cls))
+
+    async def flush(self) -> None:
+        """Wait for all pending writes to the L2 storage."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    def _on_write_back_done(self, task: asyncio.Task) -> None:
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Write back to L2 cache failed: {task.exception()}")
+
+
 def initialize_cache(
-    system_app: SystemApp, storage_type: str, max_memory_mb: int, persist_dir: str
+    system_app: SystemApp,
+    storage_type: str,
+    max_memory_mb: int,
+    persist_dir: str,
+    cache_policy: str = "lru",
+    ttl_seconds: Optional[int] = None,
+    retrieval_policy: str = "exact_match",
+    similarity_threshold: float = 0.95,
+    max_disk_mb: Optional[int] = None,
 ):
     """Initialize cache manager.
 
@@ -153,26 +284,76 @@ def initialize_cache(
         storage_type (str): The storage type.
         max_memory_mb (int): The max memory in MB.
         persist_dir (str): The persist directory.
+        cache_policy (str): The eviction policy of memory cache.
+        ttl_seconds (Optional[int]): The time to live of cache entries in seconds.
+        retrieval_policy (str): The retrieval policy.
+        similarity_threshold (float): The min similarity of a similarity match.
+        max_disk_mb (Optional[int]): The max disk usage of disk cache in MB.
     """
+    from dbgpt.core.interface.cache import CachePolicy, RetrievalPolicy
     from dbgpt.util.serialization.json_serialization import JsonSerializer
 
-    from .storage.base import MemoryCacheStorage
-
-    if storage_type == "disk":
+    use_disk = False
+    if storage_type in ("disk", "tiered"):
         try:
             from .storage.disk.disk_storage import DiskCacheStorage
 
             cache_storage: CacheStorage = DiskCacheStorage(
-                persist_dir, mem_table_buffer_mb=max_memory_mb
+                persist_dir,
+                mem_table_buffer_mb=max_memory_mb,
+                ttl=ttl_seconds,
+                max_bytes=max_disk_mb * 1024 * 1024 if max_disk_mb else None,
             )
+            use_disk = True
         except ImportError as e:
             logger.warning(
                 f"Can't import DiskCacheStorage, use MemoryCacheStorage, import error "
                 f"message: {str(e)}"
             )
-            cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
+            cache_storage = MemoryCacheStorage(
+                max_memory_mb=max_memory_mb,
+                cache_policy=CachePolicy(cache_policy),
+                ttl=ttl_seconds,
+            )
     else:
-        cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
-    system_app.register(
-        LocalCacheManager, serializer=JsonSerializer(), storage=cache_storage
-    )
+        cache_storage = MemoryCacheStorage(
+            max_memory_mb=max_memory_mb,
+            cache_policy=CachePolicy(cache_policy),
+            ttl=ttl_seconds,
+        )
+    if RetrievalPolicy(retrieval_policy) == RetrievalPolicy.SIMILARITY_MATCH:
+        from dbgpt.rag.embedding.embedding_factory import (
+            DefaultEmbeddings,
+            EmbeddingFactory,
+        )
+
+        from .storage.similarity import SimilarityCacheStorage
+
+        try:
+            embedding_factory = EmbeddingFactory.get_instance(system_app)
+            cache_storage = SimilarityCacheStorage(
+                DefaultEmbeddings(embedding_factory),
+                storage=cache_storage,
+                score_threshold=similarity_threshold,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Can't find the embedding model for similarity cache, use exact "
+                f"match only, error message: {str(e)}"
+            )
+    if storage_type == "tiered" and use_disk:
+        l1_storage = MemoryCacheStorage(
+            max_memory_mb=max_memory_mb,
+            cache_policy=CachePolicy(cache_policy),
+            ttl=ttl_seconds,
+        )
+        system_app.register(
+            TieredCacheManager,
+            serializer=JsonSerializer(),
+            storage=cache_storage,
+            l1_storage=l1_storage,
+        )
+    else:
+        system_app.register(
+            LocalCacheManager, serializer=JsonSerializer(), storage=cache_storage
+        )
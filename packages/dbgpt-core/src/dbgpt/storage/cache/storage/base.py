@@ -1,9 +1,11 @@
 """Base cache storage class."""
 
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 
 import msgpack
@@ -17,7 +19,6 @@ from dbgpt.core.interface.cache import (
     RetrievalPolicy,
     V,
 )
-from dbgpt.util.memory_utils import _get_object_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -34,24 +35,26 @@ class StorageItem:
         key_hash (bytes): The hash value of the storage item's key.
         key_data (bytes): The data of the storage item's key, represented in bytes.
         value_data (bytes): The data of the storage item's value, also in bytes.
+        timestamp (Optional[float]): The unix time when the item was written.
+        expire_at (Optional[float]): The unix time when the item expires, None means
+            it never expires.
     """
 
     length: int  # The bytes length of the storage item
     key_hash: bytes  # The hash value of the storage item's key
     key_data: bytes  # The data of the storage item's key
     value_data: bytes  # The data of the storage item's value
+    timestamp: Optional[float] = None  # The unix time when the item was written
+    expire_at: Optional[float] = None  # The unix time when the item expires
 
     @staticmethod
     def build_from(
         key_hash: bytes, key_data: bytes, value_data: bytes
     ) -> "StorageItem":
         """Build a StorageItem from the provided key and value data."""
-        length = (
-            32
-            + _get_object_bytes(key_hash)
-            + _get_object_bytes(key_data)
-            + _get_object_bytes(value_data)
-        )
+        # The payloads are already serialized, so their byte length is a cheap and
+        # stable measure of the memory they occupy.
+        length = 32 + len(key_hash) + len(key_data) + len(value_data)
         return StorageItem(
             length=length, key_hash=key_hash, key_data=key_data, value_data=value_data
         )
@@ -64,6 +67,16 @@ class StorageItem:
         value_data = value.serialize()
         return StorageItem.build_from(key_hash, key_data, value_data)
 
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check whether the item is expired.
+
+        Args:
+            now (Optional[float]): The current unix time, default is time.time().
+        """
+        if self.expire_at is None:
+            return False
+        return (now or time.time()) >= self.expire_at
+
     def serialize(self) -> bytes:
         """Serialize the StorageItem into a byte stream using MessagePack.
 
@@ -79,6 +92,10 @@ class StorageItem:
             "key_data": msgpack.ExtType(2, self.key_data),
             "value_data": msgpack.ExtType(3, self.value_data),
         }
+        if self.timestamp is not None:
+            obj["timestamp"] = self.timestamp
+        if self.expire_at is not None:
+            obj["expire_at"] = self.expire_at
         return msgpack.packb(obj)
 
     @staticmethod
@@ -104,6 +121,8 @@ class StorageItem:
             key_hash=key_hash,
             key_data=key_data,
             value_data=value_data,
+            timestamp=obj.get("timestamp"),
+            expire_at=obj.get("expire_at"),
         )
 
 
@@ -191,14 +210,141 @@ class CacheStorage(ABC):
         raise NotImplementedError
 
 
+@dataclass
+class CacheStats:
+    """Counters of a cache storage.
+
+    Parameters:
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups not found in the cache.
+        evictions (int): The number of entries evicted to free memory.
+        expirations (int): The number of entries dropped because their TTL expired.
+        rejections (int): The number of entries refused by the admission policy.
+        size (int): The number of entries currently in the cache.
+        memory_usage (int): The bytes currently used by the cached entries.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    rejections: int = 0
+    size: int = 0
+    memory_usage: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the ratio of hits to all lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _CacheEntry:
+    """An entry of the memory cache."""
+
+    __slots__ = ("item", "size", "expire_at")
+
+    def __init__(self, item: StorageItem, expire_at: Optional[float] = None):
+        self.item = item
+        self.size = item.length
+        self.expire_at = expire_at
+
+    def is_expired(self, now: float) -> bool:
+        return self.expire_at is not None and now >= self.expire_at
+
+
+class _FrequencySketch:
+    """A count-min sketch to estimate the access frequency of keys.
+
+    It is the frequency filter of TinyLFU: counters saturate at 15 and all of them
+    are halved after a sample period, so the sketch only remembers recent history.
+    """
+
+    _SEEDS = (
+        0x97CB3127A2C3E0B1,
+        0xB492B66FBE98F273,
+        0x9AE16A3B2F90404F,
+        0xCBF29CE484222325,
+    )
+    _MAX_COUNT = 15
+    _HALVE_TABLE = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, capacity: int = 4096):
+        width = 1
+        while width < max(capacity, 16):
+            width <<= 1
+        self._mask = width - 1
+        self._tables = [bytearray(width) for _ in self._SEEDS]
+        self._sample_size = 10 * width
+        self._additions = 0
+
+    def _indexes(self, key_hash: int):
+        h = key_hash & 0xFFFFFFFFFFFFFFFF
+        for seed in self._SEEDS:
+            yield (((h ^ seed) * 0x9E3779B97F4A7C15) >> 32) & self._mask
+
+    def increment(self, key_hash: int) -> None:
+        added = False
+        for table, index in zip(self._tables, self._indexes(key_hash)):
+            if table[index] < self._MAX_COUNT:
+                table[index] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._reset()
+
+    def frequency(self, key_hash: int) -> int:
+        return min(
+            table[index] for table, index in zip(self._tables, self._indexes(key_hash))
+        )
+
+    def _reset(self) -> None:
+        for table in self._tables:
+            table[:] = table.translate(self._HALVE_TABLE)
+        self._additions //= 2
+
+
 class MemoryCacheStorage(CacheStorage):
-    """A simple in-memory cache storage implementation."""
+    """An in-memory cache storage implementation.
+
+    Entries are bounded by the bytes of their serialized key and value, evicted with
+    the configured cache policy and optionally expired after a time to live. All
+    operations are guarded by a lock, so the storage can be used from the thread
+    executor of the cache manager.
+
+    Supported cache policies:
+    - LRU: Evict the least recently used entry.
+    - FIFO: Evict the earliest inserted entry.
+    - LFU: LRU eviction with a TinyLFU admission filter, a new entry is only
+      admitted when it is requested more frequently than the entry it would evict.
+    """
 
-    def __init__(self, max_memory_mb: int = 256):
-        """Create a new instance of MemoryCacheStorage."""
-        self.cache: OrderedDict = OrderedDict()
+    def __init__(
+        self,
+        max_memory_mb: int = 256,
+        cache_policy: CachePolicy = CachePolicy.LRU,
+        ttl: Optional[float] = None,
+    ):
+        """Create a new instance of MemoryCacheStorage.
+
+        Args:
+            max_memory_mb (int): The max memory of cached entries in MB.
+            cache_policy (CachePolicy): The eviction policy.
+            ttl (Optional[float]): The default time to live of entries in seconds,
+                None means entries never expire.
+        """
+        self.cache: OrderedDict[int, _CacheEntry] = OrderedDict()
         self.max_memory = max_memory_mb * 1024 * 1024
         self.current_memory_usage = 0
+        self.cache_policy = CachePolicy(cache_policy)
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._stats = CacheStats()
+        self._sketch: Optional[_FrequencySketch] = None
+        if self.cache_policy == CachePolicy.LFU:
+            # Assume an average entry of 4KB to size the sketch
+            self._sketch = _FrequencySketch(self.max_memory // 4096)
 
     def check_config(
         self,
@@ -224,14 +370,24 @@ class MemoryCacheStorage(CacheStorage):
         self.check_config(cache_config, raise_error=True)
         # Exact match retrieval
         key_hash = hash(key)
-        item: Optional[StorageItem] = self.cache.get(key_hash)
-        logger.debug(f"MemoryCacheStorage get key {key}, hash {key_hash}, item: {item}")
-
-        if not item:
-            return None
-        # Move the item to the end of the OrderedDict to signify recent use.
-        self.cache.move_to_end(key_hash)
-        return item
+        with self._lock:
+            if self._sketch:
+                self._sketch.increment(key_hash)
+            entry = self.cache.get(key_hash)
+            if entry and entry.is_expired(time.monotonic()):
+                self._remove(key_hash)
+                self._stats.expirations += 1
+                entry = None
+            if not entry:
+                self._stats.misses += 1
+                logger.debug(f"MemoryCacheStorage miss key {key}, hash {key_hash}")
+                return None
+            if self.cache_policy != CachePolicy.FIFO:
+                # Move the item to the end of the OrderedDict to signify recent use.
+                self.cache.move_to_end(key_hash)
+            self._stats.hits += 1
+        logger.debug(f"MemoryCacheStorage get key {key}, hash {key_hash}")
+        return entry.item
 
     def set(
         self,
@@ -240,18 +396,69 @@ class MemoryCacheStorage(CacheStorage):
         cache_config: Optional[CacheConfig] = None,
     ) -> None:
         """Set a value in the cache for the provided key."""
+        self.set_item(key, StorageItem.build_from_kv(key, value), cache_config)
+
+    def set_item(
+        self,
+        key: CacheKey[K],
+        item: StorageItem,
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a built storage item in the cache for the provided key.
+
+        It is used to promote an item read from another storage, an item with
+        expire_at only lives for the rest of its time to live.
+        """
         key_hash = hash(key)
-        item = StorageItem.build_from_kv(key, value)
-        # Calculate memory size of the new entry
-        new_entry_size = _get_object_bytes(item)
-        # Evict entries if necessary
-        while self.current_memory_usage + new_entry_size > self.max_memory:
-            self._apply_cache_policy(cache_config)
-
-        # Store the item in the cache.
-        self.cache[key_hash] = item
-        self.current_memory_usage += new_entry_size
-        logger.debug(f"MemoryCacheStorage set key {key}, hash {key_hash}, item: {item}")
+        if item.length > self.max_memory:
+            logger.warning(
+                f"MemoryCacheStorage skip key {key}, item size {item.length} exceeds "
+                f"max memory {self.max_memory}"
+            )
+            with self._lock:
+                self._stats.rejections += 1
+            return
+        ttl = cache_config.ttl if cache_config and cache_config.ttl else self.ttl
+        if item.expire_at is not None:
+            remaining = item.expire_at - time.time()
+            ttl = min(ttl, remaining) if ttl else remaining
+            if ttl <= 0:
+                return
+        entry = _CacheEntry(item, time.monotonic() + ttl if ttl else None)
+
+        with self._lock:
+            replaced = self._remove(key_hash) is not None
+            if not self._make_room(key_hash, entry.size, admit=replaced):
+                self._stats.rejections += 1
+                logger.debug(f"MemoryCacheStorage reject key {key}, hash {key_hash}")
+                return
+            # Store the item in the cache.
+            self.cache[key_hash] = entry
+            self.current_memory_usage += entry.size
+        logger.debug(f"MemoryCacheStorage set key {key}, hash {key_hash}")
+
+    def support_async(self) -> bool:
+        """Check whether the storage support async operation.
+
+        Operations on memory never block, so they run in the event loop directly
+        instead of being dispatched to a thread executor.
+        """
+        return True
+
+    async def aget(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key."""
+        return self.get(key, cache_config)
+
+    async def aset(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key."""
+        self.set(key, value, cache_config)
 
     def exists(
         self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
@@ -259,9 +466,61 @@ class MemoryCacheStorage(CacheStorage):
         """Check if the key exists in the cache."""
         return self.get(key, cache_config) is not None
 
-    def _apply_cache_policy(self, cache_config: Optional[CacheConfig] = None):
-        # Remove the oldest/newest item based on the cache policy.
-        if cache_config and cache_config.cache_policy == CachePolicy.FIFO:
-            self.cache.popitem(last=False)
-        else:  # Default is LRU
-            self.cache.popitem(last=True)
+    def delete(self, key: CacheKey[K]) -> bool:
+        """Delete the key from the cache.
+
+        Returns:
+            bool: True if the key was in the cache.
+        """
+        with self._lock:
+            return self._remove(hash(key)) is not None
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self.cache.clear()
+            self.current_memory_usage = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return replace(
+                self._stats,
+                size=len(self.cache),
+                memory_usage=self.current_memory_usage,
+            )
+
+    def __len__(self) -> int:
+        """Return the number of entries in the cache."""
+        return len(self.cache)
+
+    def _remove(self, key_hash: int) -> Optional[_CacheEntry]:
+        entry = self.cache.pop(key_hash, None)
+        if entry:
+            self.current_memory_usage -= entry.size
+        return entry
+
+    def _make_room(self, key_hash: int, size: int, admit: bool = False) -> bool:
+        """Evict entries until there is room for a new entry of the given size.
+
+        The oldest entry of the OrderedDict is the eviction victim of both LRU and
+        FIFO. With LFU policy, the new entry is rejected when it is not more
+        frequent than the victim, unless ``admit`` is True.
+        """
+        now = time.monotonic()
+        while self.cache and self.current_memory_usage + size > self.max_memory:
+            victim_hash, victim = next(iter(self.cache.items()))
+            if victim.is_expired(now):
+                self._remove(victim_hash)
+                self._stats.expirations += 1
+                continue
+            if (
+                self._sketch
+                and not admit
+                and self._sketch.frequency(key_hash)
+                <= self._sketch.frequency(victim_hash)
+            ):
+                return False
+            self._remove(victim_hash)
+            self._stats.evictions += 1
+        return True
@@ -4,7 +4,9 @@ Implement the cache storage using rocksdb.
 """
 
 import logging
-from typing import Optional
+import threading
+import time
+from typing import List, Optional, Tuple
 
 from rocksdict import Options, Rdict
 
@@ -47,14 +49,53 @@ def db_options(mem_table_buffer_mb: int = 256, background_threads: int = 2):
 
 
 class DiskCacheStorage(CacheStorage):
-    """Disk cache storage using rocksdb."""
+    """Disk cache storage using rocksdb.
 
-    def __init__(self, persist_dir: str, mem_table_buffer_mb: int = 256) -> None:
-        """Create a new instance of DiskCacheStorage."""
+    Entries can expire after a time to live and the total bytes of entries can be
+    bounded. Expired entries are dropped lazily when they are read, and a background
+    sweeper thread periodically purges expired entries, evicts the earliest written
+    entries when the storage exceeds its budget and compacts the database to
+    reclaim disk space.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str,
+        mem_table_buffer_mb: int = 256,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: float = 300,
+    ) -> None:
+        """Create a new instance of DiskCacheStorage.
+
+        Args:
+            persist_dir (str): The directory of the rocksdb database.
+            mem_table_buffer_mb (int): The mem-table buffer size in MB.
+            ttl (Optional[float]): The default time to live of entries in seconds,
+                None means entries never expire.
+            max_bytes (Optional[int]): The max total bytes of entries, None means
+                unbounded.
+            sweep_interval (float): The interval of the background sweeper in
+                seconds.
+        """
         super().__init__()
         self.db: Rdict = Rdict(
             persist_dir, db_options(mem_table_buffer_mb=mem_table_buffer_mb)
         )
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        # The approximate bytes of entries, recomputed by every sweep
+        self._approx_bytes = 0
+        self._stop_event = threading.Event()
+        self._wakeup_event = threading.Event()
+        self._sweep_lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        if ttl or max_bytes:
+            self._sweeper = threading.Thread(
+                target=self._run_sweeper, name="disk-cache-sweeper", daemon=True
+            )
+            self._sweeper.start()
 
     def check_config(
         self,
@@ -85,6 +126,11 @@ class DiskCacheStorage(CacheStorage):
         if not item_bytes:
             return None
         item = StorageItem.deserialize(item_bytes)
+        if item.is_expired():
+            # Drop the stale entry lazily
+            self.db.delete(key_hash)
+            logger.debug(f"Drop expired file cache, key: {key}")
+            return None
         logger.debug(f"Read file cache, key: {key}, storage item: {item}")
         return item
 
@@ -96,6 +142,73 @@ class DiskCacheStorage(CacheStorage):
     ) -> None:
         """Set a value in the cache for the provided key."""
         item = StorageItem.build_from_kv(key, value)
+        now = time.time()
+        ttl = cache_config.ttl if cache_config and cache_config.ttl else self.ttl
+        item.timestamp = now
+        item.expire_at = now + ttl if ttl else None
         key_hash = item.key_hash
-        self.db[key_hash] = item.serialize()
+        item_bytes = item.serialize()
+        self.db[key_hash] = item_bytes
+        self._approx_bytes += len(key_hash) + len(item_bytes)
+        if self.max_bytes and self._approx_bytes > self.max_bytes:
+            self._wakeup_event.set()
         logger.debug(f"Save file cache, key: {key}, value: {value}")
+
+    def sweep(self) -> int:
+        """Purge expired entries and evict entries exceeding the bytes budget.
+
+        The earliest written entries are evicted first until the total bytes drop
+        below 90% of the budget, then the database is compacted.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        with self._sweep_lock:
+            now = time.time()
+            deleted = 0
+            total_bytes = 0
+            live_entries: List[Tuple[float, bytes, int]] = []
+            for key_hash, item_bytes in self.db.items():
+                item = StorageItem.deserialize(item_bytes)
+                if item.is_expired(now):
+                    self.db.delete(key_hash)
+                    deleted += 1
+                    continue
+                size = len(key_hash) + len(item_bytes)
+                total_bytes += size
+                if self.max_bytes:
+                    live_entries.append((item.timestamp or 0, key_hash, size))
+            if self.max_bytes and total_bytes > self.max_bytes:
+                low_watermark = self.max_bytes * 0.9
+                live_entries.sort(key=lambda x: x[0])
+                for _, key_hash, size in live_entries:
+                    if total_bytes <= low_watermark:
+                        break
+                    self.db.delete(key_hash)
+                    total_bytes -= size
+                    deleted += 1
+            self._approx_bytes = total_bytes
+            if deleted:
+                self.db.compact_range(None, None)
+                logger.info(
+                    f"Disk cache sweep deleted {deleted} entries, {total_bytes} bytes "
+                    "left"
+                )
+            return deleted
+
+    def close(self) -> None:
+        """Stop the background sweeper and close the database."""
+        self._stop_event.set()
+        self._wakeup_event.set()
+        if self._sweeper:
+            self._sweeper.join()
+        self.db.close()
+
+    def _run_sweeper(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Disk cache sweep failed: {str(e)}")
+            self._wakeup_event.wait(self._sweep_interval)
+            self._wakeup_event.clear()
@@ -0,0 +1,269 @@
+"""Similarity cache storage.
+
+Serve LLM cache hits for near-duplicate prompts: the last user message of the prompt
+is embedded and looked up in an in-memory vector index, so a paraphrased question
+can reuse the answer of a previous one.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from dbgpt.core import Embeddings
+from dbgpt.core.interface.cache import (
+    CacheConfig,
+    CacheKey,
+    CacheValue,
+    K,
+    RetrievalPolicy,
+    V,
+)
+from dbgpt.core.interface.message import ModelMessageRoleType
+
+from ..llm_cache import LLMCacheKeyData
+from .base import CacheStorage, MemoryCacheStorage, StorageItem
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_HUMAN_PREFIXES = (f"{ModelMessageRoleType.HUMAN}: ", "Human: ")
+
+_Scope = Tuple[str, Optional[float]]
+
+
+def _last_user_message(prompt: str) -> str:
+    """Return the last user message of a prompt built by `messages_to_string`."""
+    start, prefix_len = -1, 0
+    for prefix in _HUMAN_PREFIXES:
+        pos = prompt.rfind("\n" + prefix)
+        if pos >= 0:
+            pos += 1
+        elif prompt.startswith(prefix):
+            pos = 0
+        if pos > start:
+            start, prefix_len = pos, len(prefix)
+    if start < 0:
+        return prompt.strip()
+    return prompt[start + prefix_len :].strip()
+
+
+class _VectorIndex:
+    """A flat inner-product index of normalized vectors.
+
+    Vectors are kept in one contiguous float32 matrix, a search is a single
+    matrix-vector product. When the index is full, the earliest inserted vector is
+    dropped.
+    """
+
+    def __init__(self, dimension: int, max_entries: int = 10000):
+        import numpy as np
+
+        self._max_entries = max_entries
+        self._vectors = np.zeros((min(64, max_entries), dimension), dtype=np.float32)
+        self._keys: List[CacheKey] = []
+        self._positions: Dict[CacheKey, int] = {}
+        self._sequences: List[int] = []
+        self._next_sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: CacheKey, vector: "np.ndarray") -> None:
+        import numpy as np
+
+        pos = self._positions.get(key)
+        if pos is None:
+            if len(self._keys) >= self._max_entries:
+                oldest = int(np.argmin(self._sequences))
+                self.remove(self._keys[oldest])
+            pos = len(self._keys)
+            if pos >= self._vectors.shape[0]:
+                new_size = min(self._vectors.shape[0] * 2, self._max_entries)
+                vectors = np.zeros((new_size, self._vectors.shape[1]), dtype=np.float32)
+                vectors[:pos] = self._vectors[:pos]
+                self._vectors = vectors
+            self._keys.append(key)
+            self._sequences.append(self._next_sequence)
+            self._positions[key] = pos
+        else:
+            self._sequences[pos] = self._next_sequence
+        self._next_sequence += 1
+        self._vectors[pos] = vector
+
+    def remove(self, key: CacheKey) -> None:
+        pos = self._positions.pop(key, None)
+        if pos is None:
+            return
+        # Move the last vector into the freed slot
+        last = len(self._keys) - 1
+        if pos != last:
+            last_key = self._keys[last]
+            self._vectors[pos] = self._vectors[last]
+            self._keys[pos] = last_key
+            self._sequences[pos] = self._sequences[last]
+            self._positions[last_key] = pos
+        self._keys.pop()
+        self._sequences.pop()
+
+    def search(
+        self, vector: "np.ndarray", score_threshold: float
+    ) -> Optional[Tuple[CacheKey, float]]:
+        """Return the most similar key whose score is not lower than the threshold."""
+        import numpy as np
+
+        if not self._keys:
+            return None
+        scores = self._vectors[: len(self._keys)] @ vector
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < score_threshold:
+            return None
+        return self._keys[best], score
+
+
+class SimilarityCacheStorage(CacheStorage):
+    """A cache storage supports similarity match retrieval.
+
+    The cached items are saved in an exact match storage, and the last user message
+    of every LLM cache key is embedded into a vector index scoped by model name and
+    temperature. A lookup first tries the exact match, then falls back to the most
+    similar cached prompt when its cosine similarity reaches the score threshold.
+
+    Keys which are not LLM cache keys only support exact match.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        storage: Optional[CacheStorage] = None,
+        score_threshold: float = 0.95,
+        max_entries_per_scope: int = 10000,
+        max_recent_queries: int = 256,
+    ):
+        """Create a new instance of SimilarityCacheStorage.
+
+        Args:
+            embeddings (Embeddings): The embedding model to embed user messages.
+            storage (Optional[CacheStorage]): The storage to save the cached items,
+                default is MemoryCacheStorage.
+            score_threshold (float): The min cosine similarity of a similarity hit.
+            max_entries_per_scope (int): The max vectors of each model name and
+                temperature scope.
+            max_recent_queries (int): The number of recently embedded queries to
+                keep, a cache check and the following read or write of the same key
+                only embed once.
+        """
+        self._embeddings = embeddings
+        self._storage = storage or MemoryCacheStorage()
+        self._score_threshold = score_threshold
+        self._max_entries_per_scope = max_entries_per_scope
+        self._max_recent_queries = max_recent_queries
+        self._indexes: Dict[_Scope, _VectorIndex] = {}
+        self._recent_queries: OrderedDict[str, "np.ndarray"] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_config(
+        self,
+        cache_config: Optional[CacheConfig] = None,
+        raise_error: Optional[bool] = True,
+    ) -> bool:
+        """Check whether the CacheConfig is legal."""
+        return self._storage.check_config(
+            self._exact_config(cache_config), raise_error=raise_error
+        )
+
+    def get(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key.
+
+        The similarity match is used unless the retrieval policy of cache_config is
+        'EXACT_MATCH'.
+        """
+        exact_config = self._exact_config(cache_config)
+        item = self._storage.get(key, exact_config)
+        if item or (
+            cache_config
+            and cache_config.retrieval_policy != RetrievalPolicy.SIMILARITY_MATCH
+        ):
+            return item
+        parsed = self._parse_key(key)
+        if not parsed:
+            return None
+        scope, text = parsed
+        vector = self._embed(text)
+        with self._lock:
+            index = self._indexes.get(scope)
+            match = index.search(vector, self._score_threshold) if index else None
+        if not match:
+            return None
+        matched_key, score = match
+        item = self._storage.get(matched_key, exact_config)
+        if not item:
+            # The item has been evicted from the storage
+            with self._lock:
+                index.remove(matched_key)  # type: ignore
+            return None
+        logger.debug(
+            f"SimilarityCacheStorage hit key {key}, matched key {matched_key}, "
+            f"score {score}"
+        )
+        return item
+
+    def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key."""
+        self._storage.set(key, value, self._exact_config(cache_config))
+        parsed = self._parse_key(key)
+        if not parsed:
+            return
+        scope, text = parsed
+        vector = self._embed(text)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if not index:
+                index = _VectorIndex(len(vector), self._max_entries_per_scope)
+                self._indexes[scope] = index
+            index.add(key, vector)
+
+    def _exact_config(
+        self, cache_config: Optional[CacheConfig] = None
+    ) -> Optional[CacheConfig]:
+        if not cache_config:
+            return None
+        return replace(cache_config, retrieval_policy=RetrievalPolicy.EXACT_MATCH)
+
+    def _parse_key(self, key: CacheKey[Any]) -> Optional[Tuple[_Scope, str]]:
+        key_data = key.get_value()
+        if not isinstance(key_data, LLMCacheKeyData):
+            return None
+        text = _last_user_message(key_data.prompt)
+        if not text:
+            return None
+        return (key_data.model_name, key_data.temperature), text
+
+    def _embed(self, text: str) -> "np.ndarray":
+        import numpy as np
+
+        with self._lock:
+            vector = self._recent_queries.get(text)
+            if vector is not None:
+                self._recent_queries.move_to_end(text)
+                return vector
+        vector = np.asarray(self._embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        with self._lock:
+            self._recent_queries[text] = vector
+            while len(self._recent_queries) > self._max_recent_queries:
+                self._recent_queries.popitem(last=False)
+        return vector
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from dbgpt.core.interface.cache import CacheConfig
+
+from ..base import StorageItem
+from .test_storage import MockCacheKey, MockCacheValue
+
+pytest.importorskip("rocksdict")
+
+
+@pytest.fixture
+def new_storage(tmp_path):
+    from ..disk.disk_storage import DiskCacheStorage
+
+    storages = []
+
+    def _new_storage(**kwargs):
+        kwargs.setdefault("sweep_interval", 3600)
+        storage = DiskCacheStorage(str(tmp_path / "cache"), 8, **kwargs)
+        storages.append(storage)
+        return storage
+
+    yield _new_storage
+    for storage in storages:
+        storage.close()
+
+
+def test_serialize_timestamp():
+    item = StorageItem.build_from(b"key_hash", b"key_data", b"value_data")
+    item.timestamp = 1.0
+    item.expire_at = 2.0
+    deserialized = StorageItem.deserialize(item.serialize())
+    assert deserialized.timestamp == 1.0
+    assert deserialized.expire_at == 2.0
+    assert deserialized.is_expired(now=2.0)
+    assert not deserialized.is_expired(now=1.5)
+
+
+def test_disk_storage_lazy_expire(new_storage):
+    storage = new_storage(ttl=60)
+    storage.set(MockCacheKey("a"), MockCacheValue())
+    storage.set(MockCacheKey("b"), MockCacheValue(), CacheConfig(ttl=0.01))
+    time.sleep(0.02)
+
+    assert storage.get(MockCacheKey("a")) is not None
+    assert storage.get(MockCacheKey("b")) is None
+    assert storage.db.get(b"b") is None
+
+
+def test_disk_storage_sweep_expired(new_storage):
+    storage = new_storage()
+    storage.set(MockCacheKey("a"), MockCacheValue())
+    storage.set(MockCacheKey("b"), MockCacheValue(), CacheConfig(ttl=0.01))
+    time.sleep(0.02)
+
+    assert storage.sweep() == 1
+    assert storage.db.get(b"a") is not None
+    assert storage.db.get(b"b") is None
+
+
+def test_disk_storage_evicts_earliest_written(new_storage):
+    storage = new_storage(max_bytes=3500)
+    for name in ["a", "b", "c", "d"]:
+        storage.set(MockCacheKey(name), MockCacheValue(1000))
+        time.sleep(0.001)
+
+    # Exceeding the budget wakes up the background sweeper
+    for _ in range(100):
+        if storage.db.get(b"b") is None:
+            break
+        time.sleep(0.01)
+    assert storage.get(MockCacheKey("a")) is None
+    assert storage.get(MockCacheKey("b")) is None
+    assert storage.get(MockCacheKey("c")) is not None
+    assert storage.get(MockCacheKey("d")) is not None
@@ -0,0 +1,91 @@
+from typing import List
+
+import pytest
+
+from dbgpt.core import Embeddings
+from dbgpt.core.interface.cache import CacheConfig, RetrievalPolicy
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ...llm_cache import LLMCacheKey, LLMCacheValue
+from ..similarity import SimilarityCacheStorage, _last_user_message
+
+_VOCABULARY = ["what", "is", "the", "weather", "today", "how", "tell", "me", "db-gpt"]
+
+
+class MockEmbeddings(Embeddings):
+    """Bag of words embeddings."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(w)) for w in _VOCABULARY]
+
+
+def _new_key(question: str, model_name: str = "model", temperature: float = 0.7):
+    key = LLMCacheKey(
+        prompt=f"system: You are a helpful assistant\nhuman: {question}",
+        model_name=model_name,
+        temperature=temperature,
+    )
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+def _new_value(text: str):
+    value = LLMCacheValue(output={"text": text, "error_code": 0})
+    value.set_serializer(JsonSerializer())
+    return value
+
+
+@pytest.fixture
+def embeddings():
+    return MockEmbeddings()
+
+
+@pytest.fixture
+def storage(embeddings):
+    return SimilarityCacheStorage(embeddings, score_threshold=0.9)
+
+
+def test_last_user_message():
+    prompt = "system: be brief\nhuman: hi\nai: hello\nhuman: what is DB-GPT?\nfoo"
+    assert _last_user_message(prompt) == "what is DB-GPT?\nfoo"
+    assert _last_user_message("Human: hello") == "hello"
+    assert _last_user_message("no role") == "no role"
+
+
+def test_similarity_match(storage):
+    storage.set(_new_key("What is the weather today?"), _new_value("sunny"))
+
+    item = storage.get(_new_key("what is the weather today"))
+    assert item is not None
+    assert b"sunny" in item.value_data
+    assert storage.get(_new_key("tell me how")) is None
+
+
+def test_exact_match_policy(storage):
+    storage.set(_new_key("What is the weather today?"), _new_value("sunny"))
+    config = CacheConfig(retrieval_policy=RetrievalPolicy.EXACT_MATCH)
+
+    assert storage.get(_new_key("What is the weather today?"), config) is not None
+    assert storage.get(_new_key("what is the weather today"), config) is None
+
+
+def test_scoped_by_model_and_temperature(storage):
+    storage.set(_new_key("What is the weather today?"), _new_value("sunny"))
+
+    assert storage.get(_new_key("what is the weather today", "other")) is None
+    assert storage.get(_new_key("what is the weather today", temperature=0.1)) is None
+
+
+def test_embed_once_for_check_and_set(storage, embeddings):
+    key = _new_key("What is the weather today?")
+    assert storage.get(key) is None
+    storage.set(key, _new_value("sunny"))
+    assert embeddings.calls == 1
@@ -1,6 +1,37 @@
-from dbgpt.util.memory_utils import _get_object_bytes
+import time
 
-from ..base import StorageItem
+from dbgpt.core.interface.cache import CacheConfig, CachePolicy
+
+from ..base import MemoryCacheStorage, StorageItem
+
+
+class MockCacheKey:
+    def __init__(self, name: str = "key"):
+        self.name = name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def get_hash_bytes(self):
+        return self.name.encode()
+
+    def serialize(self):
+        return self.name.encode()
+
+
+class MockCacheValue:
+    def __init__(self, size: int = 16):
+        self.size = size
+
+    def serialize(self):
+        return b"v" * self.size
+
+
+def _new_storage(policy: CachePolicy = CachePolicy.LRU, **kwargs):
+    storage = MemoryCacheStorage(max_memory_mb=1, cache_policy=policy, **kwargs)
+    # Each entry of 1000 bytes value, room for three entries
+    storage.max_memory = 3200
+    return storage
 
 
 def test_build_from():
@@ -12,9 +43,7 @@ def test_build_from():
     assert item.key_hash == key_hash
     assert item.key_data == key_data
     assert item.value_data == value_data
-    assert item.length == 32 + _get_object_bytes(key_hash) + _get_object_bytes(
-        key_data
-    ) + _get_object_bytes(value_data)
+    assert item.length == 32 + len(key_hash) + len(key_data) + len(value_data)
 
 
 def test_build_from_kv():
@@ -51,3 +80,80 @@ def test_serialize_deserialize():
     assert deserialized.key_data == item.key_data
     assert deserialized.value_data == item.value_data
     assert deserialized.length == item.length
+
+
+def test_memory_storage_lru_evicts_least_recently_used():
+    storage = _new_storage(CachePolicy.LRU)
+    for name in ["a", "b", "c"]:
+        storage.set(MockCacheKey(name), MockCacheValue(1000))
+    assert storage.get(MockCacheKey("a")) is not None
+    storage.set(MockCacheKey("d"), MockCacheValue(1000))
+
+    assert storage.exists(MockCacheKey("a"))
+    assert not storage.exists(MockCacheKey("b"))
+    assert storage.exists(MockCacheKey("d"))
+    assert storage.stats().evictions == 1
+
+
+def test_memory_storage_fifo_evicts_earliest_inserted():
+    storage = _new_storage(CachePolicy.FIFO)
+    for name in ["a", "b", "c"]:
+        storage.set(MockCacheKey(name), MockCacheValue(1000))
+    assert storage.get(MockCacheKey("a")) is not None
+    storage.set(MockCacheKey("d"), MockCacheValue(1000))
+
+    assert not storage.exists(MockCacheKey("a"))
+    assert storage.exists(MockCacheKey("b"))
+
+
+def test_memory_storage_lfu_rejects_infrequent_entry():
+    storage = _new_storage(CachePolicy.LFU)
+    for name in ["a", "b", "c"]:
+        storage.set(MockCacheKey(name), MockCacheValue(1000))
+        for _ in range(3):
+            storage.get(MockCacheKey(name))
+    # Seen only once, less frequent than every cached entry
+    storage.set(MockCacheKey("d"), MockCacheValue(1000))
+    assert not storage.exists(MockCacheKey("d"))
+    assert storage.stats().rejections == 1
+
+    for _ in range(5):
+        storage.get(MockCacheKey("e"))
+    storage.set(MockCacheKey("e"), MockCacheValue(1000))
+    assert storage.exists(MockCacheKey("e"))
+
+
+def test_memory_storage_ttl():
+    storage = _new_storage(ttl=60)
+    storage.set(MockCacheKey("a"), MockCacheValue())
+    storage.set(MockCacheKey("b"), MockCacheValue(), CacheConfig(ttl=0.01))
+    time.sleep(0.02)
+
+    assert storage.exists(MockCacheKey("a"))
+    assert not storage.exists(MockCacheKey("b"))
+    assert storage.stats().expirations == 1
+
+
+def test_memory_storage_stats_and_memory_usage():
+    storage = _new_storage()
+    storage.set(MockCacheKey("a"), MockCacheValue(100))
+    storage.set(MockCacheKey("a"), MockCacheValue(200))
+    storage.get(MockCacheKey("a"))
+    storage.get(MockCacheKey("b"))
+
+    stats = storage.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.hit_rate == 0.5
+    assert stats.size == 1
+    assert stats.memory_usage == 32 + 1 + 1 + 200
+
+    assert storage.delete(MockCacheKey("a"))
+    assert storage.stats().memory_usage == 0
+
+
+def test_memory_storage_skip_oversize_item():
+    storage = _new_storage()
+    storage.set(MockCacheKey("a"), MockCacheValue(5000))
+    assert len(storage) == 0
+    assert storage.stats().rejections == 1
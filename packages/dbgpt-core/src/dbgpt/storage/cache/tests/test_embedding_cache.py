@@ -0,0 +1,96 @@
+from typing import List
+
+import pytest
+
+from dbgpt.core import Embeddings
+
+from ..embedding_cache import CacheBackedEmbeddings, EmbeddingCache
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self, model_name: str = "mock"):
+        self.model_name = model_name
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_build_key():
+    key = EmbeddingCache.build_key("model", "text")
+    assert len(key) == 32
+    assert key == EmbeddingCache.build_key("model", "text")
+    assert key != EmbeddingCache.build_key("other", "text")
+
+
+def test_embed_documents_only_misses():
+    embeddings = MockEmbeddings()
+    cached = CacheBackedEmbeddings(embeddings, EmbeddingCache())
+
+    assert cached.embed_documents(["a", "bb"]) == [[1.0, 0.5], [2.0, 0.5]]
+    results = cached.embed_documents(["a", "ccc", "bb", "ccc"])
+    assert results == [[1.0, 0.5], [3.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+    assert embeddings.embedded == ["a", "bb", "ccc"]
+
+
+def test_query_not_cached():
+    embeddings = MockEmbeddings()
+    cached = CacheBackedEmbeddings(embeddings, EmbeddingCache())
+    cached.embed_query("a")
+    cached.embed_query("a")
+    assert embeddings.embedded == ["a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_aembed_documents():
+    embeddings = MockEmbeddings()
+    cached = CacheBackedEmbeddings(embeddings, EmbeddingCache())
+
+    await cached.aembed_documents(["a", "bb"])
+    assert await cached.aembed_documents(["bb", "a"]) == [[2.0, 0.5], [1.0, 0.5]]
+    assert embeddings.embedded == ["a", "bb"]
+
+
+def test_memory_bound():
+    embeddings = MockEmbeddings()
+    cached = CacheBackedEmbeddings(embeddings, EmbeddingCache(max_memory_entries=2))
+    cached.embed_documents(["a", "bb", "ccc"])
+    cached.embed_documents(["a"])
+    assert embeddings.embedded == ["a", "bb", "ccc", "a"]
+
+
+def test_persistent(tmp_path):
+    pytest.importorskip("rocksdict")
+    persist_dir = str(tmp_path / "embedding_cache")
+    cache = EmbeddingCache(persist_dir)
+    CacheBackedEmbeddings(MockEmbeddings(), cache).embed_documents(["a", "bb"])
+    cache.close()
+
+    embeddings = MockEmbeddings()
+    cache = EmbeddingCache(persist_dir)
+    results = CacheBackedEmbeddings(embeddings, cache).embed_documents(["bb", "c"])
+    assert results == [[2.0, 0.5], [1.0, 0.5]]
+    assert embeddings.embedded == ["c"]
+    cache.close()
+
+
+def test_key_by_backend():
+    class OtherEmbeddings(MockEmbeddings):
+        pass
+
+    cache = EmbeddingCache()
+    CacheBackedEmbeddings(MockEmbeddings(), cache).embed_documents(["a"])
+    normalized = MockEmbeddings()
+    normalized.encode_kwargs = {"normalize_embeddings": True}
+    other = OtherEmbeddings()
+    same = MockEmbeddings()
+    for embeddings in (normalized, other, same):
+        CacheBackedEmbeddings(embeddings, cache).embed_documents(["a"])
+    # The same model name of another backend or encode options is not a hit
+    assert normalized.embedded == ["a"]
+    assert other.embedded == ["a"]
+    assert same.embedded == []
@@ -0,0 +1,73 @@
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ..llm_cache import LLMCacheKey, LLMCacheValue
+from ..manager import TieredCacheManager
+from ..storage.base import MemoryCacheStorage
+
+
+class SyncMemoryCacheStorage(MemoryCacheStorage):
+    """A memory storage accessed through the thread executor, like disk storage."""
+
+    def support_async(self) -> bool:
+        return False
+
+
+@pytest.fixture
+def system_app():
+    system_app = SystemApp()
+    system_app.register(DefaultExecutorFactory)
+    return system_app
+
+
+@pytest.fixture
+def manager(system_app):
+    return TieredCacheManager(
+        system_app,
+        JsonSerializer(),
+        storage=SyncMemoryCacheStorage(),
+        l1_storage=MemoryCacheStorage(),
+    )
+
+
+def _new_key(manager: TieredCacheManager, prompt: str = "hello"):
+    key = LLMCacheKey(prompt=prompt, model_name="model")
+    key.set_serializer(manager.serializer)
+    return key
+
+
+def _new_value(manager: TieredCacheManager, text: str = "world"):
+    value = LLMCacheValue(output={"text": text, "error_code": 0})
+    value.set_serializer(manager.serializer)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_write_back_to_l2(manager: TieredCacheManager):
+    key = _new_key(manager)
+    await manager.set(key, _new_value(manager))
+    assert manager._l1_storage.exists(key)
+
+    await manager.flush()
+    assert manager._storage.exists(key)
+    value = await manager.get(key, LLMCacheValue)
+    assert value.get_value().output.text == "world"
+
+
+@pytest.mark.asyncio
+async def test_promote_l2_hit(manager: TieredCacheManager):
+    key = _new_key(manager)
+    manager._storage.set(key, _new_value(manager))
+    assert not manager._l1_storage.exists(key)
+
+    value = await manager.get(key, LLMCacheValue)
+    assert value.get_value().output.text == "world"
+    assert manager._l1_storage.exists(key)
+
+
+@pytest.mark.asyncio
+async def test_miss(manager: TieredCacheManager):
+    assert await manager.get(_new_key(manager, "missing"), LLMCacheValue) is None
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from dbgpt.core import Chunk
+
+from ..base import IndexStoreBase, IndexStoreConfig, LoadProgress
+
+
+class MockIndexStore(IndexStoreBase):
+    def __init__(self, fail_times: int = 0, delay: float = 0.01, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_times = fail_times
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.loaded: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def _enter(self, chunks: List[Chunk]):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                self.running -= 1
+                raise ValueError("mock error")
+
+    def _exit(self, chunks: List[Chunk]) -> List[str]:
+        with self._lock:
+            self.running -= 1
+            ids = [chunk.chunk_id for chunk in chunks]
+            self.loaded.append(ids)
+            return ids
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        self._enter(chunks)
+        # Later groups finish first
+        time.sleep(self.delay / (len(self.loaded) + 1))
+        return self._exit(chunks)
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        self._enter(chunks)
+        await asyncio.sleep(self.delay / (len(self.loaded) + 1))
+        return self._exit(chunks)
+
+    def similar_search_with_scores(self, text, topk, score_threshold, filters=None):
+        return []
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+
+def _chunks(n: int) -> List[Chunk]:
+    return [Chunk(content=f"chunk {i}", chunk_id=str(i)) for i in range(n)]
+
+
+def test_load_document_with_limit():
+    store = MockIndexStore()
+    progress: List[LoadProgress] = []
+    chunks = _chunks(25)
+
+    ids = store.load_document_with_limit(chunks, 4, 3, progress.append)
+    assert ids == [chunk.chunk_id for chunk in chunks]
+    assert store.max_running <= 3
+    assert len(progress) == 7
+    assert progress[-1].loaded_chunks == 25
+    assert all(p.total_chunks == 25 for p in progress)
+
+
+@pytest.mark.asyncio
+async def test_aload_document_with_limit_generator():
+    store = MockIndexStore()
+    progress: List[LoadProgress] = []
+    chunks = _chunks(25)
+
+    ids = await store.aload_document_with_limit(
+        (chunk for chunk in chunks), 4, 3, progress.append
+    )
+    assert ids == [chunk.chunk_id for chunk in chunks]
+    assert 1 < store.max_running <= 3
+    assert sorted(p.group_index for p in progress) == list(range(7))
+    assert all(p.total_chunks is None for p in progress)
+
+
+@pytest.mark.asyncio
+async def test_aload_document_with_limit_retry():
+    store = MockIndexStore(fail_times=2, max_retries=2)
+    progress: List[LoadProgress] = []
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("dbgpt.storage.base._retry_backoff", lambda retries: 0)
+        ids = await store.aload_document_with_limit(_chunks(3), 3, 1, progress.append)
+    assert ids == ["0", "1", "2"]
+    assert progress[0].retries == 2
+
+
+@pytest.mark.asyncio
+async def test_aload_document_with_limit_error():
+    store = MockIndexStore(fail_times=1)
+
+    with pytest.raises(RuntimeError, match="Failed to load chunk group 1"):
+        await store.aload_document_with_limit(_chunks(10), 2, 1)
+    # Stop producing new groups after a failure
+    assert len(store.loaded) == 0
+
+
+def test_load_document_with_limit_error():
+    store = MockIndexStore(fail_times=1)
+
+    # The error of a group not retried is raised as is
+    with pytest.raises(ValueError, match="mock error"):
+        store.load_document_with_limit(_chunks(10), 2, 1)
+
+    store = MockIndexStore(fail_times=2, max_retries=1)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("dbgpt.storage.base._retry_backoff", lambda retries: 0)
+        with pytest.raises(RuntimeError, match="Failed to load chunk group 1"):
+            store.load_document_with_limit(_chunks(10), 2, 1)
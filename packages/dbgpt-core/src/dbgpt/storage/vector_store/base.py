@@ -5,7 +5,7 @@ import math
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
 from dbgpt.core import Chunk, Embeddings
 from dbgpt.core.awel.flow import Parameter
@@ -14,6 +14,9 @@ from dbgpt.storage.vector_store.filters import MetadataFilters
 from dbgpt.util import RegisterParameters
 from dbgpt.util.executor_utils import blocking_func_to_async
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
 _VECTOR_STORE_COMMON_PARAMETERS = [
@@ -111,6 +114,129 @@ class VectorStoreConfig(IndexStoreConfig, RegisterParameters):
         raise NotImplementedError("Current vector store does not support create_store")
 
 
+def normalize_vectors(vectors: Any) -> "np.ndarray":
+    """Return the row-wise L2 normalized vectors.
+
+    Args:
+        vectors: A vector or a matrix whose rows are vectors.
+
+    Return:
+        np.ndarray: The float32 normalized vectors, the zero vectors are kept.
+    """
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def distances_to_scores(distances: Any, metric: str = "cosine") -> "np.ndarray":
+    """Convert the distances returned by a vector store to relevance scores.
+
+    Args:
+        distances: The distances.
+        metric(str): The distance metric, "cosine"(1 - distance), "l2"(1 - distance
+            / sqrt(2), for normalized vectors) or "ip"(negative inner product).
+
+    Return:
+        np.ndarray: The relevance scores, the higher is the more relevant.
+    """
+    import numpy as np
+
+    distances = np.asarray(distances, dtype=np.float64)
+    if metric == "cosine":
+        return 1.0 - distances
+    if metric == "l2":
+        return 1.0 - distances / math.sqrt(2)
+    if metric == "ip":
+        return -distances
+    raise ValueError(f"Unsupported distance metric: {metric}")
+
+
+def select_top_k(
+    scores: Any, topk: Optional[int] = None, score_threshold: Optional[float] = None
+) -> "np.ndarray":
+    """Select the indexes of the top k scores not lower than the threshold.
+
+    The candidates are selected by argpartition, only the selected ones are sorted.
+
+    Args:
+        scores: The scores.
+        topk(Optional[int]): The max number of indexes, None for no limit.
+        score_threshold(Optional[float]): The min score, None for no limit.
+
+    Return:
+        np.ndarray: The selected indexes, sorted by score in descending order.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.float64)
+    candidates = np.arange(len(scores))
+    if score_threshold is not None:
+        candidates = np.flatnonzero(scores >= score_threshold)
+    if topk is not None and 0 <= topk < len(candidates):
+        if topk == 0:
+            return candidates[:0]
+        part = np.argpartition(-scores[candidates], topk - 1)[:topk]
+        candidates = candidates[part]
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+def build_chunks_with_scores(
+    ids: Sequence[str],
+    contents: Sequence[str],
+    metadatas: Sequence[Optional[Dict[str, Any]]],
+    scores: Any,
+    topk: Optional[int] = None,
+    score_threshold: Optional[float] = None,
+) -> List[Chunk]:
+    """Build the chunks of the selected search results.
+
+    Only the top k results whose score is not lower than the threshold are built,
+    the metadata dicts are referenced rather than copied.
+
+    Args:
+        ids(Sequence[str]): The chunk ids.
+        contents(Sequence[str]): The chunk contents.
+        metadatas(Sequence[Optional[Dict[str, Any]]]): The chunk metadatas.
+        scores: The relevance scores.
+        topk(Optional[int]): The max number of chunks, None for no limit.
+        score_threshold(Optional[float]): The min score, None for no limit.
+
+    Return:
+        List[Chunk]: The chunks sorted by score in descending order.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.float64)
+    selected = select_top_k(scores, topk, score_threshold).tolist()
+    selected_scores = scores[selected].tolist()
+    return [
+        _construct_chunk(
+            chunk_id=ids[i],
+            content=contents[i],
+            metadata=metadatas[i] or {},
+            score=score,
+        )
+        for i, score in zip(selected, selected_scores)
+    ]
+
+
+def _construct_chunk(**values: Any) -> Chunk:
+    """Create a chunk from trusted values without validation."""
+    if hasattr(Chunk, "model_construct"):
+        return Chunk.model_construct(**values)
+    return Chunk.construct(**values)
+
+
+def _chunk_view(chunk: Chunk) -> Chunk:
+    """Return a shallow copy of a chunk, the metadata dict is shared."""
+    if hasattr(chunk, "model_copy"):
+        return chunk.model_copy()
+    return chunk.copy()
+
+
 class VectorStoreBase(IndexStoreBase, ABC):
     """Vector store base class."""
 
@@ -140,23 +266,22 @@ class VectorStoreBase(IndexStoreBase, ABC):
         Return:
             List[Chunks]: The filtered chunks.
         """
-        candidates_chunks = chunks
-        if score_threshold is not None:
-            candidates_chunks = [
-                Chunk(
-                    metadata=chunk.metadata,
-                    content=chunk.content,
-                    score=chunk.score,
-                    chunk_id=chunk.chunk_id,
-                )
-                for chunk in chunks
-                if chunk.score >= score_threshold
-            ]
-            if len(candidates_chunks) == 0:
-                logger.warning(
-                    "No relevant docs were retrieved using the relevance score"
-                    f" threshold {score_threshold}"
-                )
+        if score_threshold is None:
+            return chunks
+        import numpy as np
+
+        scores = np.fromiter(
+            (chunk.score for chunk in chunks), dtype=np.float64, count=len(chunks)
+        )
+        candidates_chunks = [
+            _chunk_view(chunks[i])
+            for i in np.flatnonzero(scores >= score_threshold).tolist()
+        ]
+        if len(candidates_chunks) == 0:
+            logger.warning(
+                "No relevant docs were retrieved using the relevance score"
+                f" threshold {score_threshold}"
+            )
         return candidates_chunks
 
     @abstractmethod
@@ -164,6 +289,66 @@ class VectorStoreBase(IndexStoreBase, ABC):
         """Whether vector name exists."""
         return False
 
+    def get_embeddings(self) -> Optional[Embeddings]:
+        """Get the embedding function of the vector store."""
+        return None
+
+    def is_support_search_by_vectors(self) -> bool:
+        """Whether the vector store supports searching by query vectors."""
+        return False
+
+    def similar_search_with_scores_by_vectors(
+        self,
+        vectors: List[List[float]],
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Similar search with scores by query vectors.
+
+        Args:
+            vectors(List[List[float]]): The query vectors.
+            topk(int): The number of similar documents to return of each vector.
+            score_threshold(float): score_threshold: Optional, a floating point value
+                between 0 to 1
+            filters(Optional[MetadataFilters]): metadata filters.
+        Return:
+            List[List[Chunk]]: The similar documents of each vector.
+        """
+        raise NotImplementedError
+
+    async def asimilar_search_with_scores_batch(
+        self,
+        queries: List[str],
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Async similar_search_with_score of multiple queries.
+
+        If the vector store supports searching by vectors, all queries are embedded
+        in one batch and searched with the query vectors, otherwise the searches are
+        issued concurrently.
+        """
+        embeddings = self.get_embeddings()
+        if (
+            len(queries) <= 1
+            or not embeddings
+            or not self.is_support_search_by_vectors()
+        ):
+            return await super().asimilar_search_with_scores_batch(
+                queries, topk, score_threshold, filters
+            )
+        vectors = await embeddings.aembed_queries(queries)
+        return await blocking_func_to_async(
+            self._executor,
+            self.similar_search_with_scores_by_vectors,
+            vectors,
+            topk,
+            score_threshold,
+            filters,
+        )
+
     def convert_metadata_filters(self, filters: MetadataFilters) -> Any:
         """Convert metadata filters to vector store filters.
 
@@ -175,12 +360,9 @@ class VectorStoreBase(IndexStoreBase, ABC):
     def _normalization_vectors(self, vectors):
         """Return L2-normalization vectors to scale[0,1].
 
-        Normalization vectors to scale[0,1].
+        Normalization vectors to scale[0,1], a matrix is normalized row by row.
         """
-        import numpy as np
-
-        norm = np.linalg.norm(vectors)
-        return vectors / norm
+        return normalize_vectors(vectors)
 
     def _default_relevance_score_fn(self, distance: float) -> float:
         """Return a similarity score on a scale [0, 1]."""
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from dbgpt.core import Chunk
+
+from ..base import (
+    VectorStoreBase,
+    build_chunks_with_scores,
+    distances_to_scores,
+    normalize_vectors,
+    select_top_k,
+)
+
+
+def test_normalize_vectors():
+    vectors = normalize_vectors([[3.0, 4.0], [0.0, 0.0], [1.0, 0.0]])
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(vectors, [[0.6, 0.8], [0.0, 0.0], [1.0, 0.0]])
+    np.testing.assert_allclose(normalize_vectors([0.0, 2.0]), [0.0, 1.0])
+
+
+def test_distances_to_scores():
+    np.testing.assert_allclose(distances_to_scores([0.0, 0.25]), [1.0, 0.75])
+    np.testing.assert_allclose(distances_to_scores([np.sqrt(2)], "l2"), [0.0])
+    np.testing.assert_allclose(distances_to_scores([-0.5], "ip"), [0.5])
+    with pytest.raises(ValueError):
+        distances_to_scores([0.0], "unknown")
+
+
+def test_select_top_k():
+    scores = [0.1, 0.9, 0.5, 0.7, 0.3]
+    assert select_top_k(scores).tolist() == [1, 3, 2, 4, 0]
+    assert select_top_k(scores, topk=2).tolist() == [1, 3]
+    assert select_top_k(scores, score_threshold=0.5).tolist() == [1, 3, 2]
+    assert select_top_k(scores, topk=10, score_threshold=0.8).tolist() == [1]
+    assert select_top_k(scores, topk=0).tolist() == []
+    assert select_top_k([]).tolist() == []
+
+
+def test_build_chunks_with_scores():
+    metadata = {"source": "a"}
+    chunks = build_chunks_with_scores(
+        ["1", "2", "3"],
+        ["a", "b", "c"],
+        [metadata, None, {}],
+        [0.2, 0.8, 0.5],
+        topk=2,
+        score_threshold=0.3,
+    )
+    assert [c.chunk_id for c in chunks] == ["2", "3"]
+    assert [c.score for c in chunks] == [0.8, 0.5]
+    assert chunks[0].metadata == {}
+
+    chunks = build_chunks_with_scores(["1"], ["a"], [metadata], [1.0])
+    assert chunks[0].metadata is metadata
+    assert chunks[0].content == "a"
+
+
+def test_filter_by_score_threshold():
+    metadata = {"source": "a"}
+    chunks = [
+        Chunk(content="a", score=0.2, metadata=metadata, summary="s"),
+        Chunk(content="b", score=0.8),
+        Chunk(content="c", score=0.5),
+    ]
+    # Call the method without creating a concrete store
+    filtered = VectorStoreBase.filter_by_score_threshold(None, chunks, 0.2)
+    assert [c.content for c in filtered] == ["a", "b", "c"]
+    assert filtered[0] is not chunks[0]
+    assert filtered[0].metadata is chunks[0].metadata
+    assert filtered[0].summary == "s"
+
+    filtered = VectorStoreBase.filter_by_score_threshold(None, chunks, 0.5)
+    assert [c.content for c in filtered] == ["b", "c"]
+    assert VectorStoreBase.filter_by_score_threshold(None, chunks, None) is chunks
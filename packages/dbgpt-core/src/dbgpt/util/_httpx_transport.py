@@ -0,0 +1,96 @@
+"""The httpx transports of the HTTP client pool.
+
+Imported lazily, httpx is an optional dependency.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from .http_client_pool import HttpClientPool
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """Dispatch the requests to the connections of the running loop."""
+
+    def __init__(
+        self,
+        pool: "HttpClientPool",
+        proxy: Optional[Any] = None,
+        limit_per_host: bool = True,
+    ):
+        self._pool = pool
+        self._proxy = proxy
+        self._limit_per_host = limit_per_host
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = self._pool._get_httpx_transport(self._proxy)
+        return await transport.handle_async_request(
+            request, limit_per_host=self._limit_per_host
+        )
+
+    async def aclose(self) -> None:
+        # The connections are owned by the pool
+        pass
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Limit the concurrent requests of a host and report the request metrics.
+
+    A host slot is held until the response headers are received, a streamed
+    response body does not hold it. The wait for a slot is bounded by the pool
+    timeout of the request.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_connections_per_host: Optional[int],
+        on_request: Callable[..., None],
+    ):
+        self._transport = transport
+        self._max_connections_per_host = max_connections_per_host
+        self._on_request = on_request
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(
+        self, request: httpx.Request, limit_per_host: bool = True
+    ) -> httpx.Response:
+        host = request.url.netloc.decode("ascii")
+        semaphore = None
+        if limit_per_host and self._max_connections_per_host:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self._max_connections_per_host)
+                self._semaphores[host] = semaphore
+            await _acquire(semaphore, request)
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            self._on_request(request.method, host, None, time.perf_counter() - start, e)
+            raise
+        finally:
+            if semaphore:
+                semaphore.release()
+        self._on_request(
+            request.method, host, response.status_code, time.perf_counter() - start
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+async def _acquire(semaphore: asyncio.Semaphore, request: httpx.Request) -> None:
+    timeout = request.extensions.get("timeout", {}).get("pool")
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise httpx.PoolTimeout(
+            f"Timed out waiting for a request slot of {request.url.host}",
+            request=request,
+        )
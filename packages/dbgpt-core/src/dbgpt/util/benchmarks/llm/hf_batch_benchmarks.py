@@ -0,0 +1,141 @@
+"""CPU benchmark of the continuous batching of the local huggingface models.
+
+Compare the throughput of the concurrent requests generated one by one by
+``model.generate`` (the default generate stream function) with the continuous
+batching engine, at different concurrency.
+
+Usage:
+    .. code-block:: shell
+
+        python -m dbgpt.util.benchmarks.llm.hf_batch_benchmarks \\
+            --model_path HuggingFaceTB/SmolLM2-135M-Instruct \\
+            --concurrency 1,2,4,8 --max_new_tokens 64
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from dbgpt.model.llm.llm_out.hf_batch_llm import batch_generate_stream_function
+from dbgpt.model.llm.llm_out.hf_chat_llm import huggingface_chat_generate_stream
+
+_QUESTIONS = [
+    "What is a vector database?",
+    "Write a SQL query to count the orders of every user.",
+    "Explain the difference between a process and a thread.",
+    "How does a B-tree index speed up queries?",
+    "Summarize the benefits of continuous batching.",
+    "What is the capital of France?",
+    "Give three tips to write readable Python code.",
+    "Why do language models use a KV cache?",
+]
+
+
+def build_prompts(tokenizer, num_prompts: int) -> List[str]:
+    prompts = []
+    for i in range(num_prompts):
+        messages = [{"role": "user", "content": _QUESTIONS[i % len(_QUESTIONS)]}]
+        if tokenizer.chat_template:
+            prompt = tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+        else:
+            prompt = messages[0]["content"]
+        prompts.append(prompt)
+    return prompts
+
+
+def run_requests(
+    generate_func: Callable, model, tokenizer, prompts: List[str], args
+) -> Tuple[float, int, float]:
+    """Run the requests concurrently.
+
+    Returns:
+        Tuple[float, int, float]: The seconds, the generated tokens and the mean
+            seconds to the first output.
+    """
+    first_output_secs: List[float] = []
+    tokens: List[int] = []
+    lock = threading.Lock()
+
+    def run(prompt: str):
+        params: Dict = {
+            "prompt": prompt,
+            "max_new_tokens": args.max_new_tokens,
+            "do_sample": False,
+            "temperature": 0.0,
+        }
+        start = time.perf_counter()
+        first = None
+        output = None
+        for output in generate_func(model, tokenizer, params, "cpu", 4096):
+            if first is None:
+                first = time.perf_counter() - start
+        with lock:
+            first_output_secs.append(first or 0.0)
+            tokens.append(output.usage["completion_tokens"] if output else 0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(len(prompts)) as executor:
+        list(executor.map(run, prompts))
+    secs = time.perf_counter() - start
+    return secs, sum(tokens), sum(first_output_secs) / len(first_output_secs)
+
+
+def run_benchmark(args):
+    torch.set_num_threads(args.num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    model = AutoModelForCausalLM.from_pretrained(
+        args.model_path, torch_dtype=torch.float32
+    ).eval()
+    print(
+        f"model={args.model_path}, max_new_tokens={args.max_new_tokens}, "
+        f"threads={torch.get_num_threads()}"
+    )
+    print(
+        f"{'concurrency':>11} {'mode':>10} {'secs':>8} {'tokens':>7} "
+        f"{'tokens/s':>9} {'first_s':>8} {'speedup':>8}"
+    )
+    for concurrency in args.concurrency:
+        prompts = build_prompts(tokenizer, concurrency)
+        baseline = None
+        modes = [
+            ("one_by_one", huggingface_chat_generate_stream),
+            ("batching", batch_generate_stream_function(concurrency)),
+        ]
+        for mode, generate_func in modes:
+            # Warm up
+            run_requests(generate_func, model, tokenizer, prompts[:1], args)
+            secs, tokens, first_secs = run_requests(
+                generate_func, model, tokenizer, prompts, args
+            )
+            throughput = tokens / secs
+            if baseline is None:
+                baseline = throughput
+            # A new engine for the next batch size
+            model._dbgpt_batch_engine = None
+            print(
+                f"{concurrency:>11} {mode:>10} {secs:>8.2f} {tokens:>7} "
+                f"{throughput:>9.1f} {first_secs:>8.2f} "
+                f"{throughput / baseline:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model_path", type=str, default="HuggingFaceTB/SmolLM2-135M-Instruct"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 2, 4, 8],
+    )
+    parser.add_argument("--max_new_tokens", type=int, default=64)
+    parser.add_argument("--num_threads", type=int, default=4)
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,118 @@
+"""CPU benchmark of the local rerank models.
+
+Compare scoring all the candidates in one padded batch with the length sorted
+micro-batches of RerankBatchEngine.
+
+Usage:
+    .. code-block:: shell
+
+        python -m dbgpt.util.benchmarks.rerank.rerank_benchmarks \\
+            --model_type cross_encoder --model_path BAAI/bge-reranker-base \\
+            --num_candidates 128 --micro_batch_sizes 0,8,16,32
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from dbgpt.rag.embedding.rerank import (
+    CrossEncoderRerankEmbeddings,
+    QwenRerankEmbeddings,
+)
+
+_WORDS = (
+    "the database query returns rows of a table joined with another table "
+    "DB-GPT builds data applications with agents knowledge graphs and workflows "
+    "a vector store saves the embeddings of the document chunks for retrieval"
+).split()
+
+
+def build_candidates(num_candidates: int, max_words: int, seed: int) -> List[str]:
+    """Build candidates with a long tail length distribution, like real chunks."""
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(num_candidates):
+        num_words = min(max_words, int(rng.paretovariate(1.2) * 16))
+        candidates.append(" ".join(rng.choice(_WORDS) for _ in range(num_words)))
+    return candidates
+
+
+def padding_efficiency(lengths: List[List[int]]) -> float:
+    """Return the real tokens / the padded tokens of the batches."""
+    real = sum(sum(batch) for batch in lengths)
+    padded = sum(max(batch) * len(batch) for batch in lengths if batch)
+    return real / padded if padded else 1.0
+
+
+def load_model(model_type: str, model_path: str, micro_batch_size: int):
+    if model_type == "qwen":
+        return QwenRerankEmbeddings(
+            model_name=model_path, device="cpu", micro_batch_size=micro_batch_size
+        )
+    return CrossEncoderRerankEmbeddings(
+        model_name=model_path,
+        model_kwargs={"device": "cpu"},
+        micro_batch_size=micro_batch_size,
+    )
+
+
+def run_benchmark(args):
+    candidates = build_candidates(args.num_candidates, args.max_words, args.seed)
+    query = "How does DB-GPT retrieve the chunks of a document?"
+    print(
+        f"model_type={args.model_type}, candidates={len(candidates)}, "
+        f"max_words={args.max_words}, runs={args.runs}"
+    )
+    print(
+        f"{'micro_batch_size':>16} {'padding_eff':>11} {'first_ms':>9} "
+        f"{'avg_ms':>9} {'cands/s':>9}"
+    )
+    baseline = None
+    for micro_batch_size in args.micro_batch_sizes:
+        model = load_model(args.model_type, args.model_path, micro_batch_size)
+        # The first run tokenizes the candidates, the others hit the cache
+        start = time.perf_counter()
+        scores = model.predict(query, candidates)
+        first_ms = (time.perf_counter() - start) * 1000
+        engine = model._engine
+        batches = [
+            [len(engine.encode(candidates[i])) for i in indices]
+            for indices in engine.micro_batches(candidates)
+        ]
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            model.predict(query, candidates)
+        avg_ms = (time.perf_counter() - start) * 1000 / args.runs
+        if baseline is None:
+            baseline = scores
+        else:
+            max_diff = max(abs(a - b) for a, b in zip(baseline, scores))
+            assert max_diff < 1e-3, f"Scores differ from the baseline: {max_diff}"
+        print(
+            f"{micro_batch_size:>16} {padding_efficiency(batches):>11.2%} "
+            f"{first_ms:>9.1f} {avg_ms:>9.1f} "
+            f"{len(candidates) * 1000 / avg_ms:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model_type",
+        type=str,
+        default="cross_encoder",
+        choices=["cross_encoder", "qwen"],
+    )
+    parser.add_argument("--model_path", type=str, default="BAAI/bge-reranker-base")
+    parser.add_argument("--num_candidates", type=int, default=128)
+    parser.add_argument("--max_words", type=int, default=400)
+    parser.add_argument(
+        "--micro_batch_sizes",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[0, 8, 16, 32],
+        help="0 scores all the candidates in one batch, the baseline",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    run_benchmark(parser.parse_args())
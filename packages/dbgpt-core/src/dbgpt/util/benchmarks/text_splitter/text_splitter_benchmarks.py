@@ -0,0 +1,150 @@
+"""Benchmark of the text splitters on multi-MB inputs.
+
+Compare the sliding window merging of the splitters with the previous merging,
+which copied the window list on every dropped piece and measured the pieces
+again, and splitting a batch of documents in a process pool.
+
+Usage:
+    .. code-block:: shell
+
+        python -m dbgpt.util.benchmarks.text_splitter.text_splitter_benchmarks \\
+            --size_mb 4 --chunk_size 4000 --chunk_overlap 200 --max_workers 4
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+
+from dbgpt.core import Document
+from dbgpt.rag.text_splitter.text_splitter import (
+    CharacterTextSplitter,
+    RecursiveCharacterTextSplitter,
+    TextSplitter,
+)
+
+_WORDS = (
+    "the database query returns rows of a table joined with another table "
+    "DB-GPT builds data applications with agents knowledge graphs and workflows "
+    "a vector store saves the embeddings of the document chunks for retrieval"
+).split()
+
+
+def build_text(size_mb: float, seed: int) -> str:
+    """Build a text of sentences, lines and a few long paragraphs."""
+    rng = random.Random(seed)
+    size = int(size_mb * 1024 * 1024)
+    parts: List[str] = []
+    total = 0
+    while total < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 40)))
+        part = words + rng.choice([". ", ".\n", ".\n\n", "\n###\n"])
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
+
+
+def _legacy_merge_pieces(
+    splitter: TextSplitter,
+    pieces,
+    separator: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    lengths=None,
+) -> List[str]:
+    """The previous merging, the window list is copied on every dropped piece."""
+    length_function = splitter._length_function
+    separator_len = length_function(separator)
+    docs = []
+    current_doc: List[str] = []
+    total = 0
+    for d in pieces:
+        _len = length_function(d)
+        if total + _len + (separator_len if len(current_doc) > 0 else 0) > chunk_size:
+            if len(current_doc) > 0:
+                doc = splitter._join_docs(current_doc, separator)
+                if doc is not None:
+                    docs.append(doc)
+                while total > chunk_overlap or (
+                    total + _len + (separator_len if len(current_doc) > 0 else 0)
+                    > chunk_size
+                    and total > 0
+                ):
+                    total -= length_function(current_doc[0]) + (
+                        separator_len if len(current_doc) > 1 else 0
+                    )
+                    current_doc = current_doc[1:]
+        current_doc.append(d)
+        total += _len + (separator_len if len(current_doc) > 1 else 0)
+    doc = splitter._join_docs(current_doc, separator)
+    if doc is not None:
+        docs.append(doc)
+    return docs
+
+
+def _timeit(func: Callable[[], List], runs: int):
+    result: Optional[List] = None
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / runs, result
+
+
+def run_benchmark(args):
+    text = build_text(args.size_mb, args.seed)
+    print(
+        f"size={len(text) / 1024 / 1024:.1f}MB, chunk_size={args.chunk_size}, "
+        f"chunk_overlap={args.chunk_overlap}, runs={args.runs}"
+    )
+    print(f"{'case':>32} {'legacy_ms':>10} {'new_ms':>10} {'speedup':>8} {'chunks':>7}")
+    kwargs = {"chunk_size": args.chunk_size, "chunk_overlap": args.chunk_overlap}
+    cases = [
+        ("recursive", RecursiveCharacterTextSplitter(**kwargs)),
+        ("character(' ')", CharacterTextSplitter(separator=" ", **kwargs)),
+        ("character('')", CharacterTextSplitter(separator="", **kwargs)),
+    ]
+    for name, splitter in cases:
+        new_ms, new_chunks = _timeit(lambda: splitter.split_text(text), args.runs)
+        # Replace the merging of this splitter with the previous one
+        splitter._merge_pieces = (  # type: ignore
+            lambda *a, s=splitter: _legacy_merge_pieces(s, *a)
+        )
+        legacy_ms, legacy_chunks = _timeit(lambda: splitter.split_text(text), args.runs)
+        assert new_chunks == legacy_chunks, f"{name}: chunks differ from legacy"
+        print(
+            f"{name:>32} {legacy_ms:>10.1f} {new_ms:>10.1f} "
+            f"{legacy_ms / new_ms:>7.1f}x {len(new_chunks):>7}"
+        )
+
+    # A corpus of documents split in the current process and in a process pool
+    size = len(text) // args.num_documents
+    documents = [
+        Document(content=text[i * size : (i + 1) * size], metadata={"i": i})
+        for i in range(args.num_documents)
+    ]
+    splitter = RecursiveCharacterTextSplitter(**kwargs)
+    sequential_ms, chunks = _timeit(
+        lambda: splitter.split_documents(documents), args.runs
+    )
+    parallel_ms, parallel_chunks = _timeit(
+        lambda: splitter.split_documents(documents, max_workers=args.max_workers),
+        args.runs,
+    )
+    assert [c.content for c in chunks] == [c.content for c in parallel_chunks]
+    print(
+        f"{f'split_documents(workers={args.max_workers})':>32} "
+        f"{sequential_ms:>10.1f} {parallel_ms:>10.1f} "
+        f"{sequential_ms / parallel_ms:>7.1f}x {len(chunks):>7}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size_mb", type=float, default=4)
+    parser.add_argument("--chunk_size", type=int, default=4000)
+    parser.add_argument("--chunk_overlap", type=int, default=200)
+    parser.add_argument("--num_documents", type=int, default=64)
+    parser.add_argument("--max_workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    run_benchmark(parser.parse_args())
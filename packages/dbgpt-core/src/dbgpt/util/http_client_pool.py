@@ -0,0 +1,289 @@
+"""A shared pool of async HTTP connections.
+
+The OpenAI compatible embedding, rerank and proxy LLM clients send many small
+requests to a few hosts, creating a client per request pays a TCP and TLS handshake
+every time. The pool keeps the connections alive and shares them between all the
+clients of the process.
+
+Two kinds of clients are provided: aiohttp sessions, and httpx clients (required by
+the OpenAI SDK, support HTTP/2).
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from dbgpt.component import BaseComponent, ComponentType, SystemApp
+
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_default_pool: Optional["HttpClientPool"] = None
+_default_pool_lock = threading.Lock()
+
+
+@dataclass
+class HttpRequestMetrics:
+    """The metrics of a request sent through the pool."""
+
+    method: str
+    host: str
+    status_code: Optional[int]
+    # Seconds from sending the request to receiving the response headers
+    elapsed: float
+    error: Optional[BaseException] = None
+
+
+MetricsHook = Callable[[HttpRequestMetrics], None]
+
+
+class HttpClientPool(BaseComponent):
+    """A lifecycle managed pool of async HTTP connections.
+
+    The connections of asyncio can't be shared between event loops, the pool keeps
+    an aiohttp session and the httpx transports for each event loop. The httpx
+    clients returned by :meth:`client` are thin wrappers which dispatch their
+    requests to the connections of the running loop, they can be created anywhere
+    and closing them does not close the connections.
+
+    Example:
+        .. code-block:: python
+
+            pool = get_http_client_pool()
+            async with pool.session().post(url, json=data) as resp:
+                result = await resp.json()
+
+            client = pool.client()
+            resp = await client.post(url, json=data)
+    """
+
+    name = ComponentType.HTTP_CLIENT_POOL
+
+    def __init__(
+        self,
+        system_app: Optional[SystemApp] = None,
+        max_connections: int = 1000,
+        max_keepalive_connections: int = 100,
+        max_connections_per_host: Optional[int] = None,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        metrics_hook: Optional[MetricsHook] = None,
+    ):
+        """Create a new HttpClientPool.
+
+        Args:
+            system_app (Optional[SystemApp]): The system app.
+            max_connections (int): The max connections of each event loop.
+            max_keepalive_connections (int): The max idle connections kept alive by
+                the httpx clients.
+            max_connections_per_host (Optional[int]): The max concurrent requests
+                to one host, None for no limit. A request of the httpx clients holds
+                its slot until the response headers are received.
+            keepalive_expiry (float): The seconds to keep an idle connection.
+            http2 (bool): Whether the httpx clients use HTTP/2 when the server
+                supports it, only enabled when the `h2` package is installed.
+            metrics_hook (Optional[MetricsHook]): Called with the metrics of every
+                request.
+        """
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._max_connections_per_host = max_connections_per_host
+        self._keepalive_expiry = keepalive_expiry
+        self._http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._metrics_hook = metrics_hook
+        # Event loop -> connections, dropped with the event loop
+        self._loops: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        super().__init__(system_app)
+
+    def init_app(self, system_app: SystemApp):
+        """Initialize the pool, it becomes the default pool of the process."""
+        global _default_pool
+        with _default_pool_lock:
+            _default_pool = self
+
+    @property
+    def http2(self) -> bool:
+        """Whether HTTP/2 is enabled for the httpx clients."""
+        return self._http2
+
+    def set_metrics_hook(self, metrics_hook: Optional[MetricsHook]) -> None:
+        """Set the hook called with the metrics of every request."""
+        self._metrics_hook = metrics_hook
+
+    def session(self) -> "aiohttp.ClientSession":
+        """Return the aiohttp session of the running event loop.
+
+        The session is shared, pass the headers and timeout per request and do not
+        close it.
+        """
+        connections = self._get_loop_connections()
+        if connections.session is None or connections.session.closed:
+            connections.session = self._create_session()
+        return connections.session
+
+    def client(
+        self,
+        proxy: Optional[Any] = None,
+        limit_per_host: bool = True,
+        **kwargs,
+    ) -> "httpx.AsyncClient":
+        """Create a httpx client which sends its requests through the pool.
+
+        Args:
+            proxy (Optional[Any]): The proxy of the requests, a URL or a
+                `httpx.Proxy`.
+            limit_per_host (bool): Whether the requests of the client are limited
+                by `max_connections_per_host`. Disable it for the clients whose
+                concurrency is bounded by the server, e.g. the model workers.
+            **kwargs: Other arguments of `httpx.AsyncClient`, e.g. headers, timeout.
+
+        Returns:
+            httpx.AsyncClient: The client.
+        """
+        import httpx
+
+        from ._httpx_transport import PoolTransport
+
+        return httpx.AsyncClient(
+            transport=PoolTransport(self, proxy, limit_per_host), **kwargs
+        )
+
+    async def aclose(self) -> None:
+        """Close the connections of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            connections = self._loops.pop(loop, None)
+        if not connections:
+            return
+        if connections.session is not None:
+            await connections.session.close()
+        for transport in connections.transports.values():
+            await transport.aclose()
+
+    async def async_before_stop(self):
+        """Close the connections before the system app stops."""
+        await self.aclose()
+
+    def _get_loop_connections(self) -> "_LoopConnections":
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            connections = self._loops.get(loop)
+            if connections is None:
+                connections = _LoopConnections()
+                self._loops[loop] = connections
+            return connections
+
+    def _create_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            self._on_request(
+                params.method,
+                _aiohttp_host(params.url),
+                params.response.status,
+                time.perf_counter() - ctx.start,
+            )
+
+        async def on_request_exception(session, ctx, params):
+            self._on_request(
+                params.method,
+                _aiohttp_host(params.url),
+                None,
+                time.perf_counter() - ctx.start,
+                params.exception,
+            )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        connector = aiohttp.TCPConnector(
+            limit=self._max_connections,
+            limit_per_host=self._max_connections_per_host or 0,
+            keepalive_timeout=self._keepalive_expiry,
+        )
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    def _get_httpx_transport(self, proxy: Optional[Any]) -> "httpx.AsyncBaseTransport":
+        import httpx
+
+        from ._httpx_transport import MeteredTransport
+
+        connections = self._get_loop_connections()
+        key = None if proxy is None else str(proxy)
+        transport = connections.transports.get(key)
+        if transport is None:
+            kwargs: Dict[str, Any] = {
+                "limits": httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_keepalive_connections,
+                    keepalive_expiry=self._keepalive_expiry,
+                ),
+                "http2": self._http2,
+            }
+            if proxy:
+                kwargs["proxy"] = proxy
+            transport = MeteredTransport(
+                self._create_httpx_transport(**kwargs),
+                self._max_connections_per_host,
+                self._on_request,
+            )
+            connections.transports[key] = transport
+        return transport
+
+    def _create_httpx_transport(self, **kwargs) -> "httpx.AsyncBaseTransport":
+        import httpx
+
+        return httpx.AsyncHTTPTransport(**kwargs)
+
+    def _on_request(
+        self,
+        method: str,
+        host: str,
+        status_code: Optional[int],
+        elapsed: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if not self._metrics_hook:
+            return
+        try:
+            self._metrics_hook(
+                HttpRequestMetrics(method, host, status_code, elapsed, error)
+            )
+        except Exception as e:
+            logger.warning(f"Error in http metrics hook: {e}")
+
+
+class _LoopConnections:
+    """The connections of an event loop."""
+
+    def __init__(self):
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self.transports: Dict[Optional[str], "httpx.AsyncBaseTransport"] = {}
+
+
+def _aiohttp_host(url: Any) -> str:
+    if url.is_default_port():
+        return url.host
+    return f"{url.host}:{url.port}"
+
+
+def get_http_client_pool() -> HttpClientPool:
+    """Return the pool registered in the system app, or a default pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = HttpClientPool()
+        return _default_pool
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from dbgpt.component import SystemApp
+from dbgpt.rag.embedding.embeddings import OpenAPIEmbeddings
+from dbgpt.util.http_client_pool import HttpClientPool, get_http_client_pool
+
+
+@pytest_asyncio.fixture
+async def server():
+    state = {"peers": set(), "running": 0, "max_running": 0}
+
+    async def embeddings(request: web.Request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        data = await request.json()
+        return web.json_response(
+            {
+                "data": [
+                    {"index": i, "embedding": [float(len(t))]}
+                    for i, t in enumerate(data["input"])
+                ]
+            }
+        )
+
+    async def slow(request: web.Request):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/embeddings", embeddings)
+    app.router.add_get("/slow", slow)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}"
+    yield state
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_session_keep_alive(server):
+    metrics = []
+    pool = HttpClientPool(metrics_hook=metrics.append)
+    session = pool.session()
+    for _ in range(3):
+        async with session.post(
+            server["url"] + "/embeddings", json={"input": ["a"]}
+        ) as resp:
+            assert resp.status == 200
+    assert pool.session() is session
+    assert len(server["peers"]) == 1
+    assert [m.status_code for m in metrics] == [200, 200, 200]
+    assert metrics[0].method == "POST"
+    await pool.aclose()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_httpx_client_per_host_limit(server):
+    pool = HttpClientPool(max_connections_per_host=2)
+    # Clients are thin wrappers, closing one keeps the connections of the pool
+    async with pool.client() as client:
+        resp = await client.get(server["url"] + "/slow")
+        assert resp.json() == {"ok": True}
+
+    client = pool.client()
+    responses = await asyncio.gather(
+        *[client.get(server["url"] + "/slow") for _ in range(6)]
+    )
+    assert all(resp.status_code == 200 for resp in responses)
+    assert server["max_running"] <= 2
+
+    # The slots are released once the headers are received, the open streams do
+    # not hold them
+    async with client.stream("GET", server["url"] + "/slow"):
+        async with client.stream("GET", server["url"] + "/slow"):
+            resp = await asyncio.wait_for(
+                client.get(server["url"] + "/slow"), timeout=5
+            )
+            assert resp.status_code == 200
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_httpx_client_per_host_pool_timeout(server):
+    assert HttpClientPool()._max_connections_per_host is None
+    pool = HttpClientPool(max_connections_per_host=1)
+    client = pool.client(timeout=httpx.Timeout(5, pool=0.01))
+    results = await asyncio.gather(
+        *[client.get(server["url"] + "/slow") for _ in range(2)],
+        return_exceptions=True,
+    )
+    # The wait for a host slot is bounded by the pool timeout
+    assert sum(isinstance(r, httpx.PoolTimeout) for r in results) == 1
+
+    # The clients exempted from the cap share the connections but not the slots
+    client = pool.client(limit_per_host=False, timeout=httpx.Timeout(5, pool=0.01))
+    responses = await asyncio.gather(
+        *[client.get(server["url"] + "/slow") for _ in range(3)]
+    )
+    assert all(resp.status_code == 200 for resp in responses)
+    assert server["max_running"] > 1
+    await pool.aclose()
+
+
+def test_registered_pool_is_default():
+    system_app = SystemApp()
+    pool = system_app.register(HttpClientPool)
+    assert get_http_client_pool() is pool
+    assert HttpClientPool.get_instance(system_app) is pool
+
+
+@pytest.mark.asyncio
+async def test_openapi_embeddings_use_pool(server):
+    system_app = SystemApp()
+    metrics = []
+    system_app.register(HttpClientPool, metrics_hook=metrics.append)
+    embeddings = OpenAPIEmbeddings(
+        api_url=server["url"] + "/embeddings", api_key="key", model_name="m"
+    )
+    for _ in range(2):
+        assert await embeddings.aembed_documents(["a", "bb"]) == [[1.0], [2.0]]
+    assert len(server["peers"]) == 1
+    assert len(metrics) == 2
+    await get_http_client_pool().aclose()
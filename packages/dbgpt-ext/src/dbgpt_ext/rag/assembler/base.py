@@ -1,7 +1,9 @@
 """Base Assembler."""
 
+import asyncio
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Iterator, List, Optional
 
 from dbgpt.core import Chunk
 from dbgpt.rag.knowledge.base import Knowledge
@@ -11,6 +13,8 @@ from dbgpt.util.tracer import root_tracer
 
 from ..chunk_manager import ChunkManager, ChunkParameters
 
+_END_OF_STREAM = object()
+
 
 class BaseAssembler(ABC):
     """Base Assembler."""
@@ -20,6 +24,8 @@ class BaseAssembler(ABC):
         knowledge: Knowledge,
         chunk_parameters: Optional[ChunkParameters] = None,
         extractor: Optional[ExtractorBase] = None,
+        streaming: bool = False,
+        queue_depth: int = 8,
         **kwargs: Any,
     ) -> None:
         """Initialize with Assembler arguments.
@@ -29,7 +35,15 @@ class BaseAssembler(ABC):
             chunk_parameters: (Optional[ChunkParameters]) ChunkManager to use for
                 chunking.
             extractor(Optional[ExtractorBase]):  ExtractorBase to use for summarization.
+            streaming(bool): Whether to stream the knowledge, if True, the knowledge
+                is not loaded on initialization, the documents are loaded, split and
+                persisted batch by batch, and `get_chunks` returns an empty list.
+                Only the assemblers which support streaming accept it.
+            queue_depth(int): The max chunk batches buffered between the loading and
+                the persisting stages in streaming mode.
         """
+        if streaming and not self.support_streaming():
+            raise ValueError(f"{self.__class__.__name__} does not support streaming.")
         self._knowledge = knowledge
         self._chunk_parameters = chunk_parameters or ChunkParameters()
         self._extractor = extractor
@@ -37,6 +51,9 @@ class BaseAssembler(ABC):
             knowledge=self._knowledge, chunk_parameter=self._chunk_parameters
         )
         self._chunks: List[Chunk] = []
+        self._streaming = streaming
+        self._queue_depth = max(queue_depth, 1)
+        self._chunk_count = 0
         metadata = {
             "knowledge_cls": (
                 self._knowledge.__class__.__name__ if self._knowledge else None
@@ -49,6 +66,10 @@ class BaseAssembler(ABC):
             ),
             "chunk_parameters": self._chunk_parameters.dict(),
         }
+        if streaming:
+            if not knowledge:
+                raise ValueError("knowledge must be provided.")
+            return
         with root_tracer.start_span("BaseAssembler.load_knowledge", metadata=metadata):
             self.load_knowledge(self._knowledge)
 
@@ -61,6 +82,82 @@ class BaseAssembler(ABC):
         with root_tracer.start_span("BaseAssembler.chunk_manager.split"):
             self._chunks = self._chunk_manager.split(documents)
 
+    def iter_chunks(self) -> Iterator[Chunk]:
+        """Load and split the knowledge lazily.
+
+        The documents are split as soon as they are loaded, only one document and
+        its chunks are held in memory at a time.
+        """
+        documents = self._knowledge.iter_load()
+        for chunk in self._chunk_manager.iter_split(documents):
+            self._chunk_count += 1
+            yield chunk
+
+    async def aiter_chunks(self, batch_size: int = 64) -> AsyncIterator[Chunk]:
+        """Load and split the knowledge lazily in a background thread.
+
+        The loading and splitting run in a thread and hand the chunks over in
+        batches through a bounded queue, so parsing overlaps with the consumer and
+        at most queue_depth batches are buffered.
+
+        Args:
+            batch_size(int): The number of chunks handed over at once.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_depth)
+        stopped = threading.Event()
+
+        def _put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def _produce() -> None:
+            try:
+                batch: List[Chunk] = []
+                for chunk in self.iter_chunks():
+                    batch.append(chunk)
+                    if len(batch) >= batch_size:
+                        if stopped.is_set():
+                            return
+                        _put(batch)
+                        batch = []
+                if batch and not stopped.is_set():
+                    _put(batch)
+                if not stopped.is_set():
+                    _put(_END_OF_STREAM)
+            except Exception as e:
+                if not stopped.is_set():
+                    _put(e)
+
+        producer = loop.run_in_executor(None, _produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for chunk in item:
+                    yield chunk
+        finally:
+            stopped.set()
+            # The producer checks stopped before every put, so at most one put is
+            # still pending, free the slots to unblock it
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+    @classmethod
+    def support_streaming(cls) -> bool:
+        """Whether the assembler can persist the chunks in streaming mode."""
+        return False
+
+    @property
+    def chunk_count(self) -> int:
+        """Return the number of chunks split so far."""
+        if not self._streaming:
+            return len(self._chunks)
+        return self._chunk_count
+
     @abstractmethod
     def as_retriever(self, **kwargs: Any) -> BaseRetriever:
         """Return a retriever."""
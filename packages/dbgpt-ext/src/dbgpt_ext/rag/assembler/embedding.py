@@ -69,6 +69,7 @@ class EmbeddingAssembler(BaseAssembler):
         embedding_model: Optional[str] = None,
         embeddings: Optional[Embeddings] = None,
         retrieve_strategy: Optional[RetrieverStrategy] = RetrieverStrategy.EMBEDDING,
+        streaming: bool = False,
     ) -> "EmbeddingAssembler":
         """Load document embedding into vector store from path.
 
@@ -80,6 +81,8 @@ class EmbeddingAssembler(BaseAssembler):
             embedding_model: (Optional[str]) Embedding model to use.
             embeddings: (Optional[Embeddings]) Embeddings to use.
             retrieve_strategy: (Optional[RetrieverStrategy]) Retriever strategy.
+            streaming: (bool) Whether to load, split and persist the knowledge
+                batch by batch.
 
         Returns:
              EmbeddingAssembler
@@ -91,6 +94,7 @@ class EmbeddingAssembler(BaseAssembler):
             embedding_model=embedding_model,
             embeddings=embeddings,
             retrieve_strategy=retrieve_strategy,
+            streaming=streaming,
         )
 
     @classmethod
@@ -101,6 +105,7 @@ class EmbeddingAssembler(BaseAssembler):
         chunk_parameters: Optional[ChunkParameters] = None,
         executor: Optional[ThreadPoolExecutor] = None,
         retrieve_strategy: Optional[RetrieverStrategy] = RetrieverStrategy.EMBEDDING,
+        streaming: bool = False,
     ) -> "EmbeddingAssembler":
         """Load document embedding into vector store from path.
 
@@ -111,6 +116,8 @@ class EmbeddingAssembler(BaseAssembler):
             index_store: (IndexStoreBase) Index store to use.
             executor: (Optional[ThreadPoolExecutor) ThreadPoolExecutor to use.
             retrieve_strategy: (Optional[RetrieverStrategy]) Retriever strategy.
+            streaming: (bool) Whether to load, split and persist the knowledge
+                batch by batch.
 
         Returns:
              EmbeddingAssembler
@@ -123,29 +130,46 @@ class EmbeddingAssembler(BaseAssembler):
             index_store,
             chunk_parameters,
             retrieve_strategy,
+            streaming=streaming,
         )
 
+    @classmethod
+    def support_streaming(cls) -> bool:
+        """Whether the assembler can persist the chunks in streaming mode."""
+        return True
+
     def persist(self, **kwargs) -> List[str]:
         """Persist chunks into store.
 
+        In streaming mode, the chunks are split lazily and loaded group by group,
+        the splitting overlaps with loading the previous groups.
+
         Returns:
             List[str]: List of chunk ids.
         """
         max_chunks_once_load = kwargs.get("max_chunks_once_load")
         max_threads = kwargs.get("max_threads")
+        chunks = self.iter_chunks() if self._streaming else self._chunks
         return self._index_store.load_document_with_limit(
-            self._chunks, max_chunks_once_load, max_threads
+            chunks, max_chunks_once_load, max_threads
         )
 
     async def apersist(self, **kwargs) -> List[str]:
         """Persist chunks into store.
 
+        In streaming mode, the knowledge is loaded and split in a background thread
+        while the chunks are embedded and written to the store.
+
         Returns:
             List[str]: List of chunk ids.
         """
         # persist chunks into vector store
         max_chunks_once_load = kwargs.get("max_chunks_once_load")
         max_threads = kwargs.get("max_threads")
+        if self._streaming:
+            return await self._index_store.aload_document_with_limit(
+                self.aiter_chunks(), max_chunks_once_load, max_threads
+            )
         return await self._index_store.aload_document_with_limit(
             self._chunks, max_chunks_once_load, max_threads
         )
@@ -1,7 +1,7 @@
 """Module for ChunkManager."""
 
 from enum import Enum
-from typing import Any, List, Optional
+from typing import Any, Iterable, Iterator, List, Optional
 
 from dbgpt._private.pydantic import BaseModel, Field
 from dbgpt.core import Chunk, Document
@@ -146,10 +146,22 @@ class ChunkManager:
         )
         self._text_splitter = self._chunk_parameters.text_splitter
         self._splitter_type = self._chunk_parameters.splitter_type
+        if self._knowledge and not self._text_splitter:
+            # The chunk size of a custom text splitter is unknown
+            self._knowledge.set_chunk_size(self._chunk_parameters.chunk_size)
 
     def split(self, documents: List[Document]) -> List[Chunk]:
         """Split a document into chunks."""
         text_splitter = self._select_text_splitter()
+        return self._split(text_splitter, documents)
+
+    def iter_split(self, documents: Iterable[Document]) -> Iterator[Chunk]:
+        """Split documents into chunks lazily, document by document."""
+        text_splitter = self._select_text_splitter()
+        for document in documents:
+            yield from self._split(text_splitter, [document])
+
+    def _split(self, text_splitter: Any, documents: List[Document]) -> List[Chunk]:
         if SplitterType.LANGCHAIN == self._splitter_type:
             documents = text_splitter.split_documents(documents)
             return [Chunk.langchain2chunk(document) for document in documents]
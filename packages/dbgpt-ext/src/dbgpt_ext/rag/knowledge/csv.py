@@ -1,7 +1,6 @@
 """CSV Knowledge."""
 
-import csv
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from dbgpt.core import Document
 from dbgpt.rag.knowledge.base import (
@@ -11,6 +10,14 @@ from dbgpt.rag.knowledge.base import (
     KnowledgeType,
 )
 
+from .tabular import (
+    DEFAULT_PACK_SIZE,
+    RowBlock,
+    format_rows,
+    iter_csv_frames,
+    pack_rows,
+)
+
 
 class CSVKnowledge(Knowledge):
     """CSV Knowledge."""
@@ -23,6 +30,8 @@ class CSVKnowledge(Knowledge):
         encoding: Optional[str] = "utf-8",
         loader: Optional[Any] = None,
         metadata: Optional[Dict[str, Union[str, List[str]]]] = None,
+        block_rows: int = 10000,
+        pack_size: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         """Create CSV Knowledge with Knowledge arguments.
@@ -33,6 +42,10 @@ class CSVKnowledge(Knowledge):
             source_column(str, optional): source column
             encoding(str, optional): csv encoding
             loader(Any, optional): loader
+            block_rows(int): the rows read and formatted at a time
+            pack_size(int, optional): the max characters of a document packing
+                several rows, None for the chunk size of the splitter, 0 to make
+                one document per row
         """
         super().__init__(
             path=file_path,
@@ -43,42 +56,57 @@ class CSVKnowledge(Knowledge):
         )
         self._encoding = encoding
         self._source_column = source_column
+        self._block_rows = block_rows
+        self._pack_size = pack_size
+        self._chunk_size = DEFAULT_PACK_SIZE
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Pack the rows up to the chunk size of the splitter by default."""
+        self._chunk_size = chunk_size
 
     def _load(self) -> List[Document]:
         """Load csv document from loader."""
         if self._loader:
             documents = self._loader.load()
-        else:
-            docs = []
-            if not self._path:
-                raise ValueError("file path is required")
-            with open(self._path, newline="", encoding=self._encoding) as csvfile:
-                csv_reader = csv.DictReader(csvfile)
-                for i, row in enumerate(csv_reader):
-                    strs = []
-                    for k, v in row.items():
-                        if k is None or v is None:
-                            continue
-                        strs.append(f"{k.strip()}: {v.strip()}")
-                    content = "\n".join(strs)
-                    try:
-                        source = (
-                            row[self._source_column]
-                            if self._source_column is not None
-                            else self._path
-                        )
-                    except KeyError:
-                        raise ValueError(
-                            f"Source column '{self._source_column}' not in CSV file."
-                        )
-                    metadata = {"source": source, "row": i}
-                    if self._metadata:
-                        metadata.update(self._metadata)  # type: ignore
-                    doc = Document(content=content, metadata=metadata)
-                    docs.append(doc)
-
-            return docs
-        return [Document.langchain2doc(lc_document) for lc_document in documents]
+            return [Document.langchain2doc(lc_document) for lc_document in documents]
+        return list(self._iter_load())
+
+    def _iter_load(self) -> Iterator[Document]:
+        """Load csv document block by block, the rows are packed into documents."""
+        if self._loader:
+            yield from self._load()
+            return
+        if not self._path:
+            raise ValueError("file path is required")
+        for content, row, row_end, source in pack_rows(
+            self._iter_row_blocks(), self._get_pack_size()
+        ):
+            metadata = {
+                "source": self._path if source is None else source,
+                "row": row,
+            }
+            if row_end != row:
+                metadata["row_end"] = row_end
+            if self._metadata:
+                metadata.update(self._metadata)  # type: ignore
+            yield Document(content=content, metadata=metadata)
+
+    def _iter_row_blocks(self) -> Iterator[RowBlock]:
+        start = 0
+        for df in iter_csv_frames(self._path, self._block_rows, self._encoding):
+            sources = None
+            if self._source_column is not None:
+                if self._source_column not in df.columns:
+                    raise ValueError(
+                        f"Source column '{self._source_column}' not in CSV file."
+                    )
+                sources = df[self._source_column].tolist()
+            rows = list(range(start, start + len(df)))
+            start += len(df)
+            yield format_rows(df), rows, sources
+
+    def _get_pack_size(self) -> int:
+        return self._chunk_size if self._pack_size is None else self._pack_size
 
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
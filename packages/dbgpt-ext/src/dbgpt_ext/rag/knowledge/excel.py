@@ -1,6 +1,7 @@
 """Excel Knowledge."""
 
-from typing import Any, Dict, List, Optional, Union
+import itertools
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import pandas as pd
 
@@ -12,6 +13,14 @@ from dbgpt.rag.knowledge.base import (
     KnowledgeType,
 )
 
+from .tabular import (
+    DEFAULT_PACK_SIZE,
+    RowBlock,
+    format_rows,
+    iter_excel_frames,
+    pack_rows,
+)
+
 
 class ExcelKnowledge(Knowledge):
     """Excel Knowledge."""
@@ -24,6 +33,8 @@ class ExcelKnowledge(Knowledge):
         encoding: Optional[str] = "utf-8",
         loader: Optional[Any] = None,
         metadata: Optional[Dict[str, Union[str, List[str]]]] = None,
+        block_rows: int = 10000,
+        pack_size: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         """Create xlsx Knowledge with Knowledge arguments.
@@ -34,6 +45,10 @@ class ExcelKnowledge(Knowledge):
             source_column(str, optional): source column
             encoding(str, optional): csv encoding
             loader(Any, optional): loader
+            block_rows(int): the rows read and formatted at a time
+            pack_size(int, optional): the max characters of a document packing
+                several rows, None for the chunk size of the splitter, 0 to make
+                one document per row
         """
         super().__init__(
             path=file_path,
@@ -44,51 +59,61 @@ class ExcelKnowledge(Knowledge):
         )
         self._encoding = encoding
         self._source_column = source_column
+        self._block_rows = block_rows
+        self._pack_size = pack_size
+        self._chunk_size = DEFAULT_PACK_SIZE
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Pack the rows up to the chunk size of the splitter by default."""
+        self._chunk_size = chunk_size
 
     def _load(self) -> List[Document]:
-        """Load csv document from loader."""
+        """Load excel document from loader."""
         if self._loader:
             documents = self._loader.load()
-        else:
-            docs = []
-            if not self._path:
-                raise ValueError("file path is required")
-
-            excel_file = pd.ExcelFile(self._path)
-            sheet_names = excel_file.sheet_names
-            for sheet_name in sheet_names:
-                df = excel_file.parse(sheet_name)
-                for index, row in df.iterrows():
-                    strs = []
-                    for column_name, column_value in row.items():
-                        if column_name is None or column_value is None:
-                            continue
-
-                        column_name = str(column_name)
-                        column_value = str(column_value)
-                        strs.append(f"{column_name.strip()}: {column_value.strip()}")
-
-                    content = "\n".join(strs)
-                    try:
-                        source = (
-                            row[self._source_column]
-                            if self._source_column is not None
-                            else self._path
-                        )
-                    except KeyError:
-                        raise ValueError(
-                            f"Source column '{self._source_column}' not in CSV file."
-                        )
-
-                    metadata = {"source": source, "row": index}
-                    if self._metadata:
-                        metadata.update(self._metadata)  # type: ignore
-                    doc = Document(content=content, metadata=metadata)
-                    docs.append(doc)
-
-            return docs
-
-        return [Document.langchain2doc(lc_document) for lc_document in documents]
+            return [Document.langchain2doc(lc_document) for lc_document in documents]
+        return list(self._iter_load())
+
+    def _iter_load(self) -> Iterator[Document]:
+        """Load excel document block by block, the rows are packed into documents.
+
+        The rows of different sheets are never packed together.
+        """
+        if self._loader:
+            yield from self._load()
+            return
+        if not self._path:
+            raise ValueError("file path is required")
+        for sheet_name, blocks in itertools.groupby(
+            iter_excel_frames(self._path, self._block_rows), key=lambda b: b[0]
+        ):
+            row_blocks = (self._to_row_block(df) for _, df in blocks)
+            for content, row, row_end, source in pack_rows(
+                row_blocks, self._get_pack_size()
+            ):
+                metadata = {
+                    "source": self._path if source is None else source,
+                    "row": row,
+                    "sheet_name": sheet_name,
+                }
+                if row_end != row:
+                    metadata["row_end"] = row_end
+                if self._metadata:
+                    metadata.update(self._metadata)  # type: ignore
+                yield Document(content=content, metadata=metadata)
+
+    def _to_row_block(self, df: pd.DataFrame) -> RowBlock:
+        sources = None
+        if self._source_column is not None:
+            if self._source_column not in df.columns:
+                raise ValueError(
+                    f"Source column '{self._source_column}' not in Excel file."
+                )
+            sources = df[self._source_column].tolist()
+        return format_rows(df), df.index.tolist(), sources
+
+    def _get_pack_size(self) -> int:
+        return self._chunk_size if self._pack_size is None else self._pack_size
 
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
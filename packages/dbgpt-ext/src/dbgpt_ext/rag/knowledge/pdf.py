@@ -1,10 +1,14 @@
 """PDF Knowledge."""
 
+import ast
+import hashlib
 import json
+import multiprocessing
 import os
 import re
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 from dbgpt.component import logger
 from dbgpt.core import Document
@@ -15,6 +19,9 @@ from dbgpt.rag.knowledge.base import (
     KnowledgeType,
 )
 
+# The max size of the parsed pdf cache directory
+DEFAULT_PARSE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
 
 class PDFKnowledge(Knowledge):
     """PDF Knowledge."""
@@ -26,6 +33,10 @@ class PDFKnowledge(Knowledge):
         loader: Optional[Any] = None,
         language: Optional[str] = "zh",
         metadata: Optional[Dict[str, Union[str, List[str]]]] = None,
+        parse_workers: Optional[int] = None,
+        pages_per_task: int = 16,
+        parse_cache_dir: Optional[str] = None,
+        parse_cache_max_bytes: int = DEFAULT_PARSE_CACHE_MAX_BYTES,
         **kwargs: Any,
     ) -> None:
         """Create PDF Knowledge with Knowledge arguments.
@@ -35,6 +46,14 @@ class PDFKnowledge(Knowledge):
             knowledge_type(KnowledgeType, optional): knowledge type
             loader(Any, optional): loader
             language(str, optional): language
+            parse_workers(int, optional): the processes to parse the pages, None to
+                use the cpu count for large files, 1 to parse in the current process
+            pages_per_task(int): the pages parsed by a process at a time
+            parse_cache_dir(str, optional): the directory to cache the parsed pages
+                by file hash, None to disable the cache. The cache keeps the text of
+                the files after their documents are deleted
+            parse_cache_max_bytes(int): the max size of the cache directory, the
+                least recently used files are evicted
         """
         super().__init__(
             path=file_path,
@@ -44,7 +63,13 @@ class PDFKnowledge(Knowledge):
             **kwargs,
         )
         self._language = language
-        self._pdf_processor = PDFProcessor(filepath=self._path)
+        self._pdf_processor = PDFProcessor(
+            filepath=self._path,
+            max_workers=parse_workers,
+            pages_per_task=pages_per_task,
+            cache_dir=parse_cache_dir,
+            cache_max_bytes=parse_cache_max_bytes,
+        )
         self.all_title: List[dict] = []
         self.all_text: List[dict] = []
 
@@ -131,129 +156,112 @@ class PDFKnowledge(Knowledge):
         """Load pdf document from loader."""
         if self._loader:
             documents = self._loader.load()
-        else:
-            self._pdf_processor.pdf_to_json()
-            file_title = self.file_path.rsplit("/", 1)[-1].replace(".pdf", "")
-            self.all_text = list(self._pdf_processor.all_text.values())
-            self.process_text_data()
-            temp_table = []
-            temp_title = None
-            page_documents = []
-            merged_data = {}  # type: ignore # noqa
-            for i, data in enumerate(self.all_text):
-                content_type = data.get("type")
-                inside_content = data.get("inside")
-                page = data.get("page")
-
-                if content_type == "excel":
-                    temp_table.append(inside_content)
-                    if temp_title is None:
-                        for j in range(i - 1, -1, -1):
-                            if self.all_text[j]["type"] == "excel":
-                                break
-                            if self.all_text[j]["type"] == "text":
-                                content = self.all_text[j]["inside"]
-                                if re.match(
-                                    r"^\d+\.\d+", content
-                                ) or content.startswith("§"):
-                                    temp_title = content.strip()
-                                    break
-                                else:
-                                    temp_title = content.strip()
-                                    break
-                elif content_type == "text":
-                    if page in merged_data:
-                        # page merge
-                        merged_data[page]["inside_content"] += " " + inside_content
-                    else:
-                        merged_data[page] = {
-                            "inside_content": inside_content,
-                            "type": "text",
-                        }
-
-                    # merge excel table
-                    if temp_table:
-                        table_meta = {
-                            "title": temp_title or temp_table[0],
-                            "type": "excel",
-                        }
-                        self.all_title.append(table_meta)
-
-                        # markdown format
-                        markdown_tables = []
-                        if temp_table:
-                            header = eval(temp_table[0])
-                            markdown_tables.append(header)
-                            for entry in temp_table[1:]:
-                                row = eval(entry)
-                                markdown_tables.append(row)
-                            markdown_output = "| " + " | ".join(header) + " |\n"
-                            markdown_output += (
-                                "| " + " | ".join(["---"] * len(header)) + " |\n"
-                            )
-                            for row in markdown_tables[1:]:
-                                markdown_output += "| " + " | ".join(row) + " |\n"
+            return [Document.langchain2doc(lc_document) for lc_document in documents]
+        return list(self._iter_page_documents())
 
-                            #  merged content
-                            merged_data[page]["excel_content"] = temp_table
-                            merged_data[page]["markdown_output"] = markdown_output
+    def _iter_load(self) -> Iterator[Document]:
+        """Load pdf document lazily, a page is yielded once it is parsed."""
+        if self._loader:
+            yield from self._load()
+        else:
+            yield from self._iter_page_documents()
 
-                        temp_title = None
-                        temp_table = []
+    def _iter_page_documents(self) -> Iterator[Document]:
+        """Build the documents of the pages from the parsed rows.
 
-            # deal last excel
-            if temp_table:
-                table_meta = {
-                    "title": temp_title or temp_table[0],
-                    "table": temp_table,
-                    "type": "excel",
-                }
-                self.all_title.append(table_meta)
-                # markdown format
-                markdown_tables = []
-                if temp_table:
-                    header = eval(temp_table[0])
-                    markdown_tables.append(header)
-                    for entry in temp_table[1:]:
-                        row = eval(entry)
-                        markdown_tables.append(row)
-                    markdown_output = "| " + " | ".join(header) + " |\n"
-                    markdown_output += "| " + " | ".join(["---"] * len(header)) + " |\n"
-                    for row in markdown_tables[1:]:
-                        markdown_output += "| " + " | ".join(row) + " |\n"
-                    #  merged content
-                    merged_data[page]["excel_content"] = temp_table
-                    merged_data[page]["markdown_output"] = markdown_output
-
-            for page, content in merged_data.items():
-                inside_content = content["inside_content"]
-                if "markdown_output" in content:
-                    markdown_content = content["markdown_output"]
-                    content_metadata = {
-                        "page": page,
-                        "type": "excel",
-                        "title": file_title,
-                        "source": self.file_path,
-                    }
-                    page_documents.append(
-                        Document(
-                            content=inside_content + "\n" + markdown_content,
-                            metadata=content_metadata,
-                        )
+        The rows of a page are complete when the text of a later page arrives, the
+        tables are merged into the page of the text following them.
+        """
+        file_title = self.file_path.rsplit("/", 1)[-1].replace(".pdf", "")
+        rows: List[dict] = []
+        table_metas: List[dict] = []
+        temp_table: List[str] = []
+        temp_title = None
+        merged_data: Dict[Any, dict] = {}
+        page = None
+        for data in self._pdf_processor.iter_rows():
+            rows.append(data)
+            i = len(rows) - 1
+            content_type = data.get("type")
+            inside_content = data.get("inside")
+            page = data.get("page")
+
+            if content_type == "excel":
+                temp_table.append(inside_content)
+                if temp_title is None:
+                    for j in range(i - 1, -1, -1):
+                        if rows[j]["type"] == "excel":
+                            break
+                        if rows[j]["type"] == "text":
+                            temp_title = rows[j]["inside"].strip()
+                            break
+            elif content_type == "text":
+                # The previous pages are complete
+                for done_page in [p for p in merged_data if p != page]:
+                    yield self._page_document(
+                        done_page, merged_data.pop(done_page), file_title
                     )
+                if page in merged_data:
+                    # page merge
+                    merged_data[page]["inside_content"] += " " + inside_content
                 else:
-                    content_metadata = {
-                        "page": page,
+                    merged_data[page] = {
+                        "inside_content": inside_content,
                         "type": "text",
-                        "title": file_title,
-                        "source": self.file_path,
                     }
-                    page_documents.append(
-                        Document(content=inside_content, metadata=content_metadata)
+
+                # merge excel table
+                if temp_table:
+                    table_metas.append(
+                        {"title": temp_title or temp_table[0], "type": "excel"}
+                    )
+                    merged_data[page]["excel_content"] = temp_table
+                    merged_data[page]["markdown_output"] = _table_to_markdown(
+                        temp_table
                     )
+                    temp_title = None
+                    temp_table = []
 
-            return page_documents
-        return [Document.langchain2doc(lc_document) for lc_document in documents]
+        # deal last excel
+        if temp_table:
+            table_metas.append(
+                {
+                    "title": temp_title or temp_table[0],
+                    "table": temp_table,
+                    "type": "excel",
+                }
+            )
+            merged_data[page]["excel_content"] = temp_table
+            merged_data[page]["markdown_output"] = _table_to_markdown(temp_table)
+
+        for page, content in merged_data.items():
+            yield self._page_document(page, content, file_title)
+
+        self.all_text = rows
+        self.process_text_data()
+        self.all_title.extend(table_metas)
+
+    def _page_document(self, page: Any, content: dict, file_title: str) -> Document:
+        inside_content = content["inside_content"]
+        if "markdown_output" in content:
+            markdown_content = content["markdown_output"]
+            content_metadata = {
+                "page": page,
+                "type": "excel",
+                "title": file_title,
+                "source": self.file_path,
+            }
+            return Document(
+                content=inside_content + "\n" + markdown_content,
+                metadata=content_metadata,
+            )
+        content_metadata = {
+            "page": page,
+            "type": "text",
+            "title": file_title,
+            "source": self.file_path,
+        }
+        return Document(content=inside_content, metadata=content_metadata)
 
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
@@ -280,11 +288,69 @@ class PDFKnowledge(Knowledge):
         return DocumentType.PDF
 
 
+def _table_to_markdown(table: List[str]) -> str:
+    """Convert the rows of a table to markdown, the first row is the header."""
+    header = ast.literal_eval(table[0])
+    markdown_output = "| " + " | ".join(header) + " |\n"
+    markdown_output += "| " + " | ".join(["---"] * len(header)) + " |\n"
+    for entry in table[1:]:
+        row = ast.literal_eval(entry)
+        markdown_output += "| " + " | ".join(row) + " |\n"
+    return markdown_output
+
+
+# Bump it when the parsed rows change, the cached rows are invalidated
+_PARSER_VERSION = "1"
+# Files with fewer pages are parsed in the current process by default
+_MIN_PARALLEL_PAGES = 64
+_MAX_DEFAULT_WORKERS = 8
+
+
+def _extract_page_range(
+    filepath: str, start: int, end: int
+) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+    """Extract the rows of the pages [start, end) in a worker process."""
+    processor = PDFProcessor(filepath)
+    try:
+        return [
+            (page.page_number, processor._extract_page_rows(page))
+            for page in processor.pdf.pages[start:end]
+        ]
+    finally:
+        processor.pdf.close()
+
+
+def _touch(path: str):
+    """Mark a cache file as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
 class PDFProcessor:
     """PDFProcessor class."""
 
-    def __init__(self, filepath):
-        """Initialize PDFProcessor class."""
+    def __init__(
+        self,
+        filepath,
+        max_workers: Optional[int] = 1,
+        pages_per_task: int = 16,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = DEFAULT_PARSE_CACHE_MAX_BYTES,
+    ):
+        """Initialize PDFProcessor class.
+
+        Args:
+            filepath: The path of the pdf file.
+            max_workers (Optional[int]): The processes to parse the pages, None to
+                use the cpu count for large files, 1 to parse in the current process.
+            pages_per_task (int): The pages parsed by a process at a time.
+            cache_dir (Optional[str]): The directory to cache the parsed rows by
+                file hash, None to disable the cache.
+            cache_max_bytes (int): The max size of the cache directory, the least
+                recently used files are evicted when a new file is cached.
+        """
         self.filepath = filepath
         try:
             import pdfplumber  # type: ignore
@@ -294,6 +360,10 @@ class PDFProcessor:
         self.all_text = defaultdict(dict)
         self.allrow = 0
         self.last_num = 0
+        self._max_workers = max_workers
+        self._pages_per_task = max(1, pages_per_task)
+        self._cache_dir = cache_dir
+        self._cache_max_bytes = cache_max_bytes
 
     def check_lines(self, page, top, buttom):
         """Check lines."""
@@ -352,6 +422,14 @@ class PDFProcessor:
 
     def extract_text_and_tables(self, page):
         """Extract text and tables."""
+        self._append_page_rows(page.page_number, self._extract_page_rows(page))
+
+    def _extract_page_rows(self, page) -> List[Dict[str, Any]]:
+        """Extract the text and table rows of a page.
+
+        It only reads the page, the pages can be extracted in parallel.
+        """
+        rows: List[Dict[str, Any]] = []
         buttom = 0
         tables = page.find_tables()
         if len(tables) >= 1:
@@ -367,13 +445,7 @@ class PDFProcessor:
                     text = self.check_lines(page, top, buttom)
                     text_list = text.split("\n")
                     for _t in range(len(text_list)):
-                        self.all_text[self.allrow] = {
-                            "page": page.page_number,
-                            "allrow": self.allrow,
-                            "type": "text",
-                            "inside": text_list[_t],
-                        }
-                        self.allrow += 1
+                        rows.append({"type": "text", "inside": text_list[_t]})
 
                     # process table
                     buttom = table.bbox[3]
@@ -440,37 +512,35 @@ class PDFProcessor:
                                 end_table[i][j] = end_table[i][j - 1]
 
                     for row in end_table:
-                        self.all_text[self.allrow] = {
-                            "page": page.page_number,
-                            "allrow": self.allrow,
-                            "type": "excel",
-                            "inside": str(row),
-                        }
-                        self.allrow += 1
+                        rows.append({"type": "excel", "inside": str(row)})
 
                     if count == 0:
                         text = self.check_lines(page, "", buttom)
                         text_list = text.split("\n")
                         for _t in range(len(text_list)):
-                            self.all_text[self.allrow] = {
-                                "page": page.page_number,
-                                "allrow": self.allrow,
-                                "type": "text",
-                                "inside": text_list[_t],
-                            }
-                            self.allrow += 1
+                            rows.append({"type": "text", "inside": text_list[_t]})
 
         else:
             text = self.check_lines(page, "", "")
             text_list = text.split("\n")
             for _t in range(len(text_list)):
-                self.all_text[self.allrow] = {
-                    "page": page.page_number,
-                    "allrow": self.allrow,
-                    "type": "text",
-                    "inside": text_list[_t],
-                }
-                self.allrow += 1
+                rows.append({"type": "text", "inside": text_list[_t]})
+
+        return rows
+
+    def _append_page_rows(self, page_number: Any, rows: List[Dict[str, Any]]):
+        """Append the extracted rows of a page, and mark its header and footer.
+
+        The pages must be appended in order.
+        """
+        for row in rows:
+            self.all_text[self.allrow] = {
+                "page": page_number,
+                "allrow": self.allrow,
+                "type": row["type"],
+                "inside": row["inside"],
+            }
+            self.allrow += 1
 
         first_re = "[^计](?:报告(?:全文)?(?:（修订版）|（修订稿）|（更正后）)?)$"
         end_re = "^(?:\d|\\|\/|第|共|页|-|_| ){1,}"
@@ -483,7 +553,7 @@ class PDFProcessor:
                     if re.search(end_re, end_text) and "[" not in end_text:
                         self.all_text[len(self.all_text) - 1]["type"] = "页脚"
             except Exception:
-                print(page.page_number)
+                print(page_number)
         else:
             try:
                 first_text = str(self.all_text[self.last_num + 2]["inside"])
@@ -493,15 +563,137 @@ class PDFProcessor:
                 if re.search(end_re, end_text) and "[" not in end_text:
                     self.all_text[len(self.all_text) - 1]["type"] = "页脚"
             except Exception:
-                print(page.page_number)
+                print(page_number)
 
         self.last_num = len(self.all_text) - 1
 
     def pdf_to_json(self):
         """Process pdf."""
-        for i in range(len(self.pdf.pages)):
+        for _ in self.iter_rows():
+            pass
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """Parse the pdf, yield the rows in order while the pages are parsed.
+
+        The rows of a page are yielded once the page is appended, the pages are
+        parsed by a process pool for large files. The parsed rows are cached by
+        the file hash when the cache is enabled.
+        """
+        cache_path = self._cache_path()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f]
+            except Exception as e:
+                logger.warning(f"Failed to read the parsed pdf cache {cache_path}: {e}")
+            else:
+                logger.info(f"{self.filepath} parsed rows loaded from cache")
+                _touch(cache_path)
+                for row in rows:
+                    self.all_text[row["allrow"]] = row
+                self.allrow = len(rows)
+                yield from rows
+                return
+        for start, end in self._iter_pages():
+            for i in range(start, end):
+                yield self.all_text[i]
+        if cache_path:
+            self._save_cache(cache_path)
+
+    def _iter_pages(self) -> Iterator[Tuple[int, int]]:
+        """Parse and append the pages, yield the row range of every page."""
+        num_pages = len(self.pdf.pages)
+        workers = self._resolve_workers(num_pages)
+        next_page = 0
+        if workers > 1:
+            try:
+                for page_number, rows in self._iter_parallel(num_pages, workers):
+                    start = self.allrow
+                    self._append_page_rows(page_number, rows)
+                    logger.info(
+                        f"{self.filepath} page {next_page} extract text success"
+                    )
+                    next_page += 1
+                    yield start, self.allrow
+            except Exception as e:
+                logger.warning(
+                    f"Parallel parsing of {self.filepath} failed: {e}, parse the "
+                    f"remaining pages from page {next_page} in the current process"
+                )
+        for i in range(next_page, num_pages):
+            start = self.allrow
             self.extract_text_and_tables(self.pdf.pages[i])
             logger.info(f"{self.filepath} page {i} extract text success")
+            yield start, self.allrow
+
+    def _iter_parallel(
+        self, num_pages: int, workers: int
+    ) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+        """Extract the page ranges in a process pool, yield the pages in order."""
+        ranges = [
+            (start, min(start + self._pages_per_task, num_pages))
+            for start in range(0, num_pages, self._pages_per_task)
+        ]
+        # Spawn the workers, forking a multithreaded server is not safe
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            futures = [
+                pool.submit(_extract_page_range, self.filepath, start, end)
+                for start, end in ranges
+            ]
+            try:
+                for future in futures:
+                    yield from future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _resolve_workers(self, num_pages: int) -> int:
+        tasks = -(-num_pages // self._pages_per_task)
+        if self._max_workers is not None:
+            return max(1, min(self._max_workers, tasks))
+        if num_pages < _MIN_PARALLEL_PAGES:
+            return 1
+        return max(1, min(os.cpu_count() or 1, _MAX_DEFAULT_WORKERS, tasks))
+
+    def _cache_path(self) -> Optional[str]:
+        if not self._cache_dir or not os.path.isfile(self.filepath):
+            return None
+        hasher = hashlib.sha256(_PARSER_VERSION.encode("utf-8"))
+        with open(self.filepath, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        return os.path.join(self._cache_dir, f"{hasher.hexdigest()}.jsonl")
+
+    def _save_cache(self, cache_path: str):
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)  # type: ignore
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for i in range(self.allrow):
+                    f.write(json.dumps(self.all_text[i], ensure_ascii=False) + "\n")
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to save the parsed pdf cache {cache_path}: {e}")
+            return
+        self._evict_cache(cache_path)
+
+    def _evict_cache(self, cache_path: str):
+        """Remove the least recently used files beyond the max size of the cache."""
+        entries = []
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".jsonl") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = 0
+        for _, size, path in sorted(entries, reverse=True):
+            total += size
+            if total > self._cache_max_bytes and path != cache_path:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Failed to evict the parsed pdf cache {path}: {e}")
 
     def save_all_text(self, path):
         """Save all text."""
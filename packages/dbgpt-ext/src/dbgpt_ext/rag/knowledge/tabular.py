@@ -0,0 +1,179 @@
+"""Columnar loading of tabular knowledge.
+
+The rows of CSV and Excel files are read in fixed size blocks, formatted column by
+column and packed several rows per document, so a million rows file is never held
+in memory at once and the documents can be split and embedded while reading.
+"""
+
+import csv
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# The rows of a block: (contents, row numbers, sources)
+RowBlock = Tuple[List[str], List[int], Optional[List[Any]]]
+# A packed document: (content, first row, last row, source)
+PackedRows = Tuple[str, int, int, Any]
+
+ROW_SEPARATOR = "\n\n"
+# The max characters of a document when the chunk size of the splitter is unknown,
+# the default chunk size of ChunkParameters
+DEFAULT_PACK_SIZE = 512
+
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    """Format every row of a block to `column: value` lines.
+
+    The formatting runs per column on the whole block, the missing values are
+    skipped.
+    """
+    content = pd.Series("", index=df.index, dtype=object)
+    for i, column in enumerate(df.columns):
+        values = df.iloc[:, i]
+        name = str(column).strip()
+        line = ("\n" + name + ": " + values.astype(str).str.strip()).astype(object)
+        content = content + line.where(values.notna(), "")
+    # Drop the leading line break
+    return content.str[1:].tolist()
+
+
+def pack_rows(
+    blocks: Iterable[RowBlock], pack_size: Optional[int]
+) -> Iterator[PackedRows]:
+    """Pack the consecutive rows of the blocks into documents.
+
+    The rows are packed until the content exceeds pack_size, a longer row is a
+    document alone. The rows of different sources are never packed together.
+
+    Args:
+        blocks (Iterable[RowBlock]): The formatted row blocks.
+        pack_size (Optional[int]): The max characters of a document, None or 0 to
+            make one document per row.
+    """
+    contents: List[str] = []
+    first_row = last_row = 0
+    source: Any = None
+    size = 0
+    for block_contents, rows, sources in blocks:
+        for i, content in enumerate(block_contents):
+            row_source = sources[i] if sources is not None else None
+            if contents and (
+                not pack_size
+                or row_source != source
+                or size + len(ROW_SEPARATOR) + len(content) > pack_size
+            ):
+                yield ROW_SEPARATOR.join(contents), first_row, last_row, source
+                contents = []
+            if not contents:
+                first_row, source, size = rows[i], row_source, -len(ROW_SEPARATOR)
+            contents.append(content)
+            size += len(ROW_SEPARATOR) + len(content)
+            last_row = rows[i]
+    if contents:
+        yield ROW_SEPARATOR.join(contents), first_row, last_row, source
+
+
+def iter_csv_frames(
+    path: str, block_rows: int, encoding: Optional[str] = "utf-8"
+) -> Iterator[pd.DataFrame]:
+    """Read a CSV file in blocks of rows, all the values are read as strings.
+
+    The malformed rows are read like `csv.DictReader`, the extra fields of a row
+    are dropped and the missing ones are empty. The file is read by the C parser
+    of pandas, a file with a row longer than the header is read again by the
+    python parser from the first block not yielded.
+    """
+    with open(path, newline="", encoding=encoding) as csvfile:
+        header = next(csv.reader(csvfile), None)
+    if not header:
+        return
+    width = len(header)
+    read_rows = 0
+    try:
+        for df in _read_csv(path, block_rows, encoding):
+            read_rows += len(df)
+            yield df
+        return
+    except pd.errors.ParserError:
+        pass
+    for df in _read_csv(
+        path,
+        block_rows,
+        encoding,
+        engine="python",
+        on_bad_lines=lambda fields: fields[:width],
+    ):
+        if read_rows >= len(df):
+            # Yielded by the C parser
+            read_rows -= len(df)
+            continue
+        yield df.iloc[read_rows:]
+        read_rows = 0
+
+
+def _read_csv(
+    path: str, block_rows: int, encoding: Optional[str], **kwargs
+) -> Iterator[pd.DataFrame]:
+    with open(path, newline="", encoding=encoding) as csvfile:
+        with pd.read_csv(
+            csvfile, chunksize=block_rows, dtype=str, keep_default_na=False, **kwargs
+        ) as reader:
+            yield from reader
+
+
+def iter_excel_frames(path: str, block_rows: int) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Read the sheets of an Excel file in blocks of rows.
+
+    The xlsx files are streamed with the read-only mode of openpyxl, the other
+    formats are parsed sheet by sheet and sliced. The index of a block is the row
+    number in its sheet. The values are read as objects, so a number is formatted
+    the same way in all the blocks.
+    """
+    try:
+        import openpyxl
+    except ImportError:
+        openpyxl = None
+
+    if openpyxl is None or not path.lower().endswith((".xlsx", ".xlsm")):
+        excel_file = pd.ExcelFile(path)
+        for sheet_name in excel_file.sheet_names:
+            df = excel_file.parse(sheet_name, dtype=object)
+            for start in range(0, len(df), block_rows):
+                yield sheet_name, df.iloc[start : start + block_rows]
+        return
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            columns = [
+                f"Unnamed: {i}" if name is None else name
+                for i, name in enumerate(header)
+            ]
+            width = len(columns)
+            row_number = 0
+            while True:
+                block = list(itertools.islice(rows, block_rows))
+                if not block:
+                    break
+                records, index = [], []
+                for values in block:
+                    # The trailing empty rows of a sheet are reported by openpyxl
+                    if any(v is not None for v in values):
+                        values = tuple(values[:width])
+                        records.append(values + (None,) * (width - len(values)))
+                        index.append(row_number)
+                    row_number += 1
+                if records:
+                    yield (
+                        sheet.title,
+                        pd.DataFrame(
+                            records, columns=columns, index=index, dtype=object
+                        ),
+                    )
+    finally:
+        workbook.close()
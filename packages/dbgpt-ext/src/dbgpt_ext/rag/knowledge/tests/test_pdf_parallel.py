@@ -0,0 +1,114 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ..factory import KnowledgeFactory
+from ..pdf import PDFKnowledge, PDFProcessor
+
+MOCK_PAGE_ROWS = [
+    [{"type": "text", "inside": "page one"}],
+    [
+        {"type": "text", "inside": "table title"},
+        {"type": "excel", "inside": "['name', 'value']"},
+        {"type": "excel", "inside": "['a', '1']"},
+    ],
+    [{"type": "text", "inside": "page three"}],
+]
+
+
+def _mock_page(page_number: int) -> MagicMock:
+    page = MagicMock()
+    page.page_number = page_number
+    return page
+
+
+def _extract_page_rows(self, page):
+    return [dict(row) for row in MOCK_PAGE_ROWS[page.page_number - 1]]
+
+
+@pytest.fixture
+def mock_pdf():
+    mock_reader = MagicMock()
+    mock_reader.pages = [_mock_page(i + 1) for i in range(len(MOCK_PAGE_ROWS))]
+    with patch("pdfplumber.open", return_value=mock_reader):
+        with patch.object(PDFProcessor, "_extract_page_rows", _extract_page_rows):
+            yield mock_reader
+
+
+def test_iter_page_documents(mock_pdf):
+    knowledge = PDFKnowledge(file_path="test_document", parse_cache_dir=None)
+    documents = list(knowledge._iter_load())
+
+    assert [d.metadata["page"] for d in documents] == [1, 2, 3]
+    assert documents[0].content == "page one"
+    # The table is merged into the page of the text following it
+    assert documents[2].metadata["type"] == "excel"
+    assert "| name | value |\n| --- | --- |\n| a | 1 |" in documents[2].content
+    assert {"title": "table title", "type": "excel"} in knowledge.all_title
+
+
+def test_parse_cache(mock_pdf, tmp_path):
+    file_path = tmp_path / "test_document.pdf"
+    file_path.write_bytes(b"%PDF-1.4 mock")
+    cache_dir = tmp_path / "cache"
+
+    processor = PDFProcessor(str(file_path), cache_dir=str(cache_dir))
+    rows = list(processor.iter_rows())
+    assert [row["allrow"] for row in rows] == list(range(5))
+    assert len(list(cache_dir.iterdir())) == 1
+
+    with patch.object(PDFProcessor, "_iter_pages") as mock_iter_pages:
+        cached = PDFProcessor(str(file_path), cache_dir=str(cache_dir))
+        assert list(cached.iter_rows()) == rows
+        assert cached.allrow == processor.allrow
+        mock_iter_pages.assert_not_called()
+
+
+def test_parse_cache_disabled_by_default(mock_pdf, tmp_path):
+    assert PDFKnowledge(file_path="test_document")._pdf_processor._cache_dir is None
+
+    # The arguments of the factory are passed to the pdf knowledge
+    knowledge = KnowledgeFactory.create(
+        datasource="test_document.pdf", parse_cache_dir=str(tmp_path)
+    )
+    assert isinstance(knowledge, PDFKnowledge)
+    assert knowledge._pdf_processor._cache_dir == str(tmp_path)
+
+
+def test_parse_cache_eviction(mock_pdf, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_files = []
+    for i in range(3):
+        file_path = tmp_path / f"test_document_{i}.pdf"
+        file_path.write_bytes(f"%PDF-1.4 mock {i}".encode())
+        processor = PDFProcessor(
+            str(file_path), cache_dir=str(cache_dir), cache_max_bytes=1
+        )
+        list(processor.iter_rows())
+        cache_files.append(processor._cache_path())
+    # Only the file cached last is kept within the max size
+    assert [path for path in cache_files if os.path.exists(path)] == cache_files[-1:]
+
+
+def test_parallel_failure_falls_back(mock_pdf):
+    def _fail_after_first_page(self, num_pages, workers):
+        yield 1, _extract_page_rows(self, _mock_page(1))
+        raise RuntimeError("worker died")
+
+    sequential = PDFProcessor("test_document")
+    sequential.pdf_to_json()
+
+    processor = PDFProcessor("test_document", max_workers=2, pages_per_task=1)
+    with patch.object(PDFProcessor, "_iter_parallel", _fail_after_first_page):
+        processor.pdf_to_json()
+    assert dict(processor.all_text) == dict(sequential.all_text)
+
+
+def test_resolve_workers(mock_pdf):
+    processor = PDFProcessor("test_document", max_workers=None, pages_per_task=16)
+    assert processor._resolve_workers(10) == 1
+    with patch("os.cpu_count", return_value=4):
+        assert processor._resolve_workers(200) == 4
+    processor = PDFProcessor("test_document", max_workers=8, pages_per_task=16)
+    assert processor._resolve_workers(40) == 3
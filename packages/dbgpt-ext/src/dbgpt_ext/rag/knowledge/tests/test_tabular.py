@@ -0,0 +1,139 @@
+import pandas as pd
+import pytest
+
+from ...chunk_manager import ChunkManager, ChunkParameters
+from ..csv import CSVKnowledge
+from ..tabular import format_rows, iter_csv_frames, iter_excel_frames, pack_rows
+
+MOCK_CSV_DATA = "id,name,age\n1,John Doe,30\n2, Jane Smith ,25\n3,Bob Johnson,40\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "test_data.csv"
+    path.write_text(MOCK_CSV_DATA, encoding="utf-8")
+    return str(path)
+
+
+def test_format_rows():
+    df = pd.DataFrame({" id ": [1, 2], "name": ["a ", None]})
+    assert format_rows(df) == ["id: 1\nname: a", "id: 2"]
+
+
+def test_pack_rows():
+    blocks = [(["aaa", "bb"], [0, 1], None), (["c", "dddd"], [2, 3], None)]
+    assert list(pack_rows(blocks, None)) == [
+        ("aaa", 0, 0, None),
+        ("bb", 1, 1, None),
+        ("c", 2, 2, None),
+        ("dddd", 3, 3, None),
+    ]
+    # The rows are packed across the blocks
+    assert list(pack_rows(blocks, 8)) == [
+        ("aaa\n\nbb", 0, 1, None),
+        ("c\n\ndddd", 2, 3, None),
+    ]
+    # The rows of different sources are not packed together
+    blocks = [(["a", "b", "c"], [0, 1, 2], ["x", "y", "y"])]
+    assert list(pack_rows(blocks, 100)) == [
+        ("a", 0, 0, "x"),
+        ("b\n\nc", 1, 2, "y"),
+    ]
+
+
+def test_csv_iter_load_in_blocks(csv_path):
+    knowledge = CSVKnowledge(file_path=csv_path, block_rows=2, pack_size=0)
+    documents = list(knowledge.iter_load())
+    assert [d.content for d in documents] == [
+        "id: 1\nname: John Doe\nage: 30",
+        "id: 2\nname: Jane Smith\nage: 25",
+        "id: 3\nname: Bob Johnson\nage: 40",
+    ]
+    assert [d.metadata["row"] for d in documents] == [0, 1, 2]
+    assert documents[0].metadata["source"] == csv_path
+
+
+def test_csv_pack_rows(csv_path):
+    knowledge = CSVKnowledge(
+        file_path=csv_path, block_rows=2, pack_size=70, metadata={"k": "v"}
+    )
+    documents = knowledge._load()
+    assert len(documents) == 2
+    assert documents[0].content.count("id: ") == 2
+    assert documents[0].metadata == {
+        "source": csv_path,
+        "row": 0,
+        "row_end": 1,
+        "k": "v",
+    }
+    assert documents[1].metadata["row"] == 2
+    assert "row_end" not in documents[1].metadata
+
+
+def test_csv_pack_rows_to_chunk_size(csv_path):
+    # The rows are packed up to the default chunk size
+    knowledge = CSVKnowledge(file_path=csv_path, block_rows=2)
+    documents = knowledge._load()
+    assert len(documents) == 1
+    assert documents[0].metadata["row_end"] == 2
+
+    ChunkManager(knowledge, ChunkParameters(chunk_size=70))
+    assert [d.metadata["row"] for d in knowledge._load()] == [0, 2]
+
+
+def test_csv_source_column(csv_path):
+    knowledge = CSVKnowledge(file_path=csv_path, source_column="name")
+    documents = knowledge._load()
+    assert [d.metadata["source"] for d in documents] == [
+        "John Doe",
+        " Jane Smith ",
+        "Bob Johnson",
+    ]
+    with pytest.raises(ValueError):
+        CSVKnowledge(file_path=csv_path, source_column="email")._load()
+
+
+def test_csv_malformed_rows(tmp_path):
+    path = tmp_path / "malformed.csv"
+    path.write_text("id,name\n1,a\n2,b,extra\n3\n", encoding="utf-8")
+    knowledge = CSVKnowledge(file_path=str(path), block_rows=2, pack_size=0)
+    # Read like csv.DictReader, the extra fields are dropped
+    assert [d.content for d in knowledge._load()] == [
+        "id: 1\nname: a",
+        "id: 2\nname: b",
+        "id: 3",
+    ]
+
+
+def test_csv_malformed_rows_after_blocks(tmp_path):
+    path = tmp_path / "malformed.csv"
+    rows = [f"{i},a" for i in range(5)] + ["5,b,extra"] + [f"{i},c" for i in (6, 7)]
+    path.write_text("id,name\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    frames = list(iter_csv_frames(str(path), 2))
+    # The blocks read before the malformed row are not read again
+    assert [df.index.tolist() for df in frames] == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    df = pd.concat(frames)
+    assert df["id"].tolist() == [str(i) for i in range(8)]
+    assert df["name"].tolist() == ["a"] * 5 + ["b", "c", "c"]
+
+
+def test_csv_empty_file(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("", encoding="utf-8")
+    assert CSVKnowledge(file_path=str(path))._load() == []
+
+
+def test_excel_blocks_keep_values(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "data.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "value"])
+    for row in [(1, 1), (2, 1.5), (3, 2)]:
+        sheet.append(row)
+    workbook.save(path)
+    contents = []
+    for _, df in iter_excel_frames(path, 1):
+        contents += format_rows(df)
+    # The integers are not formatted as floats in the block with a float
+    assert contents == ["id: 1\nvalue: 1", "id: 2\nvalue: 1.5", "id: 3\nvalue: 2"]
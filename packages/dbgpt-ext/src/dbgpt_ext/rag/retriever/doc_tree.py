@@ -1,10 +1,13 @@
 """Tree-based document retriever."""
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from concurrent.futures import Executor, ThreadPoolExecutor
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from dbgpt.core import Document
+from dbgpt.core import Chunk, Document
 from dbgpt.rag.retriever import BaseRetriever, DefaultRanker, QueryRewrite, Ranker
 from dbgpt.rag.transformer.base import ExtractorBase
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -19,11 +22,14 @@ HEADER3 = "Header3"
 HEADER4 = "Header4"
 HEADER5 = "Header5"
 HEADER6 = "Header6"
+_HEADERS = (HEADER1, HEADER2, HEADER3, HEADER4, HEADER5, HEADER6)
 
 
 class TreeNode:
     """TreeNode class to represent a node in the document tree."""
 
+    __slots__ = ("node_id", "level", "level_text", "children", "content", "retriever")
+
     def __init__(
         self, node_id: str, level_text: str, level: int, content: Optional[str] = None
     ):
@@ -31,7 +37,7 @@ class TreeNode:
         self.node_id = node_id
         self.level = level  # 0: title, 1: header1, 2: header2, 3: header3
         self.level_text = level_text  # 0: title, 1: header1, 2: header2, 3: header3
-        self.children = []
+        self.children: List["TreeNode"] = []
         self.content = content
         self.retriever = RETRIEVER_NAME
 
@@ -42,8 +48,40 @@ class TreeNode:
 
 class DocTreeIndex:
     def __init__(self):
-        """Initialize the document tree index."""
+        """Initialize the document tree index.
+
+        Besides the tree, the index keeps hash indexes of the nodes by
+        (level, level_text), by level_text and by lowercased level_text, so adding a
+        chunk and searching a keyword do not traverse the whole tree.
+        """
         self.root = TreeNode("root_id", "Root", -1)
+        self._title_node: Optional[TreeNode] = None
+        self._nodes_by_level_text: Dict[Tuple[int, str], TreeNode] = {}
+        self._nodes_by_text: Dict[str, TreeNode] = {}
+        self._nodes_by_keyword: Dict[str, List[TreeNode]] = {}
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[Chunk], with_content: bool = False
+    ) -> "DocTreeIndex":
+        """Build a document tree from the title and headers of the chunks.
+
+        Args:
+            chunks (Iterable[Chunk]): The chunks of a document.
+            with_content (bool): Whether to save the chunk content in the nodes.
+
+        Returns:
+            DocTreeIndex: The document tree.
+        """
+        tree_index = cls()
+        for chunk in chunks:
+            tree_index._add_path(
+                chunk.chunk_id,
+                chunk.metadata.get(TITLE) or TITLE,
+                [chunk.metadata.get(header) for header in _HEADERS],
+                chunk.content if with_content else None,
+            )
+        return tree_index
 
     def add_nodes(
         self,
@@ -70,28 +108,8 @@ class DocTreeIndex:
             header6 (Optional[str]): The sixth header.
             content (Optional[str]): The content of the node.
         """
-        # Assuming titles is a dictionary containing title and headers
-        title_node = None
-        if title:
-            title_nodes = self.get_node_by_level(0)
-            if not title_nodes:
-                # If title already exists, do not add it again
-                title_node = TreeNode(node_id, title, 0, content)
-                self.root.add_child(title_node)
-            else:
-                title_node = title_nodes[0]
-        current_node = title_node
         headers = [header1, header2, header3, header4, header5, header6]
-        for level, header in enumerate(headers, start=1):
-            if header:
-                header_nodes = self.get_node_by_level_text(header)
-                if header_nodes:
-                    # If header already exists, do not add it again
-                    current_node = header_nodes[0]
-                    continue
-                new_header_node = TreeNode(node_id, header, level, content)
-                current_node.add_child(new_header_node)
-                current_node = new_header_node
+        self._add_path(node_id, title, headers, content)
 
     def add_nodes_with_content(
         self,
@@ -116,29 +134,48 @@ class DocTreeIndex:
             header5 (Optional[str]): The fifth header.
             header6 (Optional[str]): The sixth header.
         """
-        # Assuming titles is a dictionary containing title and headers
+        headers = [header1, header2, header3, header4, header5, header6]
+        self._add_path(node_id, title, headers)
+
+    def _add_path(
+        self,
+        node_id: str,
+        title: str,
+        headers: List[Optional[str]],
+        content: Optional[str] = None,
+    ):
+        """Add the title and headers of a chunk, reusing the existing nodes."""
         title_node = None
         if title:
-            title_nodes = self.get_node_by_level(0)
-            if not title_nodes:
+            title_node = self._title_node
+            if title_node is None:
                 # If title already exists, do not add it again
-                title_node = TreeNode(node_id, title, 0)
+                title_node = TreeNode(node_id, title, 0, content)
                 self.root.add_child(title_node)
-            else:
-                title_node = title_nodes[0]
+                self._title_node = title_node
+                self._index_node(title_node)
         current_node = title_node
-        headers = [header1, header2, header3, header4, header5, header6]
         for level, header in enumerate(headers, start=1):
             if header:
-                header_nodes = self.get_node_by_level_text(header)
-                if header_nodes:
+                header_node = self._nodes_by_text.get(header)
+                if header_node:
                     # If header already exists, do not add it again
-                    current_node = header_nodes[0]
+                    current_node = header_node
                     continue
-                new_header_node = TreeNode(node_id, header, level)
+                new_header_node = TreeNode(node_id, header, level, content)
                 current_node.add_child(new_header_node)
+                self._index_node(new_header_node)
                 current_node = new_header_node
 
+    def _index_node(self, node: TreeNode):
+        self._nodes_by_level_text.setdefault((node.level, node.level_text), node)
+        self._nodes_by_text.setdefault(node.level_text, node)
+        self._nodes_by_keyword.setdefault(node.level_text.lower(), []).append(node)
+
+    def get_node(self, level: int, level_text: str) -> Optional[TreeNode]:
+        """Get the node of the level and level text."""
+        return self._nodes_by_level_text.get((level, level_text))
+
     def get_node_by_level(self, level):
         """Get nodes by level."""
         # Traverse the tree to find nodes at the specified level
@@ -147,11 +184,9 @@ class DocTreeIndex:
         return result
 
     def get_node_by_level_text(self, content):
-        """Get nodes by level."""
-        # Traverse the tree to find nodes at the specified level
-        result = []
-        self._traverse_by_level_text(self.root, content, result)
-        return result
+        """Get nodes by level text."""
+        node = self._nodes_by_text.get(content)
+        return [node] if node else []
 
     def get_all_children(self, node):
         """get all children of the node."""
@@ -191,23 +226,29 @@ class DocTreeIndex:
         for child in node.children:
             self._traverse(child, level, result)
 
-    def _traverse_by_level_text(self, node, level_text, result):
-        """Traverse the tree to find nodes at the specified level."""
-        # If the current node's level matches the specified level, add it to the result
-        if node.level_text == level_text:
-            result.append(node)
-        # Recursively traverse child nodes
-        for child in node.children:
-            self._traverse_by_level_text(child, level_text, result)
-
     def search_keywords(self, node, keyword) -> Optional[TreeNode]:
+        """Search the first node whose level text matches the keyword.
+
+        The keyword index is used when searching from the root.
+        """
+        if node is self.root:
+            candidates = self._nodes_by_keyword.get(keyword.lower())
+            if not candidates:
+                return None
+            if len(candidates) == 1:
+                logger.info(f"DocTreeIndex Match found in: {candidates[0].level_text}")
+                return candidates[0]
+            # Several nodes differ only in case, return the first one in tree order
+        return self._search_keywords(node, keyword)
+
+    def _search_keywords(self, node, keyword) -> Optional[TreeNode]:
         # Check if the keyword matches the current node title
         if keyword.lower() == node.level_text.lower():
             logger.info(f"DocTreeIndex Match found in: {node.level_text}")
             return node
         # Recursively search in child nodes
         for child in node.children:
-            result = self.search_keywords(child, keyword)
+            result = self._search_keywords(child, keyword)
             if result:
                 return result
         # Check if the keyword matches any of the child nodes
@@ -215,6 +256,69 @@ class DocTreeIndex:
         return None
 
 
+class DocTreeCache:
+    """A bounded LRU cache of the document trees.
+
+    The key of a tree is the fingerprint of the title, headers and (optionally) the
+    content of the chunks it is built from, so a tree is reused by the retrievers
+    created for the same document. The node ids of a reused tree are the chunk ids of
+    its first build.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """Create a new DocTreeCache.
+
+        Args:
+            max_entries (int): The max trees to keep.
+        """
+        self._max_entries = max_entries
+        self._trees: OrderedDict[str, DocTreeIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(doc: Document, with_content: bool = False) -> str:
+        """Return the fingerprint of the tree of a document."""
+        hasher = hashlib.sha256(b"1" if with_content else b"0")
+        for chunk in doc.chunks:
+            hasher.update(b"\1")
+            hasher.update(str(chunk.metadata.get(TITLE) or TITLE).encode("utf-8"))
+            for header in _HEADERS:
+                hasher.update(b"\0")
+                hasher.update(str(chunk.metadata.get(header) or "").encode("utf-8"))
+            if with_content:
+                hasher.update(b"\0")
+                hasher.update(chunk.content.encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get_or_build(self, doc: Document, with_content: bool = False) -> DocTreeIndex:
+        """Get the cached tree of a document, build it if not cached."""
+        key = self.fingerprint(doc, with_content)
+        with self._lock:
+            tree_index = self._trees.get(key)
+            if tree_index is not None:
+                self._trees.move_to_end(key)
+                return tree_index
+        tree_index = DocTreeIndex.from_chunks(doc.chunks, with_content)
+        with self._lock:
+            self._trees[key] = tree_index
+            self._trees.move_to_end(key)
+            while len(self._trees) > self._max_entries:
+                self._trees.popitem(last=False)
+        return tree_index
+
+    def clear(self):
+        """Clear the cache."""
+        with self._lock:
+            self._trees.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached trees."""
+        return len(self._trees)
+
+
+_DOC_TREE_CACHE = DocTreeCache()
+
+
 class DocTreeRetriever(BaseRetriever):
     """Doc Tree retriever."""
 
@@ -228,6 +332,7 @@ class DocTreeRetriever(BaseRetriever):
         with_content: bool = False,
         show_tree: bool = True,
         executor: Optional[Executor] = None,
+        tree_cache: Optional[DocTreeCache] = _DOC_TREE_CACHE,
     ):
         """Create DocTreeRetriever.
 
@@ -239,6 +344,8 @@ class DocTreeRetriever(BaseRetriever):
             keywords_extractor (Optional[ExtractorBase]): keywords extractor
             with_content: bool: whether to include content
             executor (Optional[Executor]): executor
+            tree_cache (Optional[DocTreeCache]): the cache to reuse the document
+                trees, default is a process wide cache, None to always rebuild
 
         Returns:
             DocTreeRetriever: BM25 retriever
@@ -250,6 +357,7 @@ class DocTreeRetriever(BaseRetriever):
         self._keywords_extractor = keywords_extractor
         self._with_content = with_content
         self._show_tree = show_tree
+        self._tree_cache = tree_cache
         self._tree_indexes = self._initialize_doc_tree(docs)
         self._executor = executor or ThreadPoolExecutor()
 
@@ -339,32 +447,10 @@ class DocTreeRetriever(BaseRetriever):
             docs (List[Document]): List of docs to initialize the tree with.
         """
         tree_indexes = []
-        for doc in docs:
-            tree_index = DocTreeIndex()
-            for chunk in doc.chunks:
-                title = chunk.metadata.get("title") or "title"
-                if not self._with_content:
-                    tree_index.add_nodes(
-                        node_id=chunk.chunk_id,
-                        title=title,
-                        header1=chunk.metadata.get(HEADER1),
-                        header2=chunk.metadata.get(HEADER2),
-                        header3=chunk.metadata.get(HEADER3),
-                        header4=chunk.metadata.get(HEADER4),
-                        header5=chunk.metadata.get(HEADER5),
-                        header6=chunk.metadata.get(HEADER6),
-                    )
-                else:
-                    tree_index.add_nodes(
-                        node_id=chunk.chunk_id,
-                        title=title,
-                        header1=chunk.metadata.get(HEADER1),
-                        header2=chunk.metadata.get(HEADER2),
-                        header3=chunk.metadata.get(HEADER3),
-                        header4=chunk.metadata.get(HEADER4),
-                        header5=chunk.metadata.get(HEADER5),
-                        header6=chunk.metadata.get(HEADER6),
-                        content=chunk.content,
-                    )
+        for doc in docs or []:
+            if self._tree_cache is not None:
+                tree_index = self._tree_cache.get_or_build(doc, self._with_content)
+            else:
+                tree_index = DocTreeIndex.from_chunks(doc.chunks, self._with_content)
             tree_indexes.append(tree_index)
         return tree_indexes
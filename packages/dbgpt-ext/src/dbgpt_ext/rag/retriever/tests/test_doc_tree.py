@@ -0,0 +1,84 @@
+import pytest
+
+from dbgpt.core import Chunk, Document
+from dbgpt_ext.rag.retriever.doc_tree import (
+    DocTreeCache,
+    DocTreeIndex,
+    DocTreeRetriever,
+    TreeNode,
+)
+
+
+def _doc() -> Document:
+    headers = [
+        {"Header1": "Install", "Header2": "Docker"},
+        {"Header1": "Install", "Header2": "Source Code"},
+        {"Header1": "Usage", "Header2": "Chat"},
+        {"Header1": "Usage", "Header2": "Chat", "Header3": "Chat Excel"},
+    ]
+    doc = Document(content="")
+    doc.chunks = [
+        Chunk(content=f"content {i}", metadata={"title": "Manual", **h})
+        for i, h in enumerate(headers)
+    ]
+    return doc
+
+
+def test_build_tree():
+    tree_index = DocTreeIndex.from_chunks(_doc().chunks, with_content=True)
+    title = tree_index.root.children[0]
+    assert title.level_text == "Manual"
+    assert [n.level_text for n in title.children] == ["Install", "Usage"]
+    assert [n.level_text for n in title.children[0].children] == [
+        "Docker",
+        "Source Code",
+    ]
+    chat = tree_index.get_node(2, "Chat")
+    assert chat.content == "content 2"
+    assert [n.level_text for n in chat.children] == ["Chat Excel"]
+    assert tree_index.get_node(1, "Chat") is None
+    assert tree_index.get_node_by_level_text("Chat") == [chat]
+    assert tree_index.get_node_by_level(0) == [title]
+    with pytest.raises(AttributeError):
+        title.extra = 1
+
+
+def test_search_keywords():
+    tree_index = DocTreeIndex.from_chunks(_doc().chunks)
+    node = tree_index.search_keywords(tree_index.root, "chat excel")
+    assert node.level_text == "Chat Excel"
+    install = tree_index.get_node(1, "Install")
+    assert tree_index.search_keywords(install, "docker").level_text == "Docker"
+    assert tree_index.search_keywords(install, "chat") is None
+    assert tree_index.search_keywords(tree_index.root, "missing") is None
+
+
+def test_search_keywords_case_collision():
+    tree_index = DocTreeIndex()
+    tree_index.add_nodes("1", "Manual", header1="A", header2="intro")
+    tree_index.add_nodes("2", "Manual", header1="Intro")
+    tree_index.add_nodes("3", "Manual", header1="A", header2="B", header3="x")
+    node = tree_index.search_keywords(tree_index.root, "INTRO")
+    assert isinstance(node, TreeNode)
+    assert node.level == 2 and node.level_text == "intro"
+
+
+@pytest.mark.asyncio
+async def test_retriever_reuses_cached_tree():
+    cache = DocTreeCache(max_entries=1)
+    first = DocTreeRetriever(docs=[_doc()], show_tree=False, tree_cache=cache)
+    second = DocTreeRetriever(docs=[_doc()], show_tree=False, tree_cache=cache)
+    assert second.get_tree_indexes()[0] is first.get_tree_indexes()[0]
+    assert len(cache) == 1
+
+    with_content = DocTreeRetriever(
+        docs=[_doc()], show_tree=False, with_content=True, tree_cache=cache
+    )
+    assert with_content.get_tree_indexes()[0] is not first.get_tree_indexes()[0]
+    assert len(cache) == 1
+
+    rebuilt = DocTreeRetriever(docs=[_doc()], show_tree=False, tree_cache=None)
+    assert rebuilt.get_tree_indexes()[0] is not first.get_tree_indexes()[0]
+
+    nodes = await first.aretrieve("docker")
+    assert [n.level_text for n in nodes] == ["Docker"]
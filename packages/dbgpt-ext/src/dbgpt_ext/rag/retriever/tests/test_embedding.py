@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -37,3 +37,42 @@ def test_retrieve(query, top_k, mock_vector_store_connector, embedding_retriever
     retrieved_chunks = embedding_retriever._retrieve(query)
 
     assert len(retrieved_chunks) == top_k
+
+
+@pytest.mark.asyncio
+async def test_aretrieve_with_score_batch_rewrite(query, mock_vector_store_connector):
+    query_rewrite = MagicMock()
+    query_rewrite.rewrite = AsyncMock(return_value=["rewritten query"])
+    mock_vector_store_connector.asimilar_search = AsyncMock(
+        return_value=[Chunk(content="context")]
+    )
+    mock_vector_store_connector.asimilar_search_with_scores_batch = AsyncMock(
+        return_value=[
+            [
+                Chunk(chunk_id="1", content="a", score=0.5),
+                Chunk(chunk_id="2", content="b", score=0.6),
+            ],
+            [
+                Chunk(chunk_id="1", content="a", score=0.9),
+                Chunk(chunk_id="3", content="c", score=0.7),
+            ],
+        ]
+    )
+    retriever = EmbeddingRetriever(
+        top_k=4,
+        query_rewrite=query_rewrite,
+        index_store=mock_vector_store_connector,
+    )
+
+    chunks = await retriever._aretrieve_with_score(query, 0.0)
+
+    mock_vector_store_connector.asimilar_search_with_scores_batch.assert_awaited_once()
+    queries = mock_vector_store_connector.asimilar_search_with_scores_batch.call_args[
+        0
+    ][0]
+    assert queries == [query, "rewritten query"]
+    assert [(c.chunk_id, c.score) for c in chunks] == [
+        ("1", 0.9),
+        ("3", 0.7),
+        ("2", 0.6),
+    ]
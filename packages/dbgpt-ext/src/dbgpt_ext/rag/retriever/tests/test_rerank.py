@@ -0,0 +1,105 @@
+from typing import List
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.rerank import DefaultRanker, RankFusion, RRFRanker
+
+
+def _chunks(ids: str, retriever: str = "vector") -> List[Chunk]:
+    return [
+        Chunk(
+            chunk_id=i, content=f"content {i}", score=1.0 - n * 0.1, retriever=retriever
+        )
+        for n, i in enumerate(ids)
+    ]
+
+
+def test_default_ranker_dedupe_by_content():
+    candidates = [
+        Chunk(content="a", score=0.5),
+        Chunk(content="b", score=0.9),
+        Chunk(content="a", score=0.7),
+        Chunk(content="c", score=0.7),
+        Chunk(content="d", score=0.1),
+    ]
+    ranked = DefaultRanker(topk=3).rank(candidates)
+    assert [(c.content, c.score) for c in ranked] == [
+        ("b", 0.9),
+        ("a", 0.7),
+        ("c", 0.7),
+    ]
+
+
+def test_rrf_fusion():
+    fused = RankFusion("rrf", rrf_k=60).fuse([_chunks("abc"), _chunks("cbd")])
+    assert [c.chunk_id for c in fused] == ["c", "b", "a", "d"]
+    assert fused[0].score == pytest.approx(1 / 63 + 1 / 61)
+    assert fused[1].score == pytest.approx(1 / 62 + 1 / 62)
+    assert fused[2].score == pytest.approx(1 / 61)
+
+
+def test_weighted_fusion():
+    fusion = RankFusion("weighted", weights={"vector": 1.0, "bm25": 3.0})
+    fused = fusion.fuse({"vector": _chunks("abc"), "bm25": _chunks("cd")}, topk=2)
+    # c: 0 * 1.0 + 1.0 * 3.0, a: 1.0 * 1.0, d: 0 * 3.0
+    assert [c.chunk_id for c in fused] == ["c", "a"]
+    assert fused[0].score == pytest.approx(3.0)
+
+
+def test_fusion_does_not_modify_candidates():
+    candidates = _chunks("ab")
+    fused = RankFusion().fuse([candidates])
+    assert candidates[0].score == 1.0
+    assert fused[0].metadata is candidates[0].metadata
+
+
+def test_fusion_invalid():
+    with pytest.raises(ValueError):
+        RankFusion("unknown")
+    assert RankFusion().fuse([[], []]) == []
+
+
+def test_rrf_ranker_groups_by_retriever():
+    candidates = _chunks("abc", "vector") + _chunks("cad", "bm25")
+    ranked = RRFRanker(topk=2).rank(candidates)
+    assert [c.chunk_id for c in ranked] == ["a", "c"]
+
+
+def test_rrf_ranker_single_retriever():
+    ranker = RRFRanker(topk=2, weights={"vector": 0.7, "bm25": 0.3})
+    ranked = ranker.rank(_chunks("abc", "vector"))
+    assert [c.chunk_id for c in ranked] == ["a", "b"]
+    assert ranked[0].score == pytest.approx(0.7 / 61)
+
+
+def test_rrf_ranker_weights_by_retriever_name():
+    ranker = RRFRanker(topk=4, weights={"vector": 0.7, "bm25": 0.3})
+    vector, bm25 = _chunks("ab", "vector"), _chunks("cd", "bm25")
+    # The weights follow the retriever names, not the arrival order
+    for candidates in (vector + bm25, bm25 + vector):
+        ranked = ranker.rank(candidates)
+        assert [c.chunk_id for c in ranked] == ["a", "b", "c", "d"]
+        assert ranked[0].score == pytest.approx(0.7 / 61)
+        assert ranked[2].score == pytest.approx(0.3 / 61)
+    ranked = ranker.rank_lists([bm25, vector])
+    assert [c.chunk_id for c in ranked] == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_rrf_ranker_streams():
+    async def _stream(chunks: List[Chunk]):
+        for chunk in chunks:
+            yield chunk
+
+    ranker = RRFRanker(topk=3)
+    ranked = await ranker.arank_streams(
+        [_stream(_chunks("abc")), _stream(_chunks("cad")), _stream([])]
+    )
+    assert [c.chunk_id for c in ranked] == ["a", "c", "b"]
+
+    ranker = RRFRanker(topk=2, weights={"vector": 0.1, "bm25": 1.0})
+    ranked = await ranker.arank_streams(
+        {"vector": _stream(_chunks("ab")), "bm25": _stream(_chunks("cd", "bm25"))}
+    )
+    assert [c.chunk_id for c in ranked] == ["c", "d"]
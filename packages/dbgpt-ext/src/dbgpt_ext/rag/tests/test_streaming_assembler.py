@@ -0,0 +1,169 @@
+import asyncio
+from typing import Iterator, List
+
+import pytest
+
+from dbgpt.core import Chunk, Document
+from dbgpt.rag.knowledge.base import ChunkStrategy, Knowledge, KnowledgeType
+from dbgpt.storage.base import IndexStoreBase, IndexStoreConfig
+from dbgpt_ext.rag.assembler.embedding import EmbeddingAssembler
+from dbgpt_ext.rag.assembler.summary import SummaryAssembler
+from dbgpt_ext.rag.chunk_manager import ChunkParameters
+
+
+class MockKnowledge(Knowledge):
+    def __init__(self, num_docs: int, **kwargs):
+        super().__init__(**kwargs)
+        self.num_docs = num_docs
+        self.loaded = 0
+
+    @classmethod
+    def type(cls) -> KnowledgeType:
+        return KnowledgeType.TEXT
+
+    @classmethod
+    def support_chunk_strategy(cls) -> List[ChunkStrategy]:
+        return [ChunkStrategy.CHUNK_BY_SEPARATOR]
+
+    def _load(self) -> List[Document]:
+        return list(self._iter_load())
+
+    def _iter_load(self) -> Iterator[Document]:
+        for i in range(self.num_docs):
+            self.loaded += 1
+            content = "\n".join(f"doc {i} line {j}" for j in range(3))
+            yield Document(content=content, metadata={"doc": i})
+
+
+class MockIndexStore(IndexStoreBase):
+    def __init__(self, knowledge: MockKnowledge, fail: bool = False):
+        super().__init__()
+        self.knowledge = knowledge
+        self.fail = fail
+        self.loaded_ahead: List[int] = []
+        self.chunks: List[Chunk] = []
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        if self.fail:
+            raise ValueError("mock error")
+        # How many documents are loaded but not persisted
+        self.loaded_ahead.append(self.knowledge.loaded - len(self.chunks) // 3)
+        self.chunks.extend(chunks)
+        return [chunk.chunk_id for chunk in chunks]
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        await asyncio.sleep(0.001)
+        return self.load_document(chunks)
+
+    def similar_search_with_scores(self, text, topk, score_threshold, filters=None):
+        return []
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+
+def _chunk_parameters() -> ChunkParameters:
+    return ChunkParameters(
+        chunk_strategy="CHUNK_BY_SEPARATOR", separator="\n", enable_merge=False
+    )
+
+
+def test_iter_chunks_is_lazy():
+    knowledge = MockKnowledge(100)
+    assembler = EmbeddingAssembler(
+        knowledge,
+        MockIndexStore(knowledge),
+        chunk_parameters=_chunk_parameters(),
+        streaming=True,
+    )
+    assert knowledge.loaded == 0
+    chunks = assembler.iter_chunks()
+    first = next(chunks)
+    assert first.content == "doc 0 line 0"
+    assert first.metadata["doc"] == 0
+    assert knowledge.loaded == 1
+    assert assembler.get_chunks() == []
+
+
+def test_streaming_persist():
+    knowledge = MockKnowledge(100)
+    index_store = MockIndexStore(knowledge)
+    assembler = EmbeddingAssembler(
+        knowledge, index_store, chunk_parameters=_chunk_parameters(), streaming=True
+    )
+    ids = assembler.persist(max_chunks_once_load=6, max_threads=2)
+    assert len(ids) == 300
+    assert ids == [chunk.chunk_id for chunk in index_store.chunks]
+    assert assembler.chunk_count == 300
+    assert max(index_store.loaded_ahead) < 10
+
+
+@pytest.mark.asyncio
+async def test_streaming_apersist():
+    knowledge = MockKnowledge(1000)
+    index_store = MockIndexStore(knowledge)
+    assembler = EmbeddingAssembler(
+        knowledge,
+        index_store,
+        chunk_parameters=_chunk_parameters(),
+        streaming=True,
+        queue_depth=2,
+    )
+    ids = await assembler.apersist(max_chunks_once_load=6, max_threads=2)
+    assert len(ids) == 3000
+    assert sorted(ids) == sorted(chunk.chunk_id for chunk in index_store.chunks)
+    assert [c.content for c in index_store.chunks[:3]] == [
+        "doc 0 line 0",
+        "doc 0 line 1",
+        "doc 0 line 2",
+    ]
+    # Bounded by the queue depth and the batch size of the producer
+    assert max(index_store.loaded_ahead) < 200
+
+
+@pytest.mark.asyncio
+async def test_streaming_apersist_error():
+    knowledge = MockKnowledge(1000)
+    index_store = MockIndexStore(knowledge, fail=True)
+    assembler = EmbeddingAssembler(
+        knowledge,
+        index_store,
+        chunk_parameters=_chunk_parameters(),
+        streaming=True,
+        queue_depth=1,
+    )
+    with pytest.raises(RuntimeError):
+        await assembler.apersist(max_chunks_once_load=6, max_threads=2)
+    # Stop loading the knowledge after the failure
+    assert knowledge.loaded < 1000
+
+
+@pytest.mark.asyncio
+async def test_aiter_chunks_stop_early():
+    knowledge = MockKnowledge(1000)
+    assembler = EmbeddingAssembler(
+        knowledge,
+        MockIndexStore(knowledge),
+        chunk_parameters=_chunk_parameters(),
+        streaming=True,
+        queue_depth=1,
+    )
+    chunks = assembler.aiter_chunks(batch_size=3)
+    assert (await chunks.__anext__()).content == "doc 0 line 0"
+    # The producer waiting for a free slot is stopped
+    await asyncio.wait_for(chunks.aclose(), 5)
+    assert knowledge.loaded < 1000
+
+
+def test_streaming_not_supported():
+    with pytest.raises(ValueError, match="does not support streaming"):
+        SummaryAssembler(MockKnowledge(1), extractor=object(), streaming=True)
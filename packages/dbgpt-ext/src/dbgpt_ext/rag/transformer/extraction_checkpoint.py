@@ -0,0 +1,104 @@
+"""Checkpoint of the graph extraction results."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from dbgpt.storage.graph_store.graph import Edge, Graph, MemoryGraph, Vertex
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCheckpoint:
+    """Persist the graphs extracted from every text.
+
+    The graphs are appended to a JSON lines file as soon as a text is extracted, an
+    interrupted build loads the file and only extracts the texts left. A text is
+    keyed by the hash of the text and the namespace, e.g. the model name, so the
+    results of another model are not reused.
+    """
+
+    def __init__(self, path: str, namespace: str = ""):
+        """Create an ExtractionCheckpoint.
+
+        Args:
+            path (str): The checkpoint file.
+            namespace (str): Isolate the results of different extraction settings.
+        """
+        self._path = path
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._graphs: Dict[str, List[Dict[str, Any]]] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        """Return the number of the checkpointed texts."""
+        return len(self._graphs)
+
+    def get(self, text: str) -> Optional[List[Graph]]:
+        """Return the checkpointed graphs of the text, None if it is not done."""
+        graphs = self._graphs.get(self._key(text))
+        if graphs is None:
+            return None
+        return [graph_from_dict(graph) for graph in graphs]
+
+    def put(self, text: str, graphs: List[Graph]) -> None:
+        """Save the graphs extracted from the text."""
+        key = self._key(text)
+        data = [graph_to_dict(graph) for graph in graphs]
+        line = json.dumps({"key": key, "graphs": data}, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._graphs[key] = data
+
+    def clear(self) -> None:
+        """Remove the checkpoint file."""
+        with self._lock:
+            self._graphs.clear()
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._namespace}\0{text}".encode()).hexdigest()
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line is partially written by an interrupted build
+                    logger.warning(f"Skip a broken line of checkpoint {self._path}")
+                    continue
+                self._graphs[entry["key"]] = entry["graphs"]
+        logger.info(f"Loaded {len(self._graphs)} extracted texts from {self._path}")
+
+
+def graph_to_dict(graph: Graph) -> Dict[str, Any]:
+    """Convert a graph to a JSON serializable dict."""
+    return {
+        "vertices": [
+            {"vid": v.vid, "name": v._name, "props": v.props} for v in graph.vertices()
+        ],
+        "edges": [
+            {"sid": e.sid, "tid": e.tid, "name": e.name, "props": e.props}
+            for e in graph.edges()
+        ],
+    }
+
+
+def graph_from_dict(data: Dict[str, Any]) -> MemoryGraph:
+    """Create a graph from the dict of :func:`graph_to_dict`."""
+    graph = MemoryGraph()
+    for v in data["vertices"]:
+        graph.upsert_vertex(Vertex(v["vid"], v["name"], **v["props"]))
+    for e in data["edges"]:
+        graph.append_edge(Edge(e["sid"], e["tid"], e["name"], **e["props"]))
+    return graph
@@ -1,17 +1,21 @@
 """GraphExtractor class."""
 
-import asyncio
+import hashlib
 import logging
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from dbgpt.core import Chunk, LLMClient
 from dbgpt.rag.transformer.llm_extractor import LLMExtractor
 from dbgpt.storage.graph_store.graph import Edge, Graph, MemoryGraph, Vertex
 from dbgpt.storage.vector_store.base import VectorStoreBase
+from dbgpt.util.chat_util import run_async_tasks
+from dbgpt_ext.rag.transformer.extraction_checkpoint import ExtractionCheckpoint
 
 logger = logging.getLogger(__name__)
 
+_PART_PATTERN = re.compile(r"^\s*\[Part\s*(\d+)\]\s*$", re.MULTILINE)
+
 
 class GraphExtractor(LLMExtractor):
     """GraphExtractor class."""
@@ -26,8 +30,19 @@ class GraphExtractor(LLMExtractor):
         max_threads: Optional[int] = 1,
         top_k: Optional[int] = 5,
         score_threshold: Optional[float] = 0.7,
+        texts_per_prompt: int = 1,
+        checkpoint_path: Optional[str] = None,
     ):
-        """Initialize the GraphExtractor."""
+        """Initialize the GraphExtractor.
+
+        Args:
+            texts_per_prompt (int): Extract several texts with one LLM request, the
+                texts whose results can not be told apart in the response are
+                extracted again one by one.
+            checkpoint_path (Optional[str]): Persist the extracted graphs to the
+                file, the texts found in it are not extracted again. The results of
+                other models, prompts or texts_per_prompt are not reused.
+        """
         super().__init__(llm_client, model_name, GRAPH_EXTRACT_PT_CN)
         self._chunk_history = chunk_history
 
@@ -38,6 +53,26 @@ class GraphExtractor(LLMExtractor):
         self._max_threads = max_threads
         self._topk = top_k
         self._score_threshold = score_threshold
+        self._texts_per_prompt = max(texts_per_prompt, 1)
+        self._checkpoint = (
+            ExtractionCheckpoint(
+                checkpoint_path, namespace=self._checkpoint_namespace()
+            )
+            if checkpoint_path
+            else None
+        )
+
+    def _checkpoint_namespace(self) -> str:
+        """Return the namespace of the extraction settings in the checkpoint."""
+        settings = "\0".join(
+            [
+                self._prompt_template,
+                GRAPH_EXTRACT_MULTI_PT_CN if self._texts_per_prompt > 1 else "",
+                str(self._texts_per_prompt),
+            ]
+        )
+        digest = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+        return f"{self._model_name or ''}:{digest}"
 
     async def aload_chunk_context(self, texts: List[str]) -> Dict[str, str]:
         """Load chunk context."""
@@ -84,52 +119,115 @@ class GraphExtractor(LLMExtractor):
     ) -> Optional[List[List[Graph]]]:
         """Extract graphs from chunks in batches.
 
+        At most batch_size LLM requests are running at the same time, every request
+        extracts up to texts_per_prompt texts. The texts found in the checkpoint are
+        skipped, the others are saved to it once extracted.
+
         Returns list of graphs in same order as input texts (text <-> graphs).
         """
         if batch_size < 1:
             raise ValueError("batch_size >= 1")
 
-        # 1. Load chunk context
-        text_context_map = await self.aload_chunk_context(texts)
-
         # Pre-allocate results list to maintain order
         graphs_list: List[List[Graph]] = [None] * len(texts)
-
-        n_texts = len(texts)
-
-        for batch_idx in range(0, n_texts, batch_size):
-            start_idx = batch_idx
-            end_idx = min(start_idx + batch_size, n_texts)
-            batch_texts = texts[start_idx:end_idx]
-
-            # 2. Create tasks with their original indices
-            extraction_tasks = [
-                (
-                    idx,
-                    self._extract(text, text_context_map[text], limit),
-                )
-                for idx, text in enumerate(batch_texts, start=start_idx)
-            ]
-
-            # 3. Process extraction in parallel while keeping track of indices
-            batch_results = await asyncio.gather(
-                *(task for _, task in extraction_tasks), return_exceptions=True
+        pending: List[int] = []
+        for idx, text in enumerate(texts):
+            graphs = (
+                self._checkpoint.get(text) if self._checkpoint is not None else None
             )
-
-            # 4. Place results in the correct positions
-            for (idx, _), graphs in zip(extraction_tasks, batch_results):
-                if isinstance(graphs, Exception):
-                    raise RuntimeError(f"Failed to extract graph: {graphs}")
-                if not isinstance(graphs, list) or not all(
-                    isinstance(g, Graph) for g in graphs
-                ):
-                    raise RuntimeError(f"Invalid graph extraction result: {graphs}")
+            if graphs is None:
+                pending.append(idx)
+            else:
                 graphs_list[idx] = graphs
+        if len(pending) < len(texts):
+            logger.info(
+                f"Skip {len(texts) - len(pending)} texts extracted in the checkpoint"
+            )
+        if not pending:
+            return graphs_list
+
+        # 1. Load chunk context
+        pending_texts = [texts[idx] for idx in pending]
+        text_context_map = await self.aload_chunk_context(pending_texts)
+
+        # 2. Extract the groups of texts with bounded concurrency
+        groups = [
+            pending_texts[i : i + self._texts_per_prompt]
+            for i in range(0, len(pending_texts), self._texts_per_prompt)
+        ]
+        results = await run_async_tasks(
+            tasks=[
+                self._extract_group(group, text_context_map, limit) for group in groups
+            ],
+            concurrency_limit=batch_size,
+        )
+
+        # 3. Place results in the correct positions
+        group_results = [graphs for group_result in results for graphs in group_result]
+        for idx, graphs in zip(pending, group_results):
+            if not isinstance(graphs, list) or not all(
+                isinstance(g, Graph) for g in graphs
+            ):
+                raise RuntimeError(f"Invalid graph extraction result: {graphs}")
+            graphs_list[idx] = graphs
 
         assert all(x is not None for x in graphs_list), "All positions should be filled"
         return graphs_list
 
-    def _parse_response(self, text: str, limit: Optional[int] = None) -> List[Graph]:
+    async def _extract_group(
+        self,
+        texts: List[str],
+        text_context_map: Dict[str, str],
+        limit: Optional[int] = None,
+    ) -> List[List[Graph]]:
+        """Extract a group of texts with one request, return graphs of every text."""
+        results: List[Optional[List[Graph]]] = [None] * len(texts)
+        if len(texts) > 1:
+            parts = "\n\n".join(
+                f"[Part {i + 1}]\n{text}" for i, text in enumerate(texts)
+            )
+            history = "\n".join(
+                dict.fromkeys(
+                    text_context_map[text] for text in texts if text_context_map[text]
+                )
+            )
+            response_text = await self._generate(
+                GRAPH_EXTRACT_MULTI_PT_CN.format(n=len(texts), parts=parts), history
+            )
+            # A response without the part headers can not be split by texts
+            for i, graphs in self._parse_parts(response_text or "", limit):
+                if 0 <= i < len(texts):
+                    results[i] = results[i] or graphs
+
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                # Not found in the response of the group, extract it alone
+                results[i] = await self._extract(text, text_context_map[text], limit)
+            # An empty result is a failed request, extract it again next time
+            if self._checkpoint is not None and results[i]:
+                self._checkpoint.put(text, results[i])
+        return results
+
+    def _parse_response(self, text: str, limit: Optional[int] = None) -> List:
+        """Parse the graphs of the response of a text."""
+        return self._parse_graphs(text, limit)
+
+    def _parse_parts(
+        self, text: str, limit: Optional[int] = None
+    ) -> List[Tuple[int, List[Graph]]]:
+        """Parse the graphs of the response of several texts by the part headers.
+
+        Returns:
+            List[Tuple[int, List[Graph]]]: The index of the text and its graphs.
+        """
+        # [text before the first part, part number, part text, ...]
+        parts = _PART_PATTERN.split(text)
+        return [
+            (int(parts[i]) - 1, self._parse_graphs(parts[i + 1], limit))
+            for i in range(1, len(parts) - 1, 2)
+        ]
+
+    def _parse_graphs(self, text: str, limit: Optional[int] = None) -> List[Graph]:
         graph = MemoryGraph()
         edge_count = 0
         current_section = None
@@ -167,13 +265,20 @@ class GraphExtractor(LLMExtractor):
 
         return [graph]
 
+    def clear_checkpoint(self):
+        """Clear the checkpoint, e.g. when its graphs are persisted."""
+        if self._checkpoint is not None:
+            self._checkpoint.clear()
+
     def truncate(self):
-        """Truncate chunk history."""
+        """Truncate chunk history and the checkpoint."""
         self._chunk_history.truncate()
+        self.clear_checkpoint()
 
     def drop(self):
-        """Drop chunk history."""
+        """Drop chunk history and the checkpoint."""
         self._chunk_history.delete_vector_name(self._vector_space)
+        self.clear_checkpoint()
 
 
 GRAPH_EXTRACT_PT_CN = (
@@ -271,6 +376,13 @@ GRAPH_EXTRACT_PT_CN = (
     "\n"
 )
 
+GRAPH_EXTRACT_MULTI_PT_CN = (
+    "[文本]包含{n}个部分，每个部分以[Part 编号]开头。请分别抽取每个部分的实体和关系，"
+    "每个部分的结果以单独一行的[Part 编号]开头，然后按照输出格式输出。\n"
+    "\n"
+    "{parts}"
+)
+
 GRAPH_EXTRACT_PT_EN = (
     "## Role\n"
     "You are an expert in Knowledge Graph Engineering, skilled at extracting "
@@ -0,0 +1,131 @@
+import asyncio
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ..extraction_checkpoint import ExtractionCheckpoint
+from ..graph_extractor import GraphExtractor
+
+
+def _response_of(text: str) -> str:
+    """Answer an entity for every `fact-N` in the text, grouped by the parts."""
+    parts = re.findall(r"\[Part (\d+)\]\n(fact-\d+)", text)
+    if not parts:
+        fact = re.findall(r"\[文本\]:\n(fact-\d+)", text)[0]
+        return f"Entities:\n({fact}#summary of {fact})\n"
+    return "".join(
+        f"[Part {i}]\nEntities:\n({fact}#summary of {fact})\n" for i, fact in parts
+    )
+
+
+class _MockLLMClient:
+    def __init__(self, drop_parts: bool = False):
+        self.requests = []
+        self.running = 0
+        self.max_running = 0
+        self._drop_parts = drop_parts
+
+    async def generate(self, request):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        content = request.messages[-1].content
+        self.requests.append(content)
+        text = _response_of(content)
+        if self._drop_parts:
+            text = re.sub(r"\[Part \d+\]\n", "", text)
+        return MagicMock(success=True, has_text=True, text=text)
+
+
+def _extractor(llm_client, **kwargs) -> GraphExtractor:
+    chunk_history = MagicMock()
+    chunk_history.asimilar_search_with_scores = AsyncMock(return_value=[])
+    chunk_history.aload_document_with_limit = AsyncMock(return_value=[])
+    return GraphExtractor(llm_client, "mock-model", chunk_history, "test", **kwargs)
+
+
+def _names(graphs_list):
+    return [[v.vid for g in graphs for v in g.vertices()] for graphs in graphs_list]
+
+
+TEXTS = [f"fact-{i}" for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_bounded_concurrency():
+    llm_client = _MockLLMClient()
+    graphs_list = await _extractor(llm_client).batch_extract(TEXTS, batch_size=3)
+    assert _names(graphs_list) == [[text] for text in TEXTS]
+    assert len(llm_client.requests) == len(TEXTS)
+    assert llm_client.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_texts_per_prompt():
+    llm_client = _MockLLMClient()
+    extractor = _extractor(llm_client, texts_per_prompt=3)
+    graphs_list = await extractor.batch_extract(TEXTS, batch_size=2)
+    assert _names(graphs_list) == [[text] for text in TEXTS]
+    # 3 + 3 + 1 texts
+    assert len(llm_client.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_texts_per_prompt_fallback():
+    # The response can not be split by parts, extract every text alone
+    llm_client = _MockLLMClient(drop_parts=True)
+    extractor = _extractor(llm_client, texts_per_prompt=3)
+    graphs_list = await extractor.batch_extract(TEXTS[:3], batch_size=2)
+    assert _names(graphs_list) == [[text] for text in TEXTS[:3]]
+    assert len(llm_client.requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_resume(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    llm_client = _MockLLMClient()
+    extractor = _extractor(llm_client, checkpoint_path=path)
+    await extractor.batch_extract(TEXTS[:4])
+    namespace = extractor._checkpoint_namespace()
+    assert namespace.startswith("mock-model:")
+    assert len(ExtractionCheckpoint(path, namespace)) == 4
+
+    # Only the texts not in the checkpoint are extracted
+    llm_client = _MockLLMClient()
+    extractor = _extractor(llm_client, checkpoint_path=path)
+    graphs_list = await extractor.batch_extract(TEXTS, batch_size=2)
+    assert _names(graphs_list) == [[text] for text in TEXTS]
+    assert len(llm_client.requests) == 3
+    assert extractor._chunk_history.asimilar_search_with_scores.await_count == 3
+
+    # The results of other models or settings are not reused
+    assert ExtractionCheckpoint(path, "other-model").get(TEXTS[0]) is None
+    assert ExtractionCheckpoint(path, namespace).get(TEXTS[0]) is not None
+    llm_client = _MockLLMClient()
+    other = _extractor(llm_client, checkpoint_path=path, texts_per_prompt=2)
+    assert other._checkpoint_namespace() != namespace
+    await other.batch_extract(TEXTS[:2])
+    assert len(llm_client.requests) == 1
+
+    extractor.clear_checkpoint()
+    assert len(ExtractionCheckpoint(path, namespace)) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_text_with_part_header(tmp_path):
+    # The response of a single text is never split by the part headers
+    llm_client = _MockLLMClient()
+    llm_client.generate = AsyncMock(
+        return_value=MagicMock(
+            success=True,
+            has_text=True,
+            text="[Part 1]\nEntities:\n(fact-0#summary of fact-0)\n",
+        )
+    )
+    path = str(tmp_path / "checkpoint.jsonl")
+    extractor = _extractor(llm_client, checkpoint_path=path)
+    graphs_list = await extractor.batch_extract(TEXTS[:1])
+    assert _names(graphs_list) == [["fact-0"]]
+    assert _names([extractor._checkpoint.get(TEXTS[0])]) == [["fact-0"]]
@@ -129,6 +129,7 @@ def scan_storage_configs():
         "dbgpt_ext.storage.vector_store",
         "dbgpt_ext.storage.knowledge_graph",
         "dbgpt_ext.storage.graph_store",
+        "dbgpt_ext.storage.full_text",
     ]
 
     scanner = ModelScanner[IndexStoreConfig]()
@@ -0,0 +1,291 @@
+"""In-process BM25 inverted index.
+
+The index is a compact segment of postings in CSR layout: the documents and the
+term frequencies of all terms are two flat numpy arrays, a term is a slice of them.
+The segment is saved as ``.npy`` files and memory-mapped on load. The documents
+added later are kept in small in-memory postings lists, the deleted documents are
+masked, and :meth:`BM25Index.compact` merges both into a new segment.
+
+A query scores all the postings of its terms with numpy in one pass, there is no
+per-document Python loop.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# The CJK characters are indexed one by one, like the standard analyzer of
+# Elasticsearch, the other words are split by the non-word characters.
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(rf"[^\W{_CJK}]+|[{_CJK}]")
+
+_SEGMENT_VERSION = 1
+_MAX_TF = np.iinfo(np.uint16).max
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text to lowercase terms."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """An inverted index scored by Okapi BM25.
+
+    Example:
+        .. code-block:: python
+
+            index = BM25Index()
+            index.add(["1", "2"], ["DB-GPT is a data app framework", "hello world"])
+            index.search("data framework", top_k=3)  # [("1", 1.23)]
+    """
+
+    def __init__(
+        self,
+        k1: float = 2.0,
+        b: float = 0.75,
+        tokenizer: Callable[[str], List[str]] = tokenize,
+    ):
+        """Create an empty BM25Index.
+
+        Args:
+            k1 (float): Controls non-linear term frequency normalization
+                (saturation).
+            b (float): Controls to what degree document length normalizes tf
+                values.
+            tokenizer (Callable[[str], List[str]]): Split a text to terms.
+        """
+        self._k1 = k1
+        self._b = b
+        self._tokenizer = tokenizer
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: List[str] = []
+        self._doc_index: Dict[str, int] = {}
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._num_alive = 0
+        self._total_len = 0.0
+        # The compact segment, term -> [offsets[i], offsets[i + 1]) of the postings
+        self._terms: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._post_docs = np.zeros(0, dtype=np.int32)
+        self._post_tfs = np.zeros(0, dtype=np.uint16)
+        self._segment_docs = 0
+        # The postings of the documents added after the segment
+        self._delta: Dict[str, Tuple[List[int], List[int]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of the live documents."""
+        return self._num_alive
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Whether the document is indexed."""
+        return doc_id in self._doc_index
+
+    @property
+    def ids(self) -> List[str]:
+        """Return the ids of the live documents."""
+        return list(self._doc_index.keys())
+
+    @property
+    def pending_docs(self) -> int:
+        """Return the documents added or deleted since the segment was built."""
+        return len(self._ids) - self._num_alive + len(self._ids) - self._segment_docs
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]) -> None:
+        """Index the texts, an indexed id is replaced."""
+        ids = list(ids)
+        self.delete([doc_id for doc_id in ids if doc_id in self._doc_index])
+        start = len(self._ids)
+        lengths = []
+        for offset, (doc_id, text) in enumerate(zip(ids, texts)):
+            doc = start + offset
+            terms = Counter(self._tokenizer(text))
+            for term, tf in terms.items():
+                docs, tfs = self._delta.setdefault(term, ([], []))
+                docs.append(doc)
+                tfs.append(min(tf, _MAX_TF))
+            self._ids.append(doc_id)
+            self._doc_index[doc_id] = doc
+            lengths.append(sum(terms.values()))
+        self._doc_len = np.concatenate(
+            [self._doc_len, np.asarray(lengths, dtype=np.float32)]
+        )
+        self._alive = np.concatenate([self._alive, np.ones(len(lengths), dtype=bool)])
+        self._num_alive += len(lengths)
+        self._total_len += float(sum(lengths))
+
+    def delete(self, ids: Iterable[str]) -> List[str]:
+        """Delete the documents, return the deleted ids."""
+        deleted = []
+        for doc_id in ids:
+            doc = self._doc_index.pop(doc_id, None)
+            if doc is None:
+                continue
+            self._alive[doc] = False
+            self._num_alive -= 1
+            self._total_len -= float(self._doc_len[doc])
+            deleted.append(doc_id)
+        return deleted
+
+    def clear(self) -> None:
+        """Delete all the documents."""
+        self._reset()
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        predicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return the ids and BM25 scores of the top k documents of the query.
+
+        Args:
+            query (str): The query text.
+            top_k (int): The number of documents to return.
+            predicate (Optional[Callable[[str], bool]]): Only return the documents
+                whose id matches it.
+        """
+        if not self._num_alive or top_k <= 0:
+            return []
+        query_terms = Counter(self._tokenizer(query))
+        num_docs = len(self._ids)
+        avg_len = self._total_len / self._num_alive or 1.0
+        all_docs, all_scores = [], []
+        for term, query_tf in query_terms.items():
+            docs, tfs = self._postings(term)
+            alive = self._alive[docs]
+            docs, tfs = docs[alive], tfs[alive]
+            df = len(docs)
+            if not df:
+                continue
+            idf = np.log1p((self._num_alive - df + 0.5) / (df + 0.5))
+            norm = self._k1 * (1 - self._b + self._b * self._doc_len[docs] / avg_len)
+            all_docs.append(docs)
+            all_scores.append(query_tf * idf * tfs * (self._k1 + 1) / (tfs + norm))
+        if not all_docs:
+            return []
+        scores = np.bincount(
+            np.concatenate(all_docs),
+            weights=np.concatenate(all_scores),
+            minlength=num_docs,
+        )
+        candidates = np.flatnonzero(scores)
+        if predicate is None and len(candidates) > top_k:
+            top = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = candidates[top]
+        # Sort by score, then by the insertion order
+        order = np.lexsort((candidates, -scores[candidates]))
+        results = []
+        for doc in candidates[order]:
+            doc_id = self._ids[doc]
+            if predicate is None or predicate(doc_id):
+                results.append((doc_id, float(scores[doc])))
+                if len(results) >= top_k:
+                    break
+        return results
+
+    def compact(self) -> None:
+        """Merge the added documents into the segment and drop the deleted ones."""
+        alive_docs = np.flatnonzero(self._alive)
+        remap = np.full(len(self._ids), -1, dtype=np.int64)
+        remap[alive_docs] = np.arange(len(alive_docs))
+        terms: Dict[str, int] = {}
+        offsets = [0]
+        doc_parts, tf_parts = [], []
+        for term in list(self._terms.keys()) + [
+            t for t in self._delta if t not in self._terms
+        ]:
+            docs, tfs = self._postings(term)
+            new_docs = remap[docs]
+            keep = new_docs >= 0
+            if not keep.any():
+                continue
+            terms[term] = len(terms)
+            doc_parts.append(new_docs[keep].astype(np.int32))
+            tf_parts.append(np.asarray(tfs[keep], dtype=np.uint16))
+            offsets.append(offsets[-1] + int(keep.sum()))
+        self._terms = terms
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._post_docs = (
+            np.concatenate(doc_parts) if doc_parts else np.zeros(0, dtype=np.int32)
+        )
+        self._post_tfs = (
+            np.concatenate(tf_parts) if tf_parts else np.zeros(0, dtype=np.uint16)
+        )
+        self._ids = [self._ids[doc] for doc in alive_docs]
+        self._doc_index = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._doc_len = np.array(self._doc_len[alive_docs], dtype=np.float32)
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._segment_docs = len(self._ids)
+        self._delta = {}
+
+    def save(self, path: str, prefix: str = "segment") -> None:
+        """Compact the index and save it as a segment in the directory.
+
+        The segment files are named by the prefix, write a new prefix and switch to
+        it to replace a segment atomically.
+        """
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, f"{prefix}.docs.npy"), self._post_docs)
+        np.save(os.path.join(path, f"{prefix}.tfs.npy"), self._post_tfs)
+        np.save(os.path.join(path, f"{prefix}.offsets.npy"), self._offsets)
+        np.save(os.path.join(path, f"{prefix}.doc_len.npy"), self._doc_len)
+        meta = {
+            "version": _SEGMENT_VERSION,
+            "ids": self._ids,
+            "terms": list(self._terms.keys()),
+        }
+        with open(os.path.join(path, f"{prefix}.meta.json"), "w") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def load(self, path: str, prefix: str = "segment", mmap: bool = True) -> None:
+        """Load a segment saved by :meth:`save`, the postings are memory-mapped."""
+        with open(os.path.join(path, f"{prefix}.meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != _SEGMENT_VERSION:
+            raise ValueError(f"Unsupported BM25 segment version {meta.get('version')}")
+        mmap_mode = "r" if mmap else None
+        self._reset()
+        self._post_docs = np.load(
+            os.path.join(path, f"{prefix}.docs.npy"), mmap_mode=mmap_mode
+        )
+        self._post_tfs = np.load(
+            os.path.join(path, f"{prefix}.tfs.npy"), mmap_mode=mmap_mode
+        )
+        self._offsets = np.load(os.path.join(path, f"{prefix}.offsets.npy"))
+        self._doc_len = np.load(os.path.join(path, f"{prefix}.doc_len.npy"))
+        self._terms = {term: i for i, term in enumerate(meta["terms"])}
+        self._ids = meta["ids"]
+        self._doc_index = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._num_alive = len(self._ids)
+        self._total_len = float(self._doc_len.sum())
+        self._segment_docs = len(self._ids)
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the documents and the term frequencies of a term."""
+        parts_docs, parts_tfs = [], []
+        i = self._terms.get(term)
+        if i is not None:
+            start, end = self._offsets[i], self._offsets[i + 1]
+            parts_docs.append(self._post_docs[start:end])
+            parts_tfs.append(self._post_tfs[start:end])
+        delta = self._delta.get(term)
+        if delta is not None:
+            parts_docs.append(np.asarray(delta[0], dtype=np.int32))
+            parts_tfs.append(np.asarray(delta[1], dtype=np.uint16))
+        if not parts_docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        if len(parts_docs) == 1:
+            return parts_docs[0], parts_tfs[0].astype(np.float32)
+        return (
+            np.concatenate(parts_docs),
+            np.concatenate(parts_tfs).astype(np.float32),
+        )
@@ -0,0 +1,377 @@
+"""Local BM25 full text store, an in-process alternative to Elasticsearch."""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from dbgpt.configs.model_config import PILOT_PATH, resolve_root_path
+from dbgpt.core import Chunk
+from dbgpt.storage.base import IndexStoreConfig
+from dbgpt.storage.full_text.base import FullTextStoreBase
+from dbgpt.storage.vector_store.base import VectorStoreConfig
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+from dbgpt.util import string_utils
+from dbgpt.util.executor_utils import blocking_func_to_async
+
+from .bm25_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LocalBM25StoreConfig(VectorStoreConfig):
+    """Local BM25 full text store config."""
+
+    __type__ = "local_bm25"
+
+    persist_path: Optional[str] = field(
+        default=os.getenv("LOCAL_BM25_PERSIST_PATH", None),
+        metadata={
+            "help": _(
+                "The persist path of the full text index, default is "
+                "`{PILOT_PATH}/data/bm25`."
+            ),
+        },
+    )
+    k1: float = field(
+        default=2.0,
+        metadata={
+            "help": _("Controls non-linear term frequency normalization (saturation).")
+        },
+    )
+    b: float = field(
+        default=0.75,
+        metadata={
+            "help": _("Controls to what degree document length normalizes tf values.")
+        },
+    )
+    compact_min_docs: int = field(
+        default=1024,
+        metadata={
+            "help": _(
+                "The added or deleted documents to rewrite the index segment, the "
+                "changes are appended to a log before."
+            )
+        },
+    )
+
+    def create_store(self, **kwargs) -> "LocalBM25Store":
+        """Create index store."""
+        return LocalBM25Store(config=self, **kwargs)
+
+
+class LocalBM25Store(FullTextStoreBase):
+    """Full text store of an in-process BM25 index.
+
+    The index is persisted as a memory-mapped segment and an append-only log of the
+    changes since the segment, the log is merged into a new segment when it grows
+    larger than a quarter of the segment.
+    """
+
+    def __init__(
+        self,
+        config: LocalBM25StoreConfig,
+        name: Optional[str] = "dbgpt",
+        k1: Optional[float] = None,
+        b: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        **kwargs: Any,
+    ):
+        """Create a LocalBM25Store.
+
+        Args:
+            config (LocalBM25StoreConfig): The store config.
+            name (Optional[str]): The index name.
+            k1 (Optional[float]): Override the k1 of the config.
+            b (Optional[float]): Override the b of the config.
+            executor (Optional[Executor]): The executor of the async methods.
+        """
+        super().__init__(executor)
+        self._config = config
+        name = name or "dbgpt"
+        self._index_name = name
+        if string_utils.contains_chinese(name):
+            self._index_name = "dbgpt_" + name.encode("utf-8").hex()
+        persist_path = config.persist_path or os.path.join(PILOT_PATH, "data", "bm25")
+        self._path = os.path.join(resolve_root_path(persist_path), self._index_name)
+        self._index = BM25Index(
+            k1=config.k1 if k1 is None else k1, b=config.b if b is None else b
+        )
+        # chunk id -> (content, metadata json)
+        self._docs: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._log_entries = 0
+        self._open()
+
+    def get_config(self) -> IndexStoreConfig:
+        """Get the store config."""
+        return self._config
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        """Index the chunks, a chunk of an indexed id is replaced.
+
+        Args:
+            chunks(List[Chunk]): document chunks.
+        Return:
+            List[str]: chunk ids.
+        """
+        ids = [chunk.chunk_id for chunk in chunks]
+        docs = [(chunk.content, json.dumps(chunk.metadata)) for chunk in chunks]
+        with self._lock:
+            self._index.add(ids, [content for content, _ in docs])
+            self._docs.update(zip(ids, docs))
+            self._append_log(
+                {"op": "add", "id": i, "content": d[0], "metadata": d[1]}
+                for i, d in zip(ids, docs)
+            )
+        return ids
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Search the chunks by BM25 scores.
+
+        Args:
+            text(str): The query text.
+            topk(int): The number of chunks to return.
+            score_threshold(float): The min BM25 score of a chunk, it is not
+                normalized.
+            filters(Optional[MetadataFilters]): metadata filters.
+        """
+        with self._lock:
+            predicate = None
+            if filters:
+                metadatas: Dict[str, Dict[str, Any]] = {}
+
+                def predicate(chunk_id: str) -> bool:
+                    if chunk_id not in metadatas:
+                        metadatas[chunk_id] = json.loads(self._docs[chunk_id][1])
+                    return _match_filters(metadatas[chunk_id], filters)
+
+            results = self._index.search(text, topk, predicate)
+            chunks = [
+                Chunk(
+                    chunk_id=chunk_id,
+                    content=self._docs[chunk_id][0],
+                    metadata=json.loads(self._docs[chunk_id][1]),
+                    score=score,
+                    retriever="full_text",
+                )
+                for chunk_id, score in results
+                if score_threshold is None or score >= score_threshold
+            ]
+        if score_threshold is not None and not chunks:
+            logger.warning(
+                "No relevant docs were retrieved using the relevance score"
+                f" threshold {score_threshold}"
+            )
+        return chunks
+
+    def similar_search(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Search the chunks by BM25 scores."""
+        return self.similar_search_with_scores(text, topk, 0.0, filters)
+
+    def full_text_search(
+        self, text: str, topk: int = 10, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Full text search in the local index."""
+        return self.similar_search_with_scores(text, topk, 0.0, filters)
+
+    async def afull_text_search(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Full text search in the local index.
+
+        The search runs in the executor, it waits for the lock held by a
+        compaction and must not block the event loop.
+        """
+        return await blocking_func_to_async(
+            self._executor, self.full_text_search, text, topk, filters
+        )
+
+    def is_support_full_text_search(self) -> bool:
+        """Support full text search."""
+        return True
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        """Delete the chunks.
+
+        Args:
+            ids(str): The chunk ids to delete, separated by comma.
+        """
+        id_list = [i for i in ids.split(",") if i]
+        with self._lock:
+            deleted = self._index.delete(id_list)
+            for chunk_id in deleted:
+                self._docs.pop(chunk_id, None)
+            if deleted:
+                self._append_log([{"op": "delete", "ids": deleted}])
+        return id_list
+
+    def delete_vector_name(self, index_name: str):
+        """Delete the index and its files."""
+        with self._lock:
+            self._index.clear()
+            self._docs.clear()
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._generation = 0
+            self._log_entries = 0
+        return True
+
+    def truncate(self) -> List[str]:
+        """Delete all the chunks, return the deleted chunk ids."""
+        with self._lock:
+            ids = self._index.ids
+            self.delete_vector_name(self._index_name)
+        return ids
+
+    def vector_name_exists(self) -> bool:
+        """Whether the index has chunks."""
+        return len(self._index) > 0
+
+    def compact(self) -> None:
+        """Rewrite the segment with all the chunks and start a new log."""
+        with self._lock:
+            generation = self._generation + 1
+            os.makedirs(self._path, exist_ok=True)
+            self._index.save(self._path, prefix=f"segment_{generation}")
+            with open(self._log_file(generation), "w", encoding="utf-8") as f:
+                for chunk_id in self._index.ids:
+                    content, metadata = self._docs[chunk_id]
+                    f.write(_log_line({"id": chunk_id, "content": content}, metadata))
+            # The meta file is the commit point of the new generation
+            meta_file = os.path.join(self._path, "meta.json")
+            with open(meta_file + ".tmp", "w") as f:
+                json.dump({"generation": generation}, f)
+            os.replace(meta_file + ".tmp", meta_file)
+            self._remove_generation(self._generation)
+            self._generation = generation
+            self._log_entries = 0
+
+    def _open(self) -> None:
+        """Load the segment and replay the log of the changes after it."""
+        meta_file = os.path.join(self._path, "meta.json")
+        if not os.path.exists(meta_file):
+            return
+        with open(meta_file) as f:
+            self._generation = json.load(f)["generation"]
+        self._index.load(self._path, prefix=f"segment_{self._generation}")
+        segment_docs = len(self._index)
+        added: List[Tuple[str, str]] = []
+        with open(self._log_file(self._generation), encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line is partially written by a crash
+                    logger.warning(f"Skip a broken line of the bm25 log {self._path}")
+                    continue
+                if i < segment_docs:
+                    self._docs[entry["id"]] = (entry["content"], entry["metadata"])
+                    continue
+                self._log_entries += 1
+                if entry["op"] == "add":
+                    added.append((entry["id"], entry["content"]))
+                    self._docs[entry["id"]] = (entry["content"], entry["metadata"])
+                else:
+                    self._flush_added(added)
+                    for chunk_id in self._index.delete(entry["ids"]):
+                        self._docs.pop(chunk_id, None)
+        self._flush_added(added)
+        logger.info(
+            f"Loaded bm25 index {self._index_name} with {len(self._index)} chunks"
+        )
+
+    def _flush_added(self, added: List[Tuple[str, str]]) -> None:
+        if added:
+            self._index.add([i for i, _ in added], [c for _, c in added])
+            added.clear()
+
+    def _append_log(self, entries) -> None:
+        os.makedirs(self._path, exist_ok=True)
+        if not os.path.exists(os.path.join(self._path, "meta.json")):
+            # The first changes of a new index are written as its first segment
+            self.compact()
+            return
+        with open(self._log_file(self._generation), "a", encoding="utf-8") as f:
+            for entry in entries:
+                metadata = entry.pop("metadata", None)
+                f.write(_log_line(entry, metadata))
+                self._log_entries += 1
+        if self._log_entries >= max(
+            self._config.compact_min_docs, len(self._index) // 4
+        ):
+            self.compact()
+
+    def _log_file(self, generation: int) -> str:
+        return os.path.join(self._path, f"log_{generation}.jsonl")
+
+    def _remove_generation(self, generation: int) -> None:
+        if not generation:
+            return
+        prefix = f"segment_{generation}."
+        for file_name in os.listdir(self._path):
+            if file_name.startswith(prefix):
+                os.remove(os.path.join(self._path, file_name))
+        if os.path.exists(self._log_file(generation)):
+            os.remove(self._log_file(generation))
+
+
+def _log_line(entry: Dict[str, Any], metadata: Optional[str]) -> str:
+    if metadata is not None:
+        entry["metadata"] = metadata
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+def _match_filter(metadata: Dict[str, Any], metadata_filter: MetadataFilter) -> bool:
+    op = metadata_filter.operator
+    if op == FilterOperator.EXISTS:
+        return metadata_filter.key in metadata
+    if metadata_filter.key not in metadata:
+        return op == FilterOperator.NIN or op == FilterOperator.NE
+    value = metadata[metadata_filter.key]
+    expected = metadata_filter.value
+    try:
+        if op == FilterOperator.EQ:
+            return value == expected
+        if op == FilterOperator.NE:
+            return value != expected
+        if op == FilterOperator.IN:
+            return value in expected  # type: ignore
+        if op == FilterOperator.NIN:
+            return value not in expected  # type: ignore
+        if op == FilterOperator.GT:
+            return value > expected
+        if op == FilterOperator.LT:
+            return value < expected
+        if op == FilterOperator.GTE:
+            return value >= expected
+        if op == FilterOperator.LTE:
+            return value <= expected
+    except TypeError:
+        return False
+    return False
+
+
+def _match_filters(metadata: Dict[str, Any], filters: MetadataFilters) -> bool:
+    matches = (_match_filter(metadata, f) for f in filters.filters)
+    if filters.condition == FilterCondition.OR:
+        return any(matches)
+    return all(matches)
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+
+from ..bm25_index import BM25Index, tokenize
+from ..local_bm25 import LocalBM25StoreConfig
+
+TEXTS = {
+    "1": "DB-GPT is an AI native data app development framework",
+    "2": "Elasticsearch is a distributed search engine",
+    "3": "BM25 ranks documents by term frequency and document length",
+    "4": "数据库问答",
+}
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add(TEXTS.keys(), TEXTS.values())
+    return index
+
+
+def _chunks():
+    return [
+        Chunk(chunk_id=chunk_id, content=text, metadata={"n": int(chunk_id)})
+        for chunk_id, text in TEXTS.items()
+    ]
+
+
+def test_tokenize():
+    assert tokenize("DB-GPT 数据库, hello_world!") == [
+        "db",
+        "gpt",
+        "数",
+        "据",
+        "库",
+        "hello_world",
+    ]
+
+
+def test_search(index):
+    results = index.search("search engine", top_k=3)
+    assert [doc_id for doc_id, _ in results] == ["2"]
+    assert index.search("document framework", top_k=1)[0][0] == "3"
+    assert index.search("数据", top_k=3)[0][0] == "4"
+    assert index.search("unknown", top_k=3) == []
+
+
+def test_delete_and_compact(index):
+    scores = dict(index.search("is", top_k=10))
+    assert set(scores) == {"1", "2"}
+
+    assert index.delete(["2", "missing"]) == ["2"]
+    assert "2" not in index
+    assert [doc_id for doc_id, _ in index.search("is", top_k=10)] == ["1"]
+
+    # An upsert replaces the indexed text
+    index.add(["1"], ["a search engine"])
+    assert [doc_id for doc_id, _ in index.search("search", top_k=10)] == ["1"]
+
+    before = index.search("search document", top_k=10)
+    index.compact()
+    assert index.pending_docs == 0
+    assert len(index) == 3
+    after = index.search("search document", top_k=10)
+    assert [doc_id for doc_id, _ in after] == [doc_id for doc_id, _ in before]
+    np.testing.assert_allclose([s for _, s in after], [s for _, s in before])
+
+
+def test_save_and_load(index, tmp_path):
+    index.delete(["1"])
+    expected = index.search("search document length", top_k=10)
+    index.save(str(tmp_path), prefix="seg")
+
+    loaded = BM25Index()
+    loaded.load(str(tmp_path), prefix="seg")
+    assert isinstance(loaded._post_docs, np.memmap)
+    assert sorted(loaded.ids) == ["2", "3", "4"]
+    assert loaded.search("search document length", top_k=10) == expected
+
+    # The memory-mapped segment accepts later changes
+    loaded.add(["5"], ["search search search"])
+    assert loaded.search("search", top_k=1)[0][0] == "5"
+
+
+def test_store_search_and_filters(tmp_path):
+    store = LocalBM25StoreConfig(persist_path=str(tmp_path)).create_store(name="test")
+    assert store.load_document(_chunks()) == list(TEXTS.keys())
+    assert store.is_support_full_text_search()
+
+    chunks = store.full_text_search("search engine framework", topk=3)
+    assert {c.chunk_id for c in chunks} == {"1", "2"}
+    assert all(c.retriever == "full_text" and c.score > 0 for c in chunks)
+    assert chunks[0].metadata == {"n": chunks[0].metadata["n"]}
+
+    filters = MetadataFilters(
+        filters=[MetadataFilter(key="n", operator=FilterOperator.GT, value=1)]
+    )
+    chunks = store.full_text_search("search engine framework", 3, filters)
+    assert [c.chunk_id for c in chunks] == ["2"]
+
+    filters = MetadataFilters(
+        condition=FilterCondition.OR,
+        filters=[
+            MetadataFilter(key="n", operator=FilterOperator.IN, value=[1]),
+            MetadataFilter(key="n", operator=FilterOperator.EQ, value=3),
+        ],
+    )
+    chunks = store.full_text_search("is document", 10, filters)
+    assert {c.chunk_id for c in chunks} == {"1", "3"}
+
+
+@pytest.mark.asyncio
+async def test_store_async_search(tmp_path):
+    config = LocalBM25StoreConfig(persist_path=str(tmp_path))
+    store = config.create_store(name="test", k1=0.0)
+    # An explicit 0.0 is not replaced by the config
+    assert store._index._k1 == 0.0
+    await store.aload_document(_chunks())
+    chunks = await store.afull_text_search("search engine", 2)
+    assert chunks == store.full_text_search("search engine", 2)
+    assert chunks[0].chunk_id == "2"
+
+
+def test_store_persistence(tmp_path):
+    config = LocalBM25StoreConfig(persist_path=str(tmp_path), compact_min_docs=2)
+    store = config.create_store(name="test")
+    store.load_document(_chunks()[:2])
+    store.load_document(_chunks()[2:])
+    store.delete_by_ids("2")
+    store.load_document(
+        [Chunk(chunk_id="5", content="another search engine", metadata={})]
+    )
+    expected = store.full_text_search("search engine document", 10)
+
+    reloaded = config.create_store(name="test")
+    assert reloaded.full_text_search("search engine document", 10) == expected
+    assert sorted(reloaded._index.ids) == ["1", "3", "4", "5"]
+
+    # A partially written line at the end of the log is skipped
+    with open(reloaded._log_file(reloaded._generation), "a") as f:
+        f.write('{"op": "add", "id": "6", "cont')
+    again = config.create_store(name="test")
+    assert sorted(again._index.ids) == ["1", "3", "4", "5"]
+
+    assert sorted(again.truncate()) == ["1", "3", "4", "5"]
+    assert not config.create_store(name="test").vector_name_exists()
@@ -3,7 +3,16 @@
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import AsyncGenerator, Dict, Iterator, List, Optional, Union
+from typing import (
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from dbgpt.storage.graph_store.base import GraphStoreBase
 from dbgpt.storage.graph_store.graph import (
@@ -139,6 +148,13 @@ class GraphStoreAdapter(ABC):
     ) -> None:
         """Convert chunk to chunk include entity."""
 
+    def upsert_chunk_include_entities(
+        self, chunk_entities: Iterable[Tuple[ParagraphChunk, Vertex]]
+    ) -> None:
+        """Upsert the chunk include entity edges of the chunk and entity pairs."""
+        for chunk, entity in chunk_entities:
+            self.upsert_chunk_include_entity(chunk=chunk, entity=entity)
+
     @abstractmethod
     def delete_document(self, chunk_id: str) -> None:
         """Delete document in graph store."""
@@ -1,10 +1,10 @@
 """Define the CommunityStore class."""
 
-import asyncio
 import logging
 from typing import List, Optional
 
 from dbgpt.storage.vector_store.base import VectorStoreBase
+from dbgpt.util.chat_util import run_async_tasks
 from dbgpt_ext.rag.transformer.community_summarizer import CommunitySummarizer
 from dbgpt_ext.storage.knowledge_graph.community.base import (
     Community,
@@ -44,20 +44,19 @@ class CommunityStore:
         )
 
     async def build_communities(self, batch_size: int = 1):
-        """Discover communities."""
+        """Discover communities.
+
+        At most batch_size communities are summarized at the same time.
+        """
         community_ids = await self._graph_store_adapter.discover_communities()
 
         # summarize communities
-        communities = []
-        n_communities = len(community_ids)
-
-        for i in range(0, n_communities, batch_size):
-            batch_ids = community_ids[i : i + batch_size]
-            batch_results = await asyncio.gather(
-                *[self._summary_community(cid) for cid in batch_ids]
-            )
-            # filter out None returns
-            communities.extend([c for c in batch_results if c is not None])
+        results = await run_async_tasks(
+            tasks=[self._summary_community(cid) for cid in community_ids],
+            concurrency_limit=max(batch_size, 1),
+        )
+        # filter out None returns
+        communities = [c for c in results if c is not None]
 
         # truncate then save new summaries
         await self._meta_store.truncate()
@@ -2,7 +2,17 @@
 
 import json
 import logging
-from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from packaging.version import Version
 
@@ -1208,3 +1218,25 @@ class TuGraphStoreAdapter(GraphStoreAdapter):
             src_type=GraphElemType.CHUNK.value,
             dst_type=GraphElemType.ENTITY.value,
         )
+
+    def upsert_chunk_include_entities(
+        self, chunk_entities: Iterable[Tuple[ParagraphChunk, Vertex]]
+    ) -> None:
+        """Upsert the chunk include entity edges in one query."""
+        edges = [
+            Edge(
+                sid=chunk.chunk_id,
+                tid=entity.vid,
+                name=GraphElemType.INCLUDE.value,
+                edge_type=GraphElemType.CHUNK_INCLUDE_ENTITY.value,
+            )
+            for chunk, entity in chunk_entities
+        ]
+        if not edges:
+            return
+        self.upsert_edge(
+            edges=iter(edges),
+            edge_type=GraphElemType.INCLUDE.value,
+            src_type=GraphElemType.CHUNK.value,
+            dst_type=GraphElemType.ENTITY.value,
+        )
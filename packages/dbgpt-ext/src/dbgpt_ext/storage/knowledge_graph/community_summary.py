@@ -2,12 +2,17 @@
 
 import logging
 import os
+import threading
 import uuid
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from typing import AsyncIterable, Iterable, Iterator, List, Optional, Tuple, Union
 
+from dbgpt.configs.model_config import GRAPH_EXTRACTION_CHECKPOINT_DIR
 from dbgpt.core import Chunk, Embeddings, LLMClient
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
+from dbgpt.storage.base import LoadProgressCallback
 from dbgpt.storage.graph_store.base import GraphStoreConfig
+from dbgpt.storage.graph_store.graph import MemoryGraph, Vertex
 from dbgpt.storage.knowledge_graph.base import ParagraphChunk
 from dbgpt.storage.vector_store.base import VectorStoreConfig
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -201,8 +206,16 @@ class CommunitySummaryKnowledgeGraph(BuiltinKnowledgeGraph):
         vector_store_config: Optional["VectorStoreConfig"] = None,
         kg_max_chunks_once_load: Optional[int] = 10,
         kg_max_threads: Optional[int] = 1,
+        kg_extraction_texts_per_prompt: Optional[int] = 1,
+        kg_extraction_checkpoint_dir: Optional[str] = GRAPH_EXTRACTION_CHECKPOINT_DIR,
     ):
-        """Initialize community summary knowledge graph class."""
+        """Initialize community summary knowledge graph class.
+
+        The graphs extracted from the chunks are checkpointed to
+        `{kg_extraction_checkpoint_dir}/{name}.jsonl`, a build interrupted is
+        resumed from the chunks not extracted yet. The checkpoint is cleared once
+        a load succeeds. Set it to None to disable the checkpoint.
+        """
         super().__init__(
             config=config, name=name, llm_client=llm_client, llm_model=llm_model
         )
@@ -255,8 +268,17 @@ class CommunitySummaryKnowledgeGraph(BuiltinKnowledgeGraph):
             max_threads=kg_max_threads,
             top_k=kg_extract_top_k,
             score_threshold=kg_extract_score_threshold,
+            texts_per_prompt=kg_extraction_texts_per_prompt or 1,
+            checkpoint_path=(
+                os.path.join(kg_extraction_checkpoint_dir, f"{name}.jsonl")
+                if kg_extraction_checkpoint_dir
+                else None
+            ),
         )
 
+        self._active_loads = 0
+        self._load_lock = threading.Lock()
+
         self._graph_embedder = GraphEmbedder(embedding_fn)
         self._text_embedder = TextEmbedder(embedding_fn)
 
@@ -308,6 +330,62 @@ class CommunitySummaryKnowledgeGraph(BuiltinKnowledgeGraph):
         """Get the knowledge graph config."""
         return self._embedding_fn
 
+    def load_document_with_limit(
+        self,
+        chunks: Iterable[Chunk],
+        max_chunks_once_load: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        progress_callback: Optional[LoadProgressCallback] = None,
+        max_retries: Optional[int] = None,
+    ) -> List[str]:
+        """Load the chunks, clear the extraction checkpoint once they are loaded."""
+        with self._clear_checkpoint_on_success():
+            return super().load_document_with_limit(
+                chunks,
+                max_chunks_once_load,
+                max_threads,
+                progress_callback,
+                max_retries,
+            )
+
+    async def aload_document_with_limit(
+        self,
+        chunks: Union[Iterable[Chunk], AsyncIterable[Chunk]],
+        max_chunks_once_load: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        progress_callback: Optional[LoadProgressCallback] = None,
+        max_retries: Optional[int] = None,
+    ) -> List[str]:
+        """Load the chunks, clear the extraction checkpoint once they are loaded."""
+        with self._clear_checkpoint_on_success():
+            return await super().aload_document_with_limit(
+                chunks,
+                max_chunks_once_load,
+                max_threads,
+                progress_callback,
+                max_retries,
+            )
+
+    @contextmanager
+    def _clear_checkpoint_on_success(self) -> Iterator[None]:
+        """Clear the checkpoint when the last running load succeeds.
+
+        The graphs of a finished load are in the graph store. The checkpoint is kept
+        while other loads are running, and after a failed load to resume it.
+        """
+        with self._load_lock:
+            self._active_loads += 1
+        try:
+            yield
+        except BaseException:
+            with self._load_lock:
+                self._active_loads -= 1
+            raise
+        with self._load_lock:
+            self._active_loads -= 1
+            if self._active_loads == 0:
+                self._graph_extractor.clear_checkpoint()
+
     async def aload_document(self, chunks: List[Chunk]) -> List[str]:
         """Extract and persist graph from the document file."""
         if not self.vector_name_exists():
@@ -391,24 +469,26 @@ class CommunitySummaryKnowledgeGraph(BuiltinKnowledgeGraph):
                 )
                 graphs_list[idx] = embeded_graphs
 
-        # Upsert the graphs into the graph store
+        # Merge the graphs of all the chunks, and upsert them in bulk
+        merged_graph = MemoryGraph()
+        chunk_entities: List[Tuple[Chunk, Vertex]] = []
         for idx, graphs in enumerate(graphs_list):
             for graph in graphs:
                 if document_graph_enabled:
                     # Append the chunk id to the edge
                     for edge in graph.edges():
                         edge.set_prop("_chunk_id", chunks[idx].chunk_id)
-                        graph.append_edge(edge=edge)
-
-                # Upsert the graph
-                self._graph_store_adapter.upsert_graph(graph)
-
-                # chunk -> include -> entity
-                if document_graph_enabled:
-                    for vertex in graph.vertices():
-                        self._graph_store_adapter.upsert_chunk_include_entity(
-                            chunk=chunks[idx], entity=vertex
-                        )
+                    # chunk -> include -> entity
+                    chunk_entities.extend(
+                        (chunks[idx], vertex) for vertex in graph.vertices()
+                    )
+                merged_graph.upsert_graph(graph)
+
+        # Upsert the graph
+        if merged_graph.vertex_count:
+            self._graph_store_adapter.upsert_graph(merged_graph)
+        if chunk_entities:
+            self._graph_store_adapter.upsert_chunk_include_entities(chunk_entities)
 
     def _load_chunks(
         self, chunks: List[ParagraphChunk]
@@ -506,6 +586,11 @@ class CommunitySummaryKnowledgeGraph(BuiltinKnowledgeGraph):
         logger.info(f"Final GraphRAG queried prompt:\n{content}")
         return [Chunk(content=content)]
 
+    def delete_by_ids(self, ids: str) -> List[str]:
+        """Delete by ids, and clear the extraction checkpoint."""
+        self._graph_extractor.clear_checkpoint()
+        return super().delete_by_ids(ids)
+
     def truncate(self) -> List[str]:
         """Truncate knowledge graph."""
         logger.info("Truncate community store")
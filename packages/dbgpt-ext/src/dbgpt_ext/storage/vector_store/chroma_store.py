@@ -15,6 +15,8 @@ from dbgpt.storage.vector_store.base import (
     _VECTOR_STORE_COMMON_PARAMETERS,
     VectorStoreBase,
     VectorStoreConfig,
+    build_chunks_with_scores,
+    distances_to_scores,
 )
 from dbgpt.storage.vector_store.filters import FilterOperator, MetadataFilters
 from dbgpt.util import string_utils
@@ -199,23 +201,40 @@ class ChromaStore(VectorStoreBase):
             topk=topk,
             filters=filters,
         )
-        chunks = [
-            (
-                Chunk(
-                    content=chroma_result[0],
-                    metadata=chroma_result[1] or {},
-                    score=(1 - chroma_result[2]),
-                    chunk_id=chroma_result[3],
-                )
-            )
-            for chroma_result in zip(
-                chroma_results["documents"][0],
-                chroma_results["metadatas"][0],
-                chroma_results["distances"][0],
-                chroma_results["ids"][0],
-            )
+        return self._to_chunks_with_scores(chroma_results, 0, score_threshold)
+
+    def get_embeddings(self) -> Optional[Embeddings]:
+        """Get the embedding function of the vector store."""
+        return self.embeddings
+
+    def is_support_search_by_vectors(self) -> bool:
+        """Whether the vector store supports searching by query vectors."""
+        return True
+
+    def similar_search_with_scores_by_vectors(
+        self,
+        vectors: List[List[float]],
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Search similar documents with scores of multiple query vectors.
+
+        All vectors are searched in one Chroma query.
+        """
+        logger.info(f"ChromaStore similar search with scores by {len(vectors)} vectors")
+        if not vectors:
+            return []
+        where_filters = self.convert_metadata_filters(filters) if filters else None
+        chroma_results = self._collection.query(
+            query_embeddings=vectors,
+            n_results=topk,
+            where=where_filters,
+        )
+        return [
+            self._to_chunks_with_scores(chroma_results, i, score_threshold)
+            for i in range(len(vectors))
         ]
-        return self.filter_by_score_threshold(chunks, score_threshold)
 
     async def afull_text_search(
         self, text: str, topk: int, filters: Optional[MetadataFilters] = None
@@ -431,6 +450,27 @@ class ChromaStore(VectorStoreBase):
             where=where_filters,
         )
 
+    def _to_chunks_with_scores(
+        self, chroma_results, index: int, score_threshold: Optional[float] = None
+    ) -> List[Chunk]:
+        """Convert the results of the query at index to chunks with scores.
+
+        The results whose score is lower than score_threshold are dropped.
+        """
+        chunks = build_chunks_with_scores(
+            chroma_results["ids"][index],
+            chroma_results["documents"][index],
+            chroma_results["metadatas"][index],
+            distances_to_scores(chroma_results["distances"][index], "cosine"),
+            score_threshold=score_threshold,
+        )
+        if not chunks and score_threshold is not None:
+            logger.warning(
+                "No relevant docs were retrieved using the relevance score"
+                f" threshold {score_threshold}"
+            )
+        return chunks
+
     def _clean_persist_folder(self):
         """Clean persist folder."""
         for root, dirs, files in os.walk(self.persist_dir, topdown=False):
@@ -216,6 +216,18 @@ class VectorStoreConnector:
             doc, topk, score_threshold, filters
         )
 
+    async def asimilar_search_with_scores_batch(
+        self,
+        queries: List[str],
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Async similar_search_with_score of multiple queries in vector database."""
+        return await self.client.asimilar_search_with_scores_batch(
+            queries, topk, score_threshold, filters
+        )
+
     @property
     def vector_store_config(self) -> IndexStoreConfig:
         """Return the vector store config."""
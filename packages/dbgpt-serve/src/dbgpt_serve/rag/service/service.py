@@ -4,7 +4,7 @@ import logging
 import os
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, cast
+from typing import Any, Dict, List, Optional, cast
 
 from fastapi import HTTPException
 
@@ -12,6 +12,8 @@ from dbgpt.component import ComponentType, SystemApp
 from dbgpt.configs import TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE
 from dbgpt.configs.model_config import (
     KNOWLEDGE_CACHE_ROOT_PATH,
+    PDF_PARSE_CACHE_DIR,
+    resolve_root_path,
 )
 from dbgpt.core import Chunk, LLMClient
 from dbgpt.core.interface.file import _SCHEMA, FileStorageClient
@@ -532,6 +534,7 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
             knowledge = KnowledgeFactory.create(
                 datasource=knowledge_content,
                 knowledge_type=KnowledgeType.get_by_value(doc.doc_type),
+                **self._document_knowledge_kwargs(),
             )
         doc.status = SyncStatus.RUNNING.name
 
@@ -551,6 +554,18 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         )
         logger.info(f"begin save document chunks, doc:{doc.doc_name}")
 
+    def _document_knowledge_kwargs(self) -> Dict[str, Any]:
+        """Return the arguments of the document knowledge in the app config."""
+        app_config = self._system_app.config.configs.get("app_config")
+        rag_config = app_config.rag if app_config else None
+        if not rag_config or not rag_config.enable_pdf_parse_cache:
+            return {}
+        return {
+            "parse_cache_dir": resolve_root_path(
+                rag_config.pdf_parse_cache_dir or PDF_PARSE_CACHE_DIR
+            )
+        }
+
     @trace("async_doc_process")
     async def async_doc_process(
         self,
@@ -12,6 +12,7 @@ from dbgpt.storage.base import IndexStoreBase
 from dbgpt.storage.full_text.base import FullTextStoreBase
 from dbgpt.storage.vector_store.base import VectorStoreBase, VectorStoreConfig
 from dbgpt_ext.storage.full_text.elasticsearch import ElasticDocumentStore
+from dbgpt_ext.storage.full_text.local_bm25 import LocalBM25StoreConfig
 from dbgpt_ext.storage.knowledge_graph.knowledge_graph import BuiltinKnowledgeGraph
 
 
@@ -124,6 +125,7 @@ class StorageManager(BaseComponent):
                         kg_document_graph_enabled=rag_config.kg_document_graph_enabled,
                         kg_chunk_search_top_k=rag_config.kg_chunk_search_top_k,
                         kg_extraction_batch_size=rag_config.kg_extraction_batch_size,
+                        kg_extraction_texts_per_prompt=rag_config.kg_extraction_texts_per_prompt,
                         kg_community_summary_batch_size=rag_config.kg_community_summary_batch_size,
                         kg_embedding_batch_size=rag_config.kg_embedding_batch_size,
                         kg_similarity_top_k=rag_config.kg_similarity_top_k,
@@ -149,6 +151,17 @@ class StorageManager(BaseComponent):
         if index_name in self._store_cache:
             return self._store_cache[index_name]
         with self._cache_lock:
+            if isinstance(storage_config.full_text, LocalBM25StoreConfig):
+                # The local index holds the chunks in memory, share one per index
+                if index_name not in self._store_cache:
+                    self._store_cache[index_name] = (
+                        storage_config.full_text.create_store(
+                            name=index_name,
+                            k1=rag_config.bm25_k1,
+                            b=rag_config.bm25_b,
+                        )
+                    )
+                return self._store_cache[index_name]
             return ElasticDocumentStore(
                 es_config=storage_config.full_text,
                 name=index_name,